@@ -0,0 +1,99 @@
+# apps/accounts/activite.py
+"""
+Suivi de la dernière activité des utilisateurs (``derniere_connexion``).
+
+Au lieu d'un ``save()`` par utilisateur, les middlewares notent l'instant
+de la requête dans un tampon du processus. Le tampon est écrit en base par
+un seul ``bulk_update`` à la fin d'une requête, au plus toutes les
+ACCOUNTS_ACTIVITE_INTERVALLE_ECRITURE secondes, et à l'arrêt du processus.
+Un utilisateur n'est noté que si son activité connue date de plus de
+ACCOUNTS_ACTIVITE_PRECISION secondes : la date est volontairement
+approximative. Les entrées non écrites lors d'un arrêt brutal sont perdues
+(quelques secondes d'activité au plus).
+"""
+import atexit
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class SuiviActivite:
+    """
+    Tampon des dernières activités, écrit en base par lots.
+    """
+
+    def __init__(self):
+        self._en_attente = {}
+        self._prochaine_ecriture = 0
+        self._verrou = threading.Lock()
+
+    def enregistrer(self, utilisateur, instant=None):
+        """
+        Note l'activité de ``utilisateur`` si celle connue est trop ancienne.
+
+        Returns:
+            bool: True si l'activité a été notée
+        """
+        instant = instant or timezone.now()
+        precision = timedelta(seconds=getattr(settings, 'ACCOUNTS_ACTIVITE_PRECISION', 900))
+        connue = utilisateur.derniere_connexion
+        if connue is not None and instant - connue < precision:
+            return False
+
+        # L'objet de la requête reflète l'activité notée
+        utilisateur.derniere_connexion = instant
+        with self._verrou:
+            self._en_attente[utilisateur.pk] = instant
+        return True
+
+    def ecriture_due(self):
+        return bool(self._en_attente) and time.monotonic() >= self._prochaine_ecriture
+
+    def ecrire(self):
+        """
+        Écrit les activités en attente (une requête par lot).
+
+        Returns:
+            int: Nombre d'utilisateurs mis à jour
+        """
+        with self._verrou:
+            en_attente, self._en_attente = self._en_attente, {}
+            self._prochaine_ecriture = time.monotonic() + getattr(
+                settings, 'ACCOUNTS_ACTIVITE_INTERVALLE_ECRITURE', 60
+            )
+        if not en_attente:
+            return 0
+
+        User = get_user_model()
+        try:
+            # bulk_update : pas de signal, une expression CASE par lot
+            User.objects.bulk_update(
+                [User(pk=pk, derniere_connexion=instant) for pk, instant in en_attente.items()],
+                ['derniere_connexion'],
+                batch_size=500
+            )
+        except DatabaseError:
+            # Remises en attente pour la prochaine écriture (sauf activité plus récente notée entre-temps)
+            with self._verrou:
+                self._en_attente = {**en_attente, **self._en_attente}
+            raise
+        return len(en_attente)
+
+    def ecrire_a_l_arret(self):
+        try:
+            self.ecrire()
+        except DatabaseError as e:
+            logger.warning(f"Activités non écrites à l'arrêt du processus : {e}")
+
+
+# Tampon partagé par les requêtes du processus
+suivi_activite = SuiviActivite()
+atexit.register(suivi_activite.ecrire_a_l_arret)
@@ -5,13 +5,20 @@ from django.shortcuts import redirect
 from django.conf import settings
 from django.contrib.auth import logout
 from django.contrib import messages
+from django.db import DatabaseError
 from django.utils.translation import gettext_lazy as _
+import logging
 import re
 
+from .activite import suivi_activite
+
+logger = logging.getLogger(__name__)
+
 
 class LastUserActivityMiddleware:
     """
     Middleware qui met à jour la dernière date d'activité d'un utilisateur.
+    Les activités sont regroupées et écrites par lots (apps.accounts.activite).
     """
     def __init__(self, get_response):
         self.get_response = get_response
@@ -19,13 +26,17 @@ class LastUserActivityMiddleware:
     def __call__(self, request):
         response = self.get_response(request)
         
-        # Mettre à jour la dernière activité de l'utilisateur
+        # Noter la dernière activité de l'utilisateur (si plus ancienne que la précision)
         if request.user.is_authenticated:
-            # Mettre à jour seulement si la dernière mise à jour date de plus de 15 minutes
-            update_threshold = timezone.now() - timezone.timedelta(minutes=15)
-            if not request.user.derniere_connexion or request.user.derniere_connexion < update_threshold:
-                request.user.derniere_connexion = timezone.now()
-                request.user.save(update_fields=['derniere_connexion'])
+            suivi_activite.enregistrer(request.user)
+        
+        # Écriture groupée des activités en attente du processus
+        if suivi_activite.ecriture_due():
+            try:
+                suivi_activite.ecrire()
+            except DatabaseError as e:
+                # La réponse est déjà produite : les activités seront réécrites plus tard
+                logger.warning(f"Écriture des activités utilisateur reportée : {e}")
         
         return response
 
@@ -91,9 +102,10 @@ class SessionExpiryMiddleware:
                 return redirect(settings.LOGIN_URL)
             
             # Vérifier l'âge de la session
-            if 'last_activity' in request.session:
-                last_activity = request.session['last_activity']
-                session_age = timezone.now().timestamp() - last_activity
+            maintenant = timezone.now().timestamp()
+            last_activity = request.session.get('last_activity')
+            if last_activity is not None:
+                session_age = maintenant - last_activity
                 
                 # Déconnecter si la session est trop ancienne (par défaut: 30 minutes)
                 session_timeout = getattr(settings, 'SESSION_IDLE_TIMEOUT', 1800)
@@ -102,8 +114,12 @@ class SessionExpiryMiddleware:
                     messages.info(request, _("Votre session a expiré pour des raisons de sécurité. Veuillez vous reconnecter."))
                     return redirect(settings.LOGIN_URL)
             
-            # Mettre à jour l'horodatage de la dernière activité
-            request.session['last_activity'] = timezone.now().timestamp()
+            # Mettre à jour l'horodatage de la dernière activité, seulement s'il
+            # date de plus de SESSION_ACTIVITE_PRECISION secondes : la session
+            # n'est pas réécrite à chaque requête
+            precision = getattr(settings, 'SESSION_ACTIVITE_PRECISION', 60)
+            if last_activity is None or maintenant - last_activity >= precision:
+                request.session['last_activity'] = maintenant
         
         return self.get_response(request)
 
@@ -4,6 +4,7 @@ from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from apps.core.models import BaseModel, Statut
+from .permissions import cache_permissions
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 import uuid
@@ -213,19 +214,13 @@ class CustomUser(AbstractUser):
     def has_permission(self, permission_code):
         """
         Vérifie si l'utilisateur a une permission spécifique.
+        Les permissions du rôle sont lues dans le cache (aucune requête).
         """
         if self.is_superuser:
             return True
-        if not self.role:
-            return False
-        try:
-            permission = Permission.objects.get(code=permission_code)
-            return RolePermission.objects.filter(
-                role=self.role, 
-                permission=permission
-            ).exists()
-        except Permission.DoesNotExist:
+        if not self.role_id:
             return False
+        return cache_permissions.a_permission(self.role_id, permission_code)
     
     def generate_activation_key(self):
         """
@@ -0,0 +1,117 @@
+# apps/accounts/permissions.py
+"""
+Cache des permissions des rôles (``CustomUser.has_permission``).
+
+Les codes de permission d'un rôle sont chargés en une requête, sous forme de
+frozenset, puis conservés à deux niveaux : dans le processus, et dans le
+cache partagé sous une clé ``rôle + version``. Une vérification de
+permission est alors une recherche dans un ensemble, sans requête.
+
+Toute modification d'un rôle, d'une permission ou d'une association
+rôle-permission incrémente la version (signaux, à l'écriture et après
+validation de la transaction) : les anciennes clés du cache partagé ne sont plus lues et le
+processus courant vide immédiatement ses ensembles. Les autres processus
+relisent la version au plus toutes les ACCOUNTS_PERMISSIONS_VERIFICATION
+secondes.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.utils import une_fois_apres_commit
+
+CLE_VERSION = 'accounts:permissions:version'
+
+
+class CachePermissions:
+    """
+    Ensembles des codes de permission par rôle.
+    """
+
+    def __init__(self):
+        self._roles = {}
+        self._version = None
+        self._prochaine_verification = 0
+        self._verrou = threading.Lock()
+
+    def codes(self, role_id):
+        """
+        Retourne les codes des permissions (non supprimées) du rôle.
+
+        Returns:
+            frozenset: Codes de permission
+        """
+        version = self._version_courante()
+        codes = self._roles.get(role_id)
+        if codes is None:
+            cle = f"accounts:permissions:{version}:{role_id}"
+            codes = cache.get(cle)
+            if codes is None:
+                codes = self._charger(role_id)
+                cache.set(cle, codes, getattr(settings, 'ACCOUNTS_PERMISSIONS_CACHE_DUREE', 3600))
+            with self._verrou:
+                if self._version == version:
+                    self._roles[role_id] = codes
+        return codes
+
+    def a_permission(self, role_id, code):
+        return code in self.codes(role_id)
+
+    def invalider(self):
+        """
+        Change la version des permissions, tout de suite (lectures de la
+        transaction en cours) puis après sa validation : un ensemble relu
+        entre-temps par un autre processus, encore sans la modification,
+        est ainsi abandonné.
+        """
+        _changer_version()
+        # Un seul changement différé par transaction
+        une_fois_apres_commit(_changer_version)
+
+    def vider(self):
+        """Oublie les ensembles du processus (relus depuis le cache partagé)."""
+        with self._verrou:
+            self._roles.clear()
+            self._version = None
+            self._prochaine_verification = 0
+
+    def _version_courante(self):
+        maintenant = time.monotonic()
+        if maintenant < self._prochaine_verification:
+            return self._version
+
+        version = cache.get(CLE_VERSION)
+        if version is None:
+            # Clé absente (premier accès ou cache vidé) : une nouvelle version
+            # évite de relire des ensembles d'une version précédente
+            cache.add(CLE_VERSION, time.time_ns(), None)
+            version = cache.get(CLE_VERSION)
+        with self._verrou:
+            if version != self._version:
+                self._roles.clear()
+                self._version = version
+            self._prochaine_verification = maintenant + getattr(settings, 'ACCOUNTS_PERMISSIONS_VERIFICATION', 5)
+        return version
+
+    def _charger(self, role_id):
+        from .models import RolePermission
+
+        return frozenset(
+            RolePermission.objects.filter(role_id=role_id, permission__deleted_at__isnull=True)
+            .values_list('permission__code', flat=True)
+        )
+
+
+# Cache partagé par les utilisateurs du processus
+cache_permissions = CachePermissions()
+
+
+def _changer_version():
+    try:
+        cache.incr(CLE_VERSION)
+    except ValueError:
+        # Clé absente : toute nouvelle valeur invalide les anciennes clés
+        cache.set(CLE_VERSION, time.time_ns(), None)
+    cache_permissions.vider()
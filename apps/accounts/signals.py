@@ -1,5 +1,5 @@
 # apps/accounts/signals.py
-from django.db.models.signals import post_save, pre_save, pre_delete
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete
 from django.dispatch import receiver
 from django.core.mail import send_mail
 from django.utils import timezone
@@ -7,7 +7,8 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
 from django.utils.translation import gettext_lazy as _
-from .models import Role, UserLoginHistory, CustomUser, RolePermission
+from .models import Role, Permission, UserLoginHistory, CustomUser, RolePermission
+from .permissions import cache_permissions
 import uuid
 import logging
 from apps.membres.models import Membre
@@ -135,6 +136,19 @@ def log_permission_removal(sender, instance, **kwargs):
     logger.info(f"Permission {instance.permission.code} supprimée du rôle {instance.role.nom}")
 
 
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_save, sender=RolePermission)
+@receiver(post_delete, sender=RolePermission)
+def invalider_cache_permissions(sender, **kwargs):
+    """
+    Invalide le cache des permissions des rôles (après validation de la transaction).
+    """
+    cache_permissions.invalider()
+
+
 def get_client_ip(request):
     """
     Récupère l'adresse IP du client, en tenant compte des proxys.
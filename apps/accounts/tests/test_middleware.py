@@ -76,4 +76,99 @@ class SessionExpiryMiddlewareTest(TestCase):
         
         # Vérifier que le timestamp de dernière activité est défini
         self.assertIn('last_activity', request.session)
-        self.assertIsInstance(request.session['last_activity'], float)
\ No newline at end of file
+        self.assertIsInstance(request.session['last_activity'], float)
+
+class SuiviActiviteTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.users = [
+            User.objects.create_user(email=f'user{i}@example.com', username=f'user{i}', password='testpassword')
+            for i in range(3)
+        ]
+    
+    def _requete(self, user):
+        request = self.factory.get('/')
+        request.user = user
+        return request
+    
+    def test_ecritures_groupees(self):
+        from django.test import override_settings
+        from apps.accounts.activite import suivi_activite
+        
+        middleware = LastUserActivityMiddleware(get_response=lambda r: r)
+        with override_settings(ACCOUNTS_ACTIVITE_INTERVALLE_ECRITURE=3600):
+            suivi_activite.ecrire()
+            # Aucune écriture pendant l'intervalle, même pour plusieurs utilisateurs
+            with self.assertNumQueries(0):
+                for user in self.users:
+                    middleware(self._requete(user))
+                    middleware(self._requete(user))
+        
+        # Une seule requête pour tous les utilisateurs en attente
+        with self.assertNumQueries(1):
+            self.assertEqual(suivi_activite.ecrire(), 3)
+        
+        for user in self.users:
+            user.refresh_from_db()
+            self.assertGreater(user.derniere_connexion, timezone.now() - timezone.timedelta(minutes=1))
+        
+        # Activité récente : rien à noter
+        self.assertFalse(suivi_activite.enregistrer(self.users[0]))
+    
+    def test_echec_ecriture_conserve_les_activites(self):
+        from unittest.mock import patch
+        from django.db import OperationalError
+        from django.test import override_settings
+        from apps.accounts.activite import suivi_activite
+        
+        suivi_activite.ecrire()
+        middleware = LastUserActivityMiddleware(get_response=lambda r: r)
+        with override_settings(ACCOUNTS_ACTIVITE_INTERVALLE_ECRITURE=0):
+            with patch.object(User.objects, 'bulk_update', side_effect=OperationalError('database is locked')):
+                with self.assertLogs('apps.accounts.middleware', level='WARNING'):
+                    request = self._requete(self.users[0])
+                    self.assertIs(middleware(request), request)
+            
+            # Réécrite à l'écriture suivante
+            self.assertEqual(suivi_activite.ecrire(), 1)
+        
+        self.users[0].refresh_from_db()
+        self.assertIsNotNone(self.users[0].derniere_connexion)
+
+
+class SessionActiviteTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            username='testuser',
+            password='testpassword'
+        )
+        self.middleware = SessionExpiryMiddleware(get_response=lambda r: r)
+    
+    def _requete(self, session_key=None):
+        request = self.factory.get('/')
+        SessionMiddleware(get_response=lambda r: r).process_request(request)
+        if session_key:
+            request.session = request.session.__class__(session_key)
+        MessageMiddleware(get_response=lambda r: r).process_request(request)
+        request.user = self.user
+        return request
+    
+    def test_session_non_reecrite_a_chaque_requete(self):
+        request = self._requete()
+        self.middleware(request)
+        self.assertTrue(request.session.modified)
+        request.session.save()
+        
+        # Requête suivante dans la minute : session lue mais non modifiée
+        request = self._requete(request.session.session_key)
+        self.middleware(request)
+        self.assertFalse(request.session.modified)
+        
+        # Horodatage plus ancien que la précision : mis à jour
+        request.session['last_activity'] -= 120
+        request.session.save()
+        request = self._requete(request.session.session_key)
+        self.middleware(request)
+        self.assertTrue(request.session.modified)
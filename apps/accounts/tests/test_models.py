@@ -74,4 +74,43 @@ class CustomUserModelTest(TestCase):
     def test_generate_activation_key(self):
         key = self.user.generate_activation_key()
         self.assertIsNotNone(key)
-        self.assertEqual(key, self.user.cle_activation)
\ No newline at end of file
+        self.assertEqual(key, self.user.cle_activation)
+
+class CachePermissionsTest(TestCase):
+    def setUp(self):
+        from apps.accounts.permissions import cache_permissions
+        
+        cache_permissions.vider()
+        self.role = Role.objects.create(nom="Gestionnaire")
+        self.permission = Permission.objects.create(code="gerer_membres", nom="Gérer les membres")
+        RolePermission.objects.create(role=self.role, permission=self.permission)
+        self.user = User.objects.create_user(
+            email="gestion@example.com", username="gestion", password="testpassword", role=self.role
+        )
+    
+    def test_verifications_sans_requete(self):
+        from apps.accounts.permissions import cache_permissions
+        
+        self.assertTrue(self.user.has_permission("gerer_membres"))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.user.has_permission("gerer_membres"))
+            self.assertFalse(self.user.has_permission("gerer_cotisations"))
+        
+        # Autre processus : ensembles relus depuis le cache partagé
+        cache_permissions.vider()
+        with self.assertNumQueries(0):
+            self.assertTrue(self.user.has_permission("gerer_membres"))
+    
+    def test_invalidation_par_les_signaux(self):
+        self.assertFalse(self.user.has_permission("gerer_cotisations"))
+        
+        autre = Permission.objects.create(code="gerer_cotisations", nom="Gérer les cotisations")
+        RolePermission.objects.create(role=self.role, permission=autre)
+        self.assertTrue(self.user.has_permission("gerer_cotisations"))
+        
+        # Permission supprimée logiquement : plus accordée
+        self.permission.delete()
+        self.assertFalse(self.user.has_permission("gerer_membres"))
+        
+        RolePermission.objects.filter(permission=autre).delete()
+        self.assertFalse(self.user.has_permission("gerer_cotisations"))
@@ -1,9 +1,16 @@
 # apps/core/admin.py
 from django.contrib import admin
-from .models import Statut
+from .models import Statut, TacheExport
 
 @admin.register(Statut)
 class StatutAdmin(admin.ModelAdmin):
     list_display = ('nom', 'type_entite', 'description', 'created_at', 'updated_at')
     list_filter = ('type_entite',)
-    search_fields = ('nom', 'description')
\ No newline at end of file
+    search_fields = ('nom', 'description')
+
+
+@admin.register(TacheExport)
+class TacheExportAdmin(admin.ModelAdmin):
+    list_display = ('generateur', 'format_export', 'utilisateur', 'statut', 'progression', 'created_at', 'date_expiration')
+    list_filter = ('statut', 'format_export')
+    readonly_fields = ('id', 'created_at', 'date_fin')
@@ -8,4 +8,9 @@ class CoreConfig(AppConfig):
     
     def ready(self):
         # Importer les signaux
-        import apps.core.signals
\ No newline at end of file
+        import apps.core.signals
+
+        # Table FTS5 de l'index de recherche (SQLite), après chaque migrate
+        from django.db.models.signals import post_migrate
+        from apps.core.recherche import installer_index_plein_texte
+        post_migrate.connect(installer_index_plein_texte, sender=self)
\ No newline at end of file
@@ -0,0 +1,151 @@
+# apps/core/audit.py
+"""
+Écriture différée de la piste d'audit (historiques et journal des sauvegardes).
+
+Par défaut, les signaux enregistrent chaque entrée d'historique au moment de
+la sauvegarde. Les traitements en masse peuvent s'inscrire au mode différé :
+
+    with journal_differe():
+        with transaction.atomic():
+            ...  # créations / modifications en masse
+
+Dans ce mode, les entrées produites dans une transaction sont mises en
+mémoire puis écrites par ``bulk_create`` une fois la transaction validée
+(``transaction.on_commit``), ou confiées à un worker Celery en mode
+asynchrone. Si la transaction est annulée, elles sont abandonnées avec elle.
+Les messages du journal des sauvegardes (apps.core.signals) sont résumés par
+modèle et par action au lieu d'une ligne par objet.
+"""
+import logging
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core import serializers
+from django.db import IntegrityError, transaction
+
+from .utils import une_fois_apres_commit
+
+logger = logging.getLogger(__name__)
+journal_logger = logging.getLogger('django')
+
+_etat = threading.local()
+
+
+class JournalAudit:
+    """
+    Entrées d'audit en attente pour une transaction.
+
+    Args:
+        asynchrone (bool): Confier l'écriture à Celery (AUDIT_ECRITURE_ASYNCHRONE)
+    """
+
+    def __init__(self, asynchrone=None):
+        if asynchrone is None:
+            asynchrone = getattr(settings, 'AUDIT_ECRITURE_ASYNCHRONE', False)
+        self.asynchrone = asynchrone
+        self.objets = []
+        self.sauvegardes = Counter()
+
+    def ajouter(self, objet):
+        self.objets.append(objet)
+
+    def compter(self, modele, action):
+        self.sauvegardes[(modele, action)] += 1
+
+    def vider(self):
+        """Écrit les entrées en attente (appelé après validation de la transaction)."""
+        for (modele, action), nombre in self.sauvegardes.items():
+            journal_logger.info(f"{modele} : {nombre} {action}")
+        self.sauvegardes.clear()
+
+        objets, self.objets = self.objets, []
+        if not objets:
+            return
+        if self.asynchrone:
+            from .tasks import ecrire_journal_audit_task
+            ecrire_journal_audit_task.delay(serializers.serialize('json', objets))
+        else:
+            ecrire_objets(objets)
+
+
+def ecrire_objets(objets):
+    """
+    Insère les entrées d'audit par ``bulk_create``, un lot par modèle.
+
+    Si un lot échoue (objet audité supprimé entre-temps, par exemple), ses
+    entrées sont insérées une à une et les entrées invalides sont ignorées.
+
+    Returns:
+        int: Nombre d'entrées écrites
+    """
+    taille_lot = getattr(settings, 'AUDIT_TAILLE_LOT', 500)
+    par_modele = defaultdict(list)
+    for objet in objets:
+        par_modele[type(objet)].append(objet)
+
+    ecrits = 0
+    for modele, lot in par_modele.items():
+        try:
+            with transaction.atomic():
+                modele.objects.bulk_create(lot, batch_size=taille_lot)
+            ecrits += len(lot)
+        except IntegrityError:
+            for objet in lot:
+                try:
+                    with transaction.atomic():
+                        objet.save(force_insert=True)
+                    ecrits += 1
+                except IntegrityError as e:
+                    logger.warning(f"Entrée d'audit {modele.__name__} ignorée : {e}")
+    return ecrits
+
+
+@contextmanager
+def journal_differe(asynchrone=None):
+    """
+    Active l'écriture différée de l'audit pour le bloc (voir le module).
+
+    Args:
+        asynchrone (bool): Confier l'écriture à Celery plutôt que de l'effectuer
+            à la validation de la transaction
+    """
+    precedent = getattr(_etat, 'differe', None)
+    _etat.differe = {'asynchrone': asynchrone}
+    try:
+        yield
+    finally:
+        _etat.differe = precedent
+
+
+def journal_courant():
+    """
+    Journal de la transaction en cours si l'écriture différée est active et
+    qu'une transaction est ouverte, sinon None (écriture immédiate).
+    """
+    differe = getattr(_etat, 'differe', None)
+    connection = transaction.get_connection()
+    if differe is None or not connection.in_atomic_block:
+        return None
+
+    # Écriture non encore programmée dans cette transaction : un journal restant
+    # appartient à une transaction annulée et est abandonné
+    if une_fois_apres_commit(_vider_journal) or getattr(_etat, 'journal', None) is None:
+        _etat.journal = JournalAudit(differe['asynchrone'])
+    return _etat.journal
+
+
+def _vider_journal():
+    journal, _etat.journal = getattr(_etat, 'journal', None), None
+    if journal is not None:
+        journal.vider()
+
+
+def enregistrer(objet):
+    """Enregistre une entrée d'audit, immédiatement ou à la validation de la transaction."""
+    journal = journal_courant()
+    if journal is None:
+        objet.save()
+    else:
+        journal.ajouter(objet)
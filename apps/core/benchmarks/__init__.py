@@ -0,0 +1,10 @@
+# apps/core/benchmarks/__init__.py
+"""
+Mesures de performance des chemins critiques sur un jeu de données
+synthétique reproductible (commande ``benchmark_association``).
+"""
+from .donnees import JeuDonneesSynthetique
+from .mesures import mesurer
+from .scenarios import SCENARIOS, executer_scenarios, scenario
+
+__all__ = ['JeuDonneesSynthetique', 'SCENARIOS', 'executer_scenarios', 'mesurer', 'scenario']
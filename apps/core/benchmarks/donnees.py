@@ -0,0 +1,358 @@
+# apps/core/benchmarks/donnees.py
+"""
+Jeu de données synthétique à l'échelle d'une association.
+
+Tout est tiré d'un générateur pseudo-aléatoire initialisé par ``graine`` :
+à échelle et graine identiques, deux générations produisent les mêmes
+volumes, statuts, montants et dates (relatives au jour de génération), donc
+des mesures comparables d'un commit à l'autre. Les lignes sont créées par
+``bulk_create`` (sans signaux) ; les compteurs dénormalisés (types actifs
+des membres, places des événements) et l'index de recherche sont renseignés
+directement, comme le feraient les signaux.
+"""
+import random
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.recherche import index_recherche
+
+PRENOMS = ('Alice', 'Bruno', 'Chloé', 'David', 'Élodie', 'Fabien', 'Gaëlle', 'Hugo', 'Inès', 'Julien')
+NOMS = ('Martin', 'Bernard', 'Dubois', 'Thomas', 'Robert', 'Richard', 'Petit', 'Durand', 'Leroy', 'Moreau')
+VILLES = ('Paris', 'Lyon', 'Marseille', 'Toulouse', 'Nantes', 'Lille', 'Rennes', 'Grenoble')
+
+TYPES_MEMBRES = (
+    ('Benchmark Standard', Decimal('50.00')),
+    ('Benchmark Étudiant', Decimal('20.00')),
+    ('Benchmark Bienfaiteur', Decimal('120.00')),
+    ('Benchmark Honoraire', Decimal('0.00')),
+)
+
+
+class JeuDonneesSynthetique:
+    """
+    Génère membres (avec historique de types), cotisations sur plusieurs
+    années (paiements et rappels) et événements (inscriptions,
+    accompagnants, listes d'attente, séries récurrentes).
+
+    Args:
+        membres (int): Nombre de membres
+        annees (int): Nombre d'années de cotisations, année en cours comprise
+        evenements (int): Nombre d'événements (passés et à venir)
+        graine (int): Graine du générateur pseudo-aléatoire
+        batch_size (int): Taille des lots de ``bulk_create``
+    """
+
+    def __init__(self, membres=1000, annees=3, evenements=100, graine=42, batch_size=1000):
+        self.nombre_membres = membres
+        self.annees = annees
+        self.nombre_evenements = evenements
+        self.graine = graine
+        self.batch_size = batch_size
+        self.rng = random.Random(graine)
+        self.suffixe = uuid.uuid4().hex[:8]
+        self.aujourd_hui = timezone.localdate()
+        self.volumes = {}
+
+    @property
+    def prefixe_email(self):
+        return f'bench-{self.suffixe}-'
+
+    def generer(self):
+        """
+        Crée le jeu de données.
+
+        Returns:
+            dict: Nombre de lignes créées par table
+        """
+        with transaction.atomic():
+            self.utilisateur = self._utilisateur()
+            self.types = self._types_membres()
+            self.membres = self._membres()
+            self._cotisations()
+            self._evenements()
+            self._indexer()
+        return self.volumes
+
+    def _creer(self, modele, objets, nom=None):
+        objets = modele.objects.bulk_create(objets, batch_size=self.batch_size)
+        nom = nom or modele._meta.model_name
+        self.volumes[nom] = self.volumes.get(nom, 0) + len(objets)
+        return objets
+
+    def _utilisateur(self):
+        """Administrateur des mesures (connexion aux vues, organisateur, auteur des rappels)."""
+        return get_user_model().objects.create_superuser(
+            email=f'{self.prefixe_email}admin@example.com',
+            username=f'{self.prefixe_email}admin',
+            password=uuid.uuid4().hex
+        )
+
+    def _types_membres(self):
+        from apps.membres.models import TypeMembre
+
+        types = []
+        for ordre, (libelle, montant) in enumerate(TYPES_MEMBRES):
+            type_membre, _ = TypeMembre.objects.get_or_create(
+                libelle=libelle,
+                defaults={'cotisation_requise': montant > 0, 'ordre_affichage': ordre}
+            )
+            types.append((type_membre, montant))
+        return types
+
+    def _membres(self):
+        """Membres et historique de types : 1 à 3 périodes successives, 80 % encore actifs."""
+        from apps.membres.models import Membre, MembreTypeMembre, TypeMembreActif
+
+        rng = self.rng
+        debut_historique = self.aujourd_hui.replace(month=1, day=1) - timedelta(days=365 * (self.annees - 1))
+        plans = []
+        for i in range(self.nombre_membres):
+            adhesion = debut_historique + timedelta(days=rng.randrange((self.aujourd_hui - debut_historique).days + 1))
+            periodes = []
+            debut = adhesion
+            for _ in range(rng.choice((1, 1, 1, 2, 3))):
+                if debut > self.aujourd_hui:
+                    break
+                periodes.append([rng.choice(self.types)[0], debut, None])
+                debut = debut + timedelta(days=rng.randint(60, 400))
+            for periode, suivante in zip(periodes, periodes[1:]):
+                periode[2] = suivante[1]
+            if rng.random() < 0.2:
+                # Adhésion terminée : membre inactif
+                periodes[-1][2] = min(self.aujourd_hui, periodes[-1][1] + timedelta(days=rng.randint(30, 365)))
+            plans.append((i, adhesion, periodes))
+
+        membres = self._creer(Membre, [
+            Membre(
+                nom=rng.choice(NOMS),
+                prenom=rng.choice(PRENOMS),
+                email=f'{self.prefixe_email}{i}@example.com',
+                ville=rng.choice(VILLES),
+                code_postal=f'{rng.randint(1, 95):02d}000',
+                date_adhesion=adhesion,
+                date_naissance=date(rng.randint(1940, 2006), rng.randint(1, 12), rng.randint(1, 28)),
+                nb_types_actifs=int(periodes[-1][2] is None),
+            )
+            for i, adhesion, periodes in plans
+        ])
+
+        historique, actifs = [], []
+        for membre, (_, _, periodes) in zip(membres, plans):
+            membre.periodes = periodes
+            for type_membre, debut, fin in periodes:
+                historique.append(MembreTypeMembre(
+                    membre=membre, type_membre=type_membre, date_debut=debut, date_fin=fin,
+                    commentaire='Historique synthétique'
+                ))
+            if periodes[-1][2] is None:
+                actifs.append(TypeMembreActif(membre=membre, type_membre=periodes[-1][0]))
+        self._creer(MembreTypeMembre, historique)
+        self._creer(TypeMembreActif, actifs)
+        return membres
+
+    def _cotisations(self):
+        """Une cotisation par membre et par année d'adhésion, ses paiements et ses rappels."""
+        from apps.cotisations.models import Cotisation, ModePaiement, Paiement, Rappel
+
+        rng = self.rng
+        montants = dict((type_membre.pk, montant) for type_membre, montant in self.types)
+        mode_paiement, _ = ModePaiement.objects.get_or_create(libelle='Benchmark virement')
+        annee_courante = self.aujourd_hui.year
+
+        cotisations = []
+        for membre in self.membres:
+            for annee in range(annee_courante - self.annees + 1, annee_courante + 1):
+                types_annee = [
+                    type_membre for type_membre, debut, fin in membre.periodes
+                    if debut.year <= annee and (fin is None or fin.year >= annee)
+                ]
+                if not types_annee or not montants[types_annee[-1].pk]:
+                    continue
+                montant = montants[types_annee[-1].pk]
+                emission = date(annee, 1, 1) + timedelta(days=rng.randrange(60))
+                if emission > self.aujourd_hui:
+                    emission = self.aujourd_hui
+                # Années passées presque toutes réglées, année en cours partagée
+                tirage = rng.random() if annee == annee_courante else rng.random() / 4
+                if tirage < 0.55:
+                    statut, restant = 'payee', Decimal('0.00')
+                elif tirage < 0.75:
+                    statut, restant = 'partiellement_payee', (montant / 2).quantize(Decimal('0.01'))
+                else:
+                    statut, restant = 'non_payee', montant
+                cotisations.append(Cotisation(
+                    membre=membre,
+                    type_membre=types_annee[-1],
+                    montant=montant,
+                    montant_restant=restant,
+                    statut_paiement=statut,
+                    date_emission=emission,
+                    date_echeance=emission + timedelta(days=30),
+                    periode_debut=date(annee, 1, 1),
+                    periode_fin=date(annee, 12, 31),
+                    annee=annee,
+                    mois=emission.month,
+                    cree_par=self.utilisateur,
+                ))
+        Cotisation.generer_references(cotisations)
+        cotisations = self._creer(Cotisation, cotisations)
+
+        maintenant = timezone.now()
+        paiements, rappels = [], []
+        for cotisation in cotisations:
+            if cotisation.montant_restant < cotisation.montant:
+                paiements.append(Paiement(
+                    cotisation=cotisation,
+                    montant=cotisation.montant - cotisation.montant_restant,
+                    date_paiement=timezone.make_aware(datetime.combine(
+                        cotisation.date_emission + timedelta(days=rng.randrange(30)), time(12)
+                    )),
+                    mode_paiement=mode_paiement,
+                    type_transaction='paiement',
+                    cree_par=self.utilisateur,
+                ))
+            if cotisation.montant_restant and cotisation.date_echeance < self.aujourd_hui:
+                for niveau in range(1, rng.randint(1, 2) + 1):
+                    # Dernier rappel encore planifié (et dû) pour un quart des cotisations
+                    planifie = niveau > 1 or rng.random() < 0.25
+                    rappels.append(Rappel(
+                        membre_id=cotisation.membre_id,
+                        cotisation=cotisation,
+                        type_rappel='email',
+                        contenu=f'Rappel {niveau} pour la cotisation {cotisation.reference}',
+                        etat='planifie' if planifie else 'envoye',
+                        niveau=niveau,
+                        date_envoi=maintenant - timedelta(days=rng.randint(1, 20)),
+                        date_envoi_reel=None if planifie else maintenant - timedelta(days=rng.randint(21, 60)),
+                        cree_par=self.utilisateur,
+                    ))
+        self._creer(Paiement, paiements)
+        self._creer(Rappel, rappels)
+        self.cotisations = cotisations
+
+    def _evenements(self):
+        """
+        Événements passés et à venir (10 % de séries hebdomadaires) : plus
+        de demandes que de places pour les événements à venir, d'où des
+        inscriptions en attente de confirmation et des listes d'attente.
+        """
+        from apps.evenements.models import (
+            AccompagnantInvite, Evenement, EvenementRecurrence, InscriptionEvenement, TypeEvenement
+        )
+
+        rng = self.rng
+        type_evenement, _ = TypeEvenement.objects.get_or_create(
+            libelle='Benchmark', defaults={'necessite_validation': False, 'permet_accompagnants': True}
+        )
+        maintenant = timezone.now()
+        debut_periode = -365 * self.annees
+
+        evenements, plans = [], []
+        for i in range(self.nombre_evenements):
+            date_debut = maintenant + timedelta(
+                days=rng.randint(debut_periode, 60), hours=rng.randint(0, 12)
+            )
+            capacite = rng.randint(10, 60)
+            evenement = Evenement(
+                titre=f'Benchmark {self.suffixe} événement {i}',
+                description='Événement généré par benchmark_association',
+                date_debut=date_debut,
+                date_fin=date_debut + timedelta(hours=rng.randint(1, 4)),
+                lieu=rng.choice(VILLES),
+                capacite_max=capacite,
+                type_evenement=type_evenement,
+                organisateur=self.utilisateur,
+                statut='publie',
+                nombre_max_accompagnants=2,
+                delai_confirmation=48,
+                est_recurrent=date_debut > maintenant and rng.random() < 0.1,
+            )
+
+            a_venir = date_debut > maintenant
+            demandes = rng.sample(self.membres, min(len(self.membres), int(capacite * rng.uniform(0.5, 1.5))))
+            inscriptions, places = [], 0
+            for membre in demandes:
+                accompagnants = rng.choice((0, 0, 0, 1, 2))
+                if places + 1 + accompagnants > capacite:
+                    statut = 'liste_attente' if a_venir else 'annulee'
+                elif not a_venir:
+                    statut = 'presente' if rng.random() < 0.85 else 'absente'
+                elif rng.random() < 0.2:
+                    statut = 'en_attente'
+                else:
+                    statut = 'confirmee'
+                if statut in ('presente', 'absente', 'confirmee', 'en_attente'):
+                    places += 1 + accompagnants
+                inscriptions.append((membre, statut, accompagnants))
+
+            self._compteurs(evenement, inscriptions)
+            evenements.append(evenement)
+            plans.append(inscriptions)
+
+        Evenement.generer_references(evenements)
+        evenements = self._creer(Evenement, evenements)
+        self.evenements = evenements
+
+        self._creer(EvenementRecurrence, [
+            EvenementRecurrence(
+                evenement_parent=evenement,
+                frequence='hebdomadaire',
+                intervalle_recurrence=1,
+                jours_semaine=[timezone.localtime(evenement.date_debut).weekday()],
+                nombre_occurrences_max=52,
+            )
+            for evenement in evenements if evenement.est_recurrent
+        ])
+
+        inscriptions = []
+        for evenement, plan in zip(evenements, plans):
+            for membre, statut, accompagnants in plan:
+                inscriptions.append(InscriptionEvenement(
+                    evenement=evenement,
+                    membre=membre,
+                    statut=statut,
+                    nombre_accompagnants=accompagnants,
+                    # Confirmations attendues dans les 48 heures : rappels et expirations à traiter
+                    date_limite_confirmation=(
+                        maintenant + timedelta(hours=rng.randint(-6, 48)) if statut == 'en_attente' else None
+                    ),
+                    date_confirmation=evenement.date_debut - timedelta(days=2) if statut in ('confirmee', 'presente', 'absente') else None,
+                    code_confirmation=uuid.UUID(int=rng.getrandbits(128)).hex[:12].upper(),
+                ))
+        inscriptions = self._creer(InscriptionEvenement, inscriptions)
+
+        self._creer(AccompagnantInvite, [
+            AccompagnantInvite(
+                inscription=inscription,
+                nom=rng.choice(NOMS),
+                prenom=rng.choice(PRENOMS),
+                statut='confirme' if inscription.statut in ('confirmee', 'presente') else 'invite',
+                date_invitation=maintenant,
+            )
+            for inscription in inscriptions
+            for _ in range(inscription.nombre_accompagnants)
+        ])
+
+    def _compteurs(self, evenement, inscriptions):
+        """Compteurs de places tenus à jour par le modèle (voir Evenement.recalculer_compteurs_places)."""
+        evenement.nb_places_occupees = sum(
+            1 + accompagnants for _, statut, accompagnants in inscriptions if statut in ('confirmee', 'presente')
+        )
+        evenement.nb_inscriptions_confirmees = sum(
+            1 for _, statut, _ in inscriptions if statut in ('confirmee', 'presente')
+        )
+        evenement.nb_places_en_attente = sum(
+            1 + accompagnants for _, statut, accompagnants in inscriptions if statut == 'en_attente'
+        )
+        evenement.nb_liste_attente = sum(1 for _, statut, _ in inscriptions if statut == 'liste_attente')
+
+    def _indexer(self):
+        """Index de recherche plein texte (renseigné par les signaux post_save hors bulk_create)."""
+        for objets in (self.membres, self.cotisations, self.evenements):
+            for debut in range(0, len(objets), self.batch_size):
+                index_recherche.indexer_objets(objets[debut:debut + self.batch_size], dependances=False)
@@ -0,0 +1,84 @@
+# apps/core/benchmarks/mesures.py
+"""
+Mesure d'une fonction : durée, nombre de requêtes SQL et pic de mémoire.
+"""
+import statistics
+import time
+import tracemalloc
+from contextlib import ExitStack
+
+from django.db import connections, transaction
+
+
+class _Annulation(Exception):
+    """Annule les écritures d'une exécution mesurée."""
+
+
+def _executer(fonction, annuler):
+    """Exécute ``fonction`` une fois ; retourne (durée, requêtes SQL)."""
+    requetes = 0
+
+    def compter(execute, sql, params, many, context):
+        nonlocal requetes
+        requetes += 1
+        return execute(sql, params, many, context)
+
+    with ExitStack() as pile:
+        for connexion in connections.all():
+            pile.enter_context(connexion.execute_wrapper(compter))
+        debut = time.perf_counter()
+        if annuler:
+            # Point de sauvegarde annulé : chaque exécution part des mêmes données
+            try:
+                with transaction.atomic():
+                    fonction()
+                    raise _Annulation
+            except _Annulation:
+                pass
+        else:
+            fonction()
+        duree = time.perf_counter() - debut
+    return duree, requetes
+
+
+def mesurer(fonction, repetitions=3, annuler=False):
+    """
+    Exécute ``fonction`` ``repetitions`` fois, puis une fois de plus sous
+    ``tracemalloc`` pour le pic de mémoire (le traçage ralentit l'exécution :
+    cette dernière n'est pas chronométrée).
+
+    Args:
+        fonction: Appelable sans argument
+        repetitions (int): Nombre d'exécutions chronométrées
+        annuler (bool): Annuler les écritures de chaque exécution
+
+    Returns:
+        dict: ``duree_mediane_s``, ``duree_min_s``, ``duree_premiere_s``
+        (caches froids), ``requetes`` (première exécution), ``requetes_min``
+        et ``memoire_pic_ko`` (allocations Python)
+    """
+    executions = [_executer(fonction, annuler) for _ in range(max(1, repetitions))]
+    durees = [duree for duree, _ in executions]
+
+    deja_actif = tracemalloc.is_tracing()
+    if deja_actif:
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        _executer(fonction, annuler)
+        pic = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        if not deja_actif:
+            tracemalloc.stop()
+
+    return {
+        'duree_mediane_s': round(statistics.median(durees), 4),
+        'duree_min_s': round(min(durees), 4),
+        'duree_premiere_s': round(durees[0], 4),
+        'requetes': executions[0][1],
+        'requetes_min': min(requetes for _, requetes in executions),
+        'memoire_pic_ko': round(max(0, pic) / 1024, 1),
+        'repetitions': len(executions),
+    }
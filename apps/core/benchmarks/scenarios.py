@@ -0,0 +1,186 @@
+# apps/core/benchmarks/scenarios.py
+"""
+Chemins critiques mesurés sur le jeu de données synthétique.
+
+Un scénario est une fonction de préparation, enregistrée par ``@scenario``,
+qui reçoit le ``ContexteBenchmark`` et retourne l'appelable à mesurer. Les
+scénarios qui écrivent (tâches, import) sont déclarés ``annuler=True`` :
+chaque exécution est annulée et repart des mêmes données.
+"""
+import csv
+import io
+import logging
+
+from django.conf import settings
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.http import QueryDict
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from .mesures import mesurer
+
+logger = logging.getLogger(__name__)
+
+# nom -> (préparation, annuler)
+SCENARIOS = {}
+
+
+def scenario(nom, annuler=False):
+    """Enregistre un scénario (voir le docstring du module)."""
+    def enregistrer(preparation):
+        SCENARIOS[nom] = (preparation, annuler)
+        return preparation
+    return enregistrer
+
+
+class ContexteBenchmark:
+    """Jeu de données, client connecté en administrateur et nettoyages à faire."""
+
+    def __init__(self, jeu):
+        self.jeu = jeu
+        self.client = Client()
+        self.client.force_login(jeu.utilisateur)
+        self.nettoyages = []
+
+    def get(self, nom_url, parametres=None):
+        """Requête GET complète (middlewares compris) ; le contenu est lu en entier."""
+        response = self.client.get(reverse(nom_url), parametres or {}, secure=True)
+        if response.status_code != 200:
+            raise RuntimeError(f"{nom_url} : statut HTTP {response.status_code}")
+        return consommer(response)
+
+
+def consommer(response):
+    """Lit le contenu d'une réponse (en flux ou non) et retourne sa taille."""
+    if response.streaming:
+        taille = sum(len(bloc) for bloc in response.streaming_content)
+        response.close()
+        return taille
+    return len(response.content)
+
+
+@scenario('cotisations_dashboard')
+def cotisations_dashboard(contexte):
+    return lambda: contexte.get('cotisations:dashboard')
+
+
+@scenario('cotisations_liste_filtres')
+def cotisations_liste_filtres(contexte):
+    parametres = {'statut_paiement': 'non_payee', 'annee': contexte.jeu.aujourd_hui.year, 'en_retard': 'on'}
+    return lambda: contexte.get('cotisations:cotisation_liste', parametres)
+
+
+@scenario('membres_liste_actifs')
+def membres_liste_actifs(contexte):
+    return lambda: contexte.get('membres:membre_liste', {'actif': 'actif'})
+
+
+@scenario('membres_liste_cotisations_impayees')
+def membres_liste_cotisations_impayees(contexte):
+    return lambda: contexte.get('membres:membre_liste', {'cotisations_impayees': 'on'})
+
+
+@scenario('evenements_places_disponibles')
+def evenements_places_disponibles(contexte):
+    from apps.evenements.models import Evenement
+
+    ids = [evenement.pk for evenement in contexte.jeu.evenements]
+    return lambda: [evenement.places_disponibles for evenement in Evenement.objects.filter(pk__in=ids)]
+
+
+@scenario('export_cotisations_csv')
+def export_cotisations_csv(contexte):
+    from apps.cotisations.views import ExportCotisationsView
+
+    vue = ExportCotisationsView()
+    return lambda: consommer(vue._export_csv(ExportCotisationsView.filtrer(QueryDict())))
+
+
+@scenario('export_cotisations_xlsx')
+def export_cotisations_xlsx(contexte):
+    from apps.cotisations.views import ExportCotisationsView
+
+    vue = ExportCotisationsView()
+    return lambda: consommer(vue._export_excel(ExportCotisationsView.filtrer(QueryDict())))
+
+
+@scenario('import_cotisations', annuler=True)
+def import_cotisations(contexte):
+    from apps.cotisations.views import ImportCotisationsView
+
+    jeu = contexte.jeu
+    fichier = io.StringIO()
+    writer = csv.writer(fichier, delimiter=';')
+    writer.writerow(['email', 'montant', 'date_emission', 'type_membre', 'statut_paiement'])
+    for i, membre in enumerate(jeu.membres[:2000]):
+        writer.writerow([
+            membre.email, f'{10 + i % 90},50', f'{(i % 28) + 1:02d}/{(i % 12) + 1:02d}/{jeu.aujourd_hui.year}',
+            jeu.types[i % len(jeu.types)][0].libelle, 'partiellement payée' if i % 3 == 0 else '',
+        ])
+    chemin = default_storage.save(f'imports/benchmark_{jeu.suffixe}.csv', ContentFile(fichier.getvalue().encode('utf-8')))
+    contexte.nettoyages.append(lambda: default_storage.delete(chemin))
+
+    vue = ImportCotisationsView()
+    return lambda: vue._import_data(chemin, {})
+
+
+@scenario('rappels_confirmation_inscriptions', annuler=True)
+def rappels_confirmation_inscriptions(contexte):
+    from apps.evenements.tasks import envoyer_rappels_confirmation
+
+    return envoyer_rappels_confirmation
+
+
+@scenario('rappels_avant_evenements', annuler=True)
+def rappels_avant_evenements(contexte):
+    from apps.evenements.tasks import envoyer_rappels_evenements
+
+    return envoyer_rappels_evenements
+
+
+@scenario('rappels_cotisations', annuler=True)
+def rappels_cotisations(contexte):
+    from apps.cotisations.tasks import traiter_rappels_planifies
+
+    return traiter_rappels_planifies
+
+
+@scenario('occurrences_recurrentes', annuler=True)
+def occurrences_recurrentes(contexte):
+    from apps.evenements.tasks import generer_occurrences_recurrentes
+
+    return generer_occurrences_recurrentes
+
+
+def executer_scenarios(jeu, noms=None, repetitions=3):
+    """
+    Mesure les scénarios ``noms`` (tous par défaut) sur le jeu de données.
+
+    Les emails sont conservés en mémoire et le profilage des requêtes est
+    désactivé pendant les mesures.
+
+    Returns:
+        dict: Mesures par scénario (``erreur`` pour un scénario en échec)
+    """
+    resultats = {}
+    with override_settings(
+        EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        PROFILAGE_TAUX=0,
+    ):
+        contexte = ContexteBenchmark(jeu)
+        try:
+            for nom in noms or SCENARIOS:
+                preparation, annuler = SCENARIOS[nom]
+                try:
+                    resultats[nom] = mesurer(preparation(contexte), repetitions=repetitions, annuler=annuler)
+                except Exception as e:
+                    logger.exception(f"Scénario {nom} en échec")
+                    resultats[nom] = {'erreur': f"{type(e).__name__}: {e}"}
+                mail.outbox = []
+        finally:
+            for nettoyer in contexte.nettoyages:
+                nettoyer()
+    return resultats
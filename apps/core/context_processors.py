@@ -1,22 +1,27 @@
 # apps/core/context_processors.py
+from apps.cotisations.models import Cotisation
+from apps.evenements.models import Evenement
 from apps.membres.models import Membre
 from django.utils import timezone
 
+from .corbeille import compteurs_corbeille
+
 def trash_counters(request):
-    """Ajouter des compteurs d'éléments dans la corbeille au contexte."""
+    """
+    Ajouter des compteurs d'éléments dans la corbeille au contexte.
+    Les compteurs sont différés : lus (cache, sinon une requête) seulement
+    si le gabarit les affiche.
+    """
     context = {}
     
     # Uniquement pour les utilisateurs authentifiés avec droits admin
     if request.user.is_authenticated and request.user.is_staff:
-        # Membres supprimés
-        context['membres_trash_count'] = Membre.objects.only_deleted().count()
-        
-        # Ajouter d'autres compteurs lorsque de nouvelles applications seront implémentées
-        # context['cotisations_trash_count'] = ...
-        # context['evenements_trash_count'] = ...
+        context['membres_trash_count'] = compteurs_corbeille.compteur_differe(Membre)
+        context['cotisations_trash_count'] = compteurs_corbeille.compteur_differe(Cotisation)
+        context['evenements_trash_count'] = compteurs_corbeille.compteur_differe(Evenement)
         
         # Total pour badge global
-        context['trash_count'] = context['membres_trash_count']  # + autres compteurs quand disponibles
+        context['trash_count'] = compteurs_corbeille.compteur_differe(Membre, Cotisation, Evenement)
     
     return context
 
@@ -28,4 +33,4 @@ def date_context(request):
         'current_date': timezone.now().date(),
         'today': timezone.now().date(),
         'now': timezone.now(),
-    }
\ No newline at end of file
+    }
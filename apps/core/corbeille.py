@@ -0,0 +1,65 @@
+# apps/core/corbeille.py
+"""
+Compteurs de la corbeille (objets supprimés logiquement) par modèle.
+
+Un compteur est calculé par une requête ``COUNT`` à sa première lecture puis
+conservé dans le cache. Les suppressions logiques, restaurations et
+suppressions définitives d'objets de la corbeille (``BaseModel.delete`` /
+``restore`` et leurs surcharges) l'ajustent ensuite de +1 / -1 une fois la
+transaction validée ; un compteur absent du cache n'est pas ajusté, il sera
+recalculé. Les écritures en masse (``QuerySet.update``) appellent
+``invalider``. Les compteurs expirent après CORBEILLE_COMPTEURS_DUREE
+secondes, ce qui borne l'effet d'une écriture oubliée.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject
+
+
+class CompteursCorbeille:
+    """
+    Nombre d'objets dans la corbeille, par modèle.
+    """
+
+    CLE_CACHE = 'corbeille'
+
+    def cle(self, modele):
+        return f"{self.CLE_CACHE}:{modele._meta.concrete_model._meta.label_lower}"
+
+    def compter(self, modele):
+        """Retourne le nombre d'objets supprimés logiquement de ``modele``."""
+        cle = self.cle(modele)
+        nombre = cache.get(cle)
+        if nombre is None:
+            nombre = modele._base_manager.filter(deleted_at__isnull=False).count()
+            cache.set(cle, nombre, getattr(settings, 'CORBEILLE_COMPTEURS_DUREE', 3600))
+        return nombre
+
+    def compteur_differe(self, *modeles):
+        """
+        Compteur (somme des modèles) évalué seulement à sa première
+        utilisation, par exemple dans un gabarit.
+        """
+        return SimpleLazyObject(lambda: sum(self.compter(modele) for modele in modeles))
+
+    def ajuster(self, modele, delta):
+        """Ajoute ``delta`` au compteur de ``modele`` après validation de la transaction."""
+        cle = self.cle(modele)
+        transaction.on_commit(lambda: self._incrementer(cle, delta))
+
+    def invalider(self, modele):
+        """Recalcul du compteur de ``modele`` après validation de la transaction."""
+        cle = self.cle(modele)
+        transaction.on_commit(lambda: cache.delete(cle))
+
+    def _incrementer(self, cle, delta):
+        try:
+            cache.incr(cle, delta)
+        except ValueError:
+            # Compteur absent du cache : recalculé à la prochaine lecture
+            pass
+
+
+# Compteurs partagés par les applications
+compteurs_corbeille = CompteursCorbeille()
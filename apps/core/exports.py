@@ -0,0 +1,177 @@
+# apps/core/exports.py
+"""
+Exports exécutés en arrière-plan par Celery.
+
+Un export est décrit par une fonction « générateur » importable, de signature
+``generateur(parametres, progression=None)``, qui reçoit les paramètres GET de
+la requête d'origine et retourne la réponse HTTP de l'export (CSV en flux,
+Excel, PDF...). La même fonction sert au chemin synchrone des vues et à la
+tâche Celery, qui écrit la réponse dans un fichier sous MEDIA.
+"""
+import logging
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.http import JsonResponse, QueryDict
+from django.shortcuts import redirect
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import TacheExport
+
+logger = logging.getLogger(__name__)
+
+
+class SuiviProgression:
+    """
+    Compte les lignes exportées et enregistre la progression de la tâche
+    à chaque pourcent franchi (au plus une centaine de mises à jour).
+    """
+    def __init__(self, tache):
+        self.tache = tache
+        self.lignes = 0
+        self._pourcentage = -1
+
+    def iterer(self, iterable, total):
+        self.tache.enregistrer_progression(0, total)
+        for element in iterable:
+            yield element
+            self.lignes += 1
+            pourcentage = self.lignes * 100 // total if total else 0
+            if pourcentage != self._pourcentage:
+                self._pourcentage = pourcentage
+                self.tache.enregistrer_progression(self.lignes)
+
+
+def suivre_progression(iterable, progression, queryset):
+    """
+    Enveloppe les lignes d'un export pour en suivre la progression.
+
+    Sans suivi (export synchrone), l'itérable est retourné tel quel et le
+    queryset n'est pas compté.
+    """
+    if progression is None:
+        return iterable
+    return progression.iterer(iterable, queryset.count())
+
+
+def exporter_en_arriere_plan(request, queryset=None):
+    """
+    Indique si l'export doit être confié à Celery.
+
+    ``?arriere_plan=1`` force l'export en arrière-plan et ``?arriere_plan=0``
+    le désactive ; sinon il l'est au-delà de EXPORT_ARRIERE_PLAN_SEUIL lignes.
+    """
+    choix = request.GET.get('arriere_plan')
+    if choix is not None:
+        return choix.lower() in ('1', 'true', 'oui')
+
+    seuil = getattr(settings, 'EXPORT_ARRIERE_PLAN_SEUIL', None)
+    if queryset is None or not seuil:
+        return False
+    return queryset.count() > seuil
+
+
+def lancer_export(request, generateur, format_export, parametres=None):
+    """
+    Crée une tâche d'export et la confie à Celery après validation de la transaction.
+
+    Args:
+        request: Requête d'origine (utilisateur et paramètres GET)
+        generateur: Chemin pointé de la fonction produisant l'export
+        format_export: Format demandé (csv, excel, pdf)
+        parametres: Paramètres supplémentaires (ex. clé de l'URL)
+
+    Returns:
+        JsonResponse (202) avec l'identifiant de la tâche pour les appels AJAX,
+        sinon une redirection vers la page de suivi
+    """
+    from .tasks import generer_export_task
+
+    valeurs = {cle: request.GET.getlist(cle) for cle in request.GET if cle != 'arriere_plan'}
+    for cle, valeur in (parametres or {}).items():
+        valeurs[cle] = [str(valeur)]
+
+    tache = TacheExport.objects.create(
+        utilisateur=request.user,
+        generateur=generateur,
+        format_export=format_export,
+        parametres=valeurs
+    )
+    transaction.on_commit(lambda: generer_export_task.delay(str(tache.pk)))
+
+    url_statut = reverse('core:export_statut', args=[tache.pk])
+    if (request.headers.get('x-requested-with') == 'XMLHttpRequest'
+            or 'application/json' in request.headers.get('accept', '')):
+        return JsonResponse({'id': str(tache.pk), 'statut': tache.statut, 'url_statut': url_statut}, status=202)
+    return redirect(url_statut)
+
+
+def executer_export(tache):
+    """
+    Produit le fichier d'une tâche d'export (appelé par la tâche Celery).
+
+    La réponse du générateur est recopiée par blocs dans un fichier temporaire
+    puis enregistrée dans le stockage des médias, avec sa date d'expiration.
+    """
+    tache.statut = TacheExport.STATUT_EN_COURS
+    tache.save(update_fields=['statut'])
+
+    try:
+        parametres = QueryDict(mutable=True)
+        for cle, valeurs in tache.parametres.items():
+            parametres.setlist(cle, valeurs)
+
+        generateur = import_string(tache.generateur)
+        response = generateur(parametres, progression=SuiviProgression(tache))
+        try:
+            nom_fichier = _nom_fichier(response, tache)
+            with tempfile.TemporaryFile() as fichier:
+                for bloc in (response.streaming_content if response.streaming else [response.content]):
+                    fichier.write(bloc)
+                tache.fichier.save(nom_fichier, File(fichier), save=False)
+        finally:
+            response.close()
+    except Exception as e:
+        logger.exception(f"Échec de l'export {tache.pk} ({tache.generateur})")
+        tache.statut = TacheExport.STATUT_ECHOUEE
+        tache.message_erreur = str(e)
+        tache.date_fin = timezone.now()
+        tache.save(update_fields=['statut', 'message_erreur', 'date_fin'])
+        return tache
+
+    tache.nom_fichier = nom_fichier
+    tache.statut = TacheExport.STATUT_TERMINEE
+    tache.progression = 100
+    tache.date_fin = timezone.now()
+    tache.date_expiration = tache.date_fin + timezone.timedelta(
+        seconds=getattr(settings, 'EXPORT_DUREE_CONSERVATION', 86400)
+    )
+    tache.save()
+    return tache
+
+
+def nettoyer_exports_expires():
+    """Supprime les fichiers des exports expirés ; retourne le nombre de tâches traitées."""
+    expirees = TacheExport.objects.filter(
+        statut=TacheExport.STATUT_TERMINEE,
+        date_expiration__lte=timezone.now()
+    )
+    nombre = 0
+    for tache in expirees.iterator():
+        tache.supprimer_fichier()
+        nombre += 1
+    return nombre
+
+
+def _nom_fichier(response, tache):
+    """Nom du fichier annoncé par la réponse de l'export (Content-Disposition)."""
+    correspondance = re.search(r'filename="([^"]+)"', response.get('Content-Disposition', ''))
+    if correspondance:
+        return correspondance.group(1)
+    extension = {'excel': 'xlsx'}.get(tache.format_export, tache.format_export)
+    return f"export_{timezone.now().strftime('%Y%m%d')}.{extension}"
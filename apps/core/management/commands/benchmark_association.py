@@ -0,0 +1,136 @@
+# apps/core/management/commands/benchmark_association.py
+import json
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.benchmarks import SCENARIOS, JeuDonneesSynthetique, executer_scenarios
+
+# Écart relatif au-delà duquel une durée est signalée par --comparer
+SEUIL_REGRESSION = 0.2
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère un jeu de données synthétique à l'échelle d'une association "
+        "(membres, historique de types, cotisations sur plusieurs années, "
+        "événements avec listes d'attente) et mesure durée, requêtes SQL et "
+        "mémoire des chemins critiques. Tout est annulé en fin de mesure"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--membres', type=int, default=1000, help='Nombre de membres')
+        parser.add_argument('--annees', type=int, default=3, help="Années d'historique de cotisations")
+        parser.add_argument('--evenements', type=int, default=100, help="Nombre d'événements")
+        parser.add_argument('--graine', type=int, default=42, help='Graine du générateur aléatoire')
+        parser.add_argument('--repetitions', type=int, default=3, help='Exécutions chronométrées par scénario')
+        parser.add_argument(
+            '--scenarios',
+            nargs='+',
+            choices=sorted(SCENARIOS),
+            help='Scénarios à mesurer (tous par défaut)'
+        )
+        parser.add_argument('--sortie', help='Fichier JSON où écrire les résultats')
+        parser.add_argument('--comparer', help='Résultats JSON précédents à comparer')
+        parser.add_argument(
+            '--conserver',
+            action='store_true',
+            help='Conserver le jeu de données en base au lieu de l\'annuler'
+        )
+
+    def handle(self, *args, **options):
+        if min(options['membres'], options['annees'], options['evenements'], options['repetitions']) < 1:
+            raise CommandError('Les valeurs numériques doivent être positives')
+        reference = self._charger(options['comparer']) if options['comparer'] else None
+
+        with transaction.atomic():
+            jeu = JeuDonneesSynthetique(
+                membres=options['membres'],
+                annees=options['annees'],
+                evenements=options['evenements'],
+                graine=options['graine'],
+            )
+            debut = time.perf_counter()
+            jeu.generer()
+            duree_generation = time.perf_counter() - debut
+            self.stdout.write(
+                f"Jeu de données généré en {duree_generation:.1f}s : "
+                + ', '.join(f'{nombre} {nom}' for nom, nombre in jeu.volumes.items())
+            )
+
+            scenarios = executer_scenarios(jeu, options['scenarios'], options['repetitions'])
+
+            if not options['conserver']:
+                transaction.set_rollback(True)
+
+        resultats = {
+            'meta': self._meta(options),
+            'jeu_de_donnees': {'volumes': jeu.volumes, 'duree_generation_s': round(duree_generation, 2)},
+            'scenarios': scenarios,
+        }
+        self._afficher(scenarios, reference)
+
+        if options['sortie']:
+            Path(options['sortie']).write_text(json.dumps(resultats, indent=2, ensure_ascii=False), encoding='utf-8')
+            self.stdout.write(f"Résultats écrits dans {options['sortie']}")
+
+        if any('erreur' in mesure for mesure in scenarios.values()):
+            raise CommandError('Des scénarios sont en échec')
+        self.stdout.write(self.style.SUCCESS('Mesure terminée'))
+
+    def _charger(self, chemin):
+        try:
+            return json.loads(Path(chemin).read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Résultats de référence illisibles : {e}')
+
+    def _meta(self, options):
+        """Contexte de la mesure, pour comparer des résultats entre révisions."""
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            'date': timezone.now().isoformat(),
+            'commit': commit,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'base_de_donnees': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+            'parametres': {
+                cle: options[cle]
+                for cle in ('membres', 'annees', 'evenements', 'graine', 'repetitions')
+            },
+        }
+
+    def _afficher(self, scenarios, reference):
+        precedents = (reference or {}).get('scenarios', {})
+        self.stdout.write(f"{'scénario':<36} {'médiane':>9} {'min':>9} {'requêtes':>9} {'mémoire':>11}")
+        for nom, mesure in scenarios.items():
+            if 'erreur' in mesure:
+                self.stdout.write(self.style.ERROR(f"{nom:<36} {mesure['erreur']}"))
+                continue
+            ligne = (
+                f"{nom:<36} {mesure['duree_mediane_s'] * 1000:>7.1f}ms {mesure['duree_min_s'] * 1000:>7.1f}ms "
+                f"{mesure['requetes']:>9} {mesure['memoire_pic_ko']:>8.1f} Ko"
+            )
+            precedent = precedents.get(nom)
+            if not precedent or 'erreur' in precedent:
+                self.stdout.write(ligne)
+                continue
+
+            ecart = (mesure['duree_mediane_s'] - precedent['duree_mediane_s']) / max(precedent['duree_mediane_s'], 1e-6)
+            ligne += f"  ({ecart:+.0%}, requêtes {mesure['requetes'] - precedent['requetes']:+d})"
+            if ecart > SEUIL_REGRESSION or mesure['requetes'] > precedent['requetes']:
+                self.stdout.write(self.style.WARNING(ligne))
+            else:
+                self.stdout.write(ligne)
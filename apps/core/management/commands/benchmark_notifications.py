@@ -0,0 +1,220 @@
+# apps/core/management/commands/benchmark_notifications.py
+import datetime
+import socketserver
+import threading
+import time
+from types import SimpleNamespace
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateDoesNotExist
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+
+from apps.core.notifications import VARIABLES_DESTINATAIRE, EnvoiEmailsGroupe
+from apps.core.rendu import RenduPrepare, templates_notifications
+
+
+class _GestionnaireSMTP(socketserver.StreamRequestHandler):
+    """Dialogue SMTP minimal : accepte tous les messages sans les délivrer."""
+
+    def handle(self):
+        # Coût d'établissement d'une session (poignée de main TLS, authentification...)
+        time.sleep(self.server.latence)
+        self.server.compter('connexions')
+        self._repondre(b'220 localhost ESMTP benchmark')
+
+        while True:
+            ligne = self.rfile.readline()
+            if not ligne:
+                break
+            commande = ligne.strip().upper()
+            if commande.startswith((b'EHLO', b'HELO')):
+                self._repondre(b'250-localhost', b'250 8BITMIME')
+            elif commande == b'DATA':
+                self._repondre(b'354 Fin du message par <CRLF>.<CRLF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                self.server.compter('messages')
+                self._repondre(b'250 OK')
+            elif commande == b'QUIT':
+                self._repondre(b'221 Au revoir')
+                break
+            else:
+                self._repondre(b'250 OK')
+
+    def _repondre(self, *lignes):
+        self.wfile.write(b''.join(ligne + b'\r\n' for ligne in lignes))
+
+
+class _ServeurSMTPFactice(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, latence):
+        super().__init__(('127.0.0.1', 0), _GestionnaireSMTP)
+        self.latence = latence
+        self.compteurs = {'connexions': 0, 'messages': 0}
+        self._verrou = threading.Lock()
+
+    def compter(self, cle):
+        with self._verrou:
+            self.compteurs[cle] += 1
+
+    def reinitialiser(self):
+        with self._verrou:
+            self.compteurs = {'connexions': 0, 'messages': 0}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le débit (messages/s) de l'envoi des emails d'événements : une "
+        "connexion SMTP par message (send_event_email) contre l'envoi groupé "
+        "(EnvoiEmailsGroupe), sur un serveur SMTP factice local, ainsi que le coût "
+        "du rendu seul (render_to_string contre rendu préparé)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--messages',
+            type=int,
+            default=800,
+            help='Nombre de destinataires'
+        )
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=100,
+            help="Nombre de messages par connexion pour l'envoi groupé"
+        )
+        parser.add_argument(
+            '--latence',
+            type=float,
+            default=50,
+            help="Durée simulée d'ouverture d'une session SMTP, en millisecondes"
+        )
+
+    def handle(self, *args, **options):
+        if options['messages'] < 1 or options['taille_lot'] < 1 or options['latence'] < 0:
+            raise CommandError('Les valeurs numériques doivent être positives')
+
+        serveur = _ServeurSMTPFactice(options['latence'] / 1000)
+        threading.Thread(target=serveur.serve_forever, daemon=True).start()
+        try:
+            destinataires = self._destinataires(options['messages'])
+            self.stdout.write(
+                f"{options['messages']} messages, latence de connexion {options['latence']:.0f} ms"
+            )
+            for mode, envoyer in (
+                ('par_message', self._envoyer_par_message),
+                ('groupe', self._envoyer_groupe),
+            ):
+                serveur.reinitialiser()
+                debut = time.perf_counter()
+                envoyes = envoyer(serveur, destinataires, options['taille_lot'])
+                duree = time.perf_counter() - debut
+                self.stdout.write(
+                    f"{mode:<12} {duree:>7.2f}s  {envoyes / duree:>8.1f} messages/s  "
+                    f"({serveur.compteurs['connexions']} connexions, {serveur.compteurs['messages']} reçus)"
+                )
+        finally:
+            serveur.shutdown()
+            serveur.server_close()
+
+        self._mesurer_rendu(destinataires)
+        self.stdout.write(self.style.SUCCESS('Mesure terminée'))
+
+    def _mesurer_rendu(self, destinataires):
+        """Compare le rendu HTML + texte par render_to_string et par RenduPrepare."""
+        gabarit = 'emails/evenements/rappel_evenement'
+        context = destinataires[0]['context']
+
+        debut = time.perf_counter()
+        for destinataire in destinataires:
+            contexte = {**context, 'recipient_name': destinataire['recipient_name'], 'current_year': 2025}
+            html_content = render_to_string(f'{gabarit}.html', contexte)
+            try:
+                render_to_string(f'{gabarit}.txt', contexte)
+            except TemplateDoesNotExist:
+                strip_tags(html_content)
+        duree_render_to_string = time.perf_counter() - debut
+
+        templates_notifications.vider()
+        debut = time.perf_counter()
+        rendu = RenduPrepare(
+            f'{gabarit}.html', context, template_texte=f'{gabarit}.txt', variables=VARIABLES_DESTINATAIRE
+        )
+        for destinataire in destinataires:
+            rendu.rendre(recipient_name=destinataire['recipient_name'], current_year=2025)
+        duree_rendu_prepare = time.perf_counter() - debut
+
+        statistiques = templates_notifications.statistiques()[f'{gabarit}.html']
+        for mode, duree in (('render_to_string', duree_render_to_string), ('rendu_prepare', duree_rendu_prepare)):
+            self.stdout.write(
+                f"{mode:<16} {duree * 1000 / len(destinataires):>7.3f} ms/message"
+            )
+        self.stdout.write(
+            f"rendu préparé (pré-rendu : {'oui' if rendu.prerendu else 'non'}) : "
+            f"{statistiques['compilations']} compilation, {statistiques['rendus']} rendus, "
+            f"{statistiques['duree_moyenne_ms']} ms en moyenne"
+        )
+
+    def _connexion(self, serveur):
+        host, port = serveur.server_address
+        return get_connection(
+            'django.core.mail.backends.smtp.EmailBackend',
+            host=host,
+            port=port,
+            username='',
+            password='',
+            use_tls=False,
+            use_ssl=False,
+            fail_silently=False
+        )
+
+    def _envoyer_par_message(self, serveur, destinataires, taille_lot):
+        """Comportement de send_event_email : rendu et connexion propres à chaque message."""
+        envoyes = 0
+        for destinataire in destinataires:
+            email = EnvoiEmailsGroupe().preparer(**destinataire)
+            email.connection = self._connexion(serveur)
+            envoyes += email.send()
+        return envoyes
+
+    def _envoyer_groupe(self, serveur, destinataires, taille_lot):
+        envoyes, echecs = EnvoiEmailsGroupe(taille_lot=taille_lot, connection=self._connexion(serveur)).envoyer(
+            destinataires
+        )
+        if echecs:
+            raise CommandError(f"{len(echecs)} messages en échec lors de l'envoi groupé")
+        return envoyes
+
+    def _destinataires(self, nombre):
+        """Rappel d'événement fictif adressé à ``nombre`` membres."""
+        evenement = SimpleNamespace(
+            pk=1,
+            titre='Assemblée générale',
+            description="Assemblée générale annuelle de l'association",
+            date_debut=datetime.datetime(2025, 6, 14, 18, 30),
+            date_fin=datetime.datetime(2025, 6, 14, 21, 0),
+            lieu='Salle des fêtes',
+            adresse_complete='1 place de la Mairie',
+            tarif_membre=0,
+            est_payant=False,
+        )
+        context = {
+            'evenement': evenement,
+            'url_evenement': 'http://localhost:8000/evenements/1/',
+            'site_url': 'http://localhost:8000',
+            'site_name': 'Gestion Association',
+        }
+        return [
+            {
+                'recipient_email': f'membre{i}@example.com',
+                'recipient_name': f'Membre {i}',
+                'template_name': 'rappel_evenement',
+                'context': context,
+                'subject': f"Rappel : {evenement.titre} - {evenement.date_debut.strftime('%d/%m/%Y')}",
+            }
+            for i in range(nombre)
+        ]
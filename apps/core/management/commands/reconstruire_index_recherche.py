@@ -0,0 +1,39 @@
+# apps/core/management/commands/reconstruire_index_recherche.py
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.recherche import index_recherche
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruit l'index de recherche plein texte (documents, table FTS5 "
+        "ou trigrammes selon le moteur)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'modeles',
+            nargs='*',
+            help="Modèles à réindexer (ex. membres.Membre), tous par défaut"
+        )
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=None,
+            help="Nombre d'objets lus et écrits par requête"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            modeles = [apps.get_model(label) for label in options['modeles']]
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+
+        index_recherche.installer()
+        resultats = index_recherche.reconstruire(modeles or None, options['taille_lot'])
+        for label, total in resultats.items():
+            self.stdout.write(f"{label} : {total} documents")
+        self.stdout.write(self.style.SUCCESS(
+            f"Index de recherche reconstruit (moteur {index_recherche.moteur()})"
+        ))
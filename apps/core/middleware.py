@@ -1,7 +1,13 @@
 # apps/core/middleware.py
+import functools
+import random
 import time
 import json
 import logging
+from contextlib import ExitStack
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template import engines
 from django.utils import timezone
 from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
@@ -149,4 +155,154 @@ class NoCacheMiddleware:
             response['Pragma'] = 'no-cache'
             response['Expires'] = '0'
         
-        return response
\ No newline at end of file
+        return response
+
+def mesurer_context_processor(processeur):
+    """
+    Enveloppe un context processor : le nombre de requêtes SQL et la durée
+    de chaque appel sont cumulés dans ``request.mesures_context_processors``.
+    Les valeurs différées (évaluées par le gabarit) ne sont pas comptées.
+    """
+    nom = getattr(processeur, '__qualname__', repr(processeur))
+
+    @functools.wraps(processeur)
+    def processeur_mesure(request):
+        requetes = 0
+
+        def compter(execute, sql, params, many, context):
+            nonlocal requetes
+            requetes += 1
+            return execute(sql, params, many, context)
+
+        debut = time.perf_counter()
+        with ExitStack() as pile:
+            for connexion in connections.all(initialized_only=True):
+                pile.enter_context(connexion.execute_wrapper(compter))
+            resultat = processeur(request)
+        duree = time.perf_counter() - debut
+
+        mesures = request.__dict__.setdefault('mesures_context_processors', {})
+        mesure = mesures.setdefault(nom, {'appels': 0, 'requetes': 0, 'duree': 0.0})
+        mesure['appels'] += 1
+        mesure['requetes'] += requetes
+        mesure['duree'] += duree
+        return resultat
+
+    processeur_mesure.mesure = True
+    return processeur_mesure
+
+
+class ContextProcessorsInstrumentationMiddleware:
+    """
+    Mesure ce que chaque context processor ajoute à une requête (requêtes
+    SQL, durée) : une ligne de journal par requête et un en-tête
+    ``Server-Timing`` lisible dans les outils du navigateur.
+
+    Activé par CONTEXT_PROCESSORS_INSTRUMENTATION (None : selon DEBUG).
+    """
+    def __init__(self, get_response):
+        actif = getattr(settings, 'CONTEXT_PROCESSORS_INSTRUMENTATION', None)
+        if not (settings.DEBUG if actif is None else actif):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.instrumenter()
+
+    @staticmethod
+    def instrumenter():
+        """Enveloppe les context processors des moteurs Django Templates."""
+        for backend in engines.all():
+            moteur = getattr(backend, 'engine', None)
+            if moteur is None:
+                continue
+            processeurs = moteur.template_context_processors
+            if not any(getattr(processeur, 'mesure', False) for processeur in processeurs):
+                # Remplace la valeur de la cached_property du moteur
+                moteur.__dict__['template_context_processors'] = tuple(
+                    mesurer_context_processor(processeur) for processeur in processeurs
+                )
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        mesures = getattr(request, 'mesures_context_processors', None)
+        if mesures:
+            logger.info("Context processors %s : %s", request.path, " ; ".join(
+                f"{nom} {mesure['requetes']} requête(s) {mesure['duree'] * 1000:.1f} ms"
+                for nom, mesure in mesures.items()
+            ))
+            response['Server-Timing'] = ", ".join(
+                f'cp{i};dur={mesure["duree"] * 1000:.2f};desc="{nom} ({mesure["requetes"]} req.)"'
+                for i, (nom, mesure) in enumerate(mesures.items())
+            )
+        return response
+
+
+class ProfilageRequetesMiddleware:
+    """
+    Profilage d'une proportion des requêtes (PROFILAGE_TAUX, 0 : désactivé) :
+    requêtes SQL, durée SQL, requête la plus lente, rendu des gabarits et
+    lectures de cache (voir apps.core.profilage).
+
+    Chaque mesure donne une ligne de journal JSON et rejoint l'historique en
+    mémoire affiché par la page de profilage. Le budget de requêtes déclaré
+    par la vue est vérifié : avertissement en production, exception si
+    PROFILAGE_BUDGET_STRICT (tests).
+    """
+    def __init__(self, get_response):
+        from .profilage import installer
+
+        self.taux = getattr(settings, 'PROFILAGE_TAUX', 0)
+        if self.taux <= 0:
+            raise MiddlewareNotUsed
+        self.strict = getattr(settings, 'PROFILAGE_BUDGET_STRICT', False)
+        self.get_response = get_response
+        installer()
+
+    def __call__(self, request):
+        from .profilage import mesurer
+
+        if self.taux < 1 and random.random() >= self.taux:
+            return self.get_response(request)
+
+        debut = time.perf_counter()
+        with mesurer() as mesure:
+            response = self.get_response(request)
+        duree = time.perf_counter() - debut
+
+        self.enregistrer(request, response, mesure, duree)
+        return response
+
+    def enregistrer(self, request, response, mesure, duree):
+        from .profilage import BudgetRequetesDepasse, budget_vue, historique_profilage
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        budget = budget_vue(resolver_match.func) if resolver_match else None
+        donnees = {
+            'date': timezone.now().isoformat(),
+            'methode': request.method,
+            'chemin': request.path,
+            'vue': (resolver_match.view_name or resolver_match._func_path) if resolver_match else '',
+            'statut': response.status_code,
+            'duree_ms': round(duree * 1000, 2),
+            'requetes': mesure.requetes,
+            'duree_sql_ms': round(mesure.duree_sql * 1000, 2),
+            'requete_plus_lente': mesure.requete_plus_lente,
+            'duree_plus_lente_ms': round(mesure.duree_plus_lente * 1000, 2),
+            'duree_gabarits_ms': round(mesure.duree_gabarits * 1000, 2),
+            'cache_trouves': mesure.cache_trouves,
+            'cache_manques': mesure.cache_manques,
+            'budget': budget,
+            'budget_depasse': budget is not None and mesure.requetes > budget,
+        }
+        historique_profilage.ajouter(donnees)
+        logger.info(f"Profilage: {json.dumps(donnees)}")
+
+        if donnees['budget_depasse']:
+            message = (
+                f"Budget de requêtes dépassé pour {donnees['vue']} ({request.path}) : "
+                f"{mesure.requetes} requêtes pour un budget de {budget}, "
+                f"la plus lente : {mesure.requete_plus_lente}"
+            )
+            if self.strict:
+                raise BudgetRequetesDepasse(message)
+            logger.warning(message)
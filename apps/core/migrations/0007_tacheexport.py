@@ -0,0 +1,43 @@
+# Generated by Django 5.1.8 on 2026-10-17 22:43
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_log'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TacheExport',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('generateur', models.CharField(help_text="Chemin de la fonction produisant l'export", max_length=200, verbose_name='Générateur')),
+                ('format_export', models.CharField(max_length=10, verbose_name='Format')),
+                ('parametres', models.JSONField(blank=True, default=dict, verbose_name='Paramètres')),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('terminee', 'Terminée'), ('echouee', 'Échouée'), ('expiree', 'Expirée')], default='en_attente', max_length=20, verbose_name='Statut')),
+                ('progression', models.PositiveSmallIntegerField(default=0, verbose_name='Progression (%)')),
+                ('lignes_traitees', models.PositiveIntegerField(default=0, verbose_name='Lignes traitées')),
+                ('lignes_total', models.PositiveIntegerField(default=0, verbose_name='Nombre total de lignes')),
+                ('fichier', models.FileField(blank=True, upload_to='exports/%Y/%m/%d/', verbose_name='Fichier')),
+                ('nom_fichier', models.CharField(blank=True, max_length=255, verbose_name='Nom du fichier')),
+                ('message_erreur', models.TextField(blank=True, verbose_name="Message d'erreur")),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('date_fin', models.DateTimeField(blank=True, null=True, verbose_name='Date de fin')),
+                ('date_expiration', models.DateTimeField(blank=True, null=True, verbose_name="Date d'expiration")),
+                ('utilisateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='taches_export', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': "Tâche d'export",
+                'verbose_name_plural': "Tâches d'export",
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['statut', 'date_expiration'], name='core_tachee_statut_d73203_idx')],
+            },
+        ),
+    ]
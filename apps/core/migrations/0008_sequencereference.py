@@ -0,0 +1,25 @@
+# Generated by Django 5.1.8 on 2026-10-17 23:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_tacheexport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SequenceReference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cle', models.CharField(max_length=50, unique=True, verbose_name='Clé')),
+                ('valeur', models.PositiveBigIntegerField(default=0, verbose_name='Dernier numéro attribué')),
+            ],
+            options={
+                'verbose_name': 'Séquence de références',
+                'verbose_name_plural': 'Séquences de références',
+            },
+        ),
+    ]
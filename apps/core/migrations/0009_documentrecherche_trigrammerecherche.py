@@ -0,0 +1,41 @@
+# Generated by Django 5.1.8 on 2026-10-18 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_sequencereference'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentRecherche',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modele', models.CharField(max_length=100, verbose_name='Modèle')),
+                ('objet_id', models.PositiveBigIntegerField(verbose_name="Identifiant de l'objet")),
+                ('contenu', models.TextField(verbose_name='Contenu normalisé')),
+            ],
+            options={
+                'verbose_name': 'Document de recherche',
+                'verbose_name_plural': 'Documents de recherche',
+                'unique_together': {('modele', 'objet_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TrigrammeRecherche',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigramme', models.CharField(max_length=3, verbose_name='Trigramme')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrammes', to='core.documentrecherche', verbose_name='Document')),
+            ],
+            options={
+                'verbose_name': 'Trigramme de recherche',
+                'verbose_name_plural': 'Trigrammes de recherche',
+                'indexes': [models.Index(fields=['trigramme', 'document'], name='core_trigramme_doc_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.8 on 2026-10-18 02:19
+
+import apps.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_documentrecherche_trigrammerecherche'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tacheexport',
+            name='fichier',
+            field=models.FileField(blank=True, upload_to=apps.core.models.chemin_fichier_export, verbose_name='Fichier'),
+        ),
+    ]
@@ -4,8 +4,11 @@ from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.db.models import Q
 from .managers import BaseManager
+from .corbeille import compteurs_corbeille
 from django.conf import settings
 import json
+import os
+import uuid
 
 class BaseModel(models.Model):
     """
@@ -30,11 +33,18 @@ class BaseModel(models.Model):
         """
         if hard:
             # Suppression physique
-            return super().delete(*args, **kwargs)
+            dans_corbeille = self.deleted_at is not None
+            resultat = super().delete(*args, **kwargs)
+            if dans_corbeille:
+                compteurs_corbeille.ajuster(self.__class__, -1)
+            return resultat
         else:
             # Suppression logique
+            deja_supprime = self.deleted_at is not None
             self.deleted_at = timezone.now()
             self.save(update_fields=['deleted_at'])
+            if not deja_supprime:
+                compteurs_corbeille.ajuster(self.__class__, 1)
             
             # Journaliser l'action (si applicable)
             self._log_deletion(user)
@@ -56,6 +66,7 @@ class BaseModel(models.Model):
         
         self.deleted_at = None
         self.save(update_fields=['deleted_at'])
+        compteurs_corbeille.ajuster(self.__class__, -1)
         
         # Journaliser l'action (si applicable)
         self._log_restoration(user)
@@ -220,4 +231,169 @@ class Log(models.Model):
         try:
             return json.dumps(self.details, indent=2, ensure_ascii=False)
         except:
-            return str(self.details)
\ No newline at end of file
+            return str(self.details)
+
+
+def chemin_fichier_export(instance, filename):
+    """
+    Chemin aléatoire du fichier d'un export : un nom devinable le rendrait
+    accessible à quiconque atteint les médias. Le nom présenté au
+    téléchargement est ``TacheExport.nom_fichier``.
+    """
+    extension = os.path.splitext(filename)[1]
+    return f"exports/{timezone.now():%Y/%m/%d}/{uuid.uuid4().hex}{extension}"
+
+
+class TacheExport(models.Model):
+    """
+    Export exécuté en arrière-plan par Celery : suivi de la progression et
+    fichier généré, conservé sous MEDIA jusqu'à sa date d'expiration.
+    """
+    STATUT_EN_ATTENTE = 'en_attente'
+    STATUT_EN_COURS = 'en_cours'
+    STATUT_TERMINEE = 'terminee'
+    STATUT_ECHOUEE = 'echouee'
+    STATUT_EXPIREE = 'expiree'
+
+    STATUT_CHOICES = [
+        (STATUT_EN_ATTENTE, _('En attente')),
+        (STATUT_EN_COURS, _('En cours')),
+        (STATUT_TERMINEE, _('Terminée')),
+        (STATUT_ECHOUEE, _('Échouée')),
+        (STATUT_EXPIREE, _('Expirée')),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    utilisateur = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='taches_export',
+        verbose_name=_("Utilisateur")
+    )
+    generateur = models.CharField(
+        max_length=200,
+        verbose_name=_("Générateur"),
+        help_text=_("Chemin de la fonction produisant l'export")
+    )
+    format_export = models.CharField(max_length=10, verbose_name=_("Format"))
+    parametres = models.JSONField(default=dict, blank=True, verbose_name=_("Paramètres"))
+    statut = models.CharField(
+        max_length=20,
+        choices=STATUT_CHOICES,
+        default=STATUT_EN_ATTENTE,
+        verbose_name=_("Statut")
+    )
+    progression = models.PositiveSmallIntegerField(default=0, verbose_name=_("Progression (%)"))
+    lignes_traitees = models.PositiveIntegerField(default=0, verbose_name=_("Lignes traitées"))
+    lignes_total = models.PositiveIntegerField(default=0, verbose_name=_("Nombre total de lignes"))
+    fichier = models.FileField(upload_to=chemin_fichier_export, blank=True, verbose_name=_("Fichier"))
+    nom_fichier = models.CharField(max_length=255, blank=True, verbose_name=_("Nom du fichier"))
+    message_erreur = models.TextField(blank=True, verbose_name=_("Message d'erreur"))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Date de création"))
+    date_fin = models.DateTimeField(null=True, blank=True, verbose_name=_("Date de fin"))
+    date_expiration = models.DateTimeField(null=True, blank=True, verbose_name=_("Date d'expiration"))
+
+    class Meta:
+        verbose_name = _("Tâche d'export")
+        verbose_name_plural = _("Tâches d'export")
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['statut', 'date_expiration']),
+        ]
+
+    def __str__(self):
+        return f"{self.generateur.rsplit('.', 1)[-1]} ({self.format_export}) - {self.get_statut_display()}"
+
+    @property
+    def est_terminee(self):
+        return self.statut in (self.STATUT_TERMINEE, self.STATUT_ECHOUEE, self.STATUT_EXPIREE)
+
+    @property
+    def est_telechargeable(self):
+        return (
+            self.statut == self.STATUT_TERMINEE
+            and bool(self.fichier)
+            and (self.date_expiration is None or self.date_expiration > timezone.now())
+        )
+
+    def enregistrer_progression(self, lignes_traitees, lignes_total=None):
+        """
+        Met à jour la progression en base, par UPDATE direct pour ne pas
+        écraser les autres champs pendant l'export.
+        """
+        if lignes_total is not None:
+            self.lignes_total = lignes_total
+        self.lignes_traitees = lignes_traitees
+        if self.lignes_total:
+            self.progression = min(100, lignes_traitees * 100 // self.lignes_total)
+        TacheExport.objects.filter(pk=self.pk).update(
+            lignes_traitees=self.lignes_traitees,
+            lignes_total=self.lignes_total,
+            progression=self.progression
+        )
+
+    def supprimer_fichier(self):
+        """Supprime le fichier généré et marque la tâche comme expirée."""
+        if self.fichier:
+            self.fichier.delete(save=False)
+        self.statut = self.STATUT_EXPIREE
+        self.save(update_fields=['fichier', 'statut'])
+
+
+class SequenceReference(models.Model):
+    """
+    Compteur d'une famille de références (préfixe et période, par exemple
+    ``COT-202510``), incrémenté par UPDATE atomique (apps.core.references).
+    """
+    cle = models.CharField(max_length=50, unique=True, verbose_name=_("Clé"))
+    valeur = models.PositiveBigIntegerField(default=0, verbose_name=_("Dernier numéro attribué"))
+
+    class Meta:
+        verbose_name = _("Séquence de références")
+        verbose_name_plural = _("Séquences de références")
+
+    def __str__(self):
+        return f"{self.cle} : {self.valeur}"
+
+
+class DocumentRecherche(models.Model):
+    """
+    Texte normalisé (minuscules, sans accents) d'un objet indexé pour la
+    recherche plein texte (apps.core.recherche).
+    """
+    modele = models.CharField(max_length=100, verbose_name=_("Modèle"))
+    objet_id = models.PositiveBigIntegerField(verbose_name=_("Identifiant de l'objet"))
+    contenu = models.TextField(verbose_name=_("Contenu normalisé"))
+
+    class Meta:
+        verbose_name = _("Document de recherche")
+        verbose_name_plural = _("Documents de recherche")
+        unique_together = ('modele', 'objet_id')
+
+    def __str__(self):
+        # Pas d'accès aux relations : appelé par les signaux de journalisation
+        return f"{self.modele} #{self.objet_id}"
+
+
+class TrigrammeRecherche(models.Model):
+    """
+    Trigrammes d'un document de recherche, utilisés quand la base ne fournit
+    pas d'index FTS5 (moteur ``trigrammes``).
+    """
+    document = models.ForeignKey(
+        DocumentRecherche,
+        on_delete=models.CASCADE,
+        related_name='trigrammes',
+        verbose_name=_("Document")
+    )
+    trigramme = models.CharField(max_length=3, verbose_name=_("Trigramme"))
+
+    class Meta:
+        verbose_name = _("Trigramme de recherche")
+        verbose_name_plural = _("Trigrammes de recherche")
+        indexes = [
+            models.Index(fields=['trigramme', 'document'], name='core_trigramme_doc_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.trigramme} #{self.document_id}"
@@ -1,16 +1,20 @@
 # apps/core/notifications.py - Extension pour les événements
 from django.contrib.auth import get_user_model
-from django.template.loader import render_to_string
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.conf import settings
 from django.utils import timezone
 from django.urls import reverse
 from celery import shared_task
 import logging
 
+from .rendu import RenduPrepare
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Variables du contexte propres à chaque destinataire (les autres sont communes à l'envoi)
+VARIABLES_DESTINATAIRE = ('recipient_name', 'current_year')
+
 # Types de notifications pour les événements
 class NotificationTypes:
     # Notifications existantes (si déjà dans le système)
@@ -215,15 +219,16 @@ class NotificationService:
                 'site_name': getattr(settings, 'SITE_NAME', 'Gestion Association'),
             }
             
-            # Envoyer à tous les membres inscrits
-            for membre in membres_inscrits:
-                send_event_email.delay(
-                    recipient_email=membre.email,
-                    recipient_name=f"{membre.prenom} {membre.nom}",
-                    template_name='evenement_modifie',
-                    context=context,
-                    subject=f"Modification : {evenement.titre}"
-                )
+            # Envoyer à tous les membres inscrits, par lots sur une connexion partagée
+            send_event_emails_batch.delay(
+                recipients=[
+                    {'recipient_email': membre.email, 'recipient_name': f"{membre.prenom} {membre.nom}"}
+                    for membre in membres_inscrits
+                ],
+                template_name='evenement_modifie',
+                context=context,
+                subject=f"Modification : {evenement.titre}"
+            )
             
             logger.info(f"Notifications de modification envoyées pour {evenement.titre}")
             return True
@@ -249,15 +254,16 @@ class NotificationService:
                 'site_name': getattr(settings, 'SITE_NAME', 'Gestion Association'),
             }
             
-            # Envoyer à tous les membres inscrits
-            for membre in membres_inscrits:
-                send_event_email.delay(
-                    recipient_email=membre.email,
-                    recipient_name=f"{membre.prenom} {membre.nom}",
-                    template_name='evenement_annule',
-                    context=context,
-                    subject=f"ANNULATION : {evenement.titre}"
-                )
+            # Envoyer à tous les membres inscrits, par lots sur une connexion partagée
+            send_event_emails_batch.delay(
+                recipients=[
+                    {'recipient_email': membre.email, 'recipient_name': f"{membre.prenom} {membre.nom}"}
+                    for membre in membres_inscrits
+                ],
+                template_name='evenement_annule',
+                context=context,
+                subject=f"ANNULATION : {evenement.titre}"
+            )
             
             logger.info(f"Notifications d'annulation envoyées pour {evenement.titre}")
             return True
@@ -325,15 +331,16 @@ class NotificationService:
                 'site_name': getattr(settings, 'SITE_NAME', 'Gestion Association'),
             }
             
-            # Envoyer à tous les membres inscrits confirmés
-            for membre in membres_inscrits:
-                send_event_email.delay(
-                    recipient_email=membre.email,
-                    recipient_name=f"{membre.prenom} {membre.nom}",
-                    template_name='rappel_evenement',
-                    context=context,
-                    subject=f"Rappel : {evenement.titre} - {evenement.date_debut.strftime('%d/%m/%Y')}"
-                )
+            # Envoyer à tous les membres inscrits confirmés, par lots sur une connexion partagée
+            send_event_emails_batch.delay(
+                recipients=[
+                    {'recipient_email': membre.email, 'recipient_name': f"{membre.prenom} {membre.nom}"}
+                    for membre in membres_inscrits
+                ],
+                template_name='rappel_evenement',
+                context=context,
+                subject=f"Rappel : {evenement.titre} - {evenement.date_debut.strftime('%d/%m/%Y')}"
+            )
             
             logger.info(f"Rappels d'événement envoyés pour {evenement.titre}")
             return True
@@ -426,28 +433,13 @@ def send_event_email(self, recipient_email, recipient_name, template_name, conte
     Tâche Celery pour l'envoi d'emails liés aux événements
     """
     try:
-        # Ajouter des informations communes au contexte
-        context.update({
-            'recipient_name': recipient_name,
-            'current_year': timezone.now().year,
-        })
-        
-        # Charger les templates
-        html_template = f'emails/evenements/{template_name}.html'
-        text_template = f'emails/evenements/{template_name}.txt'
-        
-        # Render du contenu
-        html_content = render_to_string(html_template, context)
-        text_content = render_to_string(text_template, context)
-        
-        # Créer l'email
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[recipient_email]
+        email = EnvoiEmailsGroupe().preparer(
+            recipient_email=recipient_email,
+            recipient_name=recipient_name,
+            template_name=template_name,
+            context=context,
+            subject=subject
         )
-        email.attach_alternative(html_content, "text/html")
         
         # Envoyer
         email.send()
@@ -466,30 +458,165 @@ def send_event_email(self, recipient_email, recipient_name, template_name, conte
             logger.error(f"Échec définitif de l'envoi de l'email à {recipient_email}")
             return False
 
-# Fonction utilitaire pour envoyer des notifications par lot
-@shared_task
-def send_batch_notifications(notification_type, recipients_data):
+
+class EnvoiEmailsGroupe:
     """
-    Envoie des notifications en lot
+    Envoi groupé d'emails d'événements sur une connexion SMTP partagée.
+    
+    Le rendu (templates compilés et contexte commun) est préparé une fois par
+    template et par contexte, puis exécuté avec les seules variables de chaque
+    destinataire (VARIABLES_DESTINATAIRE, voir apps.core.rendu). Les messages
+    sont envoyés par lots de ``taille_lot`` sur une même connexion, ouverte
+    une fois par lot plutôt qu'une fois par message. Chaque message est
+    transmis par ``send_messages`` sur cette connexion afin de savoir
+    précisément lesquels ont échoué et de ne rejouer que ceux-là.
+    
+    Args:
+        taille_lot (int): Nombre de messages par connexion (NOTIFICATIONS_TAILLE_LOT)
+        connection: Connexion email à réutiliser (par défaut ``get_connection()``)
     """
-    try:
-        success_count = 0
-        error_count = 0
+    
+    def __init__(self, taille_lot=None, connection=None):
+        self.taille_lot = max(1, taille_lot or getattr(settings, 'NOTIFICATIONS_TAILLE_LOT', 100))
+        self.connection = connection
+        self._rendus = {}
+    
+    def preparer(self, recipient_email, recipient_name, template_name, context, subject):
+        """Construit le message d'un destinataire à partir du rendu préparé."""
+        html_content, text_content = self._rendu(template_name, context).rendre(
+            recipient_name=recipient_name,
+            current_year=timezone.now().year
+        )
+        
+        email = EmailMultiAlternatives(
+            subject=subject,
+            body=text_content,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[recipient_email]
+        )
+        email.attach_alternative(html_content, "text/html")
+        return email
+    
+    def envoyer(self, destinataires):
+        """
+        Envoie les emails décrits par ``destinataires``.
         
-        for recipient_data in recipients_data:
-            try:
-                send_event_email.delay(**recipient_data)
-                success_count += 1
-            except Exception as e:
-                error_count += 1
-                logger.error(f"Erreur lors de l'envoi à {recipient_data.get('recipient_email')}: {str(e)}")
+        Args:
+            destinataires (list): Paramètres de ``send_event_email`` pour chaque
+                destinataire (recipient_email, recipient_name, template_name,
+                context, subject)
+                
+        Returns:
+            tuple: (nombre d'emails envoyés, destinataires en échec)
+        """
+        envoyes = 0
+        echecs = []
         
-        logger.info(f"Notifications en lot '{notification_type}': {success_count} succès, {error_count} erreurs")
-        return {'success': success_count, 'errors': error_count}
+        for debut in range(0, len(destinataires), self.taille_lot):
+            lot = destinataires[debut:debut + self.taille_lot]
+            messages = []
+            for destinataire in lot:
+                try:
+                    messages.append((destinataire, self.preparer(**destinataire)))
+                except Exception as e:
+                    logger.error(f"Erreur lors de la préparation de l'email à {destinataire.get('recipient_email')}: {str(e)}")
+                    echecs.append(destinataire)
+            
+            nombre, echecs_lot = self._envoyer_lot(messages)
+            envoyes += nombre
+            echecs.extend(echecs_lot)
         
+        return envoyes, echecs
+    
+    def _envoyer_lot(self, messages):
+        """Envoie un lot de messages sur une seule connexion."""
+        if not messages:
+            return 0, []
+        
+        connection = self.connection or get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            logger.error(f"Connexion au serveur d'envoi impossible : {str(e)}")
+            return 0, [destinataire for destinataire, _ in messages]
+        
+        envoyes = 0
+        echecs = []
+        try:
+            for destinataire, email in messages:
+                try:
+                    envoyes += connection.send_messages([email]) or 0
+                except Exception as e:
+                    logger.error(f"Erreur lors de l'envoi de l'email à {destinataire['recipient_email']}: {str(e)}")
+                    echecs.append(destinataire)
+        finally:
+            connection.close()
+        return envoyes, echecs
+    
+    def _rendu(self, template_name, context):
+        """Rendu préparé pour un template et un contexte commun (partagé par un même envoi)."""
+        cle = (template_name, id(context))
+        if cle not in self._rendus:
+            # Le contexte est conservé avec le rendu pour que son id ne soit pas réutilisé
+            self._rendus[cle] = (context, RenduPrepare(
+                f'emails/evenements/{template_name}.html',
+                context,
+                template_texte=f'emails/evenements/{template_name}.txt',
+                variables=VARIABLES_DESTINATAIRE
+            ))
+        return self._rendus[cle][1]
+
+
+def _rejouer_echecs(task, echecs, **kwargs):
+    """Relance la tâche pour les seuls destinataires en échec, avec backoff exponentiel."""
+    if echecs and task.request.retries < task.max_retries:
+        raise task.retry(countdown=2 ** task.request.retries, kwargs=kwargs)
+    for destinataire in echecs:
+        logger.error(f"Échec définitif de l'envoi de l'email à {destinataire.get('recipient_email')}")
+
+
+@shared_task(bind=True, max_retries=3)
+def send_event_emails_batch(self, recipients, template_name, context, subject):
+    """
+    Tâche Celery d'envoi d'un même email d'événement à plusieurs destinataires.
+    
+    Args:
+        recipients (list): Dictionnaires ``recipient_email`` / ``recipient_name``
+    """
+    destinataires = [
+        {**recipient, 'template_name': template_name, 'context': context, 'subject': subject}
+        for recipient in recipients
+    ]
+    envoyes, echecs = EnvoiEmailsGroupe().envoyer(destinataires)
+    logger.info(f"Email '{template_name}' envoyé à {envoyes} destinataires, {len(echecs)} échecs")
+    
+    _rejouer_echecs(
+        self, echecs,
+        recipients=[
+            {'recipient_email': echec['recipient_email'], 'recipient_name': echec['recipient_name']}
+            for echec in echecs
+        ],
+        template_name=template_name,
+        context=context,
+        subject=subject
+    )
+    return {'success': envoyes, 'errors': len(echecs)}
+
+# Fonction utilitaire pour envoyer des notifications par lot
+@shared_task(bind=True, max_retries=3)
+def send_batch_notifications(self, notification_type, recipients_data):
+    """
+    Envoie des notifications en lot sur une connexion partagée
+    """
+    try:
+        success_count, echecs = EnvoiEmailsGroupe().envoyer(recipients_data)
     except Exception as e:
         logger.error(f"Erreur lors de l'envoi des notifications en lot : {str(e)}")
         return {'success': 0, 'errors': len(recipients_data)}
+    
+    logger.info(f"Notifications en lot '{notification_type}': {success_count} succès, {len(echecs)} erreurs")
+    _rejouer_echecs(self, echecs, notification_type=notification_type, recipients_data=echecs)
+    return {'success': success_count, 'errors': len(echecs)}
 
 # Fonction pour nettoyer les anciennes notifications
 @shared_task
@@ -0,0 +1,233 @@
+# apps/core/profilage.py
+"""
+Profilage des requêtes HTTP (apps.core.middleware.ProfilageRequetesMiddleware).
+
+Pour une requête échantillonnée, ``mesurer()`` relève :
+
+- le nombre de requêtes SQL, leur durée totale et l'empreinte de la plus
+  lente (valeurs littérales et listes ``IN`` remplacées) ;
+- la durée de rendu des gabarits Django (gabarit le plus externe seulement,
+  requêtes SQL exécutées pendant le rendu comprises) ;
+- les lectures de cache trouvées / manquées (``get`` et ``get_many``).
+
+Gabarits et caches sont instrumentés une fois par processus (``installer``) ;
+hors mesure, les fonctions enveloppées appellent directement l'original.
+
+Une vue déclare son budget de requêtes SQL avec le décorateur
+``budget_requetes(n)`` ou l'attribut de classe ``budget_requetes``. Le
+dépassement est journalisé, ou lève ``BudgetRequetesDepasse`` si
+PROFILAGE_BUDGET_STRICT est activé (tests).
+
+Les dernières mesures sont conservées en mémoire par processus
+(``historique_profilage``) pour la page de profilage.
+"""
+import contextvars
+import functools
+import re
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.db import connections
+from django.template.backends.django import Template
+
+# Mesure de la requête HTTP en cours (None hors mesure)
+_mesure_courante = contextvars.ContextVar('mesure_profilage', default=None)
+
+_ABSENT = object()
+
+_LISTES = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))+\s*\)")
+_LITTERAUX = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_ESPACES = re.compile(r"\s+")
+
+
+class BudgetRequetesDepasse(AssertionError):
+    """Une vue a exécuté plus de requêtes SQL que son budget."""
+
+
+def empreinte_sql(sql, longueur=300):
+    """Forme normalisée d'une requête SQL, commune à ses variantes de paramètres."""
+    sql = _LISTES.sub('(...)', sql)
+    sql = _LITTERAUX.sub('?', sql)
+    return _ESPACES.sub(' ', sql).strip()[:longueur]
+
+
+def budget_requetes(nombre):
+    """
+    Déclare le nombre maximal de requêtes SQL d'une vue fonction (ou d'une
+    classe de vue, équivalent à l'attribut ``budget_requetes``).
+    """
+    def decorateur(vue):
+        vue.budget_requetes = nombre
+        return vue
+    return decorateur
+
+
+def budget_vue(vue):
+    """Budget de requêtes déclaré par la vue résolue (fonction ou ``as_view()``)."""
+    budget = getattr(vue, 'budget_requetes', None)
+    if budget is None:
+        budget = getattr(getattr(vue, 'view_class', None), 'budget_requetes', None)
+    return budget
+
+
+class MesureRequete:
+    """Compteurs d'une requête HTTP échantillonnée."""
+
+    def __init__(self):
+        self.requetes = 0
+        self.duree_sql = 0.0
+        self.requete_plus_lente = ''
+        self.duree_plus_lente = 0.0
+        self.duree_gabarits = 0.0
+        self.cache_trouves = 0
+        self.cache_manques = 0
+        self._sql_plus_lent = ''
+        self._rendu_en_cours = False
+
+    def executer(self, execute, sql, params, many, context):
+        """``execute_wrapper`` : compte et chronomètre chaque requête SQL."""
+        debut = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duree = time.perf_counter() - debut
+            self.requetes += 1
+            self.duree_sql += duree
+            if duree >= self.duree_plus_lente:
+                self.duree_plus_lente = duree
+                self._sql_plus_lent = sql
+
+    def finaliser(self):
+        # Empreinte calculée une seule fois, pour la plus lente
+        self.requete_plus_lente = empreinte_sql(self._sql_plus_lent)
+
+
+@contextmanager
+def mesurer():
+    """Mesure les requêtes SQL, gabarits et lectures de cache du bloc."""
+    mesure = MesureRequete()
+    jeton = _mesure_courante.set(mesure)
+    try:
+        with ExitStack() as pile:
+            for connexion in connections.all():
+                pile.enter_context(connexion.execute_wrapper(mesure.executer))
+            yield mesure
+    finally:
+        _mesure_courante.reset(jeton)
+        mesure.finaliser()
+
+
+def installer():
+    """Instrumente le rendu des gabarits et les caches configurés (une fois par processus)."""
+    if not getattr(Template.render, 'mesure', False):
+        Template.render = _mesurer_rendu(Template.render)
+
+    for alias in settings.CACHES:
+        classe = type(caches[alias])
+        if not getattr(classe.get, 'mesure', False):
+            classe.get = _mesurer_get(classe.get)
+        # get_many de BaseCache passe par get : déjà compté
+        if classe.get_many is not BaseCache.get_many and not getattr(classe.get_many, 'mesure', False):
+            classe.get_many = _mesurer_get_many(classe.get_many)
+
+
+def _mesurer_rendu(render):
+    @functools.wraps(render)
+    def render_mesure(self, context=None, request=None):
+        mesure = _mesure_courante.get()
+        if mesure is None or mesure._rendu_en_cours:
+            return render(self, context, request)
+        mesure._rendu_en_cours = True
+        debut = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            mesure.duree_gabarits += time.perf_counter() - debut
+            mesure._rendu_en_cours = False
+
+    render_mesure.mesure = True
+    return render_mesure
+
+
+def _mesurer_get(get):
+    @functools.wraps(get)
+    def get_mesure(self, key, default=None, version=None):
+        mesure = _mesure_courante.get()
+        if mesure is None:
+            return get(self, key, default, version)
+        valeur = get(self, key, _ABSENT, version)
+        if valeur is _ABSENT:
+            mesure.cache_manques += 1
+            return default
+        mesure.cache_trouves += 1
+        return valeur
+
+    get_mesure.mesure = True
+    return get_mesure
+
+
+def _mesurer_get_many(get_many):
+    @functools.wraps(get_many)
+    def get_many_mesure(self, keys, version=None):
+        mesure = _mesure_courante.get()
+        if mesure is None:
+            return get_many(self, keys, version=version)
+        keys = list(keys)
+        valeurs = get_many(self, keys, version=version)
+        mesure.cache_trouves += len(valeurs)
+        mesure.cache_manques += len(keys) - len(valeurs)
+        return valeurs
+
+    get_many_mesure.mesure = True
+    return get_many_mesure
+
+
+class HistoriqueProfilage:
+    """
+    Dernières mesures du processus (les plus anciennes sont écartées au-delà
+    de PROFILAGE_HISTORIQUE).
+    """
+
+    def __init__(self, taille=None):
+        self._mesures = deque(maxlen=taille or getattr(settings, 'PROFILAGE_HISTORIQUE', 200))
+        self._verrou = threading.Lock()
+
+    def ajouter(self, mesure):
+        with self._verrou:
+            self._mesures.append(mesure)
+
+    def lister(self):
+        """Mesures de la plus récente à la plus ancienne."""
+        with self._verrou:
+            return list(reversed(self._mesures))
+
+    def par_vue(self):
+        """Synthèse par vue : nombre de mesures, requêtes moyennes et maximales, durée moyenne."""
+        vues = {}
+        for mesure in self.lister():
+            synthese = vues.setdefault(mesure['vue'], {
+                'vue': mesure['vue'], 'mesures': 0, 'requetes': 0, 'requetes_max': 0,
+                'duree': 0.0, 'budget': mesure['budget'], 'depassements': 0,
+            })
+            synthese['mesures'] += 1
+            synthese['requetes'] += mesure['requetes']
+            synthese['requetes_max'] = max(synthese['requetes_max'], mesure['requetes'])
+            synthese['duree'] += mesure['duree_ms']
+            synthese['depassements'] += mesure['budget_depasse']
+        for synthese in vues.values():
+            synthese['requetes_moyenne'] = synthese['requetes'] / synthese['mesures']
+            synthese['duree_moyenne_ms'] = synthese['duree'] / synthese['mesures']
+        return sorted(vues.values(), key=lambda synthese: synthese['requetes_max'], reverse=True)
+
+    def vider(self):
+        with self._verrou:
+            self._mesures.clear()
+
+
+# Historique partagé par le middleware et la page de profilage
+historique_profilage = HistoriqueProfilage()
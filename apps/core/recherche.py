@@ -0,0 +1,446 @@
+# apps/core/recherche.py
+"""
+Index de recherche plein texte (membres, cotisations, événements).
+
+Chaque objet indexé a un document (``DocumentRecherche``) : le texte de ses
+champs de recherche, normalisé (minuscules, sans accents, ponctuation
+remplacée par des espaces). Une recherche découpe le terme en mots
+normalisés de la même façon ; un objet correspond si chaque mot apparaît
+dans son document (sous-chaîne, ou début de mot en mode préfixe pour
+l'autocomplétion).
+
+Deux moteurs (RECHERCHE_MOTEUR, ``auto`` par défaut) :
+
+* ``fts5`` (SQLite) : table virtuelle FTS5 à tokenizer ``trigram`` sur les
+  documents, tenue à jour par des triggers et classée par bm25. Elle est
+  créée après chaque ``migrate`` (signal ``post_migrate``), qui construit
+  aussi l'index s'il est vide.
+* ``trigrammes`` (autres bases, ou SQLite sans FTS5) : table des trigrammes
+  de chaque document, indexée par trigramme.
+
+Les mots de moins de trois caractères ne forment pas de trigramme : ils
+sont cherchés par LIKE sur les documents déjà filtrés.
+
+Les applications déclarent leurs modèles dans ``AppConfig.ready`` :
+
+    index_recherche.enregistrer(Cotisation, ('reference', 'membre__nom'))
+
+Les documents sont mis à jour dans la transaction de la sauvegarde
+(signaux ``post_save`` / ``post_delete``), y compris ceux qui reprennent les
+champs d'un objet lié (les cotisations d'un membre renommé). Les écritures
+en masse (``bulk_create``, ``QuerySet.update``) doivent appeler
+``indexer_objets`` ; la commande ``reconstruire_index_recherche`` reconstruit
+l'index (après un changement de moteur notamment).
+"""
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.db.models import Count, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Length, StrIndex
+from django.db.models.signals import post_delete, post_save
+
+from .models import DocumentRecherche, TrigrammeRecherche
+
+logger = logging.getLogger(__name__)
+
+TABLE_FTS = 'core_documentrecherche_fts'
+
+INSTRUCTIONS_FTS = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE_FTS} USING fts5("
+    f"contenu, content='core_documentrecherche', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS core_documentrecherche_ai AFTER INSERT ON core_documentrecherche BEGIN "
+    f"INSERT INTO {TABLE_FTS}(rowid, contenu) VALUES (new.id, new.contenu); END",
+    f"CREATE TRIGGER IF NOT EXISTS core_documentrecherche_ad AFTER DELETE ON core_documentrecherche BEGIN "
+    f"INSERT INTO {TABLE_FTS}({TABLE_FTS}, rowid, contenu) VALUES ('delete', old.id, old.contenu); END",
+    f"CREATE TRIGGER IF NOT EXISTS core_documentrecherche_au AFTER UPDATE ON core_documentrecherche BEGIN "
+    f"INSERT INTO {TABLE_FTS}({TABLE_FTS}, rowid, contenu) VALUES ('delete', old.id, old.contenu); "
+    f"INSERT INTO {TABLE_FTS}(rowid, contenu) VALUES (new.id, new.contenu); END",
+)
+
+_SEPARATEURS = re.compile(r'[\W_]+')
+
+
+def normaliser(texte):
+    """Minuscules, sans accents, mots séparés par une espace."""
+    if not texte:
+        return ''
+    texte = unicodedata.normalize('NFKD', str(texte))
+    texte = ''.join(caractere for caractere in texte if not unicodedata.combining(caractere))
+    return _SEPARATEURS.sub(' ', texte.casefold()).strip()
+
+
+def trigrammes(texte):
+    """Ensemble des sous-chaînes de trois caractères de ``texte``."""
+    return {texte[i:i + 3] for i in range(len(texte) - 2)}
+
+
+class SourceRecherche:
+    """
+    Modèle indexé et ses champs de recherche.
+
+    Args:
+        modele: Classe du modèle
+        champs (tuple): Champs du modèle ou d'un objet lié par clé étrangère
+            (``membre__nom``, un seul niveau)
+    """
+
+    def __init__(self, modele, champs):
+        self.modele = modele
+        self.label = modele._meta.label_lower
+        self.champs = tuple(champs)
+        # Champs du modèle dont la modification change le document
+        self.champs_locaux = {champ.split('__')[0] for champ in self.champs}
+        # Relation -> (modèle lié, champs lus sur l'objet lié)
+        self.relations = {}
+        for champ in self.champs:
+            if '__' in champ:
+                relation, champ_lie = champ.split('__', 1)
+                modele_lie = modele._meta.get_field(relation).related_model
+                self.relations.setdefault(relation, (modele_lie, set()))[1].add(champ_lie)
+
+    def contenu(self, valeurs):
+        return normaliser(' '.join(str(valeur) for valeur in valeurs if valeur not in (None, '')))
+
+    def contenu_objet(self, objet):
+        valeurs = []
+        for champ in self.champs:
+            valeur = objet
+            for partie in champ.split('__'):
+                valeur = getattr(valeur, partie, None)
+                if valeur is None:
+                    break
+            valeurs.append(valeur)
+        return self.contenu(valeurs)
+
+
+class IndexRecherche:
+    """
+    Registre des modèles indexés, mise à jour des documents et recherche.
+    """
+
+    TAILLE_LOT = 500
+
+    def __init__(self):
+        self._sources = {}
+        # Modèle lié -> [(source, relation, champs lus)]
+        self._dependances = defaultdict(list)
+        self._fts = {}
+
+    #
+    # Enregistrement des modèles
+    #
+    def enregistrer(self, modele, champs):
+        """Indexe ``modele`` sur ``champs`` et branche les signaux de mise à jour."""
+        source = SourceRecherche(modele, champs)
+        self._sources[modele] = source
+        self._connecter(modele)
+        post_delete.connect(self._apres_suppression, sender=modele, dispatch_uid=f'recherche_suppression_{source.label}')
+        for relation, (modele_lie, champs_lies) in source.relations.items():
+            self._dependances[modele_lie].append((source, relation, champs_lies))
+            self._connecter(modele_lie)
+        return source
+
+    def source(self, modele):
+        return self._sources[modele._meta.concrete_model]
+
+    def _connecter(self, modele):
+        post_save.connect(
+            self._apres_enregistrement,
+            sender=modele,
+            dispatch_uid=f'recherche_enregistrement_{modele._meta.label_lower}'
+        )
+
+    def _apres_enregistrement(self, sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+        if raw:
+            return
+        modifies = set(update_fields) if update_fields is not None else None
+        source = self._sources.get(sender)
+        if source and (modifies is None or modifies & source.champs_locaux):
+            self.indexer_objets([instance], dependances=False)
+        if not created:
+            self._indexer_dependances(sender, [instance.pk], modifies)
+
+    def _apres_suppression(self, sender, instance, **kwargs):
+        self.supprimer(sender, [instance.pk])
+
+    #
+    # Moteur
+    #
+    def moteur(self, using=DEFAULT_DB_ALIAS):
+        """``fts5`` ou ``trigrammes`` (RECHERCHE_MOTEUR, détecté si ``auto``)."""
+        choix = getattr(settings, 'RECHERCHE_MOTEUR', 'auto')
+        if choix != 'auto':
+            return choix
+        if using not in self._fts:
+            connexion = connections[using]
+            self._fts[using] = (
+                connexion.vendor == 'sqlite'
+                and TABLE_FTS in connexion.introspection.table_names()
+            )
+        return 'fts5' if self._fts[using] else 'trigrammes'
+
+    def installer(self, using=DEFAULT_DB_ALIAS):
+        """
+        Crée la table FTS5 et ses triggers (SQLite) s'ils n'existent pas.
+
+        Returns:
+            bool: True si l'index FTS5 est disponible
+        """
+        connexion = connections[using]
+        if connexion.vendor != 'sqlite':
+            return False
+        tables = connexion.introspection.table_names()
+        if DocumentRecherche._meta.db_table not in tables:
+            return False
+        if TABLE_FTS not in tables:
+            try:
+                with transaction.atomic(using=using), connexion.cursor() as cursor:
+                    for instruction in INSTRUCTIONS_FTS:
+                        cursor.execute(instruction)
+                    # Indexer les documents existants
+                    cursor.execute(f"INSERT INTO {TABLE_FTS}({TABLE_FTS}) VALUES ('rebuild')")
+            except OperationalError as e:
+                # SQLite sans FTS5 ou sans tokenizer trigram (< 3.34)
+                logger.warning(f"Index FTS5 indisponible, moteur de trigrammes utilisé : {e}")
+                self._fts[using] = False
+                return False
+        self._fts[using] = True
+        return True
+
+    #
+    # Mise à jour des documents
+    #
+    def indexer_objets(self, objets, dependances=True):
+        """
+        Écrit les documents d'objets déjà chargés (sans relire la base) et,
+        si ``dependances``, ceux des objets qui reprennent leurs champs.
+        """
+        par_modele = defaultdict(list)
+        for objet in objets:
+            par_modele[objet._meta.concrete_model].append(objet)
+
+        total = 0
+        for modele, instances in par_modele.items():
+            source = self._sources.get(modele)
+            if source:
+                total += self._ecrire(source, {objet.pk: source.contenu_objet(objet) for objet in instances})
+            if dependances:
+                total += self._indexer_dependances(modele, [objet.pk for objet in instances])
+        return total
+
+    def indexer(self, modele, ids):
+        """Relit et écrit les documents des objets ``ids`` de ``modele``."""
+        source = self.source(modele)
+        return self._indexer_requete(source, modele._base_manager.filter(pk__in=list(ids)))
+
+    def supprimer(self, modele, ids):
+        """Supprime les documents des objets ``ids`` de ``modele``."""
+        documents = DocumentRecherche.objects.filter(modele=self.source(modele).label, objet_id__in=list(ids))
+        if self.moteur(documents.db) == 'trigrammes':
+            anciens = TrigrammeRecherche.objects.filter(document__in=documents)
+            anciens._raw_delete(anciens.db)
+        # Suppression directe : pas de signal par document
+        return documents._raw_delete(documents.db)
+
+    def reconstruire(self, modeles=None, taille_lot=None):
+        """
+        Réécrit les documents de tous les objets des modèles (tous par
+        défaut), supprime les documents orphelins et reconstruit la table
+        FTS5 ou celle des trigrammes selon le moteur.
+
+        Returns:
+            dict: Nombre de documents écrits par modèle
+        """
+        taille_lot = taille_lot or self.TAILLE_LOT
+        moteur = self.moteur()
+        if moteur != 'trigrammes':
+            TrigrammeRecherche.objects.all()._raw_delete(DEFAULT_DB_ALIAS)
+
+        resultats = {}
+        for modele, source in self._sources.items():
+            if modeles and modele not in modeles:
+                continue
+            total = 0
+            dernier = 0
+            with transaction.atomic():
+                while True:
+                    lot = list(
+                        modele._base_manager.filter(pk__gt=dernier).order_by('pk')
+                        .values_list('pk', *source.champs)[:taille_lot]
+                    )
+                    if not lot:
+                        break
+                    total += self._ecrire(source, {ligne[0]: source.contenu(ligne[1:]) for ligne in lot})
+                    dernier = lot[-1][0]
+
+                orphelins = DocumentRecherche.objects.filter(modele=source.label).exclude(
+                    objet_id__in=modele._base_manager.values('pk')
+                )
+                if moteur == 'trigrammes':
+                    anciens = TrigrammeRecherche.objects.filter(document__in=orphelins)
+                    anciens._raw_delete(anciens.db)
+                orphelins._raw_delete(orphelins.db)
+            resultats[source.label] = total
+
+        if moteur == 'fts5':
+            with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+                cursor.execute(f"INSERT INTO {TABLE_FTS}({TABLE_FTS}) VALUES ('rebuild')")
+        return resultats
+
+    def _indexer_dependances(self, modele, ids, modifies=None):
+        total = 0
+        for source, relation, champs in self._dependances.get(modele, ()):
+            if modifies is None or modifies & champs:
+                total += self._indexer_requete(
+                    source, source.modele._base_manager.filter(**{f'{relation}__in': ids})
+                )
+        return total
+
+    def _indexer_requete(self, source, queryset):
+        lignes = queryset.order_by().values_list('pk', *source.champs)
+        return self._ecrire(source, {ligne[0]: source.contenu(ligne[1:]) for ligne in lignes})
+
+    def _ecrire(self, source, contenus):
+        """Insère ou met à jour (une requête par lot) les documents ``{pk: contenu}``."""
+        if not contenus:
+            return 0
+        DocumentRecherche.objects.bulk_create(
+            [DocumentRecherche(modele=source.label, objet_id=pk, contenu=contenu) for pk, contenu in contenus.items()],
+            batch_size=self.TAILLE_LOT,
+            update_conflicts=True,
+            unique_fields=['modele', 'objet_id'],
+            update_fields=['contenu'],
+        )
+        if self.moteur() == 'trigrammes':
+            self._ecrire_trigrammes(source, contenus)
+        return len(contenus)
+
+    def _ecrire_trigrammes(self, source, contenus):
+        documents = dict(
+            DocumentRecherche.objects.filter(modele=source.label, objet_id__in=list(contenus))
+            .values_list('objet_id', 'id')
+        )
+        anciens = TrigrammeRecherche.objects.filter(document_id__in=documents.values())
+        anciens._raw_delete(anciens.db)
+        TrigrammeRecherche.objects.bulk_create(
+            [
+                TrigrammeRecherche(document_id=documents[pk], trigramme=trigramme)
+                for pk, contenu in contenus.items()
+                for trigramme in trigrammes(contenu)
+            ],
+            batch_size=self.TAILLE_LOT
+        )
+
+    #
+    # Recherche
+    #
+    def filtrer(self, queryset, terme, prefixe=False):
+        """
+        Restreint ``queryset`` aux objets dont le document contient chaque
+        mot de ``terme`` (au début d'un mot si ``prefixe``).
+        """
+        if not terme:
+            return queryset
+        mots = normaliser(terme).split()
+        if not mots:
+            return queryset.none()
+        return queryset.filter(pk__in=self._documents(queryset.model, mots, prefixe).values('objet_id'))
+
+    def rechercher(self, queryset, terme, limite=None, prefixe=False):
+        """
+        Objets de ``queryset`` correspondant à ``terme``, les plus pertinents
+        en premier (bm25 avec FTS5, position du premier mot sinon).
+
+        Returns:
+            list: Au plus ``limite`` objets
+        """
+        mots = normaliser(terme).split()
+        if not mots:
+            return []
+        documents = self._documents(queryset.model, mots, prefixe).filter(objet_id__in=queryset.values('pk'))
+        ids = self._classer(documents, mots, limite)
+        objets = queryset.in_bulk(ids)
+        return [objets[pk] for pk in ids if pk in objets]
+
+    def _documents(self, modele, mots, prefixe):
+        documents = DocumentRecherche.objects.filter(modele=self.source(modele).label)
+        longs = [mot for mot in mots if len(mot) >= 3]
+        fts = bool(longs) and self.moteur(documents.db) == 'fts5'
+
+        if fts:
+            documents = documents.filter(pk__in=RawSQL(
+                f"SELECT rowid FROM {TABLE_FTS} WHERE {TABLE_FTS} MATCH %s", [self._expression_fts(longs)]
+            ))
+        else:
+            for mot in longs:
+                attendus = trigrammes(mot)
+                documents = documents.filter(pk__in=TrigrammeRecherche.objects.filter(trigramme__in=attendus)
+                                             .values('document')
+                                             .annotate(nombre=Count('trigramme', distinct=True))
+                                             .filter(nombre=len(attendus))
+                                             .values('document'))
+
+        for mot in mots:
+            if prefixe:
+                documents = documents.filter(Q(contenu__startswith=mot) | Q(contenu__contains=f' {mot}'))
+            elif not (fts and mot in longs):
+                # Trigrammes présents ≠ sous-chaîne : vérifier
+                documents = documents.filter(contenu__contains=mot)
+        return documents
+
+    def _expression_fts(self, mots):
+        # Chaînes entre guillemets : sous-chaînes exactes, combinées par AND
+        return ' '.join('"{}"'.format(mot.replace('"', '""')) for mot in mots)
+
+    def _classer(self, documents, mots, limite):
+        longs = [mot for mot in mots if len(mot) >= 3]
+        if longs and self.moteur(documents.db) == 'fts5':
+            sql, params = documents.values('id').query.sql_with_params()
+            requete = (
+                f"SELECT d.objet_id FROM {TABLE_FTS} JOIN core_documentrecherche d ON d.id = {TABLE_FTS}.rowid "
+                f"WHERE {TABLE_FTS} MATCH %s AND d.id IN ({sql}) ORDER BY {TABLE_FTS}.rank, d.objet_id"
+            )
+            params = (self._expression_fts(longs), *params)
+            if limite is not None:
+                requete += " LIMIT %s"
+                params += (limite,)
+            with connections[documents.db].cursor() as cursor:
+                cursor.execute(requete, params)
+                return [ligne[0] for ligne in cursor.fetchall()]
+
+        ids = documents.annotate(
+            position=StrIndex('contenu', Value(mots[0])),
+            longueur=Length('contenu')
+        ).order_by('position', 'longueur', 'objet_id').values_list('objet_id', flat=True)
+        return list(ids[:limite] if limite is not None else ids)
+
+
+# Index partagé par les applications
+index_recherche = IndexRecherche()
+
+
+def installer_index_plein_texte(using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Receveur ``post_migrate`` : crée la table FTS5 (SQLite) et construit
+    l'index s'il est vide, par exemple à la migration d'une base existante
+    qui crée les documents : sans cela, aucune recherche n'aboutirait avant
+    un ``reconstruire_index_recherche``.
+    """
+    index_recherche.installer(using)
+    if using != DEFAULT_DB_ALIAS:
+        return
+
+    tables = connections[using].introspection.table_names()
+    if DocumentRecherche._meta.db_table not in tables or DocumentRecherche.objects.exists():
+        return
+    # Modèles dont la table existe déjà (migration partielle)
+    modeles = [modele for modele in index_recherche._sources if modele._meta.db_table in tables]
+    if modeles:
+        resultats = index_recherche.reconstruire(modeles)
+        if any(resultats.values()):
+            logger.info(f"Index de recherche construit : {resultats}")
@@ -0,0 +1,122 @@
+# apps/core/references.py
+"""
+Attribution des références (cotisations, paiements, événements) par séquences.
+
+Chaque famille de références (préfixe et période, par exemple ``COT`` et
+``202510``) a un compteur dans ``SequenceReference``. Un numéro n'est jamais
+attribué deux fois : le compteur est incrémenté par un UPDATE atomique qui
+verrouille la ligne jusqu'à la fin de la transaction. Aucune vérification
+d'existence n'est nécessaire.
+
+Pour éviter une écriture par référence, les numéros sont réservés par blocs
+(REFERENCES_TAILLE_BLOC) et le reste du bloc est conservé par le processus.
+Un bloc réservé dans une transaction n'est conservé qu'après sa validation :
+en cas d'annulation, l'incrément du compteur est annulé avec elle. Les
+numéros sont donc uniques mais pas consécutifs entre processus, et ceux d'un
+bloc non consommé (redémarrage) sont perdus.
+"""
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import SequenceReference
+
+
+class AllocateurReferences:
+    """
+    Réserve des numéros de séquence et construit les références.
+
+    Args:
+        taille_bloc (int): Nombre de numéros réservés par écriture en base
+            (REFERENCES_TAILLE_BLOC par défaut)
+    """
+
+    def __init__(self, taille_bloc=None):
+        self._taille_bloc = taille_bloc
+        self._blocs = {}
+        self._verrou = threading.Lock()
+
+    @property
+    def taille_bloc(self):
+        return max(1, self._taille_bloc or getattr(settings, 'REFERENCES_TAILLE_BLOC', 50))
+
+    def allouer(self, cle, nombre=1):
+        """
+        Attribue ``nombre`` numéros de la séquence ``cle``.
+
+        Returns:
+            list: Numéros attribués, croissants
+        """
+        numeros = []
+        with self._verrou:
+            bloc = self._blocs.get(cle)
+            if bloc is not None:
+                prochain, fin = bloc
+                pris = min(nombre, fin - prochain + 1)
+                numeros.extend(range(prochain, prochain + pris))
+                if prochain + pris > fin:
+                    del self._blocs[cle]
+                else:
+                    self._blocs[cle] = (prochain + pris, fin)
+
+        manquants = nombre - len(numeros)
+        if manquants:
+            # Réserver au moins un bloc : le surplus sert aux appels suivants
+            reserves = max(manquants, self.taille_bloc)
+            debut = self._reserver(cle, reserves)
+            numeros.extend(range(debut, debut + manquants))
+            if reserves > manquants:
+                reste = (debut + manquants, debut + reserves - 1)
+                transaction.on_commit(lambda: self._conserver(cle, reste))
+        return numeros
+
+    def references(self, prefixe, periode=None, nombre=1, chiffres=6):
+        """
+        Construit ``nombre`` références ``PREFIXE-PERIODE-NNNNNN``
+        (``PREFIXE-NNNNNN`` sans période).
+
+        Returns:
+            list: Références uniques
+        """
+        cle = f"{prefixe}-{periode}" if periode else prefixe
+        return [f"{cle}-{numero:0{chiffres}d}" for numero in self.allouer(cle, nombre)]
+
+    def vider(self):
+        """Oublie les blocs conservés par le processus."""
+        with self._verrou:
+            self._blocs.clear()
+
+    def _reserver(self, cle, nombre):
+        """Incrémente le compteur de ``cle`` ; retourne le premier numéro réservé."""
+        with transaction.atomic():
+            if not SequenceReference.objects.filter(cle=cle).update(valeur=F('valeur') + nombre):
+                try:
+                    with transaction.atomic():
+                        SequenceReference.objects.create(cle=cle, valeur=nombre)
+                    return 1
+                except IntegrityError:
+                    # Séquence créée entre-temps par un autre processus
+                    SequenceReference.objects.filter(cle=cle).update(valeur=F('valeur') + nombre)
+            valeur = SequenceReference.objects.filter(cle=cle).values_list('valeur', flat=True).get()
+        return valeur - nombre + 1
+
+    def _conserver(self, cle, bloc):
+        with self._verrou:
+            # Un bloc déjà conservé pour la clé est abandonné (numéros perdus)
+            self._blocs[cle] = bloc
+
+
+# Allocateur partagé par les modèles du processus
+allocateur_references = AllocateurReferences()
+
+
+def generer_references(prefixe, periode=None, nombre=1):
+    """Attribue ``nombre`` références de la famille ``prefixe``/``periode``."""
+    return allocateur_references.references(prefixe, periode, nombre)
+
+
+def generer_reference(prefixe, periode=None):
+    """Attribue une référence de la famille ``prefixe``/``periode``."""
+    return generer_references(prefixe, periode)[0]
@@ -0,0 +1,235 @@
+# apps/core/rendu.py
+"""
+Rendu des notifications à partir de templates compilés.
+
+Les templates des notifications sont compilés une fois puis conservés par
+nom. En DEBUG, un template dont le fichier a changé est recompilé : les
+workers Celery ne bénéficient pas du rechargement automatique de runserver.
+
+Un rendu est préparé une fois par envoi avec le contexte commun à tous les
+destinataires (événement, URLs...). Lorsque les variables propres à chaque
+destinataire n'apparaissent dans les templates que sous la forme
+``{{ variable }}``, le corps est pré-rendu une fois avec des marqueurs et
+chaque message n'est plus qu'une substitution de chaînes ; sinon, les
+variables du destinataire sont empilées sur le contexte commun avant un rendu
+complet. Les durées de rendu sont cumulées par template (voir
+``CacheTemplates.statistiques``).
+"""
+import os
+import re
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.template import Context, TemplateDoesNotExist, engines
+from django.template.base import Variable, VariableNode, render_value_in_context
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.utils.html import strip_tags
+
+
+class CacheTemplates:
+    """
+    Templates compilés, indexés par nom.
+
+    Args:
+        verifier_modifications (bool): Recompiler les templates modifiés sur
+            disque (par défaut en DEBUG uniquement)
+    """
+
+    def __init__(self, verifier_modifications=None):
+        self._verifier_modifications = verifier_modifications
+        self._templates = {}
+        self._statistiques = {}
+        self._verrou = threading.Lock()
+
+    @property
+    def verifier_modifications(self):
+        if self._verifier_modifications is None:
+            return settings.DEBUG
+        return self._verifier_modifications
+
+    def get(self, nom, optionnel=False):
+        """
+        Retourne le template compilé ``nom``.
+
+        Args:
+            nom (str): Nom du template
+            optionnel (bool): Retourner None plutôt que lever
+                TemplateDoesNotExist si le template n'existe pas
+        """
+        entree = self._templates.get(nom)
+        if entree is None or (self.verifier_modifications and self._est_modifie(entree)):
+            with self._verrou:
+                entree = self._compiler(nom, recharger=entree is not None)
+
+        template = entree[0]
+        if template is None and not optionnel:
+            raise TemplateDoesNotExist(nom)
+        return template
+
+    def enregistrer_rendu(self, nom, duree):
+        """Cumule la durée d'un rendu du template ``nom``."""
+        with self._verrou:
+            statistiques = self._statistiques_de(nom)
+            statistiques['rendus'] += 1
+            statistiques['duree'] += duree
+
+    def statistiques(self):
+        """
+        Compilations, rendus et durées de rendu par template.
+
+        Returns:
+            dict: ``{nom: {'compilations', 'rendus', 'duree', 'duree_moyenne_ms'}}``
+        """
+        with self._verrou:
+            return {
+                nom: {
+                    **valeurs,
+                    'duree_moyenne_ms': round(valeurs['duree'] * 1000 / valeurs['rendus'], 3)
+                    if valeurs['rendus'] else 0.0,
+                }
+                for nom, valeurs in self._statistiques.items()
+            }
+
+    def vider(self):
+        with self._verrou:
+            self._templates.clear()
+            self._statistiques.clear()
+
+    def _compiler(self, nom, recharger=False):
+        moteur = engines['django'].engine
+        if recharger:
+            # Les loaders « cached » de Django conservent l'ancienne version
+            for loader in moteur.template_loaders:
+                if hasattr(loader, 'reset'):
+                    loader.reset()
+
+        try:
+            template = moteur.get_template(nom)
+        except TemplateDoesNotExist:
+            entree = (None, None, None)
+        else:
+            chemin = template.origin.name
+            entree = (template, chemin, self._date_modification(chemin))
+            self._statistiques_de(nom)['compilations'] += 1
+
+        self._templates[nom] = entree
+        return entree
+
+    def _est_modifie(self, entree):
+        template, chemin, date_modification = entree
+        if template is None:
+            # Un template absent est recherché à nouveau : il a pu être créé
+            return True
+        return self._date_modification(chemin) != date_modification
+
+    def _statistiques_de(self, nom):
+        return self._statistiques.setdefault(nom, {'compilations': 0, 'rendus': 0, 'duree': 0.0})
+
+    @staticmethod
+    def _date_modification(chemin):
+        try:
+            return os.path.getmtime(chemin)
+        except (OSError, TypeError):
+            return None
+
+
+# Cache partagé par les notifications du processus
+templates_notifications = CacheTemplates()
+
+
+class RenduPrepare:
+    """
+    Rendu d'une notification (HTML et texte) préparé pour un contexte commun.
+
+    Sans template texte, la version texte est le HTML débarrassé de ses balises.
+
+    Args:
+        template_html (str): Nom du template HTML
+        contexte_commun (dict): Contexte partagé par tous les destinataires
+        template_texte (str): Nom du template texte (facultatif)
+        variables (iterable): Noms des variables propres à chaque destinataire,
+            permettant le pré-rendu des corps
+        cache (CacheTemplates): Cache des templates compilés
+    """
+
+    def __init__(self, template_html, contexte_commun, template_texte=None, variables=(), cache=None):
+        self.cache = cache or templates_notifications
+        self.nom = template_html
+        self.html = self.cache.get(template_html)
+        self.texte = self.cache.get(template_texte, optionnel=True) if template_texte else None
+        self.variables = frozenset(variables)
+        self._contexte = Context(contexte_commun)
+        self._prerendu = None
+
+        templates = [template for template in (self.html, self.texte) if template is not None]
+        if self.variables and all(self._substituable(template) for template in templates):
+            self._prerendu = self._prerendre()
+
+    @property
+    def prerendu(self):
+        """Indique si les corps sont pré-rendus (substitution seule par destinataire)."""
+        return self._prerendu is not None
+
+    def rendre(self, **variables):
+        """
+        Rend la notification pour un destinataire.
+
+        Args:
+            **variables: Variables propres au destinataire
+
+        Returns:
+            tuple: (contenu HTML, contenu texte)
+        """
+        debut = time.perf_counter()
+        if self._prerendu is not None and variables.keys() == self.variables:
+            valeurs = {
+                nom: render_value_in_context(valeur, self._contexte)
+                for nom, valeur in variables.items()
+            }
+            html_content, text_content = (
+                ''.join(valeurs[partie] if i % 2 else partie for i, partie in enumerate(parties))
+                for parties in self._prerendu
+            )
+        else:
+            with self._contexte.push(variables):
+                html_content = self.html.render(self._contexte)
+                text_content = self.texte.render(self._contexte) if self.texte else strip_tags(html_content)
+        self.cache.enregistrer_rendu(self.nom, time.perf_counter() - debut)
+        return html_content, text_content
+
+    def _substituable(self, template):
+        """
+        Le template n'utilise les variables du destinataire que sous la forme
+        ``{{ variable }}`` (sans filtre, ni balise, ni héritage ou inclusion).
+        """
+        if template.nodelist.get_nodes_by_type((ExtendsNode, IncludeNode)):
+            return False
+
+        simples = 0
+        for noeud in template.nodelist.get_nodes_by_type(VariableNode):
+            expression = noeud.filter_expression
+            if (not expression.filters and isinstance(expression.var, Variable)
+                    and expression.var.lookups is not None
+                    and len(expression.var.lookups) == 1
+                    and expression.var.lookups[0] in self.variables):
+                simples += 1
+
+        occurrences = len(re.findall(
+            r'\b(?:%s)\b' % '|'.join(re.escape(nom) for nom in self.variables),
+            template.source
+        ))
+        return occurrences == simples
+
+    def _prerendre(self):
+        """Rend les corps une fois avec des marqueurs à la place des variables du destinataire."""
+        jeton = uuid.uuid4().hex
+        marqueurs = {nom: f'@@{jeton}:{nom}@@' for nom in self.variables}
+        with self._contexte.push(marqueurs):
+            html_content = self.html.render(self._contexte)
+            text_content = self.texte.render(self._contexte) if self.texte else strip_tags(html_content)
+
+        # Les parties d'indice impair sont les noms des variables à substituer
+        separateur = re.compile(f'@@{jeton}:(%s)@@' % '|'.join(re.escape(nom) for nom in self.variables))
+        return separateur.split(html_content), separateur.split(text_content)
@@ -2,10 +2,10 @@
 
 import logging
 from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
 from django.conf import settings
 
+from .rendu import RenduPrepare
+
 logger = logging.getLogger(__name__)
 
 class EmailService:
@@ -37,11 +37,9 @@ class EmailService:
             if isinstance(to_email, str):
                 to_email = [to_email]
                 
-            # Générer le contenu HTML à partir du template
-            html_content = render_to_string(f"{template_name}.html", context)
-            
-            # Créer une version texte à partir du HTML
-            text_content = strip_tags(html_content)
+            # Générer le contenu HTML à partir du template compilé, et une
+            # version texte à partir du HTML
+            html_content, text_content = RenduPrepare(f"{template_name}.html", context).rendre()
             
             # Créer l'email
             msg = EmailMultiAlternatives(subject, text_content, from_email, to_email)
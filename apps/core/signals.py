@@ -3,6 +3,8 @@ from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 import logging
 
+from .audit import journal_courant
+
 logger = logging.getLogger('django')
 
 @receiver(post_save)
@@ -14,10 +16,14 @@ def log_model_save(sender, instance, created, **kwargs):
     if sender._meta.app_label in ('auth', 'admin', 'sessions', 'contenttypes'):
         return
     
-    # Log l'événement
+    # Log l'événement (résumé par modèle en écriture différée)
     action = 'créé' if created else 'modifié'
     model_name = sender._meta.verbose_name
-    logger.info(f"{model_name} {instance} {action}")
+    journal = journal_courant()
+    if journal is not None:
+        journal.compter(model_name, action)
+    elif logger.isEnabledFor(logging.INFO):
+        logger.info(f"{model_name} {instance} {action}")
 
 @receiver(post_delete)
 def log_model_delete(sender, instance, **kwargs):
@@ -28,6 +34,10 @@ def log_model_delete(sender, instance, **kwargs):
     if sender._meta.app_label in ('auth', 'admin', 'sessions', 'contenttypes'):
         return
     
-    # Log l'événement
+    # Log l'événement (résumé par modèle en écriture différée)
     model_name = sender._meta.verbose_name
-    logger.info(f"{model_name} {instance} supprimé")
\ No newline at end of file
+    journal = journal_courant()
+    if journal is not None:
+        journal.compter(model_name, 'supprimé')
+    elif logger.isEnabledFor(logging.INFO):
+        logger.info(f"{model_name} {instance} supprimé")
\ No newline at end of file
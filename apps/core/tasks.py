@@ -35,4 +35,41 @@ def purge_deleted_items(days=90):
         
         results[model_path] = count
     
-    return results
\ No newline at end of file
+    return results
+
+
+@shared_task
+def generer_export_task(tache_id):
+    """
+    Génère le fichier d'une tâche d'export en arrière-plan.
+    """
+    from .exports import executer_export
+    from .models import TacheExport
+
+    tache = TacheExport.objects.filter(pk=tache_id).first()
+    if tache is None or tache.statut != TacheExport.STATUT_EN_ATTENTE:
+        return None
+    return executer_export(tache).statut
+
+
+@shared_task
+def nettoyer_exports_expires_task():
+    """
+    Supprime les fichiers des exports dont la date d'expiration est passée.
+    """
+    from .exports import nettoyer_exports_expires
+
+    return nettoyer_exports_expires()
+
+
+@shared_task
+def ecrire_journal_audit_task(donnees):
+    """
+    Écrit les entrées d'audit confiées par le mode d'écriture asynchrone
+    (apps.core.audit), sérialisées au format JSON de Django.
+    """
+    from django.core import serializers
+    from .audit import ecrire_objets
+
+    objets = [objet.object for objet in serializers.deserialize('json', donnees)]
+    return ecrire_objets(objets)
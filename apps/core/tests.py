@@ -4,14 +4,16 @@ from django.utils import timezone
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.auth import get_user_model
 from datetime import timedelta
-from .models import Statut
+from .models import SequenceReference, Statut
 from .views import HomeView, DashboardView
 from .middleware import RequestLogMiddleware, MaintenanceModeMiddleware
 from .utils import get_unique_slug, get_file_path
 from django.conf import settings
+import io
 import os
 from unittest.mock import patch
 from django.http import HttpResponse
+from django.template import Context
 from apps.core.models import Statut
 
 class BaseModelTest(TestCase):
@@ -349,4 +351,715 @@ class StatutFilterTests(TestCase):
         statuts = Statut.pour_cotisations()
         self.assertTrue(statuts.filter(nom="Statut global").exists())
         self.assertTrue(statuts.filter(nom="Statut cotisation").exists())
-        self.assertFalse(statuts.filter(nom="Statut membre").exists())
\ No newline at end of file
+        self.assertFalse(statuts.filter(nom="Statut membre").exists())
+
+class TacheExportTest(TestCase):
+    """
+    Tests des exports exécutés en arrière-plan.
+    """
+    def setUp(self):
+        import tempfile
+        from decimal import Decimal
+        from apps.membres.models import Membre
+        from apps.cotisations.models import Cotisation
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(__import__('shutil').rmtree, media_root, ignore_errors=True)
+        reglages = self.settings(MEDIA_ROOT=media_root)
+        reglages.enable()
+        self.addCleanup(reglages.disable)
+
+        self.user = get_user_model().objects.create_user(
+            username='staff', email='staff@example.com', password='password', is_staff=True
+        )
+        self.client.force_login(self.user)
+
+        membre = Membre.objects.create(nom='Durand', prenom='Anne', email='anne.durand@example.com')
+        aujourd_hui = timezone.now().date()
+        for i in range(3):
+            Cotisation.objects.create(
+                membre=membre,
+                montant=Decimal('20.00'),
+                montant_restant=Decimal('20.00'),
+                date_emission=aujourd_hui,
+                date_echeance=aujourd_hui + timedelta(days=30),
+                periode_debut=aujourd_hui,
+                annee=aujourd_hui.year,
+                mois=aujourd_hui.month,
+                reference=f'COT-EXPORT-{i}'
+            )
+
+    def _lancer(self, url):
+        from apps.core.tasks import generer_export_task
+
+        with patch('apps.core.tasks.generer_export_task.delay', side_effect=generer_export_task):
+            with self.captureOnCommitCallbacks(execute=True):
+                return self.client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    def test_export_en_arriere_plan(self):
+        from apps.core.models import TacheExport
+
+        response = self._lancer(reverse('cotisations:export') + '?format=csv&arriere_plan=1')
+        self.assertEqual(response.status_code, 202)
+
+        tache = TacheExport.objects.get(pk=response.json()['id'])
+        self.assertEqual(tache.statut, TacheExport.STATUT_TERMINEE)
+        self.assertEqual((tache.progression, tache.lignes_traitees, tache.lignes_total), (100, 3, 3))
+        self.assertTrue(tache.nom_fichier.startswith('cotisations_'))
+        # Fichier stocké sous un nom aléatoire, distinct du nom de téléchargement
+        self.assertNotIn(tache.nom_fichier, tache.fichier.name)
+        self.assertTrue(tache.fichier.name.endswith('.csv'))
+        self.assertIsNotNone(tache.date_expiration)
+
+        statut = self.client.get(response.json()['url_statut'], {'format': 'json'}).json()
+        self.assertTrue(statut['termine'])
+
+        fichier = self.client.get(statut['url_telechargement'])
+        self.assertIn(tache.nom_fichier, fichier['Content-Disposition'])
+        contenu = b''.join(fichier.streaming_content).decode('utf-8')
+        self.assertIn('COT-EXPORT-2', contenu)
+
+    def test_export_synchrone_par_defaut(self):
+        response = self.client.get(reverse('cotisations:export') + '?format=csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+    def test_tache_reservee_a_son_auteur(self):
+        response = self._lancer(reverse('cotisations:export') + '?format=excel&arriere_plan=1')
+        from django.http import Http404
+        from .views import ExportStatutView
+
+        request = RequestFactory().get(response.json()['url_statut'])
+        request.user = get_user_model().objects.create_user(
+            username='autre', email='autre@example.com', password='password', is_staff=True
+        )
+        with self.assertRaises(Http404):
+            ExportStatutView.as_view()(request, pk=response.json()['id'])
+
+    def test_nettoyage_des_exports_expires(self):
+        from apps.core.exports import nettoyer_exports_expires
+        from apps.core.models import TacheExport
+
+        response = self._lancer(reverse('cotisations:export') + '?format=csv&arriere_plan=1')
+        tache = TacheExport.objects.get(pk=response.json()['id'])
+        chemin = tache.fichier.path
+        TacheExport.objects.filter(pk=tache.pk).update(date_expiration=timezone.now() - timedelta(minutes=1))
+
+        self.assertEqual(nettoyer_exports_expires(), 1)
+        tache.refresh_from_db()
+        self.assertEqual(tache.statut, TacheExport.STATUT_EXPIREE)
+        self.assertFalse(os.path.exists(chemin))
+        self.assertEqual(
+            self.client.get(reverse('core:export_telecharger', args=[tache.pk])).status_code, 410
+        )
+
+    def test_echec_du_generateur(self):
+        from apps.core.exports import executer_export
+        from apps.core.models import TacheExport
+
+        tache = TacheExport.objects.create(
+            utilisateur=self.user, generateur='apps.cotisations.views.inexistant', format_export='csv'
+        )
+        executer_export(tache)
+        self.assertEqual(tache.statut, TacheExport.STATUT_ECHOUEE)
+        self.assertTrue(tache.message_erreur)
+
+
+class EnvoiEmailsGroupeTest(TestCase):
+    """
+    Tests pour l'envoi groupé des emails d'événements.
+    """
+    
+    def setUp(self):
+        from types import SimpleNamespace
+        
+        evenement = SimpleNamespace(pk=1, titre="Assemblée générale", date_debut=timezone.now(), lieu="Salle A")
+        self.context = {'evenement': evenement, 'url_evenement': 'http://testserver/evenements/1/'}
+        self.destinataires = [
+            {
+                'recipient_email': f'membre{i}@example.com',
+                'recipient_name': f'Membre {i}',
+                'template_name': 'rappel_evenement',
+                'context': self.context,
+                'subject': "Rappel : Assemblée générale",
+            }
+            for i in range(5)
+        ]
+    
+    def test_templates_compiles_une_fois_et_connexion_par_lot(self):
+        from django.core import mail
+        from django.core.mail import get_connection
+        from .notifications import EnvoiEmailsGroupe
+        from .rendu import templates_notifications
+        
+        templates_notifications.vider()
+        connection = get_connection()
+        with patch.object(connection, 'open', wraps=connection.open) as ouvrir:
+            envoyes, echecs = EnvoiEmailsGroupe(taille_lot=2, connection=connection).envoyer(self.destinataires)
+        
+        self.assertEqual((envoyes, echecs), (5, []))
+        statistiques = templates_notifications.statistiques()['emails/evenements/rappel_evenement.html']
+        self.assertEqual((statistiques['compilations'], statistiques['rendus']), (1, 5))
+        self.assertEqual(ouvrir.call_count, 3)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertIn("Membre 3", mail.outbox[3].body)
+        self.assertEqual(mail.outbox[3].alternatives[0][1], "text/html")
+    
+    def test_seuls_les_echecs_sont_rejoues(self):
+        from django.core import mail
+        from django.core.mail.backends.locmem import EmailBackend
+        from .notifications import send_event_emails_batch
+        
+        class BackendInstable(EmailBackend):
+            def send_messages(self, messages):
+                if messages[0].to == ['membre2@example.com']:
+                    raise ConnectionResetError("connexion interrompue")
+                return super().send_messages(messages)
+        
+        recipients = [
+            {'recipient_email': d['recipient_email'], 'recipient_name': d['recipient_name']}
+            for d in self.destinataires
+        ]
+        with patch('apps.core.notifications.get_connection', return_value=BackendInstable()), \
+                patch.object(send_event_emails_batch, 'retry', side_effect=RuntimeError("retry")) as retry:
+            with self.assertRaisesMessage(RuntimeError, "retry"):
+                send_event_emails_batch(recipients, 'rappel_evenement', self.context, "Rappel")
+        
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(
+            retry.call_args.kwargs['kwargs']['recipients'],
+            [{'recipient_email': 'membre2@example.com', 'recipient_name': 'Membre 2'}]
+        )
+
+
+class CacheTemplatesTest(TestCase):
+    """
+    Tests pour le cache des templates compilés des notifications.
+    """
+    
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        
+        self.dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dossier.cleanup)
+        self.chemin = os.path.join(self.dossier.name, 'notification.html')
+        self._ecrire("<p>Bonjour {{ recipient_name }}, {{ evenement }}</p>", 1000)
+        
+        reglages = override_settings(TEMPLATES=[{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'DIRS': [self.dossier.name],
+        }])
+        reglages.enable()
+        self.addCleanup(reglages.disable)
+    
+    def _ecrire(self, contenu, date_modification):
+        with open(self.chemin, 'w') as fichier:
+            fichier.write(contenu)
+        os.utime(self.chemin, (date_modification, date_modification))
+    
+    def test_rendu_prepare_avec_variables_par_destinataire(self):
+        from .rendu import CacheTemplates, RenduPrepare
+        
+        cache = CacheTemplates(verifier_modifications=False)
+        rendu = RenduPrepare('notification.html', {'evenement': 'AG & repas'}, cache=cache)
+        
+        self.assertEqual(rendu.rendre(recipient_name='Anne')[0], "<p>Bonjour Anne, AG &amp; repas</p>")
+        html, texte = rendu.rendre(recipient_name='Paul')
+        self.assertEqual(texte, "Bonjour Paul, AG &amp; repas")
+        # Les variables d'un destinataire ne restent pas dans le contexte commun
+        self.assertEqual(rendu.rendre()[0], "<p>Bonjour , AG &amp; repas</p>")
+        
+        statistiques = cache.statistiques()['notification.html']
+        self.assertEqual((statistiques['compilations'], statistiques['rendus']), (1, 3))
+        self.assertGreater(statistiques['duree'], 0)
+    
+    def test_recompilation_si_le_fichier_change(self):
+        from .rendu import CacheTemplates
+        
+        cache = CacheTemplates(verifier_modifications=True)
+        premier = cache.get('notification.html')
+        self.assertIs(cache.get('notification.html'), premier)
+        
+        self._ecrire("<p>Nouvelle version</p>", 2000)
+        self.assertEqual(cache.get('notification.html').render(Context()), "<p>Nouvelle version</p>")
+        self.assertEqual(cache.statistiques()['notification.html']['compilations'], 2)
+        
+        self.assertIsNone(cache.get('absent.txt', optionnel=True))
+    
+    def test_pre_rendu_identique_au_rendu_complet(self):
+        from .rendu import CacheTemplates, RenduPrepare
+        
+        cache = CacheTemplates(verifier_modifications=False)
+        variables = ('recipient_name',)
+        prerendu = RenduPrepare('notification.html', {'evenement': 'AG'}, variables=variables, cache=cache)
+        complet = RenduPrepare('notification.html', {'evenement': 'AG'}, cache=cache)
+        
+        self.assertTrue(prerendu.prerendu)
+        self.assertEqual(prerendu.rendre(recipient_name='<Anne>'), complet.rendre(recipient_name='<Anne>'))
+        self.assertEqual(prerendu.rendre(recipient_name='<Anne>')[0], "<p>Bonjour &lt;Anne&gt;, AG</p>")
+    
+    def test_rendu_complet_si_la_variable_est_utilisee_dans_une_balise(self):
+        from .rendu import CacheTemplates, RenduPrepare
+        
+        self._ecrire("{% if recipient_name %}Bonjour {{ recipient_name|upper }}{% endif %}", 3000)
+        rendu = RenduPrepare(
+            'notification.html', {}, variables=('recipient_name',),
+            cache=CacheTemplates(verifier_modifications=False)
+        )
+        
+        self.assertFalse(rendu.prerendu)
+        self.assertEqual(rendu.rendre(recipient_name='Anne')[0], "Bonjour ANNE")
+
+
+class JournalAuditTest(TestCase):
+    """
+    Tests pour l'écriture différée de la piste d'audit.
+    """
+    
+    def _creer_membres(self, nombre):
+        from apps.membres.models import Membre
+        
+        return [
+            Membre.objects.create(nom=f"Audit{i}", prenom="Test", email=f"audit{i}@example.com")
+            for i in range(nombre)
+        ]
+    
+    def test_historiques_ecrits_en_masse_a_la_validation(self):
+        from django.db import connection, transaction
+        from django.test.utils import CaptureQueriesContext
+        from apps.membres.models import HistoriqueMembre
+        from .audit import journal_differe
+        
+        with CaptureQueriesContext(connection) as ctx:
+            with self.captureOnCommitCallbacks(execute=True):
+                with journal_differe(), transaction.atomic():
+                    self._creer_membres(5)
+                    self.assertFalse(HistoriqueMembre.objects.exists())
+        
+        self.assertEqual(HistoriqueMembre.objects.filter(action='creation').count(), 5)
+        insertions = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "membres_historiquemembre"')]
+        self.assertEqual(len(insertions), 1)
+    
+    def test_historiques_abandonnes_si_la_transaction_est_annulee(self):
+        from django.db import transaction
+        from apps.membres.models import HistoriqueMembre
+        from .audit import _vider_journal, journal_differe
+        
+        with self.captureOnCommitCallbacks(execute=True) as rappels:
+            with journal_differe():
+                try:
+                    with transaction.atomic():
+                        self._creer_membres(2)
+                        raise ValueError("annulation")
+                except ValueError:
+                    pass
+                with transaction.atomic():
+                    self._creer_membres(1)
+        
+        # Un seul journal (les autres rappels invalident des caches)
+        self.assertEqual(sum(getattr(rappel, 'fonction', None) is _vider_journal for rappel in rappels), 1)
+        self.assertEqual(HistoriqueMembre.objects.count(), 1)
+    
+    def test_mode_asynchrone(self):
+        from django.db import transaction
+        from apps.membres.models import HistoriqueMembre
+        from .audit import journal_differe
+        from .tasks import ecrire_journal_audit_task
+        
+        with patch('apps.core.tasks.ecrire_journal_audit_task.delay', side_effect=ecrire_journal_audit_task) as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                with journal_differe(asynchrone=True), transaction.atomic():
+                    membres = self._creer_membres(3)
+        
+        self.assertEqual(delay.call_count, 1)
+        self.assertEqual(
+            set(HistoriqueMembre.objects.values_list('membre_id', flat=True)),
+            {membre.pk for membre in membres}
+        )
+    
+    def test_ecriture_immediate_hors_mode_differe(self):
+        from apps.membres.models import HistoriqueMembre
+        
+        self._creer_membres(1)
+        self.assertEqual(HistoriqueMembre.objects.count(), 1)
+    
+    def test_rappel_unique_par_transaction(self):
+        from django.db import transaction
+        from .utils import une_fois_apres_commit
+        
+        appels = []
+        rappel = lambda: appels.append(1)
+        with self.captureOnCommitCallbacks(execute=True) as rappels:
+            try:
+                with transaction.atomic():
+                    self.assertTrue(une_fois_apres_commit(rappel))
+                    raise ValueError("annulation")
+            except ValueError:
+                pass
+            # Abandonné avec le point de sauvegarde : programmé de nouveau
+            self.assertTrue(une_fois_apres_commit(rappel))
+            self.assertFalse(une_fois_apres_commit(rappel))
+        
+        self.assertEqual(len(rappels), 1)
+        self.assertEqual(appels, [1])
+
+
+class AllocateurReferencesTest(TestCase):
+    """
+    Tests pour l'attribution des références par séquences.
+    """
+    
+    def test_references_uniques_et_croissantes(self):
+        from .references import AllocateurReferences
+        
+        allocateur = AllocateurReferences(taille_bloc=1)
+        references = allocateur.references('COT', '202510', nombre=3)
+        references += allocateur.references('COT', '202510')
+        
+        self.assertEqual(references, [
+            'COT-202510-000001', 'COT-202510-000002', 'COT-202510-000003', 'COT-202510-000004'
+        ])
+        self.assertEqual(allocateur.references('EVT2025'), ['EVT2025-000001'])
+        self.assertEqual(SequenceReference.objects.get(cle='COT-202510').valeur, 4)
+    
+    def test_bloc_conserve_apres_validation(self):
+        from .references import AllocateurReferences
+        
+        allocateur = AllocateurReferences(taille_bloc=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(allocateur.allouer('PAI-20251017', 2), [1, 2])
+        
+        # Les numéros suivants viennent du bloc conservé, sans requête
+        with self.assertNumQueries(0):
+            self.assertEqual(allocateur.allouer('PAI-20251017', 8), list(range(3, 11)))
+        self.assertEqual(allocateur.allouer('PAI-20251017', 1), [11])
+        self.assertEqual(SequenceReference.objects.get(cle='PAI-20251017').valeur, 20)
+    
+    def test_bloc_abandonne_si_la_transaction_est_annulee(self):
+        from django.db import transaction
+        from .references import AllocateurReferences
+        
+        allocateur = AllocateurReferences(taille_bloc=10)
+        with self.captureOnCommitCallbacks(execute=True) as rappels:
+            try:
+                with transaction.atomic():
+                    allocateur.allouer('RMB-20251017', 1)
+                    raise ValueError("annulation")
+            except ValueError:
+                pass
+        
+        self.assertEqual(rappels, [])
+        self.assertEqual(allocateur.allouer('RMB-20251017', 1), [1])
+
+
+class IndexRechercheTest(TestCase):
+    """
+    Tests pour l'index de recherche plein texte.
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        from decimal import Decimal
+        from apps.cotisations.models import Cotisation
+        from apps.membres.models import Membre
+        
+        cls.helene = Membre.objects.create(
+            nom="Dupont", prenom="Hélène", email="helene.dupont@example.com", ville="Saint-Étienne"
+        )
+        cls.paul = Membre.objects.create(nom="Martin", prenom="Paul", email="paul.martin@example.org")
+        aujourd_hui = timezone.now().date()
+        cls.cotisation = Cotisation.objects.create(
+            membre=cls.helene,
+            montant=Decimal('50.00'),
+            date_echeance=aujourd_hui,
+            periode_debut=aujourd_hui,
+            periode_fin=aujourd_hui + timedelta(days=365),
+            commentaire="Règlement différé",
+        )
+    
+    def test_normalisation(self):
+        from .recherche import normaliser
+        
+        self.assertEqual(normaliser("  Hélène  DUPONT-Lefèvre "), "helene dupont lefevre")
+        self.assertEqual(normaliser("jean.dupont@Example.com"), "jean dupont example com")
+        self.assertEqual(normaliser(None), "")
+    
+    def _verifier_recherches(self):
+        from apps.cotisations.models import Cotisation
+        from apps.membres.models import Membre
+        from .recherche import index_recherche
+        
+        self.assertEqual(list(Membre.objects.recherche("HELENE")), [self.helene])
+        self.assertEqual(list(Membre.objects.recherche("étienne dup")), [self.helene])
+        self.assertEqual(set(Membre.objects.recherche("example")), {self.helene, self.paul})
+        self.assertEqual(list(Membre.objects.recherche("PA")), [self.paul])
+        self.assertFalse(Membre.objects.recherche("--").exists())
+        self.assertEqual(list(Cotisation.objects.recherche("differe")), [self.cotisation])
+        self.assertEqual(list(Cotisation.objects.recherche(self.cotisation.reference)), [self.cotisation])
+        
+        # Autocomplétion : début de mot uniquement, les plus pertinents d'abord
+        self.assertEqual(index_recherche.rechercher(Membre.objects.all(), "mar", prefixe=True), [self.paul])
+        self.assertEqual(index_recherche.rechercher(Membre.objects.all(), "artin", prefixe=True), [])
+        self.assertEqual(len(index_recherche.rechercher(Membre.objects.all(), "example", limite=1)), 1)
+        self.assertEqual(index_recherche.rechercher(Membre.objects.exclude(pk=self.paul.pk), "example"), [self.helene])
+        
+        # Le renommage d'un membre réindexe ses cotisations
+        self.helene.nom = "Durand"
+        self.helene.save()
+        self.assertEqual(list(Cotisation.objects.recherche("durand")), [self.cotisation])
+        
+        self.paul.delete_permanent()
+        self.assertFalse(Membre.objects.recherche("paul").exists())
+    
+    def test_moteur_fts5(self):
+        from .recherche import index_recherche
+        
+        self.assertEqual(index_recherche.moteur(), 'fts5')
+        self._verifier_recherches()
+    
+    def test_moteur_trigrammes(self):
+        from django.core.management import call_command
+        from django.test import override_settings
+        from .models import TrigrammeRecherche
+        
+        with override_settings(RECHERCHE_MOTEUR='trigrammes'):
+            call_command('reconstruire_index_recherche', stdout=io.StringIO())
+            self.assertTrue(TrigrammeRecherche.objects.filter(trigramme='hel').exists())
+            self._verifier_recherches()
+    
+    def test_reconstruction(self):
+        from django.core.management import call_command
+        from .models import DocumentRecherche
+        
+        DocumentRecherche.objects.filter(modele='membres.membre').update(contenu='')
+        DocumentRecherche.objects.create(modele='membres.membre', objet_id=0, contenu='orphelin')
+        
+        sortie = io.StringIO()
+        call_command('reconstruire_index_recherche', 'membres.Membre', stdout=sortie)
+        
+        self.assertIn("membres.membre : 2 documents", sortie.getvalue())
+        self.assertEqual(DocumentRecherche.objects.filter(modele='membres.membre').count(), 2)
+        self._verifier_recherches()
+    
+    def test_index_construit_apres_migration(self):
+        from .models import DocumentRecherche
+        from .recherche import installer_index_plein_texte
+        
+        # Base existante : documents absents à la création des tables de l'index
+        DocumentRecherche.objects.all().delete()
+        
+        installer_index_plein_texte()
+        
+        self.assertTrue(DocumentRecherche.objects.filter(modele='membres.membre').exists())
+        self._verifier_recherches()
+
+
+class CompteursCorbeilleTest(TestCase):
+    """
+    Tests pour les compteurs de la corbeille et la mesure des context processors.
+    """
+    
+    def setUp(self):
+        from django.core.cache import cache
+        from apps.membres.models import Membre
+        
+        cache.clear()
+        self.membres = [
+            Membre.objects.create(nom=f"Nom{i}", prenom="Prenom", email=f"corbeille{i}@example.com")
+            for i in range(3)
+        ]
+        self.staff = get_user_model().objects.create_user(
+            username='staff', email='staff@example.com', password='testpassword', is_staff=True
+        )
+    
+    def test_ajustements_sans_recalcul(self):
+        from apps.membres.models import Membre
+        from .corbeille import compteurs_corbeille
+        
+        with self.assertNumQueries(1):
+            self.assertEqual(compteurs_corbeille.compter(Membre), 0)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.membres[0].delete()
+            self.membres[1].delete()
+            self.membres[1].delete()  # déjà dans la corbeille : pas compté deux fois
+        with self.captureOnCommitCallbacks(execute=True):
+            self.membres[0].delete_permanent()
+        
+        with self.assertNumQueries(0):
+            self.assertEqual(compteurs_corbeille.compter(Membre), 1)
+        self.assertEqual(Membre.objects.only_deleted().count(), 1)
+        
+        # Transaction annulée : compteur inchangé
+        from django.db import transaction
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.membres[2].delete()
+                    raise ValueError("annulation")
+            except ValueError:
+                pass
+        self.assertEqual(compteurs_corbeille.compter(Membre), 1)
+    
+    def test_compteurs_differes(self):
+        from django.template import engines
+        from .context_processors import trash_counters
+        
+        request = RequestFactory().get('/')
+        request.user = self.staff
+        
+        with self.assertNumQueries(0):
+            contexte = trash_counters(request)
+        
+        self.membres[0].delete()
+        # Compteurs calculés au rendu seulement
+        gabarit = engines['django'].from_string("{% if membres_trash_count %}{{ trash_count }}{% endif %}")
+        with self.assertNumQueries(3):
+            self.assertEqual(gabarit.render(contexte), "1")
+    
+    def test_mesure_des_context_processors(self):
+        from django.template import engines
+        from django.test import override_settings
+        from .middleware import ContextProcessorsInstrumentationMiddleware
+        
+        moteur = engines['django'].engine
+        gabarit = engines['django'].from_string("{{ user.username }}")
+        
+        def vue(request):
+            return HttpResponse(gabarit.render({}, request))
+        
+        try:
+            with override_settings(CONTEXT_PROCESSORS_INSTRUMENTATION=True):
+                middleware = ContextProcessorsInstrumentationMiddleware(vue)
+            request = RequestFactory().get('/')
+            request.user = self.staff
+            response = middleware(request)
+        finally:
+            moteur.__dict__.pop('template_context_processors', None)
+        
+        mesures = request.mesures_context_processors
+        self.assertEqual(mesures['trash_counters']['requetes'], 0)
+        self.assertEqual(mesures['trash_counters']['appels'], 1)
+        self.assertIn('trash_counters', response['Server-Timing'])
+
+
+class ProfilageRequetesTest(TestCase):
+    """
+    Tests pour le profilage des requêtes et les budgets de requêtes des vues.
+    """
+    
+    def setUp(self):
+        from .profilage import historique_profilage
+        
+        historique_profilage.vider()
+        self.staff = get_user_model().objects.create_user(
+            username='staff', email='staff@example.com', password='testpassword', is_staff=True
+        )
+    
+    def _middleware(self, vue, **reglages):
+        from django.test import override_settings
+        from django.urls import ResolverMatch
+        from .middleware import ProfilageRequetesMiddleware
+        
+        reglages.setdefault('PROFILAGE_BUDGET_STRICT', False)
+        with override_settings(PROFILAGE_TAUX=1, **reglages):
+            middleware = ProfilageRequetesMiddleware(vue)
+        
+        def appeler(request):
+            request.resolver_match = ResolverMatch(vue, (), {}, url_name='vue_test')
+            return middleware(request)
+        return appeler
+    
+    def test_empreinte_sql(self):
+        from .profilage import empreinte_sql
+        
+        self.assertEqual(
+            empreinte_sql('SELECT *  FROM t WHERE a IN (%s, %s, %s) AND b = 12 AND c = \'x\''),
+            'SELECT * FROM t WHERE a IN (...) AND b = ? AND c = ?'
+        )
+    
+    def test_mesure_et_historique(self):
+        from django.core.cache import cache
+        from django.template import engines
+        from .profilage import historique_profilage
+        
+        gabarit = engines['django'].from_string("{{ nombre }}")
+        cache.set('profilage-present', 1)
+        
+        def vue(request):
+            cache.get('profilage-present')
+            cache.get('profilage-absent')
+            nombre = get_user_model().objects.count()
+            return HttpResponse(gabarit.render({'nombre': nombre}))
+        
+        self._middleware(vue)(RequestFactory().get('/mesure/'))
+        
+        mesure = historique_profilage.lister()[0]
+        self.assertEqual(mesure['chemin'], '/mesure/')
+        self.assertEqual(mesure['requetes'], 1)
+        self.assertIn('COUNT(*)', mesure['requete_plus_lente'])
+        self.assertEqual((mesure['cache_trouves'], mesure['cache_manques']), (1, 1))
+        self.assertGreater(mesure['duree_gabarits_ms'], 0)
+        self.assertIsNone(mesure['budget'])
+    
+    def test_budget_depasse(self):
+        from .profilage import BudgetRequetesDepasse, budget_requetes, historique_profilage
+        
+        @budget_requetes(1)
+        def vue(request):
+            get_user_model().objects.count()
+            get_user_model().objects.exists()
+            return HttpResponse()
+        
+        with self.assertLogs('apps.core.middleware', level='WARNING'):
+            self._middleware(vue)(RequestFactory().get('/'))
+        self.assertTrue(historique_profilage.lister()[0]['budget_depasse'])
+        
+        with self.assertRaises(BudgetRequetesDepasse):
+            self._middleware(vue, PROFILAGE_BUDGET_STRICT=True)(RequestFactory().get('/'))
+    
+    def test_page_profilage(self):
+        from django.test import override_settings
+        
+        url = reverse('core:profilage')
+        # Profilage désactivé par défaut : toutes les requêtes mesurées pour le test
+        with override_settings(PROFILAGE_TAUX=1):
+            self.client.force_login(get_user_model().objects.create_user(
+                username='membre', email='membre@example.com', password='testpassword'
+            ))
+            self.assertNotEqual(self.client.get(url).status_code, 200)
+            
+            self.client.force_login(self.staff)
+            self.client.get(url)
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'profilage')
+        self.assertEqual(response.context['mesures'][0]['chemin'], url)
+
+
+class BenchmarkAssociationTest(TestCase):
+    """Tests de la commande benchmark_association"""
+    
+    def test_mesure_et_annulation(self):
+        import json
+        import tempfile
+        from django.core.management import call_command
+        from apps.membres.models import Membre
+        from .benchmarks import SCENARIOS
+        
+        with tempfile.TemporaryDirectory() as dossier:
+            sortie = os.path.join(dossier, 'resultats.json')
+            call_command(
+                'benchmark_association', membres=20, annees=2, evenements=6, repetitions=1,
+                sortie=sortie, stdout=io.StringIO()
+            )
+            with open(sortie, encoding='utf-8') as f:
+                resultats = json.load(f)
+        
+        self.assertEqual(set(resultats['scenarios']), set(SCENARIOS))
+        for mesure in resultats['scenarios'].values():
+            self.assertNotIn('erreur', mesure)
+            self.assertGreater(mesure['requetes'], 0)
+        self.assertEqual(resultats['jeu_de_donnees']['volumes']['membre'], 20)
+        # Le jeu de données est annulé en fin de mesure
+        self.assertFalse(Membre.objects.filter(email__startswith='bench-').exists())
@@ -11,6 +11,9 @@ urlpatterns = [
     path('maintenance/', views.maintenance_view, name='maintenance'),
     path('', views.HomeView.as_view(), name='home'),  # Assurez-vous que cette URL est définie
     path('test-filters/', views.test_filters, name='test_filters'),
+    path('exports/<uuid:pk>/', views.ExportStatutView.as_view(), name='export_statut'),
+    path('exports/<uuid:pk>/telecharger/', views.ExportTelechargementView.as_view(), name='export_telecharger'),
+    path('profilage/', views.ProfilageRequetesView.as_view(), name='profilage'),
     # Pour le test uniquement
     #path('test-500/', lambda request: 1/0, name='test-500'),  # Division par zéro
 ]
\ No newline at end of file
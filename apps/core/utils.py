@@ -1,10 +1,15 @@
 # apps/core/utils.py
 import os
+import tempfile
+import threading
 import uuid
+import weakref
+from django.db import transaction
 from django.utils.text import slugify
 from django.utils import timezone
 from django.core.signing import TimestampSigner, BadSignature, SignatureExpired
 from django.conf import settings
+from django.http import FileResponse
 
 
 def get_file_path(instance, filename):
@@ -83,4 +88,127 @@ def verify_temp_password_token(token):
         user_id, password = parts
         return (int(user_id), password)
     except (BadSignature, SignatureExpired, ValueError):
-        return None
\ No newline at end of file
+        return None
+
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def streaming_excel_response(filename, titre_feuille, colonnes, lignes, autofiltre=True):
+    """
+    Génère un fichier Excel (XLSX) à mémoire constante et le renvoie en flux.
+
+    Le classeur est écrit par xlsxwriter en mode constant_memory dans un fichier
+    temporaire : chaque ligne est vidée sur disque dès que la suivante commence,
+    la mémoire utilisée ne dépend donc pas du nombre de lignes. Les lignes
+    doivent être fournies dans l'ordre (typiquement un itérateur sur values_list()).
+
+    Args:
+        filename: Nom du fichier attaché
+        titre_feuille: Titre de la feuille de calcul
+        colonnes: Liste de tuples (en-tête, largeur, format xlsxwriter ou None)
+        lignes: Itérable des lignes, une valeur par colonne (None = cellule vide)
+        autofiltre: Ajouter des filtres automatiques sur les en-têtes
+
+    Returns:
+        FileResponse: Réponse HTTP lisant le fichier temporaire par blocs
+    """
+    import xlsxwriter
+
+    fichier = tempfile.TemporaryFile(suffix='.xlsx', dir=getattr(settings, 'FILE_UPLOAD_TEMP_DIR', None))
+    workbook = xlsxwriter.Workbook(fichier, {
+        'constant_memory': True,
+        'in_memory': False,
+        'remove_timezone': True,
+        'tmpdir': getattr(settings, 'FILE_UPLOAD_TEMP_DIR', None),
+    })
+    worksheet = workbook.add_worksheet(str(titre_feuille))
+
+    header_format = workbook.add_format({
+        'bold': True,
+        'bg_color': '#F2F2F2',
+        'border': 1,
+        'align': 'center',
+        'valign': 'vcenter',
+        'text_wrap': True
+    })
+    formats = []
+    for col_num, (entete, largeur, cell_format) in enumerate(colonnes):
+        worksheet.set_column(col_num, col_num, largeur)
+        worksheet.write(0, col_num, str(entete), header_format)
+        formats.append(workbook.add_format(cell_format) if cell_format else None)
+
+    try:
+        # constant_memory impose une écriture ligne par ligne, dans l'ordre
+        row_num = 0
+        for row_num, ligne in enumerate(lignes, 1):
+            for col_num, valeur in enumerate(ligne):
+                if valeur is not None:
+                    worksheet.write(row_num, col_num, valeur, formats[col_num])
+
+        if autofiltre:
+            worksheet.autofilter(0, 0, row_num, len(colonnes) - 1)
+
+        workbook.close()
+    except Exception:
+        fichier.close()
+        raise
+
+    # Le fichier temporaire est supprimé à sa fermeture, en fin de réponse
+    fichier.seek(0)
+    return FileResponse(fichier, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+_rappels_en_attente = threading.local()
+
+
+class _RappelUnique:
+    """
+    Rappel ``on_commit`` programmé par ``une_fois_apres_commit``.
+
+    La transaction en détient la seule référence forte : s'il est abandonné
+    avec elle (annulation, y compris d'un point de sauvegarde), il disparaît
+    aussi du registre des rappels en attente.
+    """
+
+    __slots__ = ('cle', 'fonction', '__weakref__')
+
+    def __init__(self, cle, fonction):
+        self.cle = cle
+        self.fonction = fonction
+
+    def __call__(self):
+        # Retiré avant l'exécution : la fonction peut ouvrir une nouvelle transaction
+        _registre_rappels().pop(self.cle, None)
+        self.fonction()
+
+
+def _registre_rappels():
+    registre = getattr(_rappels_en_attente, 'registre', None)
+    if registre is None:
+        registre = _rappels_en_attente.registre = weakref.WeakValueDictionary()
+    return registre
+
+
+def une_fois_apres_commit(fonction, using=None):
+    """
+    Exécute ``fonction`` après validation de la transaction en cours, une seule
+    fois quel que soit le nombre d'appels dans la transaction. Hors transaction,
+    elle est exécutée immédiatement (comme ``transaction.on_commit``).
+
+    Returns:
+        bool: True si cet appel a programmé ``fonction``, False si elle l'était déjà
+    """
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        fonction()
+        return True
+
+    cle = (connection.alias, fonction)
+    registre = _registre_rappels()
+    if cle in registre:
+        return False
+    rappel = _RappelUnique(cle, fonction)
+    registre[cle] = rappel
+    transaction.on_commit(rappel, using=using, robust=False)
+    return True
@@ -1,15 +1,21 @@
 # apps/core/views.py
+from django.views import View
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import render
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.db.models import Count, Sum, Q, F, ExpressionWrapper, fields
 from decimal import Decimal
 import datetime
 import json
 import logging
+from django.conf import settings
 from django.urls import reverse
 from apps.evenements.models import Evenement, InscriptionEvenement, TypeEvenement
+from .mixins import StaffRequiredMixin
+from .models import TacheExport
 from datetime import timedelta
 
 logger = logging.getLogger(__name__)
@@ -25,6 +31,8 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     Vue du tableau de bord, accessible uniquement aux utilisateurs connectés.
     """
     template_name = 'core/dashboard.html'
+    # Indépendant du volume de données (apps.core.profilage)
+    budget_requetes = 30
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -482,4 +490,76 @@ def test_filters(request):
     context = {
         'current_date': timezone.now().date(),
     }
-    return render(request, 'core/test_filters.html', context)
\ No newline at end of file
+    return render(request, 'core/test_filters.html', context)
+
+class TacheExportMixin(LoginRequiredMixin):
+    """
+    Accès aux tâches d'export : chaque utilisateur ne voit que les siennes
+    (les superutilisateurs voient toutes les tâches).
+    """
+    def get_tache(self, pk):
+        taches = TacheExport.objects.all()
+        if not self.request.user.is_superuser:
+            taches = taches.filter(utilisateur=self.request.user)
+        return get_object_or_404(taches, pk=pk)
+
+
+class ExportStatutView(TacheExportMixin, View):
+    """
+    Suivi d'une tâche d'export : JSON pour le polling (?format=json ou AJAX),
+    page de suivi sinon.
+    """
+    def get(self, request, pk):
+        tache = self.get_tache(pk)
+        donnees = {
+            'id': str(tache.pk),
+            'statut': tache.statut,
+            'statut_libelle': str(tache.get_statut_display()),
+            'progression': tache.progression,
+            'lignes_traitees': tache.lignes_traitees,
+            'lignes_total': tache.lignes_total,
+            'termine': tache.est_terminee,
+            'message_erreur': tache.message_erreur,
+            'date_expiration': tache.date_expiration.isoformat() if tache.date_expiration else None,
+            'url_telechargement': (
+                reverse('core:export_telecharger', args=[tache.pk]) if tache.est_telechargeable else None
+            ),
+        }
+
+        if request.GET.get('format') == 'json' or request.headers.get('x-requested-with') == 'XMLHttpRequest':
+            return JsonResponse(donnees)
+        return render(request, 'core/export_statut.html', {'tache': tache, 'donnees': donnees})
+
+
+class ExportTelechargementView(TacheExportMixin, View):
+    """
+    Téléchargement du fichier produit par une tâche d'export.
+    """
+    def get(self, request, pk):
+        tache = self.get_tache(pk)
+        if tache.statut == TacheExport.STATUT_EXPIREE or (
+            tache.statut == TacheExport.STATUT_TERMINEE and not tache.est_telechargeable
+        ):
+            return HttpResponse(_("Ce fichier d'export a expiré."), status=410)
+        if not tache.est_telechargeable:
+            raise Http404(_("Le fichier d'export n'est pas disponible."))
+
+        return FileResponse(tache.fichier.open('rb'), as_attachment=True, filename=tache.nom_fichier)
+
+
+class ProfilageRequetesView(StaffRequiredMixin, TemplateView):
+    """
+    Dernières requêtes profilées par ce processus et synthèse par vue
+    (apps.core.middleware.ProfilageRequetesMiddleware).
+    """
+    template_name = 'core/profilage.html'
+    budget_requetes = 10
+
+    def get_context_data(self, **kwargs):
+        from .profilage import historique_profilage
+
+        context = super().get_context_data(**kwargs)
+        context['mesures'] = historique_profilage.lister()
+        context['vues'] = historique_profilage.par_vue()
+        context['taux'] = getattr(settings, 'PROFILAGE_TAUX', 0)
+        return context
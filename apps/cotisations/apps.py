@@ -8,6 +8,13 @@ class CotisationsConfig(AppConfig):
     verbose_name = _("Cotisations")
     
     def ready(self):
+        # Index de recherche plein texte (les champs du membre sont repris)
+        from apps.core.recherche import index_recherche
+        index_recherche.enregistrer(
+            self.get_model('Cotisation'),
+            ('reference', 'commentaire', 'membre__nom', 'membre__prenom', 'membre__email')
+        )
+        
         # Éviter de démarrer le scheduler pendant les commandes 'migrate' ou 'makemigrations'
         import sys
         if 'migrate' not in sys.argv and 'makemigrations' not in sys.argv:
@@ -4,15 +4,17 @@ import csv
 from datetime import timedelta
 from decimal import Decimal
 
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.db.models import Sum, F
 from django.template.loader import get_template
 from django.conf import settings
 
-# Pour Excel
-import xlsxwriter
+from apps.core.exports import suivre_progression
+from apps.core.utils import streaming_excel_response
+
+from .models import Cotisation, Paiement, Rappel
 
 # Pour PDF
 from reportlab.lib.pagesizes import letter, A4
@@ -21,260 +23,267 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch, cm
 
-def export_cotisations_csv(queryset):
+# Nombre de lignes lues par aller-retour en base lors des exports en flux
+EXPORT_CHUNK_SIZE = 2000
+
+# Nombre de lignes par tableau dans le rapport PDF des cotisations
+RAPPORT_PDF_LIGNES_PAR_TABLEAU = 500
+
+# Formats de cellules des exports Excel
+FORMAT_DATE = {'num_format': 'dd/mm/yyyy'}
+FORMAT_DATE_HEURE = {'num_format': 'dd/mm/yyyy hh:mm'}
+FORMAT_MONTANT = {'num_format': '# ##0.00 €'}
+
+
+class _Echo:
+    """
+    Pseudo-fichier pour csv.writer : retourne la ligne formatée au lieu de la
+    stocker, afin de l'envoyer directement dans le flux de la réponse.
+    """
+    def write(self, value):
+        return value
+
+
+def _libelles_choix(model, champ):
+    """Table valeur -> libellé des choix d'un champ (équivalent de get_FOO_display)."""
+    return {valeur: str(libelle) for valeur, libelle in model._meta.get_field(champ).flatchoices}
+
+
+def _reponse_csv_streaming(entetes, lignes, filename, **writer_kwargs):
+    """
+    Construit une réponse CSV envoyée au fil de l'eau.
+
+    Args:
+        entetes: Liste des en-têtes de colonnes
+        lignes: Itérable (idéalement un générateur) des lignes à écrire
+        filename: Nom du fichier attaché
+        **writer_kwargs: Options transmises à csv.writer (délimiteur...)
+
+    Returns:
+        StreamingHttpResponse: Réponse HTTP avec le fichier CSV attaché
+    """
+    writer = csv.writer(_Echo(), **writer_kwargs)
+
+    def contenu():
+        yield writer.writerow(entetes)
+        for ligne in lignes:
+            yield writer.writerow(ligne)
+
+    response = StreamingHttpResponse(contenu(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def export_cotisations_csv(queryset, progression=None):
     """
     Exporte une liste de cotisations au format CSV.
 
+    Les lignes sont lues par paquets via values_list() (membre et type de
+    membre joints dans la même requête) et envoyées au fil de l'eau : la
+    mémoire utilisée ne dépend pas du nombre de cotisations.
+
     Args:
         queryset: QuerySet de cotisations à exporter
+        progression: Suivi de progression d'un export en arrière-plan (optionnel)
 
     Returns:
-        HttpResponse: Réponse HTTP avec le fichier CSV attaché
+        StreamingHttpResponse: Réponse HTTP avec le fichier CSV attaché
     """
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="cotisations_{timezone.now().strftime("%Y%m%d")}.csv"'
-    
-    writer = csv.writer(response)
-    
-    # En-tête - CORRECTION: Chaque en-tête doit être un élément distinct
-    writer.writerow([
-        str(_('Référence')), 
-        str(_('Membre')), 
-        str(_('Courriel')), 
-        str(_('Montant')),
-        str(_('Montant restant')), 
-        str(_('Date émission')), 
-        str(_('Date échéance')),
-        str(_('Statut paiement')), 
-        str(_('Type de membre'))
-    ])
-    
-    # Données
-    for cotisation in queryset:
-        writer.writerow([
-            cotisation.reference,
-            f"{cotisation.membre.prenom} {cotisation.membre.nom}",
-            cotisation.membre.email,
-            cotisation.montant,
-            cotisation.montant_restant,
-            cotisation.date_emission,
-            cotisation.date_echeance,
-            cotisation.get_statut_paiement_display(),
-            cotisation.type_membre.libelle if cotisation.type_membre else ''
-        ])
-    
-    return response
+    statuts = _libelles_choix(Cotisation, 'statut_paiement')
+
+    def lignes():
+        valeurs = queryset.values_list(
+            'reference', 'membre__prenom', 'membre__nom', 'membre__email',
+            'montant', 'montant_restant', 'date_emission', 'date_echeance',
+            'statut_paiement', 'type_membre__libelle'
+        )
+        lignes_valeurs = suivre_progression(valeurs.iterator(chunk_size=EXPORT_CHUNK_SIZE), progression, queryset)
+        for (reference, prenom, nom, email, montant, montant_restant,
+             date_emission, date_echeance, statut, type_membre) in lignes_valeurs:
+            yield [
+                reference,
+                f"{prenom} {nom}",
+                email,
+                montant,
+                montant_restant,
+                date_emission,
+                date_echeance,
+                statuts.get(statut, statut),
+                type_membre or ''
+            ]
+
+    return _reponse_csv_streaming(
+        [
+            str(_('Référence')),
+            str(_('Membre')),
+            str(_('Courriel')),
+            str(_('Montant')),
+            str(_('Montant restant')),
+            str(_('Date émission')),
+            str(_('Date échéance')),
+            str(_('Statut paiement')),
+            str(_('Type de membre'))
+        ],
+        lignes(),
+        f'cotisations_{timezone.now().strftime("%Y%m%d")}.csv'
+    )
 
-def export_cotisations_excel(queryset):
+def export_cotisations_excel(queryset, progression=None):
     """
     Exporte une liste de cotisations au format Excel (XLSX).
 
+    Le classeur est écrit à mémoire constante dans un fichier temporaire à
+    partir d'une seule requête values_list() jointe, puis renvoyé en flux.
+
     Args:
         queryset: QuerySet de cotisations à exporter
+        progression: Suivi de progression d'un export en arrière-plan (optionnel)
 
     Returns:
-        HttpResponse: Réponse HTTP avec le fichier Excel attaché
+        FileResponse: Réponse HTTP avec le fichier Excel attaché
     """
-    # Créer un buffer en mémoire pour stocker le fichier Excel
-    output = io.BytesIO()
-    
-    # Créer un nouveau workbook et ajouter une feuille de calcul
-    workbook = xlsxwriter.Workbook(output)
-    worksheet = workbook.add_worksheet(str(_("Cotisations")))
-    
-    # Formats
-    header_format = workbook.add_format({
-        'bold': True,
-        'bg_color': '#F2F2F2',
-        'border': 1,
-        'align': 'center',
-        'valign': 'vcenter',
-        'text_wrap': True
-    })
-    
-    date_format = workbook.add_format({'num_format': 'dd/mm/yyyy'})
-    money_format = workbook.add_format({'num_format': '# ##0.00 €'})
-    
-    # En-têtes
-    headers = [
-        str(_('Référence')),
-        str(_('Membre')),
-        str(_('Courriel')),
-        str(_('Montant')),
-        str(_('Montant restant')),
-        str(_('Date émission')),
-        str(_('Date échéance')),
-        str(_('Statut paiement')),
-        str(_('Type de membre'))
-    ]
-    
-    # Largeurs des colonnes
-    column_widths = [20, 30, 35, 15, 15, 15, 15, 20, 20]
-    
-    # Écrire les en-têtes et définir les largeurs de colonnes
-    for col_num, (header, width) in enumerate(zip(headers, column_widths)):
-        worksheet.write(0, col_num, header, header_format)
-        worksheet.set_column(col_num, col_num, width)
-    
-    # Écrire les données
-    for row_num, cotisation in enumerate(queryset, 1):
-        worksheet.write(row_num, 0, cotisation.reference)
-        worksheet.write(row_num, 1, f"{cotisation.membre.prenom} {cotisation.membre.nom}")
-        worksheet.write(row_num, 2, cotisation.membre.email)
-        worksheet.write(row_num, 3, float(cotisation.montant), money_format)
-        worksheet.write(row_num, 4, float(cotisation.montant_restant), money_format)
-        worksheet.write_datetime(row_num, 5, cotisation.date_emission, date_format)
-        worksheet.write_datetime(row_num, 6, cotisation.date_echeance, date_format)
-        worksheet.write(row_num, 7, cotisation.get_statut_paiement_display())
-        worksheet.write(row_num, 8, cotisation.type_membre.libelle if cotisation.type_membre else '')
-    
-    # Filtres automatiques sur les en-têtes
-    worksheet.autofilter(0, 0, len(queryset), len(headers) - 1)
-    
-    # Fermer le workbook
-    workbook.close()
-    
-    # Préparer la réponse HTTP
-    output.seek(0)
-    
-    response = HttpResponse(
-        output,
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    statuts = _libelles_choix(Cotisation, 'statut_paiement')
+
+    def lignes():
+        valeurs = queryset.values_list(
+            'reference', 'membre__prenom', 'membre__nom', 'membre__email',
+            'montant', 'montant_restant', 'date_emission', 'date_echeance',
+            'statut_paiement', 'type_membre__libelle'
+        )
+        lignes_valeurs = suivre_progression(valeurs.iterator(chunk_size=EXPORT_CHUNK_SIZE), progression, queryset)
+        for (reference, prenom, nom, email, montant, montant_restant,
+             date_emission, date_echeance, statut, type_membre) in lignes_valeurs:
+            yield (
+                reference,
+                f"{prenom} {nom}",
+                email,
+                float(montant),
+                float(montant_restant),
+                date_emission,
+                date_echeance,
+                statuts.get(statut, statut),
+                type_membre
+            )
+
+    return streaming_excel_response(
+        f'cotisations_{timezone.now().strftime("%Y%m%d")}.xlsx',
+        _("Cotisations"),
+        [
+            (_('Référence'), 20, None),
+            (_('Membre'), 30, None),
+            (_('Courriel'), 35, None),
+            (_('Montant'), 15, FORMAT_MONTANT),
+            (_('Montant restant'), 15, FORMAT_MONTANT),
+            (_('Date émission'), 15, FORMAT_DATE),
+            (_('Date échéance'), 15, FORMAT_DATE),
+            (_('Statut paiement'), 20, None),
+            (_('Type de membre'), 20, None),
+        ],
+        lignes()
     )
-    response['Content-Disposition'] = f'attachment; filename="cotisations_{timezone.now().strftime("%Y%m%d")}.xlsx"'
-    
-    return response
 
 def export_paiements_csv(queryset):
     """
-    Exporte une liste de paiements au format CSV.
+    Exporte une liste de paiements au format CSV, en flux et par paquets.
 
     Args:
         queryset: QuerySet de paiements à exporter
 
     Returns:
-        HttpResponse: Réponse HTTP avec le fichier CSV attaché
+        StreamingHttpResponse: Réponse HTTP avec le fichier CSV attaché
     """
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="paiements_{timezone.now().strftime("%Y%m%d")}.csv"'
-    
-    writer = csv.writer(response)
-    
-    # En-tête
-    writer.writerow([
-        str(_('Référence cotisation')),
-        str(_('Membre')),
-        str(_('Date de paiement')),
-        str(_('Montant')),
-        str(_('Mode de paiement')),
-        str(_('Type de transaction')),
-        str(_('Référence de paiement')),
-        str(_('Devise'))
-    ])
-    
-    # Données
-    for paiement in queryset:
-        writer.writerow([
-            paiement.cotisation.reference,
-            f"{paiement.cotisation.membre.prenom} {paiement.cotisation.membre.nom}",
-            paiement.date_paiement.strftime('%d/%m/%Y %H:%M'),
-            paiement.montant,
-            paiement.mode_paiement.libelle if paiement.mode_paiement else '',
-            paiement.get_type_transaction_display(),
-            paiement.reference_paiement or '',
-            paiement.devise
-        ])
-    
-    return response
+    types_transaction = _libelles_choix(Paiement, 'type_transaction')
+
+    def lignes():
+        valeurs = queryset.values_list(
+            'cotisation__reference', 'cotisation__membre__prenom', 'cotisation__membre__nom',
+            'date_paiement', 'montant', 'mode_paiement__libelle', 'type_transaction',
+            'reference_paiement', 'devise'
+        )
+        for (reference, prenom, nom, date_paiement, montant, mode_paiement,
+             type_transaction, reference_paiement, devise) in valeurs.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield [
+                reference,
+                f"{prenom} {nom}",
+                date_paiement.strftime('%d/%m/%Y %H:%M'),
+                montant,
+                mode_paiement or '',
+                types_transaction.get(type_transaction, type_transaction),
+                reference_paiement or '',
+                devise
+            ]
+
+    return _reponse_csv_streaming(
+        [
+            str(_('Référence cotisation')),
+            str(_('Membre')),
+            str(_('Date de paiement')),
+            str(_('Montant')),
+            str(_('Mode de paiement')),
+            str(_('Type de transaction')),
+            str(_('Référence de paiement')),
+            str(_('Devise'))
+        ],
+        lignes(),
+        f'paiements_{timezone.now().strftime("%Y%m%d")}.csv'
+    )
 
 def export_paiements_excel(queryset):
     """
-    Exporte une liste de paiements au format Excel (XLSX).
+    Exporte une liste de paiements au format Excel (XLSX), à mémoire constante.
 
     Args:
         queryset: QuerySet de paiements à exporter
 
     Returns:
-        HttpResponse: Réponse HTTP avec le fichier Excel attaché
+        FileResponse: Réponse HTTP avec le fichier Excel attaché
     """
-    # Créer un buffer en mémoire pour stocker le fichier Excel
-    output = io.BytesIO()
-    
-    # Créer un nouveau workbook et ajouter une feuille de calcul
-    # Ajout de l'option remove_timezone=True pour éviter les erreurs avec les datetimes
-    workbook = xlsxwriter.Workbook(output, {'remove_timezone': True})
-    worksheet = workbook.add_worksheet(str(_("Paiements")))
-    
-    # Formats
-    header_format = workbook.add_format({
-        'bold': True,
-        'bg_color': '#F2F2F2',
-        'border': 1,
-        'align': 'center',
-        'valign': 'vcenter',
-        'text_wrap': True
-    })
-    
-    date_format = workbook.add_format({'num_format': 'dd/mm/yyyy hh:mm'})
-    money_format = workbook.add_format({'num_format': '# ##0.00 €'})
-    
-    # En-têtes
-    headers = [
-        str(_('Référence cotisation')),
-        str(_('Membre')),
-        str(_('Date de paiement')),
-        str(_('Montant')),
-        str(_('Mode de paiement')),
-        str(_('Type de transaction')),
-        str(_('Référence de paiement')),
-        str(_('Devise'))
-    ]
-    
-    # Largeurs des colonnes
-    column_widths = [20, 30, 20, 15, 20, 20, 25, 10]
-    
-    # Écrire les en-têtes et définir les largeurs de colonnes
-    for col_num, (header, width) in enumerate(zip(headers, column_widths)):
-        worksheet.write(0, col_num, header, header_format)
-        worksheet.set_column(col_num, col_num, width)
-    
-    # Écrire les données
-    for row_num, paiement in enumerate(queryset, 1):
-        worksheet.write(row_num, 0, paiement.cotisation.reference)
-        worksheet.write(row_num, 1, f"{paiement.cotisation.membre.prenom} {paiement.cotisation.membre.nom}")
-        
-        # Écrire la date avec le format date défini
-        worksheet.write_datetime(row_num, 2, paiement.date_paiement, date_format)
-        
-        worksheet.write(row_num, 3, float(paiement.montant), money_format)
-        worksheet.write(row_num, 4, paiement.mode_paiement.libelle if paiement.mode_paiement else '')
-        worksheet.write(row_num, 5, paiement.get_type_transaction_display())
-        worksheet.write(row_num, 6, paiement.reference_paiement or '')
-        worksheet.write(row_num, 7, paiement.devise)
-    
-    # Filtres automatiques sur les en-têtes
-    worksheet.autofilter(0, 0, len(queryset), len(headers) - 1)
-    
-    # Fermer le workbook
-    workbook.close()
-    
-    # Préparer la réponse HTTP
-    output.seek(0)
-    
-    response = HttpResponse(
-        output,
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    types_transaction = _libelles_choix(Paiement, 'type_transaction')
+
+    def lignes():
+        valeurs = queryset.values_list(
+            'cotisation__reference', 'cotisation__membre__prenom', 'cotisation__membre__nom',
+            'date_paiement', 'montant', 'mode_paiement__libelle', 'type_transaction',
+            'reference_paiement', 'devise'
+        )
+        for (reference, prenom, nom, date_paiement, montant, mode_paiement,
+             type_transaction, reference_paiement, devise) in valeurs.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield (
+                reference,
+                f"{prenom} {nom}",
+                date_paiement,
+                float(montant),
+                mode_paiement,
+                types_transaction.get(type_transaction, type_transaction),
+                reference_paiement,
+                devise
+            )
+
+    return streaming_excel_response(
+        f'paiements_{timezone.now().strftime("%Y%m%d")}.xlsx',
+        _("Paiements"),
+        [
+            (_('Référence cotisation'), 20, None),
+            (_('Membre'), 30, None),
+            (_('Date de paiement'), 20, FORMAT_DATE_HEURE),
+            (_('Montant'), 15, FORMAT_MONTANT),
+            (_('Mode de paiement'), 20, None),
+            (_('Type de transaction'), 20, None),
+            (_('Référence de paiement'), 25, None),
+            (_('Devise'), 10, None),
+        ],
+        lignes()
     )
-    response['Content-Disposition'] = f'attachment; filename="paiements_{timezone.now().strftime("%Y%m%d")}.xlsx"'
-    
-    return response
 
-def generer_rapport_cotisations_pdf(queryset):
+def generer_rapport_cotisations_pdf(queryset, titre=None, filtres=None, progression=None):
     """
     Génère un rapport PDF détaillé des cotisations.
     
     Args:
         queryset: QuerySet de cotisations à inclure dans le rapport
+        titre: Titre du rapport (par défaut: 'Rapport des cotisations')
+        filtres: Dictionnaire libellé -> valeur des filtres appliqués
+        progression: Suivi de progression d'un export en arrière-plan (optionnel)
         
     Returns:
         HttpResponse: Réponse HTTP avec le fichier PDF attaché
@@ -302,12 +311,14 @@ def generer_rapport_cotisations_pdf(queryset):
     elements = []
     
     # Titre
-    elements.append(Paragraph(str(_("Rapport des cotisations")), title_style))
+    elements.append(Paragraph(str(titre or _("Rapport des cotisations")), title_style))
     elements.append(Spacer(1, 0.5*cm))
     
     # Date du rapport
     date_rapport = timezone.now().strftime("%d/%m/%Y %H:%M")
     elements.append(Paragraph(f"{str(_('Date du rapport'))}: {date_rapport}", normal_style))
+    for libelle, valeur in (filtres or {}).items():
+        elements.append(Paragraph(f"{libelle}: {valeur}", normal_style))
     elements.append(Spacer(1, 0.5*cm))
     
     # Statistiques
@@ -357,22 +368,9 @@ def generer_rapport_cotisations_pdf(queryset):
         str(_('Date échéance'))
     ]
     
-    data = [headers]
-    
-    # Ajouter les données des cotisations
-    for cotisation in queryset:
-        data.append([
-            cotisation.reference,
-            f"{cotisation.membre.prenom} {cotisation.membre.nom}",
-            f"{cotisation.montant} €",
-            f"{cotisation.montant_restant} €",
-            cotisation.get_statut_paiement_display(),
-            cotisation.date_echeance.strftime("%d/%m/%Y")
-        ])
-    
-    # Créer le tableau des cotisations
-    cotisations_table = Table(data, colWidths=[doc.width/6.0]*6)
-    cotisations_table.setStyle(TableStyle([
+    # Tableaux de RAPPORT_PDF_LIGNES_PAR_TABLEAU lignes : reportlab découpe plus
+    # vite plusieurs petits tableaux qu'un seul tableau de toutes les cotisations
+    style_tableau = TableStyle([
         ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
         ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -381,9 +379,32 @@ def generer_rapport_cotisations_pdf(queryset):
         ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
         ('GRID', (0, 0), (-1, -1), 1, colors.black),
         ('PADDING', (0, 0), (-1, -1), 6),
-    ]))
-    
-    elements.append(cotisations_table)
+    ])
+    statuts = _libelles_choix(Cotisation, 'statut_paiement')
+    valeurs = queryset.values_list(
+        'reference', 'membre__prenom', 'membre__nom', 'montant',
+        'montant_restant', 'statut_paiement', 'date_echeance'
+    )
+
+    data = [headers]
+    nb_tableaux = 0
+    lignes_valeurs = suivre_progression(valeurs.iterator(chunk_size=EXPORT_CHUNK_SIZE), progression, queryset)
+    for reference, prenom, nom, montant, montant_restant, statut, date_echeance in lignes_valeurs:
+        data.append([
+            reference,
+            f"{prenom} {nom}",
+            f"{montant} €",
+            f"{montant_restant} €",
+            statuts.get(statut, statut),
+            date_echeance.strftime("%d/%m/%Y")
+        ])
+        if len(data) > RAPPORT_PDF_LIGNES_PAR_TABLEAU:
+            elements.append(Table(data, colWidths=[doc.width/6.0]*6, repeatRows=1, style=style_tableau))
+            nb_tableaux += 1
+            data = [headers]
+
+    if len(data) > 1 or not nb_tableaux:
+        elements.append(Table(data, colWidths=[doc.width/6.0]*6, repeatRows=1, style=style_tableau))
     
     # Construire le PDF
     doc.build(elements)
@@ -400,116 +421,100 @@ def generer_rapport_cotisations_pdf(queryset):
 
 def export_rappels_csv(queryset, filename=None):
     """
-    Exporte les rappels au format CSV.
+    Exporte les rappels au format CSV, en flux et par paquets.
     
     Args:
         queryset: QuerySet de Rappel à exporter
         filename: Nom du fichier (par défaut: 'rappels_YYYYMMDD.csv')
         
     Returns:
-        HttpResponse avec le fichier CSV
+        StreamingHttpResponse avec le fichier CSV
     """
     if not filename:
         filename = f"rappels_{timezone.now().strftime('%Y%m%d')}.csv"
-    
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    writer = csv.writer(response, delimiter=';')
-    
-    # En-tête
-    writer.writerow([
-        _('ID'), _('Cotisation'), _('Membre'), _('Email'),
-        _('Date envoi'), _('Type'), _('État'), _('Niveau')
-    ])
-    
-    # Données
-    for rappel in queryset:
-        writer.writerow([
-            rappel.id,
-            rappel.cotisation.reference,
-            f"{rappel.membre.prenom} {rappel.membre.nom}",
-            rappel.membre.email,
-            rappel.date_envoi.strftime('%d/%m/%Y %H:%M') if rappel.date_envoi else '',
-            rappel.get_type_rappel_display(),
-            rappel.get_etat_display(),
-            rappel.niveau
-        ])
-    
-    return response
+
+    types_rappel = _libelles_choix(Rappel, 'type_rappel')
+    etats = _libelles_choix(Rappel, 'etat')
+
+    def lignes():
+        valeurs = queryset.values_list(
+            'id', 'cotisation__reference', 'membre__prenom', 'membre__nom', 'membre__email',
+            'date_envoi', 'type_rappel', 'etat', 'niveau'
+        )
+        for (pk, reference, prenom, nom, email, date_envoi,
+             type_rappel, etat, niveau) in valeurs.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield [
+                pk,
+                reference,
+                f"{prenom} {nom}",
+                email,
+                date_envoi.strftime('%d/%m/%Y %H:%M') if date_envoi else '',
+                types_rappel.get(type_rappel, type_rappel),
+                etats.get(etat, etat),
+                niveau
+            ]
+
+    return _reponse_csv_streaming(
+        [
+            _('ID'), _('Cotisation'), _('Membre'), _('Email'),
+            _('Date envoi'), _('Type'), _('État'), _('Niveau')
+        ],
+        lignes(),
+        filename,
+        delimiter=';'
+    )
 
 def export_rappels_excel(queryset, filename=None):
     """
-    Exporte les rappels au format Excel.
+    Exporte les rappels au format Excel, à mémoire constante.
     
     Args:
         queryset: QuerySet de Rappel à exporter
         filename: Nom du fichier (par défaut: 'rappels_YYYYMMDD.xlsx')
         
     Returns:
-        HttpResponse avec le fichier Excel
+        FileResponse avec le fichier Excel
     """
     if not filename:
         filename = f"rappels_{timezone.now().strftime('%Y%m%d')}.xlsx"
-    
-    # Créer un buffer pour stocker le fichier Excel
-    output = io.BytesIO()
-    
-    # Créer un classeur Excel et ajouter une feuille
-    workbook = xlsxwriter.Workbook(output, {'remove_timezone': True})
-    worksheet = workbook.add_worksheet(_("Rappels"))
-    
-    # Formats
-    header_format = workbook.add_format({
-        'bold': True,
-        'bg_color': '#F0F0F0',
-        'border': 1,
-        'align': 'center',
-        'valign': 'vcenter',
-        'text_wrap': True
-    })
-    
-    datetime_format = workbook.add_format({'num_format': 'dd/mm/yyyy hh:mm'})
-    
-    # En-têtes
-    headers = [
-        _('ID'), _('Cotisation'), _('Membre'), _('Email'),
-        _('Date envoi'), _('Type'), _('État'), _('Niveau')
-    ]
-    
-    for col_num, header in enumerate(headers):
-        worksheet.write(0, col_num, header, header_format)
-    
-    # Données
-    for row_num, rappel in enumerate(queryset, 1):
-        worksheet.write(row_num, 0, rappel.id)
-        worksheet.write(row_num, 1, rappel.cotisation.reference)
-        worksheet.write(row_num, 2, f"{rappel.membre.prenom} {rappel.membre.nom}")
-        worksheet.write(row_num, 3, rappel.membre.email)
-        
-        if rappel.date_envoi:
-            worksheet.write_datetime(row_num, 4, rappel.date_envoi, datetime_format)
-        
-        worksheet.write(row_num, 5, rappel.get_type_rappel_display())
-        worksheet.write(row_num, 6, rappel.get_etat_display())
-        worksheet.write(row_num, 7, rappel.niveau)
-    
-    # Ajuster la largeur des colonnes
-    for col_num, _ in enumerate(headers):
-        worksheet.set_column(col_num, col_num, 15)
-    
-    # Fermer le classeur et obtenir le contenu
-    workbook.close()
-    output.seek(0)
-    
-    # Créer la réponse HTTP
-    response = HttpResponse(
-        output.getvalue(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+    types_rappel = _libelles_choix(Rappel, 'type_rappel')
+    etats = _libelles_choix(Rappel, 'etat')
+
+    def lignes():
+        valeurs = queryset.values_list(
+            'id', 'cotisation__reference', 'membre__prenom', 'membre__nom', 'membre__email',
+            'date_envoi', 'type_rappel', 'etat', 'niveau'
+        )
+        for (pk, reference, prenom, nom, email, date_envoi,
+             type_rappel, etat, niveau) in valeurs.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield (
+                pk,
+                reference,
+                f"{prenom} {nom}",
+                email,
+                date_envoi,
+                types_rappel.get(type_rappel, type_rappel),
+                etats.get(etat, etat),
+                niveau
+            )
+
+    return streaming_excel_response(
+        filename,
+        _("Rappels"),
+        [
+            (_('ID'), 15, None),
+            (_('Cotisation'), 15, None),
+            (_('Membre'), 15, None),
+            (_('Email'), 15, None),
+            (_('Date envoi'), 15, FORMAT_DATE_HEURE),
+            (_('Type'), 15, None),
+            (_('État'), 15, None),
+            (_('Niveau'), 15, None),
+        ],
+        lignes(),
+        autofiltre=False
     )
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    return response
 
 def generer_recu_pdf(paiement, filename=None):
     """
@@ -0,0 +1,172 @@
+# apps/cotisations/management/commands/benchmark_export_excel.py
+import datetime
+import gc
+import io
+import os
+import resource
+import time
+import uuid
+from decimal import Decimal
+
+import xlsxwriter
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import HttpResponse
+
+from apps.membres.models import Membre, TypeMembre
+from apps.cotisations.export_utils import export_cotisations_excel
+from apps.cotisations.models import Cotisation
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le pic de mémoire (RSS) et la durée de l'export Excel des cotisations : "
+        "classeur construit en mémoire (ancienne implémentation) contre écriture "
+        "constant_memory dans un fichier temporaire, sur des données synthétiques "
+        "supprimées en fin de mesure"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lignes',
+            type=int,
+            default=100000,
+            help='Nombre de cotisations synthétiques à exporter'
+        )
+        parser.add_argument(
+            '--membres',
+            type=int,
+            default=1000,
+            help='Nombre de membres synthétiques'
+        )
+
+    def handle(self, *args, **options):
+        if options['lignes'] < 1 or options['membres'] < 1:
+            raise CommandError('Les valeurs numériques doivent être strictement positives')
+        if not hasattr(os, 'fork'):
+            raise CommandError('La mesure du pic RSS nécessite os.fork (Linux/macOS)')
+
+        suffixe = uuid.uuid4().hex[:8]
+        self._generer_donnees(suffixe, options)
+        try:
+            queryset = Cotisation.objects.filter(
+                reference__startswith=f'BENCH-{suffixe}-'
+            ).select_related('membre', 'type_membre')
+
+            gc.collect()
+            self.stdout.write(f"{options['lignes']} lignes")
+            for mode, exporter in (('en_memoire', self._export_en_memoire), ('flux', export_cotisations_excel)):
+                duree, rss_initial, pic_rss, taille = self._mesurer(exporter, queryset)
+                self.stdout.write(
+                    f"{mode:<12} {duree:>8.2f}s  pic RSS {pic_rss / 1024:>7.0f} Mo "
+                    f"(+{(pic_rss - rss_initial) / 1024:.0f} Mo pendant l'export)  fichier {taille / 1024:.0f} Ko"
+                )
+        finally:
+            self._nettoyer(suffixe)
+
+        self.stdout.write(self.style.SUCCESS('Mesure terminée'))
+
+    def _mesurer(self, exporter, queryset):
+        """
+        Exécute un export dans un processus fils pour isoler son pic de mémoire
+        (ru_maxrss ne redescend jamais au sein d'un même processus).
+        """
+        # La connexion SQLite ne doit pas être partagée avec le fils
+        connection.close()
+        lecture, ecriture = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(lecture)
+            try:
+                rss_initial = self._rss_courant()
+                debut = time.perf_counter()
+                response = exporter(queryset)
+                if response.streaming:
+                    taille = sum(len(bloc) for bloc in response.streaming_content)
+                    response.close()
+                else:
+                    taille = len(response.content)
+                os.write(ecriture, f'{time.perf_counter() - debut} {rss_initial} {taille}'.encode())
+            finally:
+                os._exit(0)
+
+        os.close(ecriture)
+        _, _, usage = os.wait4(pid, 0)
+        mesure = os.read(lecture, 128).decode()
+        os.close(lecture)
+        if not mesure:
+            raise CommandError("L'export a échoué dans le processus de mesure")
+
+        duree, rss_initial, taille = mesure.split()
+        return float(duree), int(rss_initial), usage.ru_maxrss, int(taille)
+
+    def _rss_courant(self):
+        """RSS actuel du processus en Ko (/proc sous Linux, pic à défaut)."""
+        try:
+            with open('/proc/self/statm') as statm:
+                return int(statm.read().split()[1]) * resource.getpagesize() // 1024
+        except OSError:
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    def _export_en_memoire(self, queryset):
+        """Ancienne implémentation : classeur en BytesIO, instances complètes et len(queryset)."""
+        output = io.BytesIO()
+        workbook = xlsxwriter.Workbook(output)
+        worksheet = workbook.add_worksheet('Cotisations')
+        date_format = workbook.add_format({'num_format': 'dd/mm/yyyy'})
+        money_format = workbook.add_format({'num_format': '# ##0.00 €'})
+
+        for row_num, cotisation in enumerate(queryset, 1):
+            worksheet.write(row_num, 0, cotisation.reference)
+            worksheet.write(row_num, 1, f"{cotisation.membre.prenom} {cotisation.membre.nom}")
+            worksheet.write(row_num, 2, cotisation.membre.email)
+            worksheet.write(row_num, 3, float(cotisation.montant), money_format)
+            worksheet.write(row_num, 4, float(cotisation.montant_restant), money_format)
+            worksheet.write_datetime(row_num, 5, cotisation.date_emission, date_format)
+            worksheet.write_datetime(row_num, 6, cotisation.date_echeance, date_format)
+            worksheet.write(row_num, 7, cotisation.get_statut_paiement_display())
+            worksheet.write(row_num, 8, cotisation.type_membre.libelle if cotisation.type_membre else '')
+        worksheet.autofilter(0, 0, len(queryset), 8)
+        workbook.close()
+
+        output.seek(0)
+        return HttpResponse(output, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+    def _generer_donnees(self, suffixe, options):
+        """Crée les membres et cotisations synthétiques (sans signaux)."""
+        type_membre, _ = TypeMembre.objects.get_or_create(libelle='Benchmark')
+        with transaction.atomic():
+            Membre.objects.bulk_create([
+                Membre(nom='Benchmark', prenom=f'Membre {i}', email=f'bench-{suffixe}-{i}@example.com')
+                for i in range(options['membres'])
+            ])
+            membres_ids = list(
+                Membre.objects.filter(email__startswith=f'bench-{suffixe}-').values_list('pk', flat=True)
+            )
+
+            emission = datetime.date(2025, 1, 1)
+            statuts = ('non_payee', 'partiellement_payee', 'payee')
+            Cotisation.objects.bulk_create((
+                Cotisation(
+                    membre_id=membres_ids[i % len(membres_ids)],
+                    type_membre=type_membre,
+                    montant=Decimal('50.00'),
+                    montant_restant=Decimal('25.00'),
+                    statut_paiement=statuts[i % 3],
+                    date_emission=emission,
+                    date_echeance=emission + datetime.timedelta(days=30),
+                    periode_debut=emission,
+                    annee=emission.year,
+                    mois=emission.month,
+                    reference=f'BENCH-{suffixe}-{i:07d}',
+                )
+                for i in range(options['lignes'])
+            ), batch_size=2000)
+
+    def _nettoyer(self, suffixe):
+        """Supprime physiquement les données synthétiques."""
+        with transaction.atomic():
+            cotisations = Cotisation._base_manager.filter(reference__startswith=f'BENCH-{suffixe}-')
+            cotisations._raw_delete(cotisations.db)
+            membres = Membre._base_manager.filter(email__startswith=f'bench-{suffixe}-')
+            membres._raw_delete(membres.db)
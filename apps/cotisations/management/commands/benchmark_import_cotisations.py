@@ -0,0 +1,100 @@
+# apps/cotisations/management/commands/benchmark_import_cotisations.py
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.core.models import Statut
+from apps.membres.models import Membre, TypeMembre
+from apps.cotisations.services import ImportCotisationsService
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare le débit (lignes/seconde) de l'import de cotisations ligne par ligne "
+        "et de l'import par lots, sur des données synthétiques annulées en fin de mesure"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lignes',
+            type=int,
+            default=2000,
+            help='Nombre de lignes synthétiques à importer'
+        )
+        parser.add_argument(
+            '--membres',
+            type=int,
+            default=200,
+            help='Nombre de membres synthétiques référencés par les lignes'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Taille des lots de l'import groupé"
+        )
+        parser.add_argument(
+            '--erreurs',
+            type=int,
+            default=5,
+            help="Pourcentage de lignes en erreur (email inconnu)"
+        )
+
+    def handle(self, *args, **options):
+        if options['lignes'] < 1 or options['membres'] < 1:
+            raise CommandError('Les valeurs numériques doivent être strictement positives')
+
+        mesures = {}
+        for mode in ('ligne_par_ligne', 'par_lots'):
+            # Chaque mesure repart d'une base identique puis est annulée
+            with transaction.atomic():
+                lignes = self._generer_donnees(options)
+                service = ImportCotisationsService(
+                    Statut.objects.get_or_create(nom='En attente')[0],
+                    batch_size=options['batch_size']
+                )
+                importer = service.importer if mode == 'par_lots' else service.importer_ligne_par_ligne
+
+                requetes = []
+                with connection.execute_wrapper(lambda execute, sql, *args: requetes.append(sql) or execute(sql, *args)):
+                    debut = time.perf_counter()
+                    resultats = importer(lignes)
+                    duree = time.perf_counter() - debut
+
+                mesures[mode] = (duree, len(requetes), resultats)
+                transaction.set_rollback(True)
+
+        for mode, (duree, nb_requetes, resultats) in mesures.items():
+            self.stdout.write(
+                f"{mode:<16} {resultats['total'] / duree:>10.0f} lignes/s  "
+                f"{duree:>8.2f}s  {nb_requetes:>7} requêtes  "
+                f"({resultats['success']} succès, {resultats['errors']} erreurs)"
+            )
+
+        duree_unitaire, duree_lots = mesures['ligne_par_ligne'][0], mesures['par_lots'][0]
+        self.stdout.write(self.style.SUCCESS(f"Accélération : x{duree_unitaire / duree_lots:.1f}"))
+
+    def _generer_donnees(self, options):
+        """Crée les membres synthétiques et retourne les lignes à importer."""
+        suffixe = uuid.uuid4().hex[:8]
+        type_membre, _ = TypeMembre.objects.get_or_create(libelle='Benchmark')
+
+        Membre.objects.bulk_create([
+            Membre(nom='Benchmark', prenom=f'Membre {i}', email=f'bench-{suffixe}-{i}@example.com')
+            for i in range(options['membres'])
+        ])
+
+        lignes = []
+        for i in range(options['lignes']):
+            en_erreur = options['erreurs'] and i % 100 < options['erreurs']
+            lignes.append((i + 2, {
+                'email': f'inconnu-{suffixe}-{i}@example.com' if en_erreur
+                         else f"bench-{suffixe}-{i % options['membres']}@example.com",
+                'montant': f'{10 + i % 90},50',
+                'date_emission': f'{(i % 28) + 1:02d}/{(i % 12) + 1:02d}/2025',
+                'type_membre': type_membre.libelle,
+                'statut_paiement': 'partiellement payée' if i % 3 == 0 else '',
+            }))
+        return lignes
@@ -0,0 +1,33 @@
+# apps/cotisations/management/commands/reconcilier_soldes.py
+from django.core.management.base import BaseCommand, CommandError
+from apps.cotisations.services import SoldeCotisationsService
+
+class Command(BaseCommand):
+    help = 'Recalcule le montant restant et le statut de paiement de toutes les cotisations à partir de leurs paiements'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=None,
+            help='Nombre de cotisations recalculées par lot'
+        )
+        parser.add_argument(
+            '--simulation',
+            action='store_true',
+            help='Compter les soldes erronés sans les corriger'
+        )
+
+    def handle(self, *args, **options):
+        if options['taille_lot'] is not None and options['taille_lot'] < 1:
+            raise CommandError('La taille de lot doit être strictement positive')
+
+        metriques = SoldeCotisationsService(taille_lot=options['taille_lot']).recalculer_en_masse(
+            simulation=options['simulation']
+        )
+        action = 'à corriger' if options['simulation'] else 'corrigées'
+        self.stdout.write(
+            f"{metriques['cotisations']} cotisations examinées, {metriques['corrigees']} {action} "
+            f"({metriques['lots']} lots en {metriques['duree']}s)"
+        )
+        self.stdout.write(self.style.SUCCESS('Soldes réconciliés avec succès'))
@@ -1,10 +1,32 @@
 # Dans apps/cotisations/management/commands/traiter_rappels.py
-from django.core.management.base import BaseCommand
-from apps.cotisations.tasks import traiter_rappels_planifies
+from django.core.management.base import BaseCommand, CommandError
+from apps.cotisations.services import EnvoiRappelsService
 
 class Command(BaseCommand):
     help = 'Traite les rappels planifiés dont la date est passée'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--taille-lot',
+            type=int,
+            default=None,
+            help='Nombre de rappels réservés et envoyés par lot'
+        )
+        parser.add_argument(
+            '--max-lots',
+            type=int,
+            default=None,
+            help='Nombre maximal de lots à traiter'
+        )
+
     def handle(self, *args, **options):
-        traiter_rappels_planifies()
-        self.stdout.write(self.style.SUCCESS('Rappels traités avec succès'))
\ No newline at end of file
+        if options['taille_lot'] is not None and options['taille_lot'] < 1:
+            raise CommandError('La taille de lot doit être strictement positive')
+
+        metriques = EnvoiRappelsService(taille_lot=options['taille_lot']).executer(max_lots=options['max_lots'])
+        self.stdout.write(
+            f"{metriques['reserves']} rappels réservés, {metriques['envoyes']} envoyés, "
+            f"{metriques['echoues']} en échec, {metriques['liberes']} réservations libérées "
+            f"({metriques['lots']} lots en {metriques['duree']}s, {metriques['debit']} rappels/s)"
+        )
+        self.stdout.write(self.style.SUCCESS('Rappels traités avec succès'))
@@ -100,17 +100,10 @@ class CotisationManager(BaseManager):
     
     def recherche(self, terme):
         """Recherche globale sur les cotisations"""
-        if not terme:
-            return self.all()
+        from apps.core.recherche import index_recherche
         
-        # Recherche par référence, commentaire ou nom/prénom du membre
-        return self.filter(
-            Q(reference__icontains=terme) |
-            Q(commentaire__icontains=terme) |
-            Q(membre__nom__icontains=terme) |
-            Q(membre__prenom__icontains=terme) |
-            Q(membre__email__icontains=terme)
-        )
+        # Recherche par référence, commentaire ou nom/prénom/email du membre
+        return index_recherche.filtrer(self.all(), terme)
 
 
 class PaiementManager(BaseManager):
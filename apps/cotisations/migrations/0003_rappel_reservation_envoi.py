@@ -0,0 +1,35 @@
+# Generated by Django 5.1.8 on 2026-10-17 22:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cotisations', '0002_cotisation_evenement_id_and_more'),
+        ('membres', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rappel',
+            name='date_reservation',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name="Date de réservation pour l'envoi"),
+        ),
+        migrations.AddField(
+            model_name='rappel',
+            name='jeton_envoi',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, null=True, verbose_name="Jeton d'envoi"),
+        ),
+        migrations.AlterField(
+            model_name='rappel',
+            name='etat',
+            field=models.CharField(choices=[('planifie', 'Planifié'), ('en_cours', "En cours d'envoi"), ('envoye', 'Envoyé'), ('echoue', 'Échoué'), ('lu', 'Lu')], default='planifie', max_length=20, verbose_name='État'),
+        ),
+        migrations.AddIndex(
+            model_name='rappel',
+            index=models.Index(fields=['etat', 'date_envoi'], name='cotisations_etat_4df0d4_idx'),
+        ),
+    ]
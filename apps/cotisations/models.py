@@ -1,17 +1,21 @@
 # apps/cotisations/models.py
 from django.db import models
+from django.db.models import Case, DecimalField, F, Sum, Value, When
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
 from decimal import Decimal
 
+from apps.core.corbeille import compteurs_corbeille
 from apps.core.models import BaseModel, Statut
+from apps.core.references import generer_reference, generer_references
 from apps.membres.models import Membre, TypeMembre
 from apps.accounts.models import CustomUser
 from .managers import CotisationManager, PaiementManager
 
 # États des rappels
 RAPPEL_ETAT_PLANIFIE = 'planifie'
+RAPPEL_ETAT_EN_COURS = 'en_cours'
 RAPPEL_ETAT_ENVOYE = 'envoye'
 RAPPEL_ETAT_ECHOUE = 'echoue'
 RAPPEL_ETAT_LU = 'lu'
@@ -32,6 +36,26 @@ PAIEMENT_TYPE_PAIEMENT = 'paiement'
 PAIEMENT_TYPE_REMBOURSEMENT = 'remboursement'
 PAIEMENT_TYPE_REJET = 'rejet'
 
+# Champs de Paiement dont la modification change le solde de la cotisation
+PAIEMENT_CHAMPS_SOLDE = {'montant', 'type_transaction', 'deleted_at', 'cotisation'}
+
+
+def montant_paye_paiements():
+    """
+    Agrégat SQL du montant réglé par un ensemble de paiements : les paiements
+    comptent positivement, les remboursements négativement, les rejets pas.
+    """
+    champ = DecimalField(max_digits=12, decimal_places=2)
+    return Sum(
+        Case(
+            When(type_transaction=PAIEMENT_TYPE_PAIEMENT, then=F('montant')),
+            When(type_transaction=PAIEMENT_TYPE_REMBOURSEMENT, then=-F('montant')),
+            default=Value(Decimal('0.00')),
+            output_field=champ
+        ),
+        output_field=champ
+    )
+
 class BaremeCotisation(BaseModel):
     """
     Modèle définissant les montants de cotisation par type de membre.
@@ -369,24 +393,7 @@ class Cotisation(BaseModel):
         """
         # Si c'est une création (pas d'id)
         if not self.pk:
-            # S'assurer que le montant restant est égal au montant total
-            if self.montant_restant is None or self.montant_restant == 0:
-                self.montant_restant = self.montant
-            
-            # Génération de référence améliorée
-            if not self.reference or self.reference == 'auto':
-                self.reference = self._generer_reference()
-                
-            # Vérification de sécurité: pas de cotisation sans référence
-            if not self.reference:
-                raise ValueError("Impossible de créer une cotisation sans référence")
-            
-            # Extraire mois et année si non définis
-            if not self.mois and self.periode_debut:
-                self.mois = self.periode_debut.month
-            
-            if not self.annee and self.periode_debut:
-                self.annee = self.periode_debut.year
+            self._initialiser_creation()
         
         # Mettre à jour le statut de paiement en fonction du montant restant
         self._mettre_a_jour_statut_paiement()
@@ -394,6 +401,31 @@ class Cotisation(BaseModel):
         # Sauvegarder l'objet
         super().save(*args, **kwargs)
     
+    def _initialiser_creation(self):
+        """
+        Initialise les champs calculés d'une nouvelle cotisation
+        (montant restant, référence, mois et année).
+        Utilisée par save() et par les créations en masse (bulk_create).
+        """
+        # S'assurer que le montant restant est égal au montant total
+        if self.montant_restant is None or self.montant_restant == 0:
+            self.montant_restant = self.montant
+        
+        # Génération de référence améliorée
+        if not self.reference or self.reference == 'auto':
+            self.reference = self._generer_reference()
+            
+        # Vérification de sécurité: pas de cotisation sans référence
+        if not self.reference:
+            raise ValueError("Impossible de créer une cotisation sans référence")
+        
+        # Extraire mois et année si non définis
+        if not self.mois and self.periode_debut:
+            self.mois = self.periode_debut.month
+        
+        if not self.annee and self.periode_debut:
+            self.annee = self.periode_debut.year
+    
     def clean(self):
         from django.core.exceptions import ValidationError
         
@@ -412,64 +444,59 @@ class Cotisation(BaseModel):
     def _generer_reference(self):
         """
         Génère une référence unique pour la cotisation.
-        Format: COT-YYYYMM-XXXXX (standard) ou EVENT-YYYYMM-XXXXX (événement)
+        Format: COT-YYYYMM-NNNNNN (standard) ou EVENT-YYYYMM-NNNNNN (événement)
         """
-        import random
-        import string
-        
-        # Préfixe selon le type de cotisation
-        if self.type_cotisation == 'evenement':
-            prefix = 'EVENT'
-        else:
-            prefix = 'COT'
-        
-        date_part = timezone.now().strftime('%Y%m')
-        
-        # Générer un identifiant aléatoire de 5 caractères
-        chars = string.ascii_uppercase + string.digits
-        random_part = ''.join(random.choice(chars) for _ in range(5))
-        
-        # Si le membre a un id, l'inclure dans la référence
-        if self.membre and self.membre.id:
-            membre_part = f"{self.membre.id:04d}"
-            reference = f"{prefix}-{date_part}-{membre_part}-{random_part}"
-        else:
-            reference = f"{prefix}-{date_part}-{random_part}"
-        
-        # S'assurer que la référence est unique
-        while Cotisation.objects.filter(reference=reference).exists():
-            random_part = ''.join(random.choice(chars) for _ in range(5))
-            if self.membre and self.membre.id:
-                reference = f"{prefix}-{date_part}-{membre_part}-{random_part}"
-            else:
-                reference = f"{prefix}-{date_part}-{random_part}"
+        return generer_reference(self._prefixe_reference(), timezone.now().strftime('%Y%m'))
+    
+    def _prefixe_reference(self):
+        """Préfixe de la référence selon le type de cotisation."""
+        return 'EVENT' if self.type_cotisation == 'evenement' else 'COT'
+    
+    @classmethod
+    def generer_references(cls, cotisations):
+        """
+        Attribue une référence unique à chaque cotisation d'un lot non enregistré,
+        avec une réservation de séquence par préfixe pour tout le lot.
         
-        return reference
+        Args:
+            cotisations (list): Cotisations non enregistrées
+        """
+        par_prefixe = {}
+        for cotisation in cotisations:
+            if not cotisation.reference or cotisation.reference == 'auto':
+                par_prefixe.setdefault(cotisation._prefixe_reference(), []).append(cotisation)
+        
+        periode = timezone.now().strftime('%Y%m')
+        for prefixe, lot in par_prefixe.items():
+            for cotisation, reference in zip(lot, generer_references(prefixe, periode, len(lot))):
+                cotisation.reference = reference
     
     def _mettre_a_jour_statut_paiement(self):
         """
         Met à jour le statut de paiement en fonction du montant restant.
         """
-        if self.montant_restant <= 0:
-            self.statut_paiement = 'payee'
-        elif self.montant_restant < self.montant:
-            self.statut_paiement = 'partiellement_payee'
-        else:
-            self.statut_paiement = 'non_payee'
+        self.statut_paiement = self.statut_pour_solde(self.montant, self.montant_restant)
+    
+    @staticmethod
+    def statut_pour_solde(montant, montant_restant):
+        """
+        Statut de paiement correspondant au montant restant d'une cotisation.
+        """
+        if montant_restant <= 0:
+            return 'payee'
+        elif montant_restant < montant:
+            return 'partiellement_payee'
+        return 'non_payee'
     
     def get_montant_paye(self):
         """
-        Calcule le montant total des paiements pour cette cotisation.
+        Calcule le montant total des paiements pour cette cotisation
+        (une seule requête d'agrégation).
         """
-        montant_paye = Decimal('0.00')
-        for paiement in self.paiements.filter(deleted_at__isnull=True):
-            # Ajouter les paiements positifs, soustraire les remboursements
-            if paiement.type_transaction == 'paiement':
-                montant_paye += paiement.montant
-            elif paiement.type_transaction == 'remboursement':
-                montant_paye -= paiement.montant
-        
-        return montant_paye
+        montant_paye = self.paiements.filter(deleted_at__isnull=True).aggregate(
+            total=montant_paye_paiements()
+        )['total']
+        return montant_paye or Decimal('0.00')
     
     def recalculer_montant_restant(self):
         """
@@ -507,6 +534,7 @@ class Cotisation(BaseModel):
         if self.deleted_at:
             self.deleted_at = None
             self.save(update_fields=['deleted_at'])
+            compteurs_corbeille.ajuster(Cotisation, -1)
             # Si vous avez un historique des actions, vous pourriez vouloir l'enregistrer ici
             # Par exemple:
             # if hasattr(self, 'log_action'):
@@ -910,41 +938,20 @@ class Paiement(BaseModel):
     
     # Dans apps/cotisations/models.py, classe Paiement
 
+    # Préfixe des références selon le type de transaction
+    PREFIXES_REFERENCE = {
+        PAIEMENT_TYPE_PAIEMENT: 'PAI',
+        PAIEMENT_TYPE_REMBOURSEMENT: 'RMB',
+        PAIEMENT_TYPE_REJET: 'REJ',
+    }
+
     def _generer_reference(self):
         """
         Génère une référence unique pour le paiement basée sur le type de transaction.
-        Format: [PAI|RMB|REJ]-YYYYMMDD-XXXXX
+        Format: [PAI|RMB|REJ]-YYYYMMDD-NNNNNN
         """
-        import random
-        import string
-        
-        # Préfixe selon le type de transaction
-        prefixes = {
-            'paiement': 'PAI',
-            'remboursement': 'RMB',
-            'rejet': 'REJ'
-        }
-        prefix = prefixes.get(self.type_transaction, 'PAI')
-        
-        # Date au format YYYYMMDD
-        date_part = timezone.now().strftime('%Y%m%d')
-        
-        # Identifiant de la cotisation
-        cotisation_part = f"{self.cotisation.id:04d}" if self.cotisation else "0000"
-        
-        # Partie aléatoire
-        chars = string.ascii_uppercase + string.digits
-        random_part = ''.join(random.choice(chars) for _ in range(4))
-        
-        # Assembler la référence
-        reference = f"{prefix}-{date_part}-{cotisation_part}-{random_part}"
-        
-        # Vérifier l'unicité
-        while Paiement.objects.filter(reference_paiement=reference).exists():
-            random_part = ''.join(random.choice(chars) for _ in range(4))
-            reference = f"{prefix}-{date_part}-{cotisation_part}-{random_part}"
-        
-        return reference
+        prefix = self.PREFIXES_REFERENCE.get(self.type_transaction, 'PAI')
+        return generer_reference(prefix, timezone.now().strftime('%Y%m%d'))
 
     def save(self, *args, **kwargs):
         """
@@ -975,27 +982,39 @@ class Paiement(BaseModel):
                     )
                 self.statut = default_status
         
-        # Sauvegarder le paiement
+        # Sauvegarder le paiement (le signal post_save peut recalculer le solde)
+        self._solde_recalcule = False
         super().save(*args, **kwargs)
         
         # Mettre à jour le montant restant de la cotisation
-        if is_new or kwargs.get('update_fields') is None or 'montant' in kwargs.get('update_fields', []):
-            self.cotisation.recalculer_montant_restant()
-            self.cotisation.save(update_fields=['montant_restant', 'statut_paiement'])
+        update_fields = kwargs.get('update_fields')
+        if is_new or update_fields is None or PAIEMENT_CHAMPS_SOLDE.intersection(update_fields):
+            self.mettre_a_jour_solde_cotisation()
     
     def delete(self, hard=False, *args, **kwargs):
         """
         Surcharge de delete pour mettre à jour le montant restant de la cotisation.
         """
-        cotisation = self.cotisation  # Stocker la référence avant suppression
+        self._solde_recalcule = False
         result = super().delete(hard=hard, *args, **kwargs)
         
         # Mettre à jour le montant restant si suppression physique ou logique
-        cotisation.recalculer_montant_restant()
-        cotisation.save(update_fields=['montant_restant', 'statut_paiement'])
+        self.mettre_a_jour_solde_cotisation()
         
         return result
     
+    def mettre_a_jour_solde_cotisation(self):
+        """
+        Recalcule et enregistre le solde de la cotisation, une seule fois par
+        écriture du paiement, que le recalcul soit demandé par le modèle ou
+        par les signaux.
+        """
+        if getattr(self, '_solde_recalcule', False):
+            return
+        self.cotisation.recalculer_montant_restant()
+        self.cotisation.save(update_fields=['montant_restant', 'statut_paiement'])
+        self._solde_recalcule = True
+    
     def clean(self):
         from django.core.exceptions import ValidationError
         
@@ -1040,6 +1059,7 @@ class Rappel(BaseModel):
         max_length=20,
         choices=[
             (RAPPEL_ETAT_PLANIFIE, _('Planifié')),
+            (RAPPEL_ETAT_EN_COURS, _("En cours d'envoi")),
             (RAPPEL_ETAT_ENVOYE, _('Envoyé')),
             (RAPPEL_ETAT_ECHOUE, _('Échoué')),
             (RAPPEL_ETAT_LU, _('Lu')),
@@ -1085,6 +1105,21 @@ class Rappel(BaseModel):
         help_text=_("Résultat de l'envoi ou commentaire sur le suivi")
     )
     
+    # Réservation par un processus d'envoi (voir EnvoiRappelsService)
+    jeton_envoi = models.UUIDField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        verbose_name=_("Jeton d'envoi")
+    )
+    date_reservation = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Date de réservation pour l'envoi")
+    )
+    
     class Meta:
         verbose_name = _("Rappel")
         verbose_name_plural = _("Rappels")
@@ -1094,6 +1129,7 @@ class Rappel(BaseModel):
             models.Index(fields=['cotisation']),
             models.Index(fields=['date_envoi']),
             models.Index(fields=['etat']),
+            models.Index(fields=['etat', 'date_envoi']),
         ]
     
     def __str__(self):
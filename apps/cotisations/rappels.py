@@ -0,0 +1,88 @@
+# apps/cotisations/rappels.py
+"""
+Backends d'envoi des rappels de cotisation.
+
+Le backend utilisé par EnvoiRappelsService est défini par le réglage
+COTISATIONS_RAPPELS_BACKEND (chemin pointé). Comme les backends email de
+Django, il est ouvert une fois par lot : tous les rappels d'un lot partagent
+la même connexion.
+"""
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext as _
+
+from .models import RAPPEL_TYPE_EMAIL
+
+BACKEND_PAR_DEFAUT = 'apps.cotisations.rappels.EmailRappelBackend'
+
+
+class BaseRappelBackend:
+    """
+    Interface commune des backends de rappels.
+
+    ``envoyer`` lève une exception en cas d'échec et retourne le texte à
+    enregistrer dans ``Rappel.resultat`` en cas de succès.
+    """
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def envoyer(self, rappel):
+        raise NotImplementedError
+
+
+class EmailRappelBackend(BaseRappelBackend):
+    """
+    Envoie les rappels de type email par le backend email de Django, avec une
+    seule connexion (SMTP) pour tout le lot.
+
+    Les autres types (SMS, courrier, appel) n'ont pas de transport automatique :
+    ils sont marqués comme envoyés, comme auparavant.
+    """
+    def __init__(self, connection=None):
+        self.connection = connection
+        self._connexion_propre = connection is None
+
+    def open(self):
+        if self.connection is None:
+            self.connection = get_connection(fail_silently=False)
+        self.connection.open()
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            if self._connexion_propre:
+                self.connection = None
+
+    def envoyer(self, rappel):
+        if rappel.type_rappel != RAPPEL_TYPE_EMAIL:
+            return _("Envoi simulé (aucun transport automatique pour ce type de rappel)")
+
+        if not rappel.membre.email:
+            raise ValueError(_("Le membre n'a pas d'adresse email"))
+
+        message = EmailMessage(
+            subject=_("Rappel de cotisation %(reference)s") % {'reference': rappel.cotisation.reference},
+            body=rappel.contenu or '',
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[rappel.membre.email],
+            connection=self.connection
+        )
+        message.send()
+        return _("Email envoyé à %(email)s") % {'email': rappel.membre.email}
+
+
+def get_backend():
+    """Instancie le backend de rappels configuré."""
+    chemin = getattr(settings, 'COTISATIONS_RAPPELS_BACKEND', BACKEND_PAR_DEFAUT)
+    return import_string(chemin)()
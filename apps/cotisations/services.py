@@ -0,0 +1,1057 @@
+# apps/cotisations/services.py
+"""
+Services métier pour les cotisations.
+
+Ce module regroupe les calculs transverses utilisés par plusieurs vues
+(tableau de bord, statistiques, API) afin de ne pas dupliquer les requêtes
+d'agrégation dans chaque vue.
+"""
+import datetime
+import logging
+import time
+import traceback
+import uuid
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from apps.core.models import Statut
+from apps.core.recherche import index_recherche
+from apps.membres.models import Membre, TypeMembre, MembreTypeMembre
+
+from .models import (
+    Cotisation, Paiement, HistoriqueCotisation, Rappel,
+    COTISATION_STATUT_NON_PAYEE, COTISATION_STATUT_PARTIELLEMENT_PAYEE,
+    COTISATION_STATUT_PAYEE, PAIEMENT_TYPE_PAIEMENT, PAIEMENT_TYPE_REMBOURSEMENT,
+    RAPPEL_ETAT_PLANIFIE, RAPPEL_ETAT_EN_COURS, RAPPEL_ETAT_ENVOYE, RAPPEL_ETAT_ECHOUE,
+    montant_paye_paiements,
+)
+from .rappels import get_backend
+from .signals import historique_cotisation
+
+logger = logging.getLogger(__name__)
+
+# Noms des mois en français, indexés de 0 (janvier) à 11 (décembre)
+MOIS_FR = [
+    'Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin',
+    'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre'
+]
+
+STATUTS_IMPAYES = [COTISATION_STATUT_NON_PAYEE, COTISATION_STATUT_PARTIELLEMENT_PAYEE]
+
+ZERO = Decimal('0.00')
+
+
+def _montant_paye_expression():
+    """Expression SQL du montant déjà réglé d'une cotisation."""
+    return ExpressionWrapper(
+        F('montant') - F('montant_restant'),
+        output_field=DecimalField()
+    )
+
+
+class StatistiquesCotisationsService:
+    """
+    Calcule les agrégats des cotisations et paiements avec un nombre
+    constant de requêtes SQL, quelle que soit la période demandée.
+
+    Chaque série mensuelle est obtenue par une seule requête groupée par
+    modèle (``TruncMonth`` ou champ ``mois``) avec agrégation conditionnelle,
+    puis complétée en mémoire pour les mois sans données.
+
+    Args:
+        cotisations (QuerySet, optional): Cotisations de base (déjà filtrées)
+        paiements (QuerySet, optional): Paiements de base (déjà filtrés)
+    """
+
+    def __init__(self, cotisations=None, paiements=None):
+        self.cotisations = cotisations if cotisations is not None else Cotisation.objects.all()
+        self.paiements = paiements if paiements is not None else Paiement.objects.all()
+
+    #
+    # Agrégats globaux
+    #
+    def totaux(self):
+        """
+        Retourne le nombre de cotisations, le montant total et le montant payé
+        en une seule requête.
+        """
+        data = self.cotisations.aggregate(
+            nombre=Count('id'),
+            montant_total=Sum('montant'),
+            montant_paye=Sum(_montant_paye_expression()),
+        )
+        return {
+            'total_cotisations': data['nombre'] or 0,
+            'montant_total': data['montant_total'] or ZERO,
+            'montant_paye': data['montant_paye'] or ZERO,
+        }
+
+    def totaux_paiements(self):
+        """
+        Retourne les montants encaissés et remboursés en une seule requête.
+        """
+        data = self.paiements.aggregate(
+            montant_paye=Sum('montant', filter=Q(type_transaction=PAIEMENT_TYPE_PAIEMENT)),
+            montant_remboursement=Sum('montant', filter=Q(type_transaction=PAIEMENT_TYPE_REMBOURSEMENT)),
+        )
+        return {
+            'montant_paye': data['montant_paye'] or ZERO,
+            'montant_remboursement': data['montant_remboursement'] or ZERO,
+        }
+
+    def par_statut(self):
+        """Répartition des cotisations par statut de paiement (QuerySet groupé)."""
+        return self.cotisations.values('statut_paiement').annotate(
+            count=Count('id'),
+            total=Sum('montant'),
+            paid=Sum(_montant_paye_expression()),
+        ).order_by('statut_paiement')
+
+    def par_type_membre(self):
+        """Répartition des cotisations par type de membre (QuerySet groupé)."""
+        return self.cotisations.values('type_membre__libelle').annotate(
+            count=Count('id'),
+            total=Sum('montant'),
+            paid=Sum(_montant_paye_expression()),
+        ).order_by('type_membre__libelle')
+
+    @staticmethod
+    def compter_statuts(lignes_statut):
+        """
+        Convertit une répartition par statut en dictionnaire sérialisable
+        contenant toujours les trois statuts de paiement.
+        """
+        statuts = {
+            COTISATION_STATUT_NON_PAYEE: 0,
+            COTISATION_STATUT_PARTIELLEMENT_PAYEE: 0,
+            COTISATION_STATUT_PAYEE: 0,
+        }
+        for ligne in lignes_statut:
+            if ligne['statut_paiement'] in statuts:
+                statuts[ligne['statut_paiement']] = ligne['count']
+        return statuts
+
+    #
+    # Séries mensuelles
+    #
+    def mois_emission(self, annee):
+        """
+        Agrège les cotisations émises par mois de ``date_emission``.
+
+        Returns:
+            list: 12 dictionnaires (``mois``, ``nombre``, ``montant_emis``,
+            ``montant_paye``, ``montant_impaye``)
+        """
+        lignes = self.cotisations.filter(
+            date_emission__year=annee
+        ).annotate(
+            periode=TruncMonth('date_emission')
+        ).values('periode').annotate(
+            nombre=Count('id'),
+            montant_emis=Sum('montant'),
+            montant_paye=Sum(_montant_paye_expression()),
+            montant_impaye=Sum('montant_restant', filter=Q(statut_paiement__in=STATUTS_IMPAYES)),
+        ).order_by('periode')
+
+        return self._completer_mois(
+            {ligne['periode'].month: ligne for ligne in lignes},
+            ['nombre', 'montant_emis', 'montant_paye', 'montant_impaye']
+        )
+
+    def mois_paiement(self, annee, type_transaction=PAIEMENT_TYPE_PAIEMENT):
+        """
+        Agrège les paiements reçus par mois de ``date_paiement``.
+
+        Returns:
+            list: 12 dictionnaires (``mois``, ``nombre``, ``montant``)
+        """
+        lignes = self.paiements.filter(
+            date_paiement__year=annee,
+            type_transaction=type_transaction
+        ).annotate(
+            periode=TruncMonth('date_paiement')
+        ).values('periode').annotate(
+            nombre=Count('id'),
+            montant=Sum('montant'),
+        ).order_by('periode')
+
+        return self._completer_mois(
+            {ligne['periode'].month: ligne for ligne in lignes},
+            ['nombre', 'montant']
+        )
+
+    def mois_periode(self):
+        """
+        Agrège cotisations et paiements par mois de période couverte
+        (champ ``mois`` de la cotisation), en deux requêtes groupées.
+
+        Returns:
+            list: 12 dictionnaires (``mois``, ``montant_cotisations``,
+            ``montant_paiements``)
+        """
+        cotisations = {
+            ligne['mois']: ligne['montant_cotisations']
+            for ligne in self.cotisations.filter(mois__isnull=False).values('mois').annotate(
+                montant_cotisations=Sum('montant')
+            ).order_by('mois')
+        }
+        paiements = {
+            ligne['cotisation__mois']: ligne['montant_paiements']
+            for ligne in self.paiements.filter(
+                type_transaction=PAIEMENT_TYPE_PAIEMENT,
+                cotisation__mois__isnull=False
+            ).values('cotisation__mois').annotate(
+                montant_paiements=Sum('montant')
+            ).order_by('cotisation__mois')
+        }
+
+        return [
+            {
+                'mois': mois,
+                'montant_cotisations': cotisations.get(mois) or ZERO,
+                'montant_paiements': paiements.get(mois) or ZERO,
+            }
+            for mois in range(1, 13)
+        ]
+
+    @staticmethod
+    def serie(lignes, cle):
+        """
+        Transforme une série mensuelle en tableau prêt pour les graphiques
+        (``[{'month': 'Janvier', 'total': 12.5}, ...]``).
+        """
+        return [
+            {'month': MOIS_FR[ligne['mois'] - 1], 'total': float(ligne[cle])}
+            for ligne in lignes
+        ]
+
+    @staticmethod
+    def _completer_mois(lignes_par_mois, cles):
+        """Complète une série groupée avec des zéros pour les mois absents."""
+        serie = []
+        for mois in range(1, 13):
+            ligne = lignes_par_mois.get(mois, {})
+            valeurs = {'mois': mois}
+            for cle in cles:
+                defaut = 0 if cle == 'nombre' else ZERO
+                valeurs[cle] = ligne.get(cle) or defaut
+            serie.append(valeurs)
+        return serie
+
+
+class ImportCotisationsService:
+    """
+    Moteur d'importation des cotisations par lots.
+    
+    Les lignes sont validées par lots de ``batch_size`` : les membres et
+    leurs types actifs sont résolus par quelques requêtes ``IN`` par lot,
+    les références sont générées en masse, puis cotisations et historiques
+    sont écrits par ``bulk_create`` dans une transaction par lot.
+    
+    Les erreurs sont rapportées ligne par ligne, avec les mêmes messages
+    que l'import unitaire. Si l'écriture d'un lot échoue, ses lignes sont
+    rejouées une à une pour identifier les lignes fautives.
+    
+    Args:
+        statut (Statut): Statut attribué aux cotisations créées
+        force_import (bool): Créer les membres inconnus et appliquer des
+            valeurs par défaut aux champs invalides
+        batch_size (int): Nombre de lignes par lot
+    """
+    
+    FORMATS_DATE = [
+        '%Y-%m-%d',       # YYYY-MM-DD
+        '%d/%m/%Y',       # DD/MM/YYYY
+        '%d-%m-%Y',       # DD-MM-YYYY
+        '%m/%d/%Y',       # MM/DD/YYYY (format US)
+        '%d.%m.%Y',       # DD.MM.YYYY
+    ]
+    
+    def __init__(self, statut, force_import=False, batch_size=500):
+        self.statut = statut
+        self.force_import = force_import
+        self.batch_size = max(1, batch_size)
+        self.results = {
+            'success': 0,
+            'errors': 0,
+            'total': 0,
+            'details': []
+        }
+        
+        # Caches conservés d'un lot à l'autre
+        self._membres = {}
+        self._types_actifs = {}
+        self._types_par_libelle = None
+        self._type_par_defaut = None
+        self._statut_membre = None
+    
+    #
+    # Points d'entrée
+    #
+    def importer(self, lignes):
+        """
+        Importe les lignes par lots.
+        
+        Args:
+            lignes (iterable): Couples ``(numéro de ligne, données)``
+            
+        Returns:
+            dict: Résultats (``success``, ``errors``, ``total``, ``details``)
+        """
+        lot = []
+        for ligne in lignes:
+            lot.append(ligne)
+            if len(lot) >= self.batch_size:
+                self._traiter_lot(lot)
+                lot = []
+        if lot:
+            self._traiter_lot(lot)
+        
+        return self._terminer()
+    
+    def importer_ligne_par_ligne(self, lignes):
+        """
+        Importe les lignes une à une (résolution et ``save()`` par ligne).
+        Chemin historique, conservé comme référence de comparaison.
+        """
+        for row_num, row_data in lignes:
+            ligne = self._preparer_ligne(row_num, row_data, charger=True)
+            if ligne is not None:
+                self._enregistrer_unitaire(ligne)
+        
+        return self._terminer()
+    
+    def _terminer(self):
+        # Les succès d'un lot sont connus après son écriture : rétablir l'ordre du fichier
+        self.results['details'].sort(key=lambda detail: detail['row'])
+        self.results['total'] = self.results['success'] + self.results['errors']
+        return self.results
+    
+    #
+    # Traitement par lots
+    #
+    def _traiter_lot(self, lot):
+        """Valide puis enregistre un lot de lignes."""
+        # Résolution groupée des membres et de leurs types actifs
+        emails = {str(row_data.get('email', '')).strip() for _, row_data in lot}
+        self._charger_membres(emails)
+        self._charger_types_actifs(
+            [self._membres[email].pk for email in emails if email in self._membres]
+        )
+        
+        lignes = []
+        for row_num, row_data in lot:
+            ligne = self._preparer_ligne(row_num, row_data)
+            if ligne is not None:
+                lignes.append(ligne)
+        
+        if lignes:
+            self._enregistrer_lot(lignes)
+    
+    def _enregistrer_lot(self, lignes):
+        """Écrit un lot de cotisations et leurs historiques par bulk_create."""
+        cotisations = [ligne['cotisation'] for ligne in lignes]
+        
+        try:
+            with transaction.atomic():
+                Cotisation.generer_references(cotisations)
+                for cotisation in cotisations:
+                    cotisation._initialiser_creation()
+                    cotisation._mettre_a_jour_statut_paiement()
+                
+                Cotisation.objects.bulk_create(cotisations, batch_size=self.batch_size)
+                index_recherche.indexer_objets(cotisations)
+                HistoriqueCotisation.objects.bulk_create(
+                    [historique_cotisation(cotisation, True) for cotisation in cotisations],
+                    batch_size=self.batch_size
+                )
+        except Exception as e:
+            # Transaction annulée : rejouer chaque ligne pour isoler les erreurs
+            logger.warning(f"Échec de l'écriture groupée ({e}), reprise ligne par ligne")
+            for ligne in lignes:
+                cotisation = ligne['cotisation']
+                cotisation.pk = None
+                cotisation.reference = None
+                cotisation._state.adding = True
+                self._enregistrer_unitaire(ligne)
+            return
+        
+        for ligne in lignes:
+            self._ajouter_succes(ligne)
+    
+    def _enregistrer_unitaire(self, ligne):
+        """Enregistre une cotisation via save() (signaux compris)."""
+        try:
+            with transaction.atomic():
+                ligne['cotisation'].save()
+            self._ajouter_succes(ligne)
+        except Exception as e:
+            logger.error(f"Erreur lors de la création de la cotisation: {str(e)}")
+            logger.error(traceback.format_exc())
+            
+            self._ajouter_erreur(
+                ligne['row'],
+                _("Erreur lors de la création: {}").format(str(e)),
+                membre=self._decrire_membre(ligne['membre']), montant=ligne['montant']
+            )
+    
+    #
+    # Validation d'une ligne
+    #
+    def _preparer_ligne(self, row_num, row_data, charger=False):
+        """
+        Valide une ligne et construit la cotisation correspondante (non enregistrée).
+        
+        Args:
+            charger (bool): Résoudre membre et types pour cette seule ligne
+                (import unitaire) au lieu d'utiliser les données du lot
+                
+        Returns:
+            dict: Ligne préparée, ou None si une erreur a été rapportée
+        """
+        try:
+            # Vérifier si toutes les données nécessaires sont présentes
+            email = str(row_data.get('email', '')).strip()
+            montant_str = str(row_data.get('montant', '')).strip().replace(',', '.')
+            
+            # Vérifier les données obligatoires
+            if not email:
+                self._ajouter_erreur(row_num, _("Email manquant"))
+                return None
+            
+            if not montant_str:
+                self._ajouter_erreur(row_num, _("Montant manquant"))
+                return None
+            
+            # Convertir le montant
+            try:
+                montant = Decimal(montant_str)
+                if montant <= 0:
+                    self._ajouter_erreur(row_num, _("Le montant doit être supérieur à zéro"))
+                    return None
+            except (InvalidOperation, ValueError, TypeError):
+                self._ajouter_erreur(row_num, _("Montant invalide: {}").format(montant_str))
+                return None
+            
+            # Trouver le membre
+            if charger:
+                self._charger_membres([email])
+            membre = self._membres.get(email)
+            
+            # Si le membre n'existe pas, essayer de le créer
+            if not membre and self.force_import:
+                membre = self._creer_membre(row_data, email)
+                if not membre:
+                    self._ajouter_erreur(
+                        row_num,
+                        _("Impossible de créer le membre avec l'email '{}'").format(email),
+                        email=email, montant=montant
+                    )
+                    return None
+            
+            # Si le membre n'existe toujours pas
+            if not membre:
+                self._ajouter_erreur(
+                    row_num,
+                    _("Membre introuvable avec l'email '{}'").format(email),
+                    email=email, montant=montant
+                )
+                return None
+            
+            # Traiter les dates
+            date_emission, date_echeance = self._extraire_dates(row_data)
+            if date_emission is None and not self.force_import:
+                self._ajouter_erreur(
+                    row_num,
+                    _("Date d'émission invalide: {}").format(row_data.get('date_emission', '')),
+                    membre=membre, montant=montant
+                )
+                return None
+            
+            if date_echeance is None and 'date_echeance' in row_data and row_data['date_echeance'] and not self.force_import:
+                self._ajouter_erreur(
+                    row_num,
+                    _("Date d'échéance invalide: {}").format(row_data['date_echeance']),
+                    membre=membre, montant=montant
+                )
+                return None
+            
+            # Trouver le type de membre
+            if charger:
+                self._charger_types_actifs([membre.pk])
+            type_membre = self._trouver_type_membre(row_data, membre)
+            if type_membre is None and 'type_membre' in row_data and row_data['type_membre'] and not self.force_import:
+                self._ajouter_erreur(
+                    row_num,
+                    _("Type de membre non trouvé: {}").format(row_data['type_membre']),
+                    membre=membre, montant=montant
+                )
+                return None
+            
+            # Récupérer le montant restant et déterminer le statut de paiement
+            montant_restant, statut_paiement = self.extraire_paiement(row_data, montant)
+            
+            return {
+                'row': row_num,
+                'membre': membre,
+                'montant': montant,
+                'cotisation': self._construire_cotisation(
+                    membre, montant, montant_restant, statut_paiement,
+                    date_emission, date_echeance, type_membre
+                ),
+            }
+        
+        except Exception as e:
+            logger.error(f"Erreur lors du traitement de la ligne {row_num}: {str(e)}")
+            logger.error(traceback.format_exc())
+            
+            self._ajouter_erreur(row_num, _("Erreur inattendue: {}").format(str(e)))
+            return None
+    
+    def _construire_cotisation(self, membre, montant, montant_restant, statut_paiement,
+                               date_emission, date_echeance, type_membre):
+        """Construit une cotisation non enregistrée avec les données fournies."""
+        cotisation = Cotisation(
+            membre=membre,
+            montant=montant,
+            montant_restant=montant_restant,
+            statut=self.statut,
+            statut_paiement=statut_paiement,
+            type_membre=type_membre,
+        )
+        
+        # Ajouter les champs optionnels si présents
+        if date_emission:
+            cotisation.date_emission = date_emission
+            cotisation.periode_debut = date_emission
+            cotisation.mois = date_emission.month
+            cotisation.annee = date_emission.year
+        
+        if date_echeance:
+            cotisation.date_echeance = date_echeance
+            cotisation.periode_fin = date_echeance
+        
+        return cotisation
+    
+    #
+    # Résolution des membres et types de membre
+    #
+    def _charger_membres(self, emails):
+        """Charge en une requête les membres des emails absents du cache."""
+        manquants = [email for email in emails if email and email not in self._membres]
+        if manquants:
+            for membre in Membre.objects.filter(email__in=manquants):
+                self._membres.setdefault(membre.email, membre)
+    
+    def _charger_types_actifs(self, membres_ids):
+        """Charge en une requête les types actifs des membres absents du cache."""
+        manquants = [pk for pk in membres_ids if pk not in self._types_actifs]
+        if not manquants:
+            return
+        
+        for pk in manquants:
+            self._types_actifs[pk] = None
+        
+        associations = MembreTypeMembre.objects.filter(
+            membre_id__in=manquants,
+            date_fin__isnull=True
+        ).select_related('type_membre')
+        for association in associations:
+            if self._types_actifs[association.membre_id] is None:
+                self._types_actifs[association.membre_id] = association.type_membre
+    
+    def _trouver_type_membre(self, row_data, membre):
+        """Récupère le type de membre à partir des données de la ligne ou du membre."""
+        # Essayer d'abord à partir des données de la ligne
+        if 'type_membre' in row_data and row_data['type_membre']:
+            if self._types_par_libelle is None:
+                self._types_par_libelle = {}
+                for type_membre in TypeMembre.objects.all():
+                    self._types_par_libelle.setdefault(type_membre.libelle.lower(), type_membre)
+            
+            type_membre = self._types_par_libelle.get(row_data['type_membre'].strip().lower())
+            if type_membre:
+                return type_membre
+        
+        # Si pas dans les données ou pas trouvé, utiliser le type actif du membre
+        type_membre = self._types_actifs.get(membre.pk)
+        if type_membre:
+            return type_membre
+        
+        # Si force_import est activé, utiliser le type de membre par défaut
+        if self.force_import:
+            if self._type_par_defaut is None:
+                self._type_par_defaut = (
+                    TypeMembre.objects.filter(libelle__iexact='Standard').first()
+                    or TypeMembre.objects.first()  # Prendre le premier type disponible
+                )
+            return self._type_par_defaut
+        
+        return None
+    
+    def _creer_membre(self, row_data, email):
+        """Crée un nouveau membre à partir des données de la ligne."""
+        try:
+            # Extraire les informations du membre
+            nom_prenom = row_data.get('membre', '').strip()
+            
+            # Diviser le nom complet en nom et prénom
+            if nom_prenom:
+                parts = nom_prenom.split(' ', 1)
+                if len(parts) > 1:
+                    prenom, nom = parts
+                else:
+                    nom = parts[0]
+                    prenom = ""
+            else:
+                # Si le nom n'est pas fourni, utiliser l'email comme base
+                nom = email.split('@')[0]
+                prenom = ""
+            
+            # Créer le statut par défaut pour les membres si nécessaire
+            if self._statut_membre is None:
+                self._statut_membre = Statut.objects.filter(nom__iexact='Actif').first()
+                if not self._statut_membre:
+                    self._statut_membre = Statut.objects.create(
+                        nom='Actif',
+                        description='Statut par défaut pour les membres'
+                    )
+            
+            # Créer le nouveau membre
+            membre = Membre.objects.create(
+                nom=nom.upper() if nom else "NOM",
+                prenom=prenom.capitalize() if prenom else "Prénom",
+                email=email,
+                statut=self._statut_membre,
+                # Même référence que la validation des membres (signal pre_save)
+                date_adhesion=timezone.now().date()
+            )
+            self._membres[email] = membre
+            self._types_actifs[membre.pk] = None
+            
+            # Récupérer et assigner le type de membre si disponible
+            type_membre_nom = row_data.get('type_membre', '').strip()
+            if type_membre_nom:
+                type_membre = TypeMembre.objects.filter(libelle__iexact=type_membre_nom).first()
+                if type_membre:
+                    # Créer une association entre le membre et le type de membre
+                    MembreTypeMembre.objects.create(
+                        membre=membre,
+                        type_membre=type_membre,
+                        date_debut=timezone.now().date()
+                    )
+                    self._types_actifs[membre.pk] = type_membre
+            
+            logger.info(f"Membre créé automatiquement: {email}")
+            return membre
+            
+        except Exception as e:
+            # En cas d'erreur lors de la création du membre
+            logger.error(f"Erreur lors de la création automatique du membre: {str(e)}")
+            logger.error(traceback.format_exc())
+            return None
+    
+    #
+    # Analyse des valeurs
+    #
+    def _extraire_dates(self, row_data):
+        """Extrait et valide les dates d'une ligne."""
+        date_emission = None
+        date_echeance = None
+        
+        # Traiter la date d'émission
+        if 'date_emission' in row_data and row_data['date_emission']:
+            try:
+                date_emission = self.parser_date(row_data['date_emission'])
+            except ValueError:
+                if self.force_import:
+                    # Utiliser la date actuelle si force_import est activé
+                    date_emission = datetime.datetime.now().date()
+                else:
+                    return None, None
+        else:
+            # Par défaut, utiliser la date actuelle
+            date_emission = datetime.datetime.now().date()
+        
+        # Traiter la date d'échéance
+        if 'date_echeance' in row_data and row_data['date_echeance']:
+            try:
+                date_echeance = self.parser_date(row_data['date_echeance'])
+            except ValueError:
+                if self.force_import:
+                    # Par défaut, la date d'échéance est à 1 an de la date d'émission
+                    date_echeance = date_emission.replace(year=date_emission.year + 1)
+                else:
+                    return date_emission, None
+        else:
+            # Par défaut, la date d'échéance est à 1 an de la date d'émission
+            date_echeance = date_emission.replace(year=date_emission.year + 1)
+        
+        return date_emission, date_echeance
+    
+    @staticmethod
+    def extraire_paiement(row_data, montant):
+        """Récupère le montant restant et le statut de paiement d'une ligne."""
+        # Montant restant par défaut = montant total
+        montant_restant = montant
+        
+        # Récupérer le montant restant s'il est spécifié
+        if 'montant_restant' in row_data and row_data['montant_restant']:
+            try:
+                montant_restant_str = str(row_data['montant_restant']).strip().replace(',', '.')
+                montant_restant = Decimal(montant_restant_str)
+                # Valider le montant restant
+                if montant_restant < 0:
+                    montant_restant = Decimal('0.00')
+                elif montant_restant > montant:
+                    montant_restant = montant
+            except (InvalidOperation, ValueError, TypeError):
+                # En cas d'erreur dans le format, utiliser le montant total
+                pass
+        
+        # Déterminer le statut de paiement
+        statut_paiement = 'non_payee'  # Par défaut
+        
+        if 'statut_paiement' in row_data and row_data['statut_paiement']:
+            statut_str = row_data['statut_paiement'].strip().lower()
+            
+            if 'payée' in statut_str or 'payee' in statut_str or 'pay' in statut_str:
+                if 'partiel' in statut_str or 'partial' in statut_str:
+                    statut_paiement = 'partiellement_payee'
+                    # Si le montant restant n'a pas été explicitement défini
+                    if montant_restant == montant:
+                        montant_restant = montant * Decimal('0.5')  # 50% par défaut
+                else:
+                    statut_paiement = 'payee'
+                    montant_restant = Decimal('0')
+        
+        # Si le montant restant est 0, la cotisation est payée
+        if montant_restant == 0:
+            statut_paiement = 'payee'
+        # Si le montant restant est entre 0 et le montant total, partiellement payée
+        elif montant_restant < montant:
+            statut_paiement = 'partiellement_payee'
+        
+        return montant_restant, statut_paiement
+    
+    @classmethod
+    def parser_date(cls, date_str):
+        """Parse une date à partir d'une chaîne de caractères."""
+        date_str = str(date_str).strip()
+        
+        # Essayer différents formats de date
+        for fmt in cls.FORMATS_DATE:
+            try:
+                return datetime.datetime.strptime(date_str, fmt).date()
+            except ValueError:
+                continue
+        
+        # Si on arrive ici, aucun format n'a fonctionné
+        raise ValueError(f"Format de date non reconnu: {date_str}")
+    
+    #
+    # Résultats
+    #
+    @staticmethod
+    def _decrire_membre(membre):
+        return f"{membre.prenom} {membre.nom} ({membre.email})"
+    
+    def _ajouter_succes(self, ligne):
+        self.results['success'] += 1
+        self.results['details'].append({
+            'row': ligne['row'],
+            'status': 'success',
+            'membre': self._decrire_membre(ligne['membre']),
+            'montant': float(ligne['montant']),
+            'message': _("Cotisation créée avec succès")
+        })
+    
+    def _ajouter_erreur(self, row_num, message, **kwargs):
+        """Ajoute une erreur détaillée aux résultats."""
+        self.results['errors'] += 1
+        
+        # Créer un dictionnaire de détails
+        detail = {
+            'row': row_num,
+            'status': 'error',
+            'message': message
+        }
+        
+        # Ajouter les kwargs comme informations supplémentaires
+        for key, value in kwargs.items():
+            if isinstance(value, Decimal):
+                detail[key] = float(value)
+            else:
+                detail[key] = value
+        
+        self.results['details'].append(detail)
+
+
+class EnvoiRappelsService:
+    """
+    Envoi par lots des rappels planifiés arrivés à échéance.
+    
+    Chaque lot est réservé par une mise à jour conditionnelle (``planifie`` →
+    ``en_cours`` avec un jeton propre au lot) : plusieurs workers peuvent
+    tourner en parallèle sans envoyer deux fois le même rappel. Les rappels
+    d'un lot partagent une ouverture du backend (une connexion SMTP) et leurs
+    états finaux sont écrits par un seul ``bulk_update``.
+    
+    Une réservation plus ancienne que ``delai_reservation`` secondes (worker
+    interrompu) est rendue à l'état planifié au début de l'exécution suivante.
+    
+    Args:
+        taille_lot (int): Nombre de rappels réservés par lot
+        backend: Backend d'envoi (par défaut COTISATIONS_RAPPELS_BACKEND)
+        delai_reservation (int): Durée de validité d'une réservation, en secondes
+    """
+    
+    CHAMPS_FINALISATION = ['etat', 'date_envoi_reel', 'resultat', 'jeton_envoi', 'date_reservation', 'updated_at']
+    
+    def __init__(self, taille_lot=None, backend=None, delai_reservation=None):
+        self.taille_lot = max(1, taille_lot or getattr(settings, 'COTISATIONS_RAPPELS_TAILLE_LOT', 100))
+        self.backend = backend or get_backend()
+        self.delai_reservation = delai_reservation or getattr(
+            settings, 'COTISATIONS_RAPPELS_DELAI_RESERVATION', 900
+        )
+        self.metriques = {
+            'lots': 0,
+            'reserves': 0,
+            'envoyes': 0,
+            'echoues': 0,
+            'liberes': 0,
+            'duree': 0.0,
+        }
+    
+    def executer(self, max_lots=None):
+        """
+        Traite les rappels dus, lot par lot, jusqu'à épuisement.
+        
+        Args:
+            max_lots (int): Nombre maximal de lots pour cette exécution
+            
+        Returns:
+            dict: Métriques (``lots``, ``reserves``, ``envoyes``, ``echoues``,
+            ``liberes``, ``duree`` en secondes et ``debit`` en rappels/s)
+        """
+        debut = time.perf_counter()
+        try:
+            self.metriques['liberes'] = self.liberer_reservations_expirees()
+            while max_lots is None or self.metriques['lots'] < max_lots:
+                jeton = self.reserver_lot()
+                if jeton is None:
+                    break
+                self.envoyer_lot(jeton)
+        finally:
+            self._terminer(debut)
+        return self.metriques
+    
+    def reserver_lot(self):
+        """
+        Réserve le prochain lot de rappels dus.
+        
+        Returns:
+            UUID: Jeton du lot, ou None s'il n'y a plus de rappel à envoyer
+        """
+        while True:
+            maintenant = timezone.now()
+            candidats = list(
+                Rappel.objects.filter(etat=RAPPEL_ETAT_PLANIFIE, date_envoi__lte=maintenant)
+                .order_by('date_envoi', 'pk')
+                .values_list('pk', flat=True)[:self.taille_lot]
+            )
+            if not candidats:
+                return None
+            
+            jeton = uuid.uuid4()
+            # La condition sur l'état écarte les rappels pris entre-temps par un autre worker
+            reserves = Rappel.objects.filter(pk__in=candidats, etat=RAPPEL_ETAT_PLANIFIE).update(
+                etat=RAPPEL_ETAT_EN_COURS,
+                jeton_envoi=jeton,
+                date_reservation=maintenant,
+                updated_at=maintenant
+            )
+            if reserves:
+                self.metriques['reserves'] += reserves
+                return jeton
+    
+    def envoyer_lot(self, jeton):
+        """
+        Envoie les rappels réservés sous ``jeton`` et enregistre leur état final.
+        
+        Si le backend ne peut pas être ouvert, le lot est rendu à l'état
+        planifié et l'erreur est propagée.
+        
+        Returns:
+            list: Rappels du lot, avec leur état final
+        """
+        rappels = list(
+            Rappel.objects.filter(jeton_envoi=jeton, etat=RAPPEL_ETAT_EN_COURS)
+            .select_related('membre', 'cotisation')
+            .order_by('pk')
+        )
+        if not rappels:
+            return rappels
+        
+        try:
+            self.backend.open()
+        except Exception:
+            logger.exception(f"Ouverture du backend de rappels impossible, lot {jeton} remis en attente")
+            Rappel.objects.filter(jeton_envoi=jeton, etat=RAPPEL_ETAT_EN_COURS).update(
+                etat=RAPPEL_ETAT_PLANIFIE, jeton_envoi=None, date_reservation=None
+            )
+            raise
+        
+        try:
+            for rappel in rappels:
+                try:
+                    rappel.resultat = self.backend.envoyer(rappel) or ''
+                    rappel.etat = RAPPEL_ETAT_ENVOYE
+                    rappel.date_envoi_reel = timezone.now()
+                    self.metriques['envoyes'] += 1
+                except Exception as e:
+                    logger.error(f"Erreur lors de l'envoi du rappel {rappel.pk}: {e}")
+                    rappel.resultat = str(e)
+                    rappel.etat = RAPPEL_ETAT_ECHOUE
+                    self.metriques['echoues'] += 1
+        finally:
+            self.backend.close()
+        
+        maintenant = timezone.now()
+        for rappel in rappels:
+            rappel.jeton_envoi = None
+            rappel.date_reservation = None
+            rappel.updated_at = maintenant
+        Rappel.objects.bulk_update(rappels, self.CHAMPS_FINALISATION)
+        
+        self.metriques['lots'] += 1
+        return rappels
+    
+    def liberer_reservations_expirees(self):
+        """Rend à l'état planifié les réservations abandonnées ; retourne leur nombre."""
+        limite = timezone.now() - datetime.timedelta(seconds=self.delai_reservation)
+        return Rappel.objects.filter(
+            etat=RAPPEL_ETAT_EN_COURS,
+            date_reservation__lt=limite
+        ).update(etat=RAPPEL_ETAT_PLANIFIE, jeton_envoi=None, date_reservation=None)
+    
+    def _terminer(self, debut):
+        """Calcule la durée et le débit de l'exécution."""
+        duree = time.perf_counter() - debut
+        self.metriques['duree'] = round(duree, 3)
+        self.metriques['debit'] = round(self.metriques['envoyes'] / duree, 1) if duree else 0.0
+
+
+class SoldeCotisationsService:
+    """
+    Recalcul du montant restant et du statut de paiement des cotisations à
+    partir de leurs paiements (non supprimés).
+    
+    Pour une cotisation, le montant réglé est obtenu par un seul ``SUM``
+    signé (paiements moins remboursements). En masse, les cotisations sont
+    parcourues par lots de clés primaires : une requête groupée par
+    cotisation calcule les montants réglés du lot, puis les cotisations dont
+    le solde a changé sont corrigées par un ``UPDATE`` par couple (montant
+    restant, statut), sans signaux ni historique.
+    
+    Args:
+        taille_lot (int): Nombre de cotisations traitées par lot
+    """
+    
+    def __init__(self, taille_lot=None):
+        self.taille_lot = max(1, taille_lot or getattr(settings, 'COTISATIONS_SOLDES_TAILLE_LOT', 2000))
+    
+    def recalculer(self, cotisation, sauvegarder=True):
+        """
+        Recalcule le solde d'une cotisation.
+        
+        Args:
+            cotisation (Cotisation): Cotisation à recalculer
+            sauvegarder (bool): Enregistrer le montant restant et le statut
+            
+        Returns:
+            Decimal: Nouveau montant restant
+        """
+        montant_restant = cotisation.recalculer_montant_restant()
+        if sauvegarder:
+            cotisation.save(update_fields=['montant_restant', 'statut_paiement'])
+        return montant_restant
+    
+    def recalculer_en_masse(self, cotisations=None, simulation=False):
+        """
+        Recalcule le solde d'un ensemble de cotisations.
+        
+        Args:
+            cotisations (QuerySet): Cotisations à recalculer (par défaut
+                toutes, y compris celles de la corbeille)
+            simulation (bool): Compter les écarts sans les corriger
+            
+        Returns:
+            dict: Métriques (``cotisations`` examinées, ``corrigees``,
+            ``lots``, ``duree`` en secondes)
+        """
+        if cotisations is None:
+            cotisations = Cotisation.objects.with_deleted()
+        
+        metriques = {'cotisations': 0, 'corrigees': 0, 'lots': 0}
+        debut = time.perf_counter()
+        dernier_id = 0
+        while True:
+            lot = list(
+                cotisations.filter(pk__gt=dernier_id)
+                .order_by('pk')
+                .values_list('pk', 'montant', 'montant_restant', 'statut_paiement')[:self.taille_lot]
+            )
+            if not lot:
+                break
+            dernier_id = lot[-1][0]
+            
+            corrections = self._corrections(lot)
+            if corrections and not simulation:
+                maintenant = timezone.now()
+                with transaction.atomic():
+                    for (montant_restant, statut_paiement), pks in corrections.items():
+                        Cotisation.objects.with_deleted().filter(pk__in=pks).update(
+                            montant_restant=montant_restant,
+                            statut_paiement=statut_paiement,
+                            updated_at=maintenant
+                        )
+            
+            metriques['cotisations'] += len(lot)
+            metriques['corrigees'] += sum(len(pks) for pks in corrections.values())
+            metriques['lots'] += 1
+        
+        metriques['duree'] = round(time.perf_counter() - debut, 3)
+        return metriques
+    
+    def _corrections(self, lot):
+        """
+        Cotisations du lot dont le solde enregistré diffère du solde calculé.
+        
+        Args:
+            lot (list): Tuples ``(pk, montant, montant_restant, statut_paiement)``
+            
+        Returns:
+            dict: ``{(montant_restant, statut_paiement): [pk, ...]}``
+        """
+        montants_payes = dict(
+            Paiement.objects.filter(cotisation_id__in=[ligne[0] for ligne in lot])
+            .values('cotisation_id')
+            .annotate(total=montant_paye_paiements())
+            .order_by()
+            .values_list('cotisation_id', 'total')
+        )
+        
+        corrections = {}
+        for pk, montant, montant_restant, statut_paiement in lot:
+            solde = max(ZERO, montant - (montants_payes.get(pk) or ZERO))
+            statut = Cotisation.statut_pour_solde(montant, solde)
+            if (solde, statut) != (montant_restant, statut_paiement):
+                corrections.setdefault((solde, statut), []).append(pk)
+        return corrections
@@ -5,6 +5,8 @@ from django.utils import timezone
 from datetime import datetime
 import json
 
+from apps.core.audit import enregistrer
+
 from .models import Cotisation, Paiement, HistoriqueCotisation
 
 
@@ -27,11 +29,10 @@ def format_date(date_value):
         return date_value.isoformat()
 
 
-@receiver(post_save, sender=Cotisation)
-def post_save_cotisation(sender, instance, created, **kwargs):
+def historique_cotisation(instance, created):
     """
-    Signal exécuté après la sauvegarde d'une cotisation.
-    Crée une entrée dans l'historique des cotisations.
+    Construit (sans l'enregistrer) l'entrée d'historique d'une cotisation.
+    Partagée entre le signal post_save et les créations en masse.
     """
     # Préparer les détails à enregistrer dans l'historique
     details = {
@@ -45,26 +46,33 @@ def post_save_cotisation(sender, instance, created, **kwargs):
         'periode_fin': format_date(instance.periode_fin),
     }
     
-    # Créer l'entrée d'historique
-    HistoriqueCotisation.objects.create(
+    return HistoriqueCotisation(
         cotisation=instance,
         action='creation' if created else 'modification',
         details=json.dumps(details),
-        utilisateur=instance.cree_par if created else instance.modifie_par,
+        utilisateur_id=instance.cree_par_id if created else instance.modifie_par_id,
         date_action=timezone.now()
     )
 
 
+@receiver(post_save, sender=Cotisation)
+def post_save_cotisation(sender, instance, created, **kwargs):
+    """
+    Signal exécuté après la sauvegarde d'une cotisation.
+    Crée une entrée dans l'historique des cotisations.
+    """
+    enregistrer(historique_cotisation(instance, created))
+
+
 @receiver(post_save, sender=Paiement)
 def post_save_paiement(sender, instance, created, **kwargs):
     """
     Signal exécuté après la sauvegarde d'un paiement.
     Met à jour le montant restant et le statut de la cotisation associée.
     """
-    # Mettre à jour la cotisation
+    # Mettre à jour la cotisation (une seule fois, voir Paiement.mettre_a_jour_solde_cotisation)
     cotisation = instance.cotisation
-    cotisation.recalculer_montant_restant()
-    cotisation.save(update_fields=['montant_restant', 'statut_paiement'])
+    instance.mettre_a_jour_solde_cotisation()
     
     # Enregistrer dans l'historique
     details = {
@@ -77,13 +85,13 @@ def post_save_paiement(sender, instance, created, **kwargs):
         'nouveau_statut_paiement': cotisation.statut_paiement,
     }
     
-    HistoriqueCotisation.objects.create(
+    enregistrer(HistoriqueCotisation(
         cotisation=cotisation,
         action='paiement_ajoute' if created else 'paiement_modifie',
         details=json.dumps(details),
-        utilisateur=instance.cree_par if created else instance.modifie_par,
+        utilisateur_id=instance.cree_par_id if created else instance.modifie_par_id,
         date_action=timezone.now()
-    )
+    ))
 
 
 @receiver(post_delete, sender=Paiement)
@@ -95,8 +103,7 @@ def post_delete_paiement(sender, instance, **kwargs):
     # Vérifier si la cotisation existe encore
     try:
         cotisation = instance.cotisation
-        cotisation.recalculer_montant_restant()
-        cotisation.save(update_fields=['montant_restant', 'statut_paiement'])
+        instance.mettre_a_jour_solde_cotisation()
         
         # Enregistrer dans l'historique
         details = {
@@ -109,12 +116,12 @@ def post_delete_paiement(sender, instance, **kwargs):
             'nouveau_statut_paiement': cotisation.statut_paiement,
         }
         
-        HistoriqueCotisation.objects.create(
+        enregistrer(HistoriqueCotisation(
             cotisation=cotisation,
             action='paiement_supprime',
             details=json.dumps(details),
             date_action=timezone.now()
-        )
+        ))
     except Cotisation.DoesNotExist:
         # La cotisation a déjà été supprimée, rien à faire
         pass
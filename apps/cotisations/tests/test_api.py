@@ -306,4 +306,61 @@ class TestRappelCreateAjax(TestCase):
         
         response_data = json.loads(response.content)
         self.assertFalse(response_data['success'])
-        self.assertIn('errors', response_data)
\ No newline at end of file
+        self.assertIn('errors', response_data)
+
+class TestApiEnvoyerRappelsAutomatiques(TestCase):
+    """Tests pour l'API api_envoyer_rappels_automatiques."""
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="staff_rappels",
+            email="staff_rappels@example.com",
+            password="password123",
+            is_staff=True
+        )
+        self.client.force_login(self.user)
+        
+        echeance = timezone.now().date() - datetime.timedelta(days=60)
+        self.cotisations = []
+        for i in range(3):
+            membre = Membre.objects.create(nom=f"Retard{i}", prenom="Test", email=f"retard{i}@example.com")
+            self.cotisations.append(Cotisation.objects.create(
+                membre=membre,
+                montant=Decimal("30.00"),
+                montant_restant=Decimal("30.00"),
+                date_emission=echeance - datetime.timedelta(days=30),
+                date_echeance=echeance,
+                periode_debut=echeance - datetime.timedelta(days=30),
+                annee=echeance.year,
+                mois=echeance.month
+            ))
+        
+        # Un rappel récent pour la première cotisation
+        Rappel.objects.create(
+            membre=self.cotisations[0].membre,
+            cotisation=self.cotisations[0],
+            type_rappel='email',
+            etat='envoye'
+        )
+    
+    def test_rappels_recents_ignores_et_envoi_groupe(self):
+        from django.core import mail
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('cotisations:api_envoyer_rappels_automatiques'))
+        
+        stats = json.loads(response.content)['stats']
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual(stats['rappels_crees'], 2)
+        self.assertEqual(stats['rappels_envoyes'], 2)
+        statuts = {detail['reference']: detail['status'] for detail in stats['details']}
+        self.assertEqual(statuts[self.cotisations[0].reference], 'ignored')
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(Rappel.objects.filter(etat='envoye', cree_par=self.user).count(), 2)
+        
+        # Aucune requête par cotisation pour détecter les rappels récents
+        self.assertFalse([
+            q for q in ctx.captured_queries
+            if q['sql'].startswith('SELECT 1 AS "a" FROM "cotisations_rappel"')
+        ])
@@ -114,7 +114,7 @@ class TestExportUtils(TestCase):
         self.assertTrue('attachment; filename="cotisations_' in response['Content-Disposition'])
         
         # Lire le contenu CSV
-        content = response.content.decode('utf-8')
+        content = b''.join(response.streaming_content).decode('utf-8')
         csv_reader = csv.reader(io.StringIO(content))
         rows = list(csv_reader)
         
@@ -152,7 +152,7 @@ class TestExportUtils(TestCase):
         self.assertTrue('attachment; filename="cotisations_' in response['Content-Disposition'])
         
         # Vérifier que le contenu est un fichier Excel valide (présence de contenu)
-        self.assertTrue(len(response.content) > 0)
+        self.assertTrue(len(b''.join(response.streaming_content)) > 0)
     
     def test_export_paiements_csv(self):
         """Vérifier que l'export CSV des paiements fonctionne."""
@@ -163,13 +163,46 @@ class TestExportUtils(TestCase):
         self.assertTrue('attachment; filename="paiements_' in response['Content-Disposition'])
         
         # Lire le contenu CSV
-        content = response.content.decode('utf-8')
+        content = b''.join(response.streaming_content).decode('utf-8')
         csv_reader = csv.reader(io.StringIO(content))
         rows = list(csv_reader)
         
         # Vérifier que le nombre de lignes est correct (en-tête + 2 paiements)
         self.assertEqual(len(rows), 3)
-    
+        ligne = next(row for row in rows if row[0] == 'COT-2023-001')
+        self.assertEqual(ligne[1], 'Jean DUPONT')
+        self.assertEqual(ligne[4], 'Carte bancaire')
+
+    def test_export_csv_en_flux_requetes_constantes(self):
+        """Vérifier que l'export CSV est envoyé en flux, en une seule requête."""
+        for i in range(10):
+            Cotisation.objects.create(
+                membre=self.membre,
+                montant=Decimal('10.00'),
+                montant_restant=Decimal('10.00'),
+                date_emission=self.cotisation1.date_emission,
+                date_echeance=self.cotisation1.date_echeance,
+                periode_debut=self.cotisation1.periode_debut,
+                reference=f'COT-FLUX-{i:03d}',
+                type_membre=self.type_membre,
+                annee=self.cotisation1.annee,
+                mois=self.cotisation1.mois
+            )
+
+        response = export_cotisations_csv(Cotisation.objects.all())
+        self.assertTrue(response.streaming)
+
+        # Aucune requête avant la lecture du flux, une seule pendant
+        with self.assertNumQueries(1):
+            content = b''.join(response.streaming_content).decode('utf-8')
+
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(len(rows), 13)
+        ligne = next(row for row in rows if row[0] == 'COT-2023-002')
+        self.assertEqual(ligne[1:3], ['Jean DUPONT', 'jean.dupont@example.com'])
+        self.assertEqual(ligne[7], 'Partiellement payée')
+        self.assertEqual(ligne[8], 'Standard')
+
     def test_export_paiements_excel(self):
         """Vérifier que l'export Excel des paiements fonctionne."""
         # Vérifier si xlsxwriter est disponible
@@ -187,10 +220,27 @@ class TestExportUtils(TestCase):
             'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         )
         self.assertTrue('attachment; filename="paiements_' in response['Content-Disposition'])
-        
+
         # Vérifier que le contenu est un fichier Excel valide
-        self.assertTrue(len(response.content) > 0)
-    
+        self.assertTrue(len(b''.join(response.streaming_content)) > 0)
+
+    def test_export_excel_memoire_constante(self):
+        """Vérifier le contenu de l'export Excel écrit en une seule requête."""
+        from openpyxl import load_workbook
+
+        with self.assertNumQueries(1):
+            response = export_cotisations_excel(Cotisation.objects.order_by('reference'))
+        self.assertTrue(response.streaming)
+
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        rows = list(workbook.active.iter_rows(values_only=True))
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1][:4], ('COT-2023-001', 'Jean DUPONT', 'jean.dupont@example.com', 100))
+        self.assertEqual(rows[2][7], 'Partiellement payée')
+        self.assertEqual(rows[2][5].date(), self.cotisation2.date_emission)
+        self.assertEqual(workbook.active.auto_filter.ref, 'A1:I3')
+
     def test_generer_rapport_cotisations_pdf(self):
         """Vérifier que la génération de rapport PDF fonctionne."""
         # Vérifier si reportlab est disponible
@@ -354,7 +404,7 @@ class TestExportViews(TestCase):
         )
         
         # Lire le contenu CSV
-        content = response.content.decode('utf-8')
+        content = b''.join(response.streaming_content).decode('utf-8')
         csv_reader = csv.reader(io.StringIO(content))
         rows = list(csv_reader)
         
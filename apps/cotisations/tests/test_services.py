@@ -0,0 +1,454 @@
+# apps/cotisations/tests/test_services.py
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.corbeille import compteurs_corbeille
+from apps.core.models import Statut
+from apps.evenements.models import Evenement
+from apps.membres.models import Membre, TypeMembre, MembreTypeMembre
+from apps.cotisations.models import Cotisation, Paiement, ModePaiement, HistoriqueCotisation, Rappel
+from apps.cotisations.services import (
+    EnvoiRappelsService, ImportCotisationsService, SoldeCotisationsService, StatistiquesCotisationsService
+)
+
+User = get_user_model()
+
+
+class TestStatistiquesCotisationsService(TestCase):
+    """
+    Tests pour le service d'agrégation des cotisations.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.annee = timezone.now().year
+        cls.type_membre = TypeMembre.objects.create(libelle="Standard")
+        cls.membre = Membre.objects.create(
+            nom="Dupont",
+            prenom="Jean",
+            email="jean.dupont@example.com"
+        )
+        cls.mode_paiement = ModePaiement.objects.create(libelle="Virement")
+
+        # Une cotisation en mars (payée partiellement) et une en juillet (non payée)
+        cls.cotisation_mars = cls._creer_cotisation(3, Decimal('100.00'))
+        cls.cotisation_juillet = cls._creer_cotisation(7, Decimal('50.00'))
+
+        Paiement.objects.create(
+            cotisation=cls.cotisation_mars,
+            montant=Decimal('40.00'),
+            date_paiement=timezone.make_aware(datetime.datetime(cls.annee, 4, 15, 12, 0)),
+            mode_paiement=cls.mode_paiement,
+            type_transaction='paiement'
+        )
+
+    @classmethod
+    def _creer_cotisation(cls, mois, montant):
+        date_emission = datetime.date(cls.annee, mois, 10)
+        return Cotisation.objects.create(
+            membre=cls.membre,
+            montant=montant,
+            montant_restant=montant,
+            date_emission=date_emission,
+            date_echeance=date_emission + datetime.timedelta(days=30),
+            periode_debut=date_emission,
+            annee=cls.annee,
+            mois=mois,
+            type_membre=cls.type_membre
+        )
+
+    def test_totaux(self):
+        totaux = StatistiquesCotisationsService().totaux()
+        self.assertEqual(totaux['total_cotisations'], 2)
+        self.assertEqual(totaux['montant_total'], Decimal('150.00'))
+        self.assertEqual(totaux['montant_paye'], Decimal('40.00'))
+
+    def test_mois_emission(self):
+        service = StatistiquesCotisationsService()
+        with self.assertNumQueries(1):
+            serie = service.mois_emission(self.annee)
+
+        self.assertEqual(len(serie), 12)
+        self.assertEqual(serie[2]['montant_emis'], Decimal('100.00'))
+        self.assertEqual(serie[2]['montant_impaye'], Decimal('60.00'))
+        self.assertEqual(serie[6]['montant_impaye'], Decimal('50.00'))
+        self.assertEqual(serie[0]['montant_emis'], Decimal('0.00'))
+
+    def test_mois_paiement(self):
+        service = StatistiquesCotisationsService()
+        with self.assertNumQueries(1):
+            serie = service.mois_paiement(self.annee)
+
+        self.assertEqual(serie[3]['nombre'], 1)
+        self.assertEqual(serie[3]['montant'], Decimal('40.00'))
+        self.assertEqual(sum(ligne['nombre'] for ligne in serie), 1)
+
+    def test_mois_periode(self):
+        service = StatistiquesCotisationsService(
+            cotisations=Cotisation.objects.filter(annee=self.annee),
+            paiements=Paiement.objects.filter(cotisation__annee=self.annee)
+        )
+        with self.assertNumQueries(2):
+            serie = service.mois_periode()
+
+        self.assertEqual(serie[2]['montant_cotisations'], Decimal('100.00'))
+        self.assertEqual(serie[2]['montant_paiements'], Decimal('40.00'))
+        self.assertEqual(serie[6]['montant_paiements'], Decimal('0.00'))
+
+    def test_serie_et_statuts(self):
+        service = StatistiquesCotisationsService()
+        serie = service.serie(service.mois_emission(self.annee), 'montant_emis')
+        self.assertEqual(serie[2], {'month': 'Mars', 'total': 100.0})
+
+        statuts = service.compter_statuts(service.par_statut())
+        self.assertEqual(statuts, {'non_payee': 1, 'partiellement_payee': 1, 'payee': 0})
+
+
+class TestDashboardQueries(TestCase):
+    """
+    Le nombre de requêtes du tableau de bord ne dépend pas du volume de données.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='staff',
+            email='staff@example.com',
+            password='testpassword',
+            is_staff=True
+        )
+        self.client.force_login(self.user)
+        # Activité de session récente : pas d'écriture de session pendant les mesures
+        session = self.client.session
+        session['last_activity'] = timezone.now().timestamp()
+        session.save()
+        self.membre = Membre.objects.create(nom="Martin", prenom="Paul", email="paul.martin@example.com")
+        # Compteurs de la corbeille en cache : pas de COUNT au premier rendu mesuré
+        for modele in (Membre, Cotisation, Evenement):
+            compteurs_corbeille.compter(modele)
+
+    def _ajouter_cotisations(self, nombre):
+        today = timezone.now().date()
+        for i in range(nombre):
+            emission = today.replace(month=(i % 12) + 1, day=1)
+            Cotisation.objects.create(
+                membre=self.membre,
+                montant=Decimal('10.00'),
+                montant_restant=Decimal('10.00'),
+                date_emission=emission,
+                date_echeance=emission + datetime.timedelta(days=30),
+                periode_debut=emission,
+                annee=emission.year,
+                mois=emission.month
+            )
+
+    def _compter_requetes(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('cotisations:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_nombre_de_requetes_constant(self):
+        self._ajouter_cotisations(2)
+        requetes_initiales = self._compter_requetes()
+
+        self._ajouter_cotisations(24)
+        self.assertEqual(self._compter_requetes(), requetes_initiales)
+
+
+class TestImportCotisationsService(TestCase):
+    """
+    Tests pour l'import des cotisations par lots.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.statut = Statut.objects.create(nom="En attente")
+        cls.type_standard = TypeMembre.objects.create(libelle="Standard")
+        cls.type_etudiant = TypeMembre.objects.create(libelle="Étudiant")
+        cls.membres = [
+            Membre.objects.create(nom=f"Membre{i}", prenom="Test", email=f"membre{i}@example.com")
+            for i in range(3)
+        ]
+        MembreTypeMembre.objects.create(
+            membre=cls.membres[0],
+            type_membre=cls.type_etudiant,
+            date_debut=datetime.date(2024, 1, 1)
+        )
+
+    def _lignes(self):
+        return [
+            (2, {'email': 'membre0@example.com', 'montant': '50,00', 'date_emission': '15/03/2025'}),
+            (3, {'email': '', 'montant': '10'}),
+            (4, {'email': 'inconnu@example.com', 'montant': '10'}),
+            (5, {'email': 'membre1@example.com', 'montant': 'abc'}),
+            (6, {'email': 'membre1@example.com', 'montant': '30', 'type_membre': 'standard',
+                 'statut_paiement': 'Payée'}),
+            (7, {'email': 'membre2@example.com', 'montant': '20', 'date_emission': '2025-13-45'}),
+            (8, {'email': 'membre2@example.com', 'montant': '20', 'type_membre': 'Inexistant'}),
+        ]
+
+    def _resume(self, results):
+        return [(detail['row'], detail['status'], str(detail['message'])) for detail in results['details']]
+
+    def test_import_par_lots(self):
+        results = ImportCotisationsService(self.statut, batch_size=3).importer(self._lignes())
+
+        self.assertEqual(results['total'], 7)
+        self.assertEqual(results['success'], 2)
+        self.assertEqual(results['errors'], 5)
+        self.assertEqual([detail['row'] for detail in results['details']], [2, 3, 4, 5, 6, 7, 8])
+
+        cotisation = Cotisation.objects.get(membre=self.membres[0])
+        self.assertEqual(cotisation.montant, Decimal('50.00'))
+        self.assertEqual(cotisation.type_membre, self.type_etudiant)
+        self.assertEqual((cotisation.mois, cotisation.annee), (3, 2025))
+        self.assertTrue(cotisation.reference.startswith('COT-'))
+        self.assertEqual(cotisation.historique.filter(action='creation').count(), 1)
+
+        self.assertEqual(Cotisation.objects.get(membre=self.membres[1]).type_membre, self.type_standard)
+
+    def test_memes_erreurs_que_l_import_unitaire(self):
+        par_lots = ImportCotisationsService(self.statut).importer(self._lignes())
+        Cotisation._base_manager.all().delete()
+        unitaire = ImportCotisationsService(self.statut).importer_ligne_par_ligne(self._lignes())
+
+        self.assertEqual(self._resume(par_lots), self._resume(unitaire))
+
+    def test_nombre_de_requetes_independant_du_volume(self):
+        def lignes(nombre):
+            return [
+                (i + 2, {'email': f'membre{i % 3}@example.com', 'montant': '10', 'type_membre': 'Standard'})
+                for i in range(nombre)
+            ]
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as petit:
+            ImportCotisationsService(self.statut, batch_size=100).importer(lignes(5))
+        with CaptureQueriesContext(connection) as grand:
+            ImportCotisationsService(self.statut, batch_size=100).importer(lignes(80))
+
+        # Seules les insertions groupées (limitées en paramètres par SQLite) augmentent
+        self.assertLess(len(grand.captured_queries), len(petit.captured_queries) + 5)
+        self.assertEqual(Cotisation.objects.count(), 85)
+        self.assertEqual(len(set(Cotisation.objects.values_list('reference', flat=True))), 85)
+
+    def test_reprise_ligne_par_ligne_si_le_lot_echoue(self):
+        from unittest import mock
+
+        with mock.patch.object(HistoriqueCotisation.objects, 'bulk_create', side_effect=Exception("échec")):
+            results = ImportCotisationsService(self.statut).importer(self._lignes())
+
+        self.assertEqual(results['success'], 2)
+        self.assertEqual(Cotisation.objects.count(), 2)
+        self.assertEqual(HistoriqueCotisation.objects.filter(action='creation').count(), 2)
+
+    def test_force_import_cree_le_membre(self):
+        results = ImportCotisationsService(self.statut, force_import=True).importer([
+            (2, {'email': 'nouveau@example.com', 'montant': '15', 'membre': 'Jean Nouveau'}),
+            (3, {'email': 'nouveau@example.com', 'montant': '25'}),
+        ])
+
+        self.assertEqual(results['success'], 2)
+        membre = Membre.objects.get(email='nouveau@example.com')
+        self.assertEqual(membre.cotisations.count(), 2)
+        self.assertEqual(Cotisation.objects.filter(membre=membre).first().type_membre, self.type_standard)
+
+
+class TestEnvoiRappelsService(TestCase):
+    """
+    Tests pour l'envoi des rappels planifiés par lots.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.membre = Membre.objects.create(nom="Durand", prenom="Marie", email="marie.durand@example.com")
+        cls.sans_email = Membre.objects.create(nom="Sans", prenom="Email", email="sans.email@example.com")
+        Membre.objects.filter(pk=cls.sans_email.pk).update(email='')
+        date_emission = datetime.date(2025, 1, 1)
+        cls.cotisation = Cotisation.objects.create(
+            membre=cls.membre,
+            montant=Decimal('50.00'),
+            montant_restant=Decimal('50.00'),
+            date_emission=date_emission,
+            date_echeance=date_emission + datetime.timedelta(days=30),
+            periode_debut=date_emission,
+            annee=2025,
+            mois=1
+        )
+
+    def _creer_rappels(self, nombre, membre=None, **kwargs):
+        kwargs.setdefault('date_envoi', timezone.now() - datetime.timedelta(hours=1))
+        return Rappel.objects.bulk_create([
+            Rappel(
+                membre=membre or self.membre,
+                cotisation=self.cotisation,
+                type_rappel='email',
+                contenu=f"Rappel {i}",
+                **kwargs
+            )
+            for i in range(nombre)
+        ])
+
+    def test_envoi_par_lots(self):
+        from django.core import mail
+
+        self._creer_rappels(5)
+        self._creer_rappels(1, date_envoi=timezone.now() + datetime.timedelta(days=1))
+
+        metriques = EnvoiRappelsService(taille_lot=2).executer()
+
+        self.assertEqual((metriques['lots'], metriques['reserves'], metriques['envoyes']), (3, 5, 5))
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].to, ['marie.durand@example.com'])
+        self.assertEqual(Rappel.objects.filter(etat='envoye', date_envoi_reel__isnull=False).count(), 5)
+        self.assertEqual(Rappel.objects.filter(etat='planifie').count(), 1)
+        self.assertFalse(Rappel.objects.filter(jeton_envoi__isnull=False).exists())
+
+    def test_une_connexion_et_une_ecriture_par_lot(self):
+        from unittest import mock
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self._creer_rappels(4)
+        backend = mock.Mock()
+        backend.envoyer.return_value = "ok"
+
+        with CaptureQueriesContext(connection) as ctx:
+            EnvoiRappelsService(taille_lot=10, backend=backend).executer()
+
+        self.assertEqual(backend.open.call_count, 1)
+        self.assertEqual(backend.envoyer.call_count, 4)
+        mises_a_jour = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        # Libération des réservations expirées, réservation du lot, finalisation groupée
+        self.assertEqual(len(mises_a_jour), 3)
+
+    def test_rappels_reserves_par_un_autre_worker_ignores(self):
+        self._creer_rappels(3)
+        autre = EnvoiRappelsService(taille_lot=2)
+        jeton = autre.reserver_lot()
+
+        metriques = EnvoiRappelsService(taille_lot=10).executer()
+
+        self.assertEqual(metriques['envoyes'], 1)
+        self.assertEqual(Rappel.objects.filter(jeton_envoi=jeton, etat='en_cours').count(), 2)
+
+    def test_echec_et_reservation_expiree(self):
+        self._creer_rappels(1, membre=self.sans_email)
+        self._creer_rappels(
+            1,
+            etat='en_cours',
+            date_reservation=timezone.now() - datetime.timedelta(hours=1)
+        )
+
+        metriques = EnvoiRappelsService().executer()
+
+        self.assertEqual(metriques['liberes'], 1)
+        self.assertEqual((metriques['envoyes'], metriques['echoues']), (1, 1))
+        echoue = Rappel.objects.get(etat='echoue')
+        self.assertEqual(echoue.membre, self.sans_email)
+        self.assertIn("adresse email", echoue.resultat)
+
+    def test_lot_remis_en_attente_si_le_backend_est_indisponible(self):
+        from unittest import mock
+
+        self._creer_rappels(2)
+        backend = mock.Mock()
+        backend.open.side_effect = ConnectionRefusedError("SMTP indisponible")
+
+        with self.assertRaises(ConnectionRefusedError):
+            EnvoiRappelsService(backend=backend).executer()
+
+        self.assertEqual(Rappel.objects.filter(etat='planifie', jeton_envoi__isnull=True).count(), 2)
+
+
+class TestSoldeCotisationsService(TestCase):
+    """
+    Tests pour le recalcul des soldes des cotisations.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.membre = Membre.objects.create(nom="Solde", prenom="Test", email="solde@example.com")
+        cls.cotisations = [cls._creer_cotisation(Decimal('100.00')) for _ in range(5)]
+
+        # Paiement, remboursement, rejet et paiement supprimé sur la première cotisation
+        premiere = cls.cotisations[0]
+        Paiement.objects.create(cotisation=premiere, montant=Decimal('80.00'), type_transaction='paiement')
+        Paiement.objects.create(cotisation=premiere, montant=Decimal('20.00'), type_transaction='remboursement')
+        Paiement.objects.create(cotisation=premiere, montant=Decimal('50.00'), type_transaction='rejet')
+        Paiement.objects.create(cotisation=premiere, montant=Decimal('10.00'), type_transaction='paiement').delete()
+        Paiement.objects.create(cotisation=cls.cotisations[1], montant=Decimal('100.00'), type_transaction='paiement')
+
+    @classmethod
+    def _creer_cotisation(cls, montant):
+        aujourd_hui = timezone.now().date()
+        return Cotisation.objects.create(
+            membre=cls.membre,
+            montant=montant,
+            montant_restant=montant,
+            date_emission=aujourd_hui,
+            date_echeance=aujourd_hui + datetime.timedelta(days=30),
+            periode_debut=aujourd_hui
+        )
+
+    def test_montant_paye_en_une_requete(self):
+        cotisation = Cotisation.objects.get(pk=self.cotisations[0].pk)
+        with self.assertNumQueries(1):
+            montant_restant = SoldeCotisationsService().recalculer(cotisation, sauvegarder=False)
+
+        self.assertEqual(montant_restant, Decimal('40.00'))
+        self.assertEqual(cotisation.statut_paiement, 'partiellement_payee')
+
+    def test_un_seul_recalcul_par_paiement(self):
+        cotisation = Cotisation.objects.get(pk=self.cotisations[2].pk)
+        nb_historiques = HistoriqueCotisation.objects.filter(cotisation=cotisation, action='modification').count()
+
+        Paiement.objects.create(cotisation=cotisation, montant=Decimal('30.00'), type_transaction='paiement')
+
+        cotisation.refresh_from_db()
+        self.assertEqual(cotisation.montant_restant, Decimal('70.00'))
+        self.assertEqual(
+            HistoriqueCotisation.objects.filter(cotisation=cotisation, action='modification').count(),
+            nb_historiques + 1
+        )
+
+    def test_restauration_paiement_recalcule_le_solde(self):
+        cotisation = Cotisation.objects.get(pk=self.cotisations[3].pk)
+        paiement = Paiement.objects.create(cotisation=cotisation, montant=Decimal('25.00'))
+        paiement.delete()
+        cotisation.refresh_from_db()
+        self.assertEqual(cotisation.montant_restant, Decimal('100.00'))
+
+        paiement.restore()
+        cotisation.refresh_from_db()
+        self.assertEqual(cotisation.montant_restant, Decimal('75.00'))
+
+    def test_recalcul_en_masse(self):
+        # Soldes corrompus par des écritures hors ORM
+        Cotisation.objects.filter(pk__in=[c.pk for c in self.cotisations]).update(
+            montant_restant=Decimal('100.00'), statut_paiement='non_payee'
+        )
+
+        # 3 lots (cotisations puis paiements), lot vide, 2 corrections (une par solde) et leur savepoint
+        with self.assertNumQueries(2 * 3 + 1 + 2 + 2):
+            metriques = SoldeCotisationsService(taille_lot=2).recalculer_en_masse()
+
+        self.assertEqual(metriques['cotisations'], 5)
+        self.assertEqual(metriques['corrigees'], 2)
+        soldes = dict(Cotisation.objects.values_list('pk', 'montant_restant'))
+        self.assertEqual(soldes[self.cotisations[0].pk], Decimal('40.00'))
+        self.assertEqual(soldes[self.cotisations[1].pk], Decimal('0.00'))
+        self.assertEqual(Cotisation.objects.get(pk=self.cotisations[1].pk).statut_paiement, 'payee')
+
+    def test_simulation(self):
+        Cotisation.objects.filter(pk=self.cotisations[0].pk).update(montant_restant=Decimal('100.00'))
+
+        metriques = SoldeCotisationsService().recalculer_en_masse(simulation=True)
+
+        self.assertEqual(metriques['corrigees'], 1)
+        self.assertEqual(Cotisation.objects.get(pk=self.cotisations[0].pk).montant_restant, Decimal('100.00'))
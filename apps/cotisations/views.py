@@ -10,6 +10,7 @@ import json
 import logging
 import os
 import tempfile
+import uuid
 from datetime import datetime as dt
 import traceback
 from decimal import Decimal, InvalidOperation
@@ -18,6 +19,7 @@ from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 
 # Importations Django
+from django.conf import settings
 from django.contrib import messages
 from django import forms
 from django.contrib.auth.decorators import login_required
@@ -25,7 +27,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.core.serializers.json import DjangoJSONEncoder
-from django.db.models import Q, Sum, Count, F, ExpressionWrapper, DecimalField
+from django.db.models import Q, Sum, Count, F, ExpressionWrapper, DecimalField, Exists, OuterRef
 from django.http import JsonResponse, HttpResponse, HttpResponseForbidden
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse, reverse_lazy
@@ -48,12 +50,15 @@ except ImportError:
 # Importations des applications
 from apps.core.mixins import StaffRequiredMixin, TrashViewMixin, RestoreViewMixin
 from apps.core.models import Statut
-from apps.membres.models import Membre, TypeMembre, MembreTypeMembre
+from apps.core.recherche import index_recherche
+from apps.membres.models import Membre, TypeMembre
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import View
 from apps.core.mixins import StaffRequiredMixin
 # Importations locales
+from apps.core.exports import exporter_en_arriere_plan, lancer_export
 from . import export_utils
+from .services import EnvoiRappelsService, ImportCotisationsService, StatistiquesCotisationsService
 from .models import (
     Cotisation, Paiement, ModePaiement, BaremeCotisation,
     Rappel, HistoriqueCotisation, ConfigurationCotisation
@@ -64,7 +69,7 @@ from .forms import (
     ConfigurationCotisationForm
 )
 
-from apps.cotisations.models import Rappel, RAPPEL_ETAT_PLANIFIE, RAPPEL_ETAT_ENVOYE, RAPPEL_ETAT_ECHOUE, RAPPEL_ETAT_LU
+from apps.cotisations.models import Rappel, RAPPEL_ETAT_PLANIFIE, RAPPEL_ETAT_EN_COURS, RAPPEL_ETAT_ENVOYE, RAPPEL_ETAT_ECHOUE, RAPPEL_ETAT_LU
 
 # Configuration du logging
 logger = logging.getLogger(__name__)
@@ -132,40 +137,26 @@ class DashboardView(StaffRequiredMixin, TemplateView):
         if date_debut and date_fin:
             cotisations_filter &= Q(date_emission__gte=date_debut, date_emission__lte=date_fin)
         
-        # Statistiques générales
-        total_cotisations = Cotisation.objects.filter(cotisations_filter).count()
-        montant_total = Cotisation.objects.filter(cotisations_filter).aggregate(
-            total=Sum('montant')
-        ).get('total') or Decimal('0.00')
+        # Toutes les agrégations passent par le service (nombre de requêtes constant)
+        stats_service = StatistiquesCotisationsService(
+            cotisations=Cotisation.objects.filter(cotisations_filter)
+        )
         
-        montant_paye = Cotisation.objects.filter(cotisations_filter).aggregate(
-            total=Sum(ExpressionWrapper(
-                F('montant') - F('montant_restant'),
-                output_field=DecimalField()
-            ))
-        ).get('total') or Decimal('0.00')
+        # Statistiques générales
+        totaux = stats_service.totaux()
+        total_cotisations = totaux['total_cotisations']
+        montant_total = totaux['montant_total']
+        montant_paye = totaux['montant_paye']
         
         taux_recouvrement = 0
         if montant_total > 0:
             taux_recouvrement = (montant_paye / montant_total * 100).quantize(Decimal('0.01'))
         
         # Cotisations par statut
-        cotisations_par_statut = Cotisation.objects.filter(cotisations_filter).values('statut_paiement').annotate(
-            count=Count('id'),
-            total=Sum('montant'),
-            paid=Sum(ExpressionWrapper(
-                F('montant') - F('montant_restant'),
-                output_field=DecimalField()
-            ))
-        ).order_by('statut_paiement')
+        cotisations_par_statut = list(stats_service.par_statut())
         
         # Cotisations par type de membre
-        cotisations_par_type = Cotisation.objects.filter(cotisations_filter).values(
-            'type_membre__libelle'
-        ).annotate(
-            count=Count('id'),
-            total=Sum('montant')
-        ).order_by('type_membre__libelle')
+        cotisations_par_type = list(stats_service.par_type_membre())
         
         # Préparation des données pour le JSON des types de membre
         cotisations_par_type_data = []
@@ -179,55 +170,19 @@ class DashboardView(StaffRequiredMixin, TemplateView):
                 'total': float(item['total'] or 0)
             })
         
-        # Définir les noms des mois en français
-        mois_fr = [
-            'Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin',
-            'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre'
-        ]
-        
         # Cotisations par mois (pour graphique)
         cotisations_par_mois = []
         paiements_par_mois = []
         cotisations_non_payees_par_mois = []
         
         if periode == 'year':
-            for month_idx, month_name in enumerate(mois_fr, 1):
-                # Cotisations émises ce mois
-                month_cotisations = Cotisation.objects.filter(
-                    date_emission__year=annee,
-                    date_emission__month=month_idx
-                )
-                
-                # Paiements reçus ce mois
-                month_paiements = Paiement.objects.filter(
-                    date_paiement__year=annee,
-                    date_paiement__month=month_idx,
-                    type_transaction='paiement'
-                )
-                
-                # Cotisations non payées émises ce mois
-                month_non_payees = month_cotisations.filter(
-                    statut_paiement__in=['non_payee', 'partiellement_payee']
-                )
-                
-                montant_cotisations = month_cotisations.aggregate(total=Sum('montant')).get('total') or Decimal('0.00')
-                montant_paiements = month_paiements.aggregate(total=Sum('montant')).get('total') or Decimal('0.00')
-                montant_non_payees = month_non_payees.aggregate(total=Sum('montant_restant')).get('total') or Decimal('0.00')
-                
-                cotisations_par_mois.append({
-                    'month': month_name,
-                    'total': float(montant_cotisations)
-                })
-                
-                paiements_par_mois.append({
-                    'month': month_name,
-                    'total': float(montant_paiements)
-                })
-                
-                cotisations_non_payees_par_mois.append({
-                    'month': month_name,
-                    'total': float(montant_non_payees)
-                })
+            # Une requête groupée par modèle au lieu de trois requêtes par mois
+            mois_emission = stats_service.mois_emission(annee)
+            mois_paiement = stats_service.mois_paiement(annee)
+            
+            cotisations_par_mois = stats_service.serie(mois_emission, 'montant_emis')
+            paiements_par_mois = stats_service.serie(mois_paiement, 'montant')
+            cotisations_non_payees_par_mois = stats_service.serie(mois_emission, 'montant_impaye')
         
         # TOP 5 des membres avec le plus de cotisations impayées
         top_membres_impayes = Cotisation.objects.filter(
@@ -240,9 +195,13 @@ class DashboardView(StaffRequiredMixin, TemplateView):
             total=Sum('montant_restant')
         ).order_by('-total')[:5]
         
-        # Cotisations en retard et à échéance proche
+        # Cotisations en retard et à échéance proche (seules les 5 premières sont affichées)
         cotisations_retard = Cotisation.objects.en_retard()
         cotisations_echeance = Cotisation.objects.a_echeance(jours=30)
+        nb_cotisations_retard = cotisations_retard.count()
+        nb_cotisations_echeance = cotisations_echeance.count()
+        cotisations_retard = list(cotisations_retard.select_related('membre')[:5])
+        cotisations_echeance = list(cotisations_echeance.select_related('membre')[:5])
         
         # S'assurer que les données JSON sont bien formatées
         try:
@@ -252,16 +211,7 @@ class DashboardView(StaffRequiredMixin, TemplateView):
             cotisations_non_payees_par_mois_json = json.dumps(cotisations_non_payees_par_mois, cls=ExtendedJSONEncoder, ensure_ascii=False)
             
             # Sérialiser les données de statut
-            statuts_data = {
-                'non_payee': 0,
-                'partiellement_payee': 0,
-                'payee': 0
-            }
-            
-            for statut in cotisations_par_statut:
-                statut_key = statut['statut_paiement']
-                if statut_key in statuts_data:
-                    statuts_data[statut_key] = statut['count']
+            statuts_data = stats_service.compter_statuts(cotisations_par_statut)
             
             statuts_json = json.dumps(statuts_data, cls=ExtendedJSONEncoder, ensure_ascii=False)
             
@@ -298,8 +248,8 @@ class DashboardView(StaffRequiredMixin, TemplateView):
             'types_json': types_json,
             'cotisations_retard': cotisations_retard,
             'cotisations_echeance': cotisations_echeance,
-            'nb_cotisations_retard': cotisations_retard.count(),
-            'nb_cotisations_echeance': cotisations_echeance.count(),
+            'nb_cotisations_retard': nb_cotisations_retard,
+            'nb_cotisations_echeance': nb_cotisations_echeance,
             'top_membres_impayes': top_membres_impayes,
             'now': timezone.now(),
         })
@@ -364,13 +314,7 @@ class CotisationListView(StaffRequiredMixin, ListView):
                 )
             
             if terme := form.cleaned_data.get('terme'):
-                queryset = queryset.filter(
-                    Q(reference__icontains=terme) |
-                    Q(commentaire__icontains=terme) |
-                    Q(membre__nom__icontains=terme) |
-                    Q(membre__prenom__icontains=terme) |
-                    Q(membre__email__icontains=terme)
-                )
+                queryset = index_recherche.filtrer(queryset, terme)
         
         return queryset.select_related('membre', 'type_membre', 'statut')
     
@@ -2223,13 +2167,6 @@ class ImportCotisationsView(StaffRequiredMixin, TemplateView):
 		
     def _import_data(self, file_path, mappings, force_import=False):
             """Importe les données du fichier dans la base de données."""
-            results = {
-                'success': 0,
-                'errors': 0,
-                'total': 0,
-                'details': []
-            }
-            
             try:
                 # Déterminer le type de fichier
                 file_extension = os.path.splitext(file_path)[1].lower()
@@ -2244,26 +2181,41 @@ class ImportCotisationsView(StaffRequiredMixin, TemplateView):
                 
                 # Parser le fichier selon son type
                 if file_extension == '.csv':
-                    self._import_from_csv(file_path, mappings, results, default_status, force_import)
+                    lignes = self._import_from_csv(file_path, mappings)
                 elif file_extension in ['.xls', '.xlsx']:
                     if not PANDAS_AVAILABLE:
                         raise ImportError(_("Le support des fichiers Excel nécessite pandas. Veuillez l'installer ou utiliser un fichier CSV."))
-                    self._import_from_excel(file_path, mappings, results, default_status, force_import)
+                    lignes = self._import_from_excel(file_path, mappings)
                 else:
                     raise ValueError(_("Format de fichier non pris en charge."))
                 
-                # Mettre à jour le total
-                results['total'] = results['success'] + results['errors']
-                
-                return results
+                # Import par lots (résolution groupée et bulk_create)
+                service = ImportCotisationsService(
+                    default_status,
+                    force_import=force_import,
+                    batch_size=getattr(settings, 'COTISATIONS_IMPORT_BATCH_SIZE', 500)
+                )
+                return service.importer(lignes)
                 
             except Exception as e:
                 logger.error(f"Erreur lors de l'importation des données: {str(e)}")
                 logger.error(traceback.format_exc())
                 raise
     
-    def _import_from_csv(self, file_path, mappings, results, default_status, force_import):
-        """Importe les données à partir d'un fichier CSV."""
+    def _apply_mappings(self, row_data, mappings):
+        """Applique le mappage des colonnes à une ligne."""
+        if mappings:
+            mapped_data = {}
+            for field, column in mappings.items():
+                if column in row_data:
+                    mapped_data[field] = row_data[column]
+            
+            if mapped_data:
+                return mapped_data
+        return row_data
+    
+    def _import_from_csv(self, file_path, mappings):
+        """Lit un fichier CSV et produit les couples (numéro de ligne, données)."""
         try:
             # Ouvrir le fichier en mode binaire puis le décoder manuellement
             with default_storage.open(file_path, 'rb') as binary_file:
@@ -2303,29 +2255,16 @@ class ImportCotisationsView(StaffRequiredMixin, TemplateView):
                     elif len(row) > len(headers):
                         row = row[:len(headers)]
                     
-                    # Créer un dictionnaire pour la ligne
-                    row_data = dict(zip(headers, row))
-                    
-                    # Appliquer les mappings
-                    if mappings:
-                        mapped_data = {}
-                        for field, column in mappings.items():
-                            if column in row_data:
-                                mapped_data[field] = row_data[column]
-                        
-                        if mapped_data:
-                            row_data = mapped_data
-                    
-                    # Traiter la ligne
-                    self._process_row(row_data, i, results, default_status, force_import)
+                    # Créer un dictionnaire pour la ligne et appliquer les mappings
+                    yield i, self._apply_mappings(dict(zip(headers, row)), mappings)
     
         except Exception as e:
             logger.error(f"Erreur lors de l'importation CSV: {str(e)}")
             logger.error(traceback.format_exc())
             raise
     
-    def _import_from_excel(self, file_path, mappings, results, default_status, force_import):
-        """Importe les données à partir d'un fichier Excel."""
+    def _import_from_excel(self, file_path, mappings):
+        """Lit un fichier Excel et produit les couples (numéro de ligne, données)."""
         try:
             # Ouvrir le fichier avec pandas
             df = pd.read_excel(default_storage.path(file_path))
@@ -2334,393 +2273,20 @@ class ImportCotisationsView(StaffRequiredMixin, TemplateView):
             headers = [str(col).strip().lower() for col in df.columns]
             
             # Traiter chaque ligne
-            for i, (_, row) in enumerate(df.iterrows(), start=2):  # Commencer à 2 car la ligne 1 est l'en-tête
+            for i, row in enumerate(df.itertuples(index=False), start=2):  # Commencer à 2 car la ligne 1 est l'en-tête
                 # Convertir les valeurs nan en chaînes vides
                 row_data = {headers[j]: ('' if pd.isna(val) else str(val)) for j, val in enumerate(row)}
                 
-                # Appliquer les mappings
-                if mappings:
-                    mapped_data = {}
-                    for field, column in mappings.items():
-                        if column in row_data:
-                            mapped_data[field] = row_data[column]
-                    
-                    if mapped_data:
-                        row_data = mapped_data
-                
-                # Traiter la ligne
-                self._process_row(row_data, i, results, default_status, force_import)
+                yield i, self._apply_mappings(row_data, mappings)
         
         except Exception as e:
             logger.error(f"Erreur lors de l'importation Excel: {str(e)}")
             logger.error(traceback.format_exc())
             raise
     
-    def _process_row(self, row_data, row_num, results, default_status, force_import):
-        """Traite une ligne pour l'importation."""
-        try:
-            # Vérifier si toutes les données nécessaires sont présentes
-            email = row_data.get('email', '').strip()
-            montant_str = str(row_data.get('montant', '')).strip().replace(',', '.')
-            
-            # Vérifier les données obligatoires
-            if not email:
-                self._add_error_detail(results, row_num, _("Email manquant"))
-                return
-            
-            if not montant_str:
-                self._add_error_detail(results, row_num, _("Montant manquant"))
-                return
-            
-            # Convertir le montant
-            try:
-                montant = Decimal(montant_str)
-                if montant <= 0:
-                    self._add_error_detail(results, row_num, _("Le montant doit être supérieur à zéro"))
-                    return
-            except (InvalidOperation, ValueError, TypeError):
-                self._add_error_detail(results, row_num, _("Montant invalide: {}").format(montant_str))
-                return
-            
-            # Trouver le membre
-            membre = Membre.objects.filter(email=email).first()
-            
-            # Si le membre n'existe pas, essayer de le créer
-            if not membre and force_import:
-                membre = self._create_membre_from_row(row_data, email)
-                if not membre:
-                    self._add_error_detail(
-                        results, row_num, 
-                        _("Impossible de créer le membre avec l'email '{}'").format(email),
-                        email=email, montant=montant
-                    )
-                    return
-            
-            # Si le membre n'existe toujours pas
-            if not membre:
-                self._add_error_detail(
-                    results, row_num,
-                    _("Membre introuvable avec l'email '{}'").format(email),
-                    email=email, montant=montant
-                )
-                return
-            
-            # Traiter les dates
-            date_emission, date_echeance = self._get_dates_from_row(row_data, force_import)
-            if date_emission is None and not force_import:
-                self._add_error_detail(
-                    results, row_num,
-                    _("Date d'émission invalide: {}").format(row_data.get('date_emission', '')),
-                    membre=membre, montant=montant
-                )
-                return
-            
-            if date_echeance is None and 'date_echeance' in row_data and row_data['date_echeance'] and not force_import:
-                self._add_error_detail(
-                    results, row_num,
-                    _("Date d'échéance invalide: {}").format(row_data['date_echeance']),
-                    membre=membre, montant=montant
-                )
-                return
-            
-            # Trouver le type de membre
-            type_membre = self._get_type_membre(row_data, membre, force_import)
-            if type_membre is None and 'type_membre' in row_data and row_data['type_membre'] and not force_import:
-                self._add_error_detail(
-                    results, row_num,
-                    _("Type de membre non trouvé: {}").format(row_data['type_membre']),
-                    membre=membre, montant=montant
-                )
-                return
-            
-            # Récupérer le montant restant et déterminer le statut de paiement
-            montant_restant, statut_paiement = self._get_payment_details(row_data, montant)
-            
-            # Créer la cotisation
-            try:
-                cotisation = self._create_cotisation(
-                    membre, montant, montant_restant, statut_paiement,
-                    default_status, date_emission, date_echeance, type_membre
-                )
-                
-                # Succès !
-                membre_info = f"{membre.prenom} {membre.nom} ({membre.email})"
-                results['success'] += 1
-                results['details'].append({
-                    'row': row_num,
-                    'status': 'success',
-                    'membre': membre_info,
-                    'montant': float(montant),
-                    'message': _("Cotisation créée avec succès")
-                })
-                
-            except Exception as e:
-                logger.error(f"Erreur lors de la création de la cotisation: {str(e)}")
-                logger.error(traceback.format_exc())
-                
-                membre_info = f"{membre.prenom} {membre.nom} ({membre.email})" if membre else email
-                self._add_error_detail(
-                    results, row_num,
-                    _("Erreur lors de la création: {}").format(str(e)),
-                    membre=membre_info, montant=montant
-                )
-        
-        except Exception as e:
-            logger.error(f"Erreur lors du traitement de la ligne {row_num}: {str(e)}")
-            logger.error(traceback.format_exc())
-            
-            self._add_error_detail(results, row_num, _("Erreur inattendue: {}").format(str(e)))
-    
-    def _add_error_detail(self, results, row_num, message, **kwargs):
-        """Ajoute une erreur détaillée aux résultats."""
-        results['errors'] += 1
-        
-        # Créer un dictionnaire de détails
-        detail = {
-            'row': row_num,
-            'status': 'error',
-            'message': message
-        }
-        
-        # Ajouter les kwargs comme informations supplémentaires
-        for key, value in kwargs.items():
-            if isinstance(value, Decimal):
-                detail[key] = float(value)
-            else:
-                detail[key] = value
-        
-        results['details'].append(detail)
-    
-    def _create_membre_from_row(self, row_data, email):
-        """Crée un nouveau membre à partir des données de la ligne."""
-        try:
-            # Extraire les informations du membre
-            nom_prenom = row_data.get('membre', '').strip()
-            
-            # Diviser le nom complet en nom et prénom
-            if nom_prenom:
-                parts = nom_prenom.split(' ', 1)
-                if len(parts) > 1:
-                    prenom, nom = parts
-                else:
-                    nom = parts[0]
-                    prenom = ""
-            else:
-                # Si le nom n'est pas fourni, utiliser l'email comme base
-                nom = email.split('@')[0]
-                prenom = ""
-            
-            # Créer le statut par défaut pour les membres si nécessaire
-            membre_statut = Statut.objects.filter(nom__iexact='Actif').first()
-            if not membre_statut:
-                membre_statut = Statut.objects.create(
-                    nom='Actif', 
-                    description='Statut par défaut pour les membres'
-                )
-            
-            # Créer le nouveau membre
-            membre = Membre.objects.create(
-                nom=nom.upper() if nom else "NOM",
-                prenom=prenom.capitalize() if prenom else "Prénom",
-                email=email,
-                statut=membre_statut,
-                date_adhesion=datetime.datetime.now().date()
-            )
-            
-            # Récupérer et assigner le type de membre si disponible
-            type_membre_nom = row_data.get('type_membre', '').strip()
-            if type_membre_nom:
-                type_membre = TypeMembre.objects.filter(libelle__iexact=type_membre_nom).first()
-                if type_membre:
-                    # Créer une association entre le membre et le type de membre
-                    # Note: ceci dépend de la structure du modèle MembreTypeMembre
-                    MembreTypeMembre.objects.create(
-                        membre=membre,
-                        type_membre=type_membre,
-                        date_debut=datetime.datetime.now().date()
-                    )
-            
-            logger.info(f"Membre créé automatiquement: {email}")
-            return membre
-            
-        except Exception as e:
-            # En cas d'erreur lors de la création du membre
-            logger.error(f"Erreur lors de la création automatique du membre: {str(e)}")
-            logger.error(traceback.format_exc())
-            return None
-    
-    def _get_dates_from_row(self, row_data, force_import):
-        """Extrait et valide les dates d'une ligne."""
-        date_emission = None
-        date_echeance = None
-        
-        # Traiter la date d'émission
-        if 'date_emission' in row_data and row_data['date_emission']:
-            try:
-                date_emission = self._parse_date(row_data['date_emission'])
-            except ValueError:
-                if force_import:
-                    # Utiliser la date actuelle si force_import est activé
-                    date_emission = datetime.datetime.now().date()
-                else:
-                    return None, None
-        else:
-            # Par défaut, utiliser la date actuelle
-            date_emission = datetime.datetime.now().date()
-        
-        # Traiter la date d'échéance
-        if 'date_echeance' in row_data and row_data['date_echeance']:
-            try:
-                date_echeance = self._parse_date(row_data['date_echeance'])
-            except ValueError:
-                if force_import:
-                    # Par défaut, la date d'échéance est à 1 an de la date d'émission
-                    date_echeance = date_emission.replace(year=date_emission.year + 1)
-                else:
-                    return date_emission, None
-        else:
-            # Par défaut, la date d'échéance est à 1 an de la date d'émission
-            date_echeance = date_emission.replace(year=date_emission.year + 1)
-        
-        return date_emission, date_echeance
-    
-    def _get_type_membre(self, row_data, membre, force_import):
-        """Récupère le type de membre à partir des données de la ligne ou du membre."""
-        # Essayer d'abord à partir des données de la ligne
-        if 'type_membre' in row_data and row_data['type_membre']:
-            type_membre = TypeMembre.objects.filter(libelle__iexact=row_data['type_membre'].strip()).first()
-            if type_membre:
-                return type_membre
-        
-        # Si pas dans les données ou pas trouvé, essayer à partir du membre
-        if membre:
-            # Approche 1: Relations type active via MembreTypeMembre
-            membre_types = MembreTypeMembre.objects.filter(
-                membre=membre,
-                date_fin__isnull=True
-            ).select_related('type_membre').first()
-            
-            if membre_types:
-                return membre_types.type_membre
-            
-            # Approche 2: Types actifs via une méthode du modèle
-            if hasattr(membre, 'get_types_actifs') and callable(membre.get_types_actifs):
-                types_actifs = membre.get_types_actifs()
-                if types_actifs.exists():
-                    return types_actifs.first()
-        
-        # Si force_import est activé, utiliser le type de membre par défaut
-        if force_import:
-            # Trouver ou créer un type par défaut
-            default_type = TypeMembre.objects.filter(libelle__iexact='Standard').first()
-            if not default_type:
-                default_type = TypeMembre.objects.first()  # Prendre le premier type disponible
-            
-            return default_type
-        
-        return None
-    
-    def _get_payment_details(self, row_data, montant):
-        """Récupère les détails de paiement à partir des données de la ligne."""
-        # Montant restant par défaut = montant total
-        montant_restant = montant
-        
-        # Récupérer le montant restant s'il est spécifié
-        if 'montant_restant' in row_data and row_data['montant_restant']:
-            try:
-                montant_restant_str = str(row_data['montant_restant']).strip().replace(',', '.')
-                montant_restant = Decimal(montant_restant_str)
-                # Valider le montant restant
-                if montant_restant < 0:
-                    montant_restant = Decimal('0.00')
-                elif montant_restant > montant:
-                    montant_restant = montant
-            except (InvalidOperation, ValueError, TypeError):
-                # En cas d'erreur dans le format, utiliser le montant total
-                pass
-        
-        # Déterminer le statut de paiement
-        statut_paiement = 'non_payee'  # Par défaut
-        
-        if 'statut_paiement' in row_data and row_data['statut_paiement']:
-            statut_str = row_data['statut_paiement'].strip().lower()
-            
-            if 'payée' in statut_str or 'payee' in statut_str or 'pay' in statut_str:
-                if 'partiel' in statut_str or 'partial' in statut_str:
-                    statut_paiement = 'partiellement_payee'
-                    # Si le montant restant n'a pas été explicitement défini
-                    if montant_restant == montant:
-                        montant_restant = montant * Decimal('0.5')  # 50% par défaut
-                else:
-                    statut_paiement = 'payee'
-                    montant_restant = Decimal('0')
-        
-        # Si le montant restant est 0, la cotisation est payée
-        if montant_restant == 0:
-            statut_paiement = 'payee'
-        # Si le montant restant est entre 0 et le montant total, partiellement payée
-        elif montant_restant < montant:
-            statut_paiement = 'partiellement_payee'
-        
-        return montant_restant, statut_paiement
-    
-    def _create_cotisation(self, membre, montant, montant_restant, statut_paiement, 
-                         statut, date_emission, date_echeance, type_membre):
-        """Crée une nouvelle cotisation avec les données fournies."""
-        # Préparer les données pour la cotisation
-        cotisation_data = {
-            'membre': membre,
-            'montant': montant,
-            'montant_restant': montant_restant,
-            'statut': statut,
-            'statut_paiement': statut_paiement,
-        }
-        
-        # Ajouter les champs optionnels si présents
-        if date_emission:
-            cotisation_data['date_emission'] = date_emission
-        
-        if date_echeance:
-            cotisation_data['date_echeance'] = date_echeance
-        
-        # Ajouter les périodes
-        if date_emission:
-            cotisation_data['periode_debut'] = date_emission
-            cotisation_data['mois'] = date_emission.month
-            cotisation_data['annee'] = date_emission.year
-        
-        if date_echeance:
-            cotisation_data['periode_fin'] = date_echeance
-        
-        # Ajouter le type de membre si présent
-        if type_membre:
-            cotisation_data['type_membre'] = type_membre
-        
-        # Créer la cotisation
-        cotisation = Cotisation.objects.create(**cotisation_data)
-        return cotisation
-    
     def _parse_date(self, date_str):
         """Parse une date à partir d'une chaîne de caractères."""
-        date_str = str(date_str).strip()
-        
-        # Essayer différents formats de date
-        formats = [
-            '%Y-%m-%d',       # YYYY-MM-DD
-            '%d/%m/%Y',       # DD/MM/YYYY
-            '%d-%m-%Y',       # DD-MM-YYYY
-            '%m/%d/%Y',       # MM/DD/YYYY (format US)
-            '%d.%m.%Y',       # DD.MM.YYYY
-        ]
-        
-        for fmt in formats:
-            try:
-                return datetime.datetime.strptime(date_str, fmt).date()
-            except ValueError:
-                continue
-        
-        # Si on arrive ici, aucun format n'a fonctionné
-        raise ValueError(f"Format de date non reconnu: {date_str}")
+        return ImportCotisationsService.parser_date(date_str)
     
     def _get_debug_info(self, file_path):
         """Récupère des informations de débogage sur le fichier."""
@@ -2774,28 +2340,35 @@ class ImportCotisationsView(StaffRequiredMixin, TemplateView):
 class ExportCotisationsView(StaffRequiredMixin, View):
     """
     Vue pour exporter la liste des cotisations au format CSV ou Excel.
+
+    Les exports volumineux (ou demandés avec ?arriere_plan=1) sont confiés à
+    une tâche Celery : la vue retourne alors immédiatement l'identifiant de la tâche.
     """
     def get(self, request, *args, **kwargs):
         format_export = request.GET.get('format', 'csv')
-        
-        # Récupérer les filtres de recherche pour les appliquer à l'export
-        form = CotisationSearchForm(request.GET)
-        queryset = Cotisation.objects.all()
-        
-        if form.is_valid():
-            # Appliquer les mêmes filtres que pour la vue liste
-            queryset = self._apply_search_filters(form, queryset)
-        
-        # Charger les relations pour optimiser les performances
-        queryset = queryset.select_related('membre', 'type_membre')
-        
+        if format_export not in ('csv', 'excel'):
+            return HttpResponse(_("Format non supporté"), status=400)
+
+        queryset = self.filtrer(request.GET)
+        if exporter_en_arriere_plan(request, queryset):
+            return lancer_export(request, 'apps.cotisations.views.generer_export_cotisations', format_export)
+
         # Selon le format demandé
         if format_export == 'csv':
             return self._export_csv(queryset)
-        elif format_export == 'excel':
-            return self._export_excel(queryset)
-        else:
-            return HttpResponse(_("Format non supporté"), status=400)
+        return self._export_excel(queryset)
+
+    @classmethod
+    def filtrer(cls, parametres):
+        """Retourne les cotisations correspondant aux filtres de recherche."""
+        form = CotisationSearchForm(parametres)
+        queryset = Cotisation.objects.all()
+
+        if form.is_valid():
+            # Appliquer les mêmes filtres que pour la vue liste
+            queryset = cls()._apply_search_filters(form, queryset)
+
+        return queryset
     
     def _apply_search_filters(self, form, queryset):
         """Applique les filtres de recherche au queryset."""
@@ -2842,23 +2415,29 @@ class ExportCotisationsView(StaffRequiredMixin, View):
             )
         
         if terme := form.cleaned_data.get('terme'):
-            queryset = queryset.filter(
-                Q(reference__icontains=terme) |
-                Q(commentaire__icontains=terme) |
-                Q(membre__nom__icontains=terme) |
-                Q(membre__prenom__icontains=terme) |
-                Q(membre__email__icontains=terme)
-            )
+            queryset = index_recherche.filtrer(queryset, terme)
         
         return queryset
     
-    def _export_csv(self, queryset):
+    def _export_csv(self, queryset, progression=None):
         """Exporte les cotisations au format CSV."""
-        return export_utils.export_cotisations_csv(queryset)
+        return export_utils.export_cotisations_csv(queryset, progression=progression)
     
-    def _export_excel(self, queryset):
+    def _export_excel(self, queryset, progression=None):
         """Exporte les cotisations au format Excel."""
-        return export_utils.export_cotisations_excel(queryset)
+        return export_utils.export_cotisations_excel(queryset, progression=progression)
+
+
+def generer_export_cotisations(parametres, progression=None):
+    """
+    Générateur de l'export des cotisations exécuté par la tâche d'export en arrière-plan.
+    """
+    vue = ExportCotisationsView()
+    queryset = vue.filtrer(parametres)
+    if parametres.get('format') == 'excel':
+        return vue._export_excel(queryset, progression=progression)
+    return vue._export_csv(queryset, progression=progression)
+
 
 class StatistiquesView(StaffRequiredMixin, TemplateView):
     """
@@ -2876,51 +2455,34 @@ class StatistiquesView(StaffRequiredMixin, TemplateView):
         except (ValueError, TypeError):
             annee = timezone.now().date().year
         
-        # Statistiques générales
-        total_cotisations = Cotisation.objects.filter(annee=annee).count()
-        montant_total = Cotisation.objects.filter(annee=annee).aggregate(
-            total=Sum('montant')
-        ).get('total') or Decimal('0.00')
-        
-        montant_paye = Paiement.objects.filter(
-            cotisation__annee=annee,
-            type_transaction='paiement'
-        ).aggregate(total=Sum('montant')).get('total') or Decimal('0.00')
+        stats_service = StatistiquesCotisationsService(
+            cotisations=Cotisation.objects.filter(annee=annee),
+            paiements=Paiement.objects.filter(cotisation__annee=annee)
+        )
         
-        montant_remboursement = Paiement.objects.filter(
-            cotisation__annee=annee,
-            type_transaction='remboursement'
-        ).aggregate(total=Sum('montant')).get('total') or Decimal('0.00')
+        # Statistiques générales
+        totaux = stats_service.totaux()
+        totaux_paiements = stats_service.totaux_paiements()
+        total_cotisations = totaux['total_cotisations']
+        montant_total = totaux['montant_total']
+        montant_paye = totaux_paiements['montant_paye']
+        montant_remboursement = totaux_paiements['montant_remboursement']
         
         # Calcul du taux de recouvrement
         taux_recouvrement = 0
         if montant_total > 0:
             taux_recouvrement = (montant_paye / montant_total * 100).quantize(Decimal('0.01'))
         
-        # Statistiques par mois
+        # Statistiques par mois (deux requêtes groupées pour les 12 mois)
         stats_par_mois = []
-        for mois in range(1, 13):
-            cotisations_mois = Cotisation.objects.filter(annee=annee, mois=mois)
-            paiements_mois = Paiement.objects.filter(
-                cotisation__annee=annee,
-                cotisation__mois=mois,
-                type_transaction='paiement'
-            )
-            
-            montant_cotisations = cotisations_mois.aggregate(
-                total=Sum('montant')
-            ).get('total') or Decimal('0.00')
-            
-            montant_paiements = paiements_mois.aggregate(
-                total=Sum('montant')
-            ).get('total') or Decimal('0.00')
-            
+        for ligne in stats_service.mois_periode():
+            mois = ligne['mois']
             stats_par_mois.append({
                 'mois': mois,
                 'mois_nom': datetime.date(2000, mois, 1).strftime('%B'),
-                'montant_cotisations': montant_cotisations,
-                'montant_paiements': montant_paiements,
-                'difference': montant_paiements - montant_cotisations,
+                'montant_cotisations': ligne['montant_cotisations'],
+                'montant_paiements': ligne['montant_paiements'],
+                'difference': ligne['montant_paiements'] - ligne['montant_cotisations'],
             })
         
         # Statistiques par type de membre
@@ -2966,28 +2528,33 @@ def export_cotisations_pdf(request):
     if not request.user.is_staff:
         return HttpResponseForbidden(_("Vous n'avez pas les permissions nécessaires."))
     
+    if exporter_en_arriere_plan(request, ExportCotisationsView.filtrer(request.GET)):
+        return lancer_export(request, 'apps.cotisations.views.generer_export_cotisations_pdf', 'pdf')
+
+    return generer_export_cotisations_pdf(request.GET)
+
+
+def generer_export_cotisations_pdf(parametres, progression=None):
+    """
+    Générateur du rapport PDF des cotisations (vue et tâche d'export en arrière-plan).
+    """
     # Récupérer les filtres de recherche pour les appliquer à l'export
-    form = CotisationSearchForm(request.GET)
-    queryset = Cotisation.objects.all()
-    
-    # Appliquer les filtres comme dans ExportCotisationsView._apply_search_filters
-    if form.is_valid():
-        # Appliquer les filtres correspondants
-        if membre := form.cleaned_data.get('membre'):
-            queryset = queryset.filter(membre=membre)
-        # Continuer avec les autres filtres...
+    form = CotisationSearchForm(parametres)
+    queryset = ExportCotisationsView.filtrer(parametres)
     
     # Préparer les filtres pour le rapport
     filtres = {}
-    for field in form.cleaned_data:
-        if form.cleaned_data[field]:
-            filtres[form.fields[field].label] = form.cleaned_data[field]
+    if form.is_valid():
+        for field in form.cleaned_data:
+            if form.cleaned_data[field]:
+                filtres[form.fields[field].label] = form.cleaned_data[field]
     
     # Générer le rapport PDF
     return export_utils.generer_rapport_cotisations_pdf(
         queryset,
         titre=_("Rapport des cotisations"),
-        filtres=filtres
+        filtres=filtres,
+        progression=progression
     )
 
 
@@ -3499,13 +3066,16 @@ def api_stats_cotisations(request):
     except (ValueError, TypeError):
         annee = timezone.now().year
     
+    stats_service = StatistiquesCotisationsService(
+        cotisations=Cotisation.objects.filter(annee=annee)
+    )
+    
     # Statistiques de base
+    totaux = stats_service.totaux()
     stats = {
-        'total_cotisations': Cotisation.objects.filter(annee=annee).count(),
-        'montant_total': float(Cotisation.objects.filter(annee=annee).aggregate(
-            total=Sum('montant')).get('total') or 0),
-        'montant_paye': float(Cotisation.objects.filter(annee=annee).aggregate(
-            total=Sum(F('montant') - F('montant_restant'))).get('total') or 0),
+        'total_cotisations': totaux['total_cotisations'],
+        'montant_total': float(totaux['montant_total']),
+        'montant_paye': float(totaux['montant_paye']),
         'taux_recouvrement': 0,
     }
     
@@ -3515,38 +3085,35 @@ def api_stats_cotisations(request):
     
     # Distribution par statut de paiement
     status_counts = {status[0]: 0 for status in Cotisation._meta.get_field('statut_paiement').choices}
-    for status_data in Cotisation.objects.filter(annee=annee).values('statut_paiement').annotate(count=Count('id')):
+    for status_data in stats_service.par_statut():
         status_counts[status_data['statut_paiement']] = status_data['count']
     
     stats['distribution_statut'] = status_counts
     
-    # Données par mois
-    monthly_data = []
-    for month in range(1, 13):
-        month_name = datetime.date(2000, month, 1).strftime('%B')
-        
-        cotisations_data = Cotisation.objects.filter(annee=annee, mois=month).aggregate(
+    # Données par mois (une requête groupée pour les cotisations, une pour les paiements)
+    cotisations_par_mois = {
+        ligne['mois']: ligne
+        for ligne in Cotisation.objects.filter(annee=annee, mois__isnull=False).values('mois').annotate(
             count=Count('id'),
             total=Sum('montant'),
             paid=Sum(F('montant') - F('montant_restant'))
-        )
-        
-        paiements_data = Paiement.objects.filter(
-            date_paiement__year=annee,
-            date_paiement__month=month,
-            type_transaction='paiement'
-        ).aggregate(
-            count=Count('id'),
-            total=Sum('montant')
-        )
+        ).order_by('mois')
+    }
+    paiements_par_mois = stats_service.mois_paiement(annee)
+    
+    monthly_data = []
+    for month in range(1, 13):
+        month_name = datetime.date(2000, month, 1).strftime('%B')
+        cotisations_data = cotisations_par_mois.get(month, {})
+        paiements_data = paiements_par_mois[month - 1]
         
         monthly_data.append({
             'month': month_name,
-            'cotisations_count': cotisations_data['count'] or 0,
-            'cotisations_total': float(cotisations_data['total'] or 0),
-            'cotisations_paid': float(cotisations_data['paid'] or 0),
-            'paiements_count': paiements_data['count'] or 0,
-            'paiements_total': float(paiements_data['total'] or 0),
+            'cotisations_count': cotisations_data.get('count') or 0,
+            'cotisations_total': float(cotisations_data.get('total') or 0),
+            'cotisations_paid': float(cotisations_data.get('paid') or 0),
+            'paiements_count': paiements_data['nombre'],
+            'paiements_total': float(paiements_data['montant']),
         })
     
     stats['monthly_data'] = monthly_data
@@ -3645,26 +3212,33 @@ def api_envoyer_rappels_automatiques(request):
     date_limite = timezone.now().date() - datetime.timedelta(days=jours_retard)
     cotisations_retard = Cotisation.objects.en_retard().filter(date_echeance__lte=date_limite)
     
-    # Vérifier si des rappels ont déjà été envoyés récemment
-    date_dernier_rappel = timezone.now() - datetime.timedelta(days=7)  # Ne pas envoyer plus d'un rappel par semaine
+    # Ne pas envoyer plus d'un rappel par semaine : les rappels récents sont
+    # détectés par une seule sous-requête EXISTS au lieu d'une requête par cotisation
+    date_dernier_rappel = timezone.now() - datetime.timedelta(days=7)
+    cotisations_retard = cotisations_retard.select_related('membre').annotate(
+        rappel_recent=Exists(Rappel.objects.filter(
+            cotisation=OuterRef('pk'),
+            date_envoi__gte=date_dernier_rappel
+        ))
+    )
     
     # Statistiques pour le retour
     stats = {
-        'total': cotisations_retard.count(),
+        'total': 0,
         'rappels_crees': 0,
         'rappels_envoyes': 0,
         'erreurs': 0,
         'details': []
     }
     
+    # Les nouveaux rappels sont créés déjà réservés (en cours d'envoi) puis
+    # envoyés en un lot par le service d'envoi
+    jeton = uuid.uuid4()
+    maintenant = timezone.now()
+    nouveaux_rappels = []
     for cotisation in cotisations_retard:
-        # Vérifier si un rappel récent existe déjà
-        rappel_recent = Rappel.objects.filter(
-            cotisation=cotisation,
-            date_envoi__gte=date_dernier_rappel
-        ).exists()
-        
-        if rappel_recent:
+        stats['total'] += 1
+        if cotisation.rappel_recent:
             stats['details'].append({
                 'reference': cotisation.reference,
                 'status': 'ignored',
@@ -3672,65 +3246,74 @@ def api_envoyer_rappels_automatiques(request):
             })
             continue
         
-        # Créer un nouveau rappel
+        # Générer le contenu du rappel
+        membre = cotisation.membre
+        contenu = _(
+            "Cher/Chère %(prenom)s %(nom)s,\n\n"
+            "Nous vous rappelons que votre cotisation (réf. %(reference)s) "
+            "d'un montant restant dû de %(montant)s € "
+            "est arrivée à échéance le %(date)s.\n\n"
+            "Nous vous remercions de bien vouloir procéder au règlement "
+            "dans les meilleurs délais.\n\n"
+            "Cordialement,\n"
+            "L'équipe de l'association"
+        ) % {
+            'prenom': membre.prenom,
+            'nom': membre.nom,
+            'reference': cotisation.reference,
+            'montant': cotisation.montant_restant,
+            'date': cotisation.date_echeance.strftime('%d/%m/%Y')
+        }
+        
+        nouveaux_rappels.append(Rappel(
+            membre=membre,
+            cotisation=cotisation,
+            type_rappel=type_rappel,
+            niveau=niveau_rappel,
+            contenu=contenu,
+            etat=RAPPEL_ETAT_EN_COURS,
+            date_envoi=maintenant,
+            jeton_envoi=jeton,
+            date_reservation=maintenant,
+            cree_par=request.user
+        ))
+    
+    if nouveaux_rappels:
         try:
-            # Générer le contenu du rappel
-            membre = cotisation.membre
-            montant = cotisation.montant_restant
-            date_echeance = cotisation.date_echeance
-            
-            contenu = _(
-                "Cher/Chère %(prenom)s %(nom)s,\n\n"
-                "Nous vous rappelons que votre cotisation (réf. %(reference)s) "
-                "d'un montant restant dû de %(montant)s € "
-                "est arrivée à échéance le %(date)s.\n\n"
-                "Nous vous remercions de bien vouloir procéder au règlement "
-                "dans les meilleurs délais.\n\n"
-                "Cordialement,\n"
-                "L'équipe de l'association"
-            ) % {
-                'prenom': membre.prenom,
-                'nom': membre.nom,
-                'reference': cotisation.reference,
-                'montant': montant,
-                'date': date_echeance.strftime('%d/%m/%Y')
-            }
-            
-            # Créer le rappel
-            rappel = Rappel.objects.create(
-                membre=membre,
-                cotisation=cotisation,
-                type_rappel=type_rappel,
-                niveau=niveau_rappel,
-                contenu=contenu,
-                etat='planifie',
-                cree_par=request.user
-            )
-            
-            stats['rappels_crees'] += 1
-            
-            # Simuler l'envoi du rappel
-            # Note: Dans une implémentation réelle, vous connecteriez ceci à votre système d'envoi d'emails
-            rappel.etat = 'envoye'
-            rappel.date_envoi = timezone.now()
-            rappel.save()
-            
-            stats['rappels_envoyes'] += 1
-            stats['details'].append({
-                'reference': cotisation.reference,
-                'status': 'success',
-                'rappel_id': rappel.id,
-                'message': _("Rappel créé et envoyé")
-            })
-            
+            Rappel.objects.bulk_create(nouveaux_rappels)
+            stats['rappels_crees'] = len(nouveaux_rappels)
+            rappels = EnvoiRappelsService().envoyer_lot(jeton)
         except Exception as e:
-            logger.error(f"Erreur lors de la création du rappel: {str(e)}")
-            stats['erreurs'] += 1
-            stats['details'].append({
-                'reference': cotisation.reference,
-                'status': 'error',
-                'message': str(e)
-            })
+            logger.error(f"Erreur lors de la création des rappels: {str(e)}")
+            Rappel.objects.filter(jeton_envoi=jeton, etat=RAPPEL_ETAT_EN_COURS).update(
+                etat=RAPPEL_ETAT_PLANIFIE, jeton_envoi=None, date_reservation=None
+            )
+            rappels = []
+            stats['erreurs'] = len(nouveaux_rappels)
+            for rappel in nouveaux_rappels:
+                stats['details'].append({
+                    'reference': rappel.cotisation.reference,
+                    'status': 'error',
+                    'message': str(e)
+                })
+        
+        for rappel in rappels:
+            if rappel.etat == RAPPEL_ETAT_ENVOYE:
+                stats['rappels_envoyes'] += 1
+                stats['details'].append({
+                    'reference': rappel.cotisation.reference,
+                    'status': 'success',
+                    'rappel_id': rappel.id,
+                    'message': _("Rappel créé et envoyé")
+                })
+            else:
+                stats['erreurs'] += 1
+                stats['details'].append({
+                    'reference': rappel.cotisation.reference,
+                    'status': 'error',
+                    'rappel_id': rappel.id,
+                    'message': rappel.resultat
+                })
     
     return JsonResponse({
         'success': True,
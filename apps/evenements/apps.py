@@ -13,4 +13,11 @@ class EvenementsConfig(AppConfig):
         try:
             import apps.evenements.signals
         except ImportError:
-            pass
\ No newline at end of file
+            pass
+
+        # Index de recherche plein texte
+        from apps.core.recherche import index_recherche
+        index_recherche.enregistrer(
+            self.get_model('Evenement'),
+            ('titre', 'description', 'lieu', 'adresse_complete', 'instructions_particulieres')
+        )
\ No newline at end of file
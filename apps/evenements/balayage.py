@@ -0,0 +1,231 @@
+# apps/evenements/balayage.py
+"""
+Expiration des inscriptions non confirmées et promotion de la liste d'attente,
+traitées de façon ensembliste.
+
+Un balayage s'exécute dans une transaction :
+
+1. verrouillage des événements concernés (UPDATE sans effet, comme
+   ``Evenement._verrouiller_places``) : les réservations et les autres
+   balayages sur ces événements attendent la fin de la transaction ;
+2. expiration de toutes les inscriptions échues par un seul UPDATE ;
+3. places libérées par événement (requête groupée) répercutées sur les
+   compteurs en un UPDATE ;
+4. promotion, dans l'ordre d'arrivée, des inscriptions en liste d'attente
+   qui tiennent dans les places libres : somme cumulée des places
+   (``SUM() OVER (PARTITION BY evenement ORDER BY date_inscription)``), on
+   s'arrête au premier inscrit qui ne tient plus, comme
+   ``Evenement.promouvoir_liste_attente`` ;
+5. notifications confiées à une seule tâche Celery après validation.
+
+Les lignes modifiées par un balayage sont marquées par la même valeur de
+``updated_at`` : les compteurs sont ajustés d'après les lignes effectivement
+modifiées, jamais d'après une lecture préalable qu'une confirmation
+concurrente aurait rendue fausse. Un second balayage ne trouve rien à faire.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When, Window
+from django.db.models.expressions import RowRange
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Evenement, InscriptionEvenement
+
+logger = logging.getLogger(__name__)
+
+
+class BalayageInscriptions:
+    """
+    Expiration et promotion groupées des inscriptions aux événements.
+    """
+
+    def executer(self, maintenant=None):
+        """
+        Expire les inscriptions échues puis promeut la liste d'attente.
+
+        Returns:
+            dict: ``inscriptions_expirees`` et ``promotions``
+        """
+        return self._balayer(maintenant or timezone.now(), expirer=True)
+
+    def promouvoir(self, maintenant=None):
+        """Promeut la liste d'attente des événements ayant des places libres."""
+        return self._balayer(maintenant or timezone.now(), expirer=False)['promotions']
+
+    def _balayer(self, maintenant, expirer):
+        echues = Q(statut='en_attente', date_limite_confirmation__lt=maintenant)
+        concernees = Q(statut='liste_attente') | echues if expirer else Q(statut='liste_attente')
+
+        # Marque des lignes modifiées par ce balayage
+        marque = timezone.now()
+        with transaction.atomic():
+            Evenement._base_manager.filter(
+                pk__in=InscriptionEvenement.objects.filter(concernees).values('evenement_id')
+            ).update(nb_places_en_attente=F('nb_places_en_attente'))
+
+            expirees = []
+            if expirer:
+                if InscriptionEvenement.objects.filter(echues).update(statut='expiree', updated_at=marque):
+                    expirees = self._appliquer_variations(marque, 'expiree')
+
+            promues = self._promouvoir(maintenant, marque)
+
+            if expirees or promues:
+                transaction.on_commit(lambda: self._planifier_notifications(expirees, promues))
+
+        logger.info(f"Balayage des inscriptions : {len(expirees)} expirées, {len(promues)} promotions")
+        return {'inscriptions_expirees': len(expirees), 'promotions': len(promues)}
+
+    def _promouvoir(self, maintenant, marque):
+        """Promeut les inscriptions en liste d'attente qui tiennent dans les places libres."""
+        places = 1 + F('nombre_accompagnants')
+        candidates = InscriptionEvenement.objects.filter(
+            statut='liste_attente',
+            evenement__deleted_at__isnull=True
+        ).annotate(
+            places_cumulees=Window(
+                Sum(places),
+                partition_by=[F('evenement_id')],
+                order_by=[F('date_inscription').asc(), F('pk').asc()],
+                frame=RowRange(start=None, end=0)
+            ),
+            places_libres=(
+                F('evenement__capacite_max') - F('evenement__nb_places_occupees')
+                - F('evenement__nb_places_en_attente')
+            )
+        ).filter(places_cumulees__lte=F('places_libres'))
+
+        # Date limite de confirmation selon le délai de chaque événement
+        par_delai = defaultdict(list)
+        for pk, delai in candidates.values_list('pk', 'evenement__delai_confirmation'):
+            par_delai[delai].append(pk)
+        if not par_delai:
+            return []
+
+        promues = InscriptionEvenement.objects.filter(
+            pk__in=[pk for ids in par_delai.values() for pk in ids],
+            statut='liste_attente'
+        ).update(
+            statut='en_attente',
+            date_limite_confirmation=Case(*[
+                When(pk__in=ids, then=Value(maintenant + timedelta(hours=delai)))
+                for delai, ids in par_delai.items()
+            ]),
+            updated_at=marque
+        )
+        if not promues:
+            return []
+        return self._appliquer_variations(marque, 'en_attente')
+
+    def _appliquer_variations(self, marque, statut):
+        """
+        Répercute sur les compteurs des événements les inscriptions passées
+        à ``statut`` par ce balayage (requête groupée par événement).
+
+        Returns:
+            list: Ids des inscriptions concernées
+        """
+        marquees = InscriptionEvenement.objects.filter(statut=statut, updated_at=marque)
+        par_evenement = marquees.order_by().values('evenement_id').annotate(
+            places=Sum(1 + F('nombre_accompagnants')),
+            nombre=Count('id')
+        )
+        if statut == 'expiree':
+            variations = {
+                ligne['evenement_id']: {'nb_places_en_attente': -ligne['places']}
+                for ligne in par_evenement
+            }
+        else:
+            variations = {
+                ligne['evenement_id']: {'nb_places_en_attente': ligne['places'], 'nb_liste_attente': -ligne['nombre']}
+                for ligne in par_evenement
+            }
+        Evenement.ajuster_compteurs_places_groupes(variations)
+        return list(marquees.values_list('pk', flat=True))
+
+    def _planifier_notifications(self, expirees, promues):
+        from .tasks import notifier_balayage_inscriptions
+        notifier_balayage_inscriptions.delay(expirees, promues)
+
+    def notifier(self, expirees, promues):
+        """
+        Envoie les notifications d'expiration et de promotion d'un balayage
+        sur une connexion partagée (préférences du membre respectées).
+
+        Returns:
+            tuple: (nombre d'emails envoyés, destinataires en échec)
+        """
+        from apps.core.notifications import EnvoiEmailsGroupe
+
+        expirees, promues = set(expirees), set(promues)
+        inscriptions = InscriptionEvenement._base_manager.filter(
+            pk__in=expirees | promues
+        ).select_related('evenement', 'membre__utilisateur__profile')
+
+        destinataires = []
+        for inscription in inscriptions:
+            if inscription.statut == 'expiree' and inscription.pk in expirees:
+                destinataire = self._destinataire_expiration(inscription)
+            elif inscription.statut == 'en_attente' and inscription.pk in promues:
+                destinataire = self._destinataire_promotion(inscription)
+            else:
+                # Inscription modifiée depuis le balayage
+                continue
+            if destinataire:
+                destinataires.append(destinataire)
+
+        return EnvoiEmailsGroupe().envoyer(destinataires)
+
+    def _destinataire_expiration(self, inscription):
+        if not self._preference(inscription, 'evenement_rappel_confirmation'):
+            return None
+        return self._destinataire(inscription, 'inscription_expiree', f"Inscription expirée : {inscription.evenement.titre}")
+
+    def _destinataire_promotion(self, inscription):
+        if not self._preference(inscription, 'evenement_promotion_liste'):
+            return None
+        temps_restant = inscription.date_limite_confirmation - timezone.now()
+        return self._destinataire(
+            inscription,
+            'promotion_liste_attente',
+            f"Bonne nouvelle ! Place disponible pour {inscription.evenement.titre}",
+            heures_restantes=max(0, int(temps_restant.total_seconds() / 3600)),
+            url_confirmation=settings.SITE_URL + reverse(
+                'evenements:confirmer_email', kwargs={'code': inscription.code_confirmation}
+            ),
+        )
+
+    def _destinataire(self, inscription, template_name, subject, **contexte):
+        membre = inscription.membre
+        return {
+            'recipient_email': membre.email,
+            'recipient_name': f"{membre.prenom} {membre.nom}",
+            'template_name': template_name,
+            'subject': subject,
+            'context': {
+                'inscription': inscription,
+                'evenement': inscription.evenement,
+                'membre': membre,
+                'url_detail': settings.SITE_URL + reverse(
+                    'evenements:inscription_detail', kwargs={'pk': inscription.pk}
+                ),
+                'site_url': settings.SITE_URL,
+                'site_name': getattr(settings, 'SITE_NAME', 'Gestion Association'),
+                **contexte
+            },
+        }
+
+    def _preference(self, inscription, type_notification):
+        """Préférence de notification du membre (activée sans compte ni profil)."""
+        utilisateur = inscription.membre.utilisateur
+        profil = getattr(utilisateur, 'profile', None) if utilisateur else None
+        return profil is None or profil.get_notification_preference(type_notification)
+
+
+# Balayage partagé par les tâches périodiques
+balayage_inscriptions = BalayageInscriptions()
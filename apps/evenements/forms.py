@@ -442,7 +442,8 @@ class InscriptionEvenementForm(forms.ModelForm):
         else:
             inscription.montant_paye = Decimal('0.00')
         
-        # Déterminer le statut initial
+        # Statut initial indicatif (commit=False) : la place n'est réellement
+        # attribuée qu'à l'enregistrement, par Evenement.reserver_places
         if self.evenement.places_disponibles > 0:
             inscription.statut = 'en_attente'
             inscription.date_limite_confirmation = timezone.now() + timezone.timedelta(
@@ -452,7 +453,7 @@ class InscriptionEvenementForm(forms.ModelForm):
             inscription.statut = 'liste_attente'
         
         if commit:
-            inscription.save()
+            self.evenement.reserver_places(inscription)
             
             # Créer les accompagnants
             accompagnants_data = self.cleaned_data.get('accompagnants_data', [])
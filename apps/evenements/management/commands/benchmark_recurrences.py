@@ -0,0 +1,141 @@
+# apps/evenements/management/commands/benchmark_recurrences.py
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.evenements.models import Evenement, EvenementRecurrence, TypeEvenement
+from apps.evenements.recurrence import GenerateurOccurrences
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure la génération des occurrences de séries hebdomadaires synthétiques "
+        "(création occurrence par occurrence puis par lots), annulée en fin de mesure"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--series',
+            type=int,
+            default=500,
+            help='Nombre de séries hebdomadaires'
+        )
+        parser.add_argument(
+            '--horizon',
+            type=int,
+            default=365,
+            help='Horizon de génération en jours'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Taille des lots de la génération groupée'
+        )
+        parser.add_argument(
+            '--par-lots-seulement',
+            action='store_true',
+            help='Ne mesurer que la génération par lots'
+        )
+
+    def handle(self, *args, **options):
+        if options['series'] < 1 or options['horizon'] < 1 or options['batch_size'] < 1:
+            raise CommandError('Les valeurs numériques doivent être strictement positives')
+
+        modes = ['par_lots'] if options['par_lots_seulement'] else ['occurrence_par_occurrence', 'par_lots']
+        generateur = GenerateurOccurrences(batch_size=options['batch_size'])
+        mesures = {}
+        for mode in modes:
+            # Chaque mesure repart d'une base identique puis est annulée
+            with transaction.atomic():
+                self._generer_series(options)
+                debut = timezone.now()
+                fin = debut + timedelta(days=options['horizon'])
+                recurrences = EvenementRecurrence.objects.filter(
+                    evenement_parent__titre__startswith='Benchmark récurrence'
+                ).select_related('evenement_parent__type_evenement')
+
+                passages = []
+                for _passage in range(2):
+                    # Second passage : tout existe déjà, rien à créer
+                    requetes = []
+                    with connection.execute_wrapper(lambda execute, sql, *args: requetes.append(sql) or execute(sql, *args)):
+                        debut_mesure = time.perf_counter()
+                        if mode == 'par_lots':
+                            creees = sum(generateur.generer(recurrences, fin=fin, debut=debut).values())
+                        else:
+                            creees = self._generer_une_par_une(generateur, recurrences, debut, fin)
+                        passages.append((time.perf_counter() - debut_mesure, len(requetes), creees))
+
+                mesures[mode] = passages
+                transaction.set_rollback(True)
+
+        for mode, passages in mesures.items():
+            for numero, (duree, nb_requetes, creees) in enumerate(passages, start=1):
+                self.stdout.write(
+                    f"{mode:<26} passage {numero}  {duree:>8.2f}s  {nb_requetes:>7} requêtes  "
+                    f"{creees:>7} occurrences créées"
+                )
+
+        if len(mesures) == 2:
+            duree_unitaire, duree_lots = mesures['occurrence_par_occurrence'][0][0], mesures['par_lots'][0][0]
+            self.stdout.write(self.style.SUCCESS(f"Accélération : x{duree_unitaire / duree_lots:.1f}"))
+
+    def _generer_series(self, options):
+        """Crée les événements parents et leurs récurrences hebdomadaires."""
+        suffixe = uuid.uuid4().hex[:8]
+        User = get_user_model()
+
+        organisateur = User.objects.filter(is_superuser=True).first() or User.objects.first()
+        if organisateur is None:
+            raise CommandError('Aucun utilisateur disponible pour organiser les événements de test')
+
+        type_evenement, _ = TypeEvenement.objects.get_or_create(
+            libelle='Benchmark récurrence',
+            defaults={'necessite_validation': False}
+        )
+        maintenant = timezone.now()
+        parents = [
+            Evenement(
+                titre=f'Benchmark récurrence {suffixe} {i}',
+                description='Série générée par benchmark_recurrences',
+                date_debut=maintenant + timedelta(days=1 + i % 7, hours=i % 10),
+                date_fin=maintenant + timedelta(days=1 + i % 7, hours=i % 10 + 2),
+                lieu='Test',
+                capacite_max=20,
+                type_evenement=type_evenement,
+                organisateur=organisateur,
+                statut='publie',
+                est_recurrent=True,
+            )
+            for i in range(options['series'])
+        ]
+        # bulk_create : pas de signaux pour les événements parents
+        Evenement.generer_references(parents)
+        Evenement.objects.bulk_create(parents, batch_size=1000)
+        EvenementRecurrence.objects.bulk_create([
+            EvenementRecurrence(
+                evenement_parent=parent,
+                frequence='hebdomadaire',
+                intervalle_recurrence=1,
+                jours_semaine=[parent.date_debut.weekday()],
+                nombre_occurrences_max=1000,
+            )
+            for parent in parents
+        ], batch_size=1000)
+
+    def _generer_une_par_une(self, generateur, recurrences, debut, fin):
+        """Ancienne méthode : une vérification et un enregistrement complet par occurrence."""
+        creees = 0
+        for recurrence in recurrences:
+            parent = recurrence.evenement_parent
+            for date_debut in recurrence.dates_occurrences(fin, debut):
+                if not Evenement.objects.filter(evenement_parent=parent, date_debut=date_debut).exists():
+                    generateur._occurrence(parent, date_debut).save()
+                    creees += 1
+        return creees
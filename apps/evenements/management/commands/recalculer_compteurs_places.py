@@ -0,0 +1,67 @@
+# apps/evenements/management/commands/recalculer_compteurs_places.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.evenements.models import Evenement, InscriptionEvenement
+
+
+class Command(BaseCommand):
+    help = 'Vérifie et reconstruit les compteurs de places des événements à partir des inscriptions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verifier',
+            action='store_true',
+            help='Signale les écarts sans modifier la base'
+        )
+        parser.add_argument(
+            '--evenement',
+            type=int,
+            action='append',
+            dest='evenements',
+            help="Limiter à un événement (option répétable)"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Taille des lots pour la mise à jour'
+        )
+
+    def handle(self, *args, **options):
+        champs = Evenement.CHAMPS_COMPTEURS_PLACES
+        evenements = Evenement._base_manager.order_by('pk')
+        inscriptions = InscriptionEvenement.objects.all()
+        if options['evenements']:
+            evenements = evenements.filter(pk__in=options['evenements'])
+            inscriptions = inscriptions.filter(evenement_id__in=options['evenements'])
+
+        # Une requête groupée pour les valeurs attendues, une pour les valeurs stockées
+        attendus = inscriptions.compteurs_places_par_evenement()
+        a_corriger = []
+        for evenement in evenements.only('pk', *champs).iterator(chunk_size=options['batch_size']):
+            valeurs = attendus.get(evenement.pk, {})
+            ecarts = {
+                champ: (getattr(evenement, champ), valeurs.get(champ, 0))
+                for champ in champs
+                if getattr(evenement, champ) != valeurs.get(champ, 0)
+            }
+            if not ecarts:
+                continue
+
+            details = ', '.join(f'{champ}: {stocke} -> {attendu}' for champ, (stocke, attendu) in ecarts.items())
+            self.stdout.write(self.style.WARNING(f'Événement {evenement.pk} : {details}'))
+
+            for champ, (_, attendu) in ecarts.items():
+                setattr(evenement, champ, attendu)
+            a_corriger.append(evenement)
+
+        if options['verifier']:
+            message = f'{len(a_corriger)} événement(s) avec des compteurs incohérents'
+            self.stdout.write(self.style.SUCCESS(message) if not a_corriger else self.style.ERROR(message))
+            return
+
+        with transaction.atomic():
+            Evenement._base_manager.bulk_update(a_corriger, champs, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'{len(a_corriger)} événement(s) corrigé(s)'))
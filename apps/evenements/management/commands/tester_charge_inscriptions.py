@@ -0,0 +1,182 @@
+# apps/evenements/management/commands/tester_charge_inscriptions.py
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from apps.evenements.models import Evenement, InscriptionEvenement, TypeEvenement
+from apps.membres.models import HistoriqueMembre, Membre
+
+
+class Command(BaseCommand):
+    help = (
+        "Test de charge des inscriptions : lance N inscriptions simultanées sur un "
+        "événement de test et vérifie qu'aucune place n'est attribuée en surnombre"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--inscriptions',
+            type=int,
+            default=200,
+            help="Nombre d'inscriptions simultanées"
+        )
+        parser.add_argument(
+            '--capacite',
+            type=int,
+            default=50,
+            help="Capacité de l'événement de test"
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=32,
+            help='Nombre de threads (une connexion base par thread)'
+        )
+        parser.add_argument(
+            '--accompagnants',
+            type=int,
+            default=0,
+            help="Nombre d'accompagnants par inscription"
+        )
+        parser.add_argument(
+            '--tentatives',
+            type=int,
+            default=20,
+            help='Nombre de tentatives en cas de base verrouillée (SQLite)'
+        )
+        parser.add_argument(
+            '--conserver',
+            action='store_true',
+            help="Conserver l'événement et les membres de test"
+        )
+
+    def handle(self, *args, **options):
+        if options['inscriptions'] < 1 or options['capacite'] < 1 or options['workers'] < 1:
+            raise CommandError('Les valeurs numériques doivent être strictement positives')
+
+        evenement, membres_ids = self._preparer(options)
+        try:
+            resultats, duree = self._lancer(evenement, membres_ids, options)
+            self._verifier(evenement, resultats, duree, options)
+        finally:
+            if not options['conserver']:
+                self._nettoyer(evenement, membres_ids)
+
+    def _preparer(self, options):
+        """Crée l'événement de test et les membres à inscrire."""
+        suffixe = uuid.uuid4().hex[:8]
+        User = get_user_model()
+
+        organisateur = User.objects.filter(is_superuser=True).first() or User.objects.first()
+        if organisateur is None:
+            raise CommandError("Aucun utilisateur disponible pour organiser l'événement de test")
+
+        type_evenement, _ = TypeEvenement.objects.get_or_create(
+            libelle='Test de charge',
+            defaults={'permet_accompagnants': True}
+        )
+        evenement = Evenement.objects.create(
+            titre=f'Test de charge {suffixe}',
+            description='Événement généré par tester_charge_inscriptions',
+            date_debut=timezone.now() + timezone.timedelta(days=30),
+            lieu='Test',
+            capacite_max=options['capacite'],
+            inscriptions_ouvertes=True,
+            permet_accompagnants=options['accompagnants'] > 0,
+            nombre_max_accompagnants=options['accompagnants'],
+            type_evenement=type_evenement,
+            organisateur=organisateur,
+            statut='publie',
+        )
+
+        # bulk_create : pas de signaux ni d'historique pour les membres de test
+        Membre.objects.bulk_create([
+            Membre(nom='Charge', prenom=f'Membre {i}', email=f'charge-{suffixe}-{i}@example.com')
+            for i in range(options['inscriptions'])
+        ])
+        membres_ids = list(
+            Membre.objects.filter(email__startswith=f'charge-{suffixe}-').values_list('pk', flat=True)
+        )
+        return evenement, membres_ids
+
+    def _lancer(self, evenement, membres_ids, options):
+        """Lance toutes les inscriptions en parallèle, au même signal de départ."""
+        depart = threading.Event()
+
+        def inscrire(membre_id):
+            try:
+                depart.wait()
+                for tentative in range(options['tentatives']):
+                    try:
+                        inscription = InscriptionEvenement(
+                            membre_id=membre_id,
+                            nombre_accompagnants=options['accompagnants'],
+                        )
+                        place = Evenement.objects.get(pk=evenement.pk).reserver_places(inscription)
+                        return 'place' if place else 'liste_attente'
+                    except OperationalError:
+                        # SQLite n'accepte qu'un écrivain à la fois : on réessaie
+                        time.sleep(0.01 * (tentative + 1))
+                return 'echec'
+            finally:
+                close_old_connections()
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = [executor.submit(inscrire, membre_id) for membre_id in membres_ids]
+            debut = time.perf_counter()
+            depart.set()
+            resultats = [future.result() for future in futures]
+            duree = time.perf_counter() - debut
+
+        return resultats, duree
+
+    def _verifier(self, evenement, resultats, duree, options):
+        """Contrôle l'absence de surréservation et la cohérence des compteurs."""
+        evenement.refresh_from_db()
+        inscriptions = InscriptionEvenement.objects.filter(evenement=evenement)
+        attendus = inscriptions.compteurs_places_par_evenement().get(evenement.pk, {})
+
+        places_par_inscription = 1 + options['accompagnants']
+        attribuees = resultats.count('place')
+        places_prises = attendus.get('nb_places_occupees', 0) + attendus.get('nb_places_en_attente', 0)
+        attendues = min(len(resultats), evenement.capacite_max // places_par_inscription)
+
+        self.stdout.write(
+            f"{len(resultats)} inscriptions en {duree:.2f}s "
+            f"({len(resultats) / duree:.0f}/s) : {attribuees} place(s) attribuée(s), "
+            f"{resultats.count('liste_attente')} en liste d'attente, {resultats.count('echec')} échec(s)"
+        )
+
+        erreurs = []
+        if places_prises > evenement.capacite_max:
+            erreurs.append(f'surréservation : {places_prises} places pour {evenement.capacite_max}')
+        if inscriptions.count() != len(resultats) - resultats.count('echec'):
+            erreurs.append("le nombre d'inscriptions enregistrées ne correspond pas aux réponses")
+        if resultats.count('echec') == 0 and attribuees != attendues:
+            erreurs.append(f'{attribuees} place(s) attribuée(s) au lieu de {attendues}')
+        for champ in Evenement.CHAMPS_COMPTEURS_PLACES:
+            if getattr(evenement, champ) != attendus.get(champ, 0):
+                erreurs.append(f'compteur {champ} incohérent ({getattr(evenement, champ)} != {attendus.get(champ, 0)})')
+
+        if erreurs:
+            raise CommandError(' ; '.join(erreurs))
+
+        self.stdout.write(self.style.SUCCESS('Aucune surréservation détectée'))
+
+    def _nettoyer(self, evenement, membres_ids):
+        """Supprime physiquement les données de test."""
+        with transaction.atomic():
+            InscriptionEvenement._base_manager.filter(evenement=evenement).delete()
+            evenement.delete(hard=True)
+            Membre._base_manager.filter(pk__in=membres_ids).delete()
+            # Entrées d'historique créées par le signal pre_delete des membres :
+            # suppression directe, leur membre n'existe déjà plus
+            historique = HistoriqueMembre._base_manager.filter(membre_id__in=membres_ids)
+            historique._raw_delete(historique.db)
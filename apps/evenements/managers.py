@@ -100,25 +100,18 @@ class EvenementQuerySet(models.QuerySet):
         return self.exclude(pk__in=self.inscriptions_ouvertes().values_list('pk', flat=True))
     
     def avec_places_disponibles(self):
-        """Événements ayant encore des places disponibles"""
-        return self.annotate(
-            inscriptions_confirmees=Count(
-                'inscriptions',
-                filter=Q(inscriptions__statut__in=['confirmee', 'presente'])
-            )
-        ).filter(
-            inscriptions_confirmees__lt=models.F('capacite_max')
+        """
+        Événements ayant encore des places disponibles (accompagnants et
+        places réservées en attente de confirmation inclus, comme reserver_places)
+        """
+        return self.filter(
+            capacite_max__gt=models.F('nb_places_occupees') + models.F('nb_places_en_attente')
         )
     
     def complets(self):
-        """Événements complets"""
-        return self.annotate(
-            inscriptions_confirmees=Count(
-                'inscriptions',
-                filter=Q(inscriptions__statut__in=['confirmee', 'presente'])
-            )
-        ).filter(
-            inscriptions_confirmees__gte=models.F('capacite_max')
+        """Événements complets (même décompte que avec_places_disponibles)"""
+        return self.filter(
+            capacite_max__lte=models.F('nb_places_occupees') + models.F('nb_places_en_attente')
         )
     
     def par_type(self, type_evenement):
@@ -176,16 +169,8 @@ class EvenementQuerySet(models.QuerySet):
     
     def recherche(self, query):
         """Recherche textuelle dans titre, description et lieu"""
-        if not query:
-            return self
-        
-        return self.filter(
-            Q(titre__icontains=query) |
-            Q(description__icontains=query) |
-            Q(lieu__icontains=query) |
-            Q(adresse_complete__icontains=query) |
-            Q(instructions_particulieres__icontains=query)
-        ).distinct()
+        from apps.core.recherche import index_recherche
+        return index_recherche.filtrer(self, query)
     
     def avec_statistiques(self):
         """Ajoute les statistiques d'inscriptions"""
@@ -482,6 +467,29 @@ class InscriptionEvenementQuerySet(models.QuerySet):
                 output_field=models.BooleanField()
             )
         )
+    
+    def compteurs_places_par_evenement(self):
+        """
+        Calcule en une requête groupée les compteurs de places de chaque événement
+        (mêmes règles que InscriptionEvenement.compteurs_places).
+        
+        Returns:
+            dict: {evenement_id: {nom_compteur: valeur}}
+        """
+        places = 1 + F('nombre_accompagnants')
+        statuts_occupant = ['confirmee', 'presente']
+        
+        lignes = self.order_by().values('evenement_id').annotate(
+            nb_places_occupees=Sum(places, filter=Q(statut__in=statuts_occupant)),
+            nb_places_en_attente=Sum(places, filter=Q(statut='en_attente')),
+            nb_liste_attente=Count('id', filter=Q(statut='liste_attente')),
+            nb_inscriptions_confirmees=Count('id', filter=Q(statut__in=statuts_occupant)),
+        )
+        
+        return {
+            ligne.pop('evenement_id'): {cle: valeur or 0 for cle, valeur in ligne.items()}
+            for ligne in lignes
+        }
 
 
 class InscriptionEvenementManager(BaseManager):
@@ -607,17 +615,12 @@ class InscriptionEvenementManager(BaseManager):
         )
     
     def nettoyer_inscriptions_expirees(self):
-        """Marque comme expirées les inscriptions dépassant le délai"""
-        inscriptions_expirees = self.en_retard_confirmation()
-        
-        for inscription in inscriptions_expirees:
-            inscription.statut = 'expiree'
-            inscription.save()
-            
-            # Promouvoir depuis la liste d'attente
-            inscription.evenement.promouvoir_liste_attente()
-        
-        return inscriptions_expirees.count()
+        """
+        Marque comme expirées les inscriptions dépassant le délai et promeut
+        la liste d'attente (balayage ensembliste, voir apps.evenements.balayage)
+        """
+        from .balayage import balayage_inscriptions
+        return balayage_inscriptions.executer()['inscriptions_expirees']
 
 
 class AccompagnantInviteManager(BaseManager):
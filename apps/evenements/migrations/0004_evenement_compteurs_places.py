@@ -0,0 +1,58 @@
+# Generated by Django 5.1.8 on 2026-10-17 22:05
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+
+
+def initialiser_compteurs_places(apps, schema_editor):
+    Evenement = apps.get_model('evenements', 'Evenement')
+    InscriptionEvenement = apps.get_model('evenements', 'InscriptionEvenement')
+    
+    places = 1 + F('nombre_accompagnants')
+    statuts_occupant = ['confirmee', 'presente']
+    
+    lignes = InscriptionEvenement.objects.filter(
+        deleted_at__isnull=True
+    ).order_by().values('evenement_id').annotate(
+        nb_places_occupees=Sum(places, filter=Q(statut__in=statuts_occupant)),
+        nb_places_en_attente=Sum(places, filter=Q(statut='en_attente')),
+        nb_liste_attente=Count('id', filter=Q(statut='liste_attente')),
+        nb_inscriptions_confirmees=Count('id', filter=Q(statut__in=statuts_occupant)),
+    )
+    
+    for ligne in lignes:
+        evenement_id = ligne.pop('evenement_id')
+        Evenement.objects.filter(pk=evenement_id).update(
+            **{champ: valeur or 0 for champ, valeur in ligne.items()}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evenements', '0003_delete_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evenement',
+            name='nb_inscriptions_confirmees',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Inscriptions confirmées ou présentes'),
+        ),
+        migrations.AddField(
+            model_name='evenement',
+            name='nb_liste_attente',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Inscriptions en liste d'attente"),
+        ),
+        migrations.AddField(
+            model_name='evenement',
+            name='nb_places_en_attente',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Membres et accompagnants des inscriptions en attente de confirmation', verbose_name='Places en attente de confirmation'),
+        ),
+        migrations.AddField(
+            model_name='evenement',
+            name='nb_places_occupees',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Membres et accompagnants des inscriptions confirmées ou présentes', verbose_name='Places occupées'),
+        ),
+        migrations.RunPython(initialiser_compteurs_places, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.8 on 2026-10-18 00:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evenements', '0004_evenement_compteurs_places'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RappelInscription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type_rappel', models.CharField(choices=[('confirmation_24h', 'Confirmation - 24 heures avant la date limite'), ('confirmation_2h', 'Confirmation - 2 heures avant la date limite'), ('evenement_24h', 'Événement - 24 heures avant le début'), ('evenement_2h', 'Événement - 2 heures avant le début')], max_length=20, verbose_name='Type de rappel')),
+                ('date_envoi', models.DateTimeField(default=django.utils.timezone.now, verbose_name="Date d'envoi")),
+                ('inscription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rappels', to='evenements.inscriptionevenement', verbose_name='Inscription')),
+            ],
+            options={
+                'verbose_name': "Rappel d'inscription",
+                'verbose_name_plural': "Rappels d'inscriptions",
+                'db_table': 'rappels_inscriptions',
+                'indexes': [models.Index(fields=['date_envoi'], name='rappels_ins_date_en_5ce453_idx')],
+                'constraints': [models.UniqueConstraint(fields=('inscription', 'type_rappel'), name='rappel_inscription_unique')],
+            },
+        ),
+    ]
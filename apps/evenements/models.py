@@ -1,5 +1,7 @@
 # apps/evenements/models.py
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -8,6 +10,7 @@ from decimal import Decimal
 import uuid
 
 from apps.core.models import BaseModel
+from apps.core.references import generer_reference, generer_references
 from apps.membres.models import Membre
 from apps.accounts.models import CustomUser
 from apps.cotisations.models import ModePaiement
@@ -145,6 +148,31 @@ class Evenement(BaseModel):
         verbose_name="Date de fermeture des inscriptions"
     )
     
+    # Compteurs dénormalisés, maintenus par InscriptionEvenement.save()
+    # et vérifiables via la commande recalculer_compteurs_places
+    nb_places_occupees = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Membres et accompagnants des inscriptions confirmées ou présentes",
+        verbose_name="Places occupées"
+    )
+    nb_places_en_attente = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Membres et accompagnants des inscriptions en attente de confirmation",
+        verbose_name="Places en attente de confirmation"
+    )
+    nb_liste_attente = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Inscriptions en liste d'attente"
+    )
+    nb_inscriptions_confirmees = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Inscriptions confirmées ou présentes"
+    )
+    
     # Tarification
     est_payant = models.BooleanField(
         default=False,
@@ -322,6 +350,12 @@ class Evenement(BaseModel):
                     'Ce type d\'événement n\'autorise pas les accompagnants.'
                 )
 
+    # Compteurs mis à jour uniquement par requêtes UPDATE atomiques
+    CHAMPS_COMPTEURS_PLACES = [
+        'nb_places_occupees', 'nb_places_en_attente',
+        'nb_liste_attente', 'nb_inscriptions_confirmees',
+    ]
+
     def save(self, *args, **kwargs):
         # Génération de la référence unique
         if not self.reference:
@@ -335,14 +369,89 @@ class Evenement(BaseModel):
             self.permet_accompagnants = False
             self.nombre_max_accompagnants = 0
         
+        # Ne jamais réécrire les compteurs de places avec une valeur en mémoire
+        # potentiellement périmée : ils ne changent que via ajuster_compteurs_places
+        if (not self._state.adding and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.CHAMPS_COMPTEURS_PLACES
+            ]
+        
         super().save(*args, **kwargs)
 
+    @classmethod
+    def ajuster_compteurs_places(cls, evenement_id, **deltas):
+        """
+        Applique des variations aux compteurs de places d'un événement
+        via un UPDATE atomique (sans lecture préalable de la ligne).
+        """
+        updates = {
+            champ: Greatest(F(champ) + delta, 0)
+            for champ, delta in deltas.items()
+            if delta
+        }
+        if evenement_id and updates:
+            cls._base_manager.filter(pk=evenement_id).update(**updates)
+
+    @classmethod
+    def ajuster_compteurs_places_groupes(cls, variations):
+        """
+        Applique en un seul UPDATE les variations des compteurs de places
+        de plusieurs événements ({evenement_id: {champ: delta}}).
+        """
+        updates = {}
+        for champ in cls.CHAMPS_COMPTEURS_PLACES:
+            cas = [
+                When(pk=evenement_id, then=Value(deltas[champ]))
+                for evenement_id, deltas in variations.items()
+                if deltas.get(champ)
+            ]
+            if cas:
+                updates[champ] = Greatest(
+                    F(champ) + Case(*cas, default=Value(0), output_field=models.IntegerField()), 0
+                )
+        if updates:
+            cls._base_manager.filter(pk__in=list(variations)).update(**updates)
+
+    def recalculer_compteurs_places(self, commit=True):
+        """
+        Recalcule les compteurs de places depuis les inscriptions.
+        
+        Returns:
+            dict: Valeurs recalculées des compteurs
+        """
+        compteurs = InscriptionEvenement.objects.filter(
+            evenement=self
+        ).compteurs_places_par_evenement().get(self.pk, {})
+        
+        for champ in self.CHAMPS_COMPTEURS_PLACES:
+            setattr(self, champ, compteurs.get(champ, 0))
+        
+        if commit:
+            Evenement._base_manager.filter(pk=self.pk).update(
+                **{champ: getattr(self, champ) for champ in self.CHAMPS_COMPTEURS_PLACES}
+            )
+        return {champ: getattr(self, champ) for champ in self.CHAMPS_COMPTEURS_PLACES}
+
     def _generer_reference(self):
-        """Génère une référence unique pour l'événement"""
-        prefix = f"EVT{self.date_debut.year}"
-        # Utiliser les 8 premiers caractères d'un UUID
-        suffix = str(uuid.uuid4()).upper()[:8]
-        return f"{prefix}-{suffix}"
+        """Génère une référence unique pour l'événement (format EVT2024-NNNNNN)"""
+        return generer_reference(f"EVT{self.date_debut.year}")
+
+    @classmethod
+    def generer_references(cls, evenements):
+        """
+        Attribue une référence aux événements non enregistrés d'un lot
+        (occurrences d'une récurrence...), une réservation par année.
+        """
+        par_prefixe = {}
+        for evenement in evenements:
+            if not evenement.reference:
+                par_prefixe.setdefault(f"EVT{evenement.date_debut.year}", []).append(evenement)
+
+        for prefixe, lot in par_prefixe.items():
+            for evenement, reference in zip(lot, generer_references(prefixe, nombre=len(lot))):
+                evenement.reference = reference
 
     @property
     def duree_heures(self):
@@ -365,21 +474,15 @@ class Evenement(BaseModel):
     def places_disponibles(self):
         """
         Nombre de places disponibles
-        Seules les inscriptions confirmées/présentes comptent définitivement
+        Même décompte que reserver_places : places des inscriptions
+        confirmées/présentes et places réservées en attente de confirmation
+        (membre principal + accompagnants, compteurs nb_places_occupees et
+        nb_places_en_attente)
         """
         if not self.capacite_max:
             return float('inf')
         
-        total_participants = 0
-        inscriptions_definitives = self.inscriptions.filter(
-            statut__in=self.STATUTS_OCCUPENT_PLACE
-        )
-        
-        for inscription in inscriptions_definitives:
-            # Le membre principal + ses accompagnants
-            total_participants += 1 + inscription.nombre_accompagnants
-        
-        return max(0, self.capacite_max - total_participants)
+        return max(0, self.capacite_max - self.nb_places_occupees - self.nb_places_en_attente)
 
     @property
     def est_complet(self):
@@ -394,10 +497,7 @@ class Evenement(BaseModel):
         """Calcule le taux d'occupation de l'événement"""
         if self.capacite_max == 0:
             return 0
-        inscriptions_confirmees = self.inscriptions.filter(
-            statut__in=['confirmee', 'presente']
-        ).count()
-        return (inscriptions_confirmees / self.capacite_max) * 100
+        return (self.nb_inscriptions_confirmees / self.capacite_max) * 100
 
     @property
     def places_en_attente(self):
@@ -405,13 +505,7 @@ class Evenement(BaseModel):
         NOUVELLE PROPRIÉTÉ : Places temporairement réservées (en_attente)
         Utile pour l'interface utilisateur
         """
-        total_en_attente = 0
-        inscriptions_en_attente = self.inscriptions.filter(statut='en_attente')
-        
-        for inscription in inscriptions_en_attente:
-            total_en_attente += 1 + inscription.nombre_accompagnants
-        
-        return total_en_attente
+        return self.nb_places_en_attente
     
     def peut_s_inscrire(self, membre):
         """Vérifie si un membre peut s'inscrire à l'événement"""
@@ -535,20 +629,79 @@ class Evenement(BaseModel):
 
     def promouvoir_liste_attente(self):
         """Promeut les inscrits de la liste d'attente si des places se libèrent"""
-        places_libres = self.places_disponibles
-        if places_libres > 0:
-            inscriptions_attente = self.inscriptions.filter(
-                statut='liste_attente'
-            ).order_by('date_inscription')[:places_libres]
-            
-            for inscription in inscriptions_attente:
+        if self.places_disponibles <= 0:
+            return 0
+        
+        # Ordre d'arrivée strict : on s'arrête au premier inscrit qui ne tient plus
+        promues = 0
+        inscriptions_attente = self.inscriptions.filter(
+            statut='liste_attente'
+        ).order_by('date_inscription')
+        
+        for inscription in inscriptions_attente:
+            with transaction.atomic():
+                if not self._verrouiller_places(1 + inscription.nombre_accompagnants):
+                    break
                 inscription.statut = 'en_attente'
                 inscription.date_limite_confirmation = timezone.now() + timezone.timedelta(hours=self.delai_confirmation)
                 inscription.save(update_fields=['statut', 'date_limite_confirmation'])
-                
-            # AJOUTER : Retourner le nombre d'inscriptions promues pour feedback
-            return len(inscriptions_attente)
-        return 0
+            promues += 1
+        
+        # AJOUTER : Retourner le nombre d'inscriptions promues pour feedback
+        return promues
+
+    def reserver_places(self, inscription):
+        """
+        Enregistre une nouvelle inscription en lui attribuant une place,
+        ou en liste d'attente si l'événement ne peut plus l'accueillir.
+        
+        La vérification de capacité et l'enregistrement se font dans la même
+        transaction, derrière le verrou posé par _verrouiller_places : deux
+        demandes simultanées ne peuvent pas obtenir la même place.
+        
+        Args:
+            inscription (InscriptionEvenement): Inscription non encore enregistrée
+            
+        Returns:
+            bool: True si une place est attribuée (statut en_attente),
+            False si l'inscription est placée en liste d'attente
+        """
+        inscription.evenement = self
+        
+        with transaction.atomic():
+            place_attribuee = self._verrouiller_places(1 + (inscription.nombre_accompagnants or 0))
+            if place_attribuee:
+                inscription.statut = 'en_attente'
+                inscription.date_limite_confirmation = timezone.now() + timezone.timedelta(
+                    hours=self.delai_confirmation
+                )
+            else:
+                inscription.statut = 'liste_attente'
+                inscription.date_limite_confirmation = None
+            inscription.save()
+        
+        return place_attribuee
+
+    def _verrouiller_places(self, places):
+        """
+        Verrouille la ligne de l'événement et vérifie qu'il peut accueillir
+        ``places`` supplémentaires (places occupées + places en attente de
+        confirmation), en une seule requête UPDATE conditionnelle.
+        
+        Le verrou d'écriture est conservé jusqu'à la fin de la transaction
+        appelante : les compteurs sont ensuite ajustés par la sauvegarde de
+        l'inscription, avant que toute autre réservation ne puisse les relire.
+        Doit donc être appelée dans un bloc transaction.atomic().
+        
+        Returns:
+            bool: True si la capacité le permet
+        """
+        evenements = Evenement._base_manager.filter(pk=self.pk)
+        if self.capacite_max:
+            evenements = evenements.filter(
+                capacite_max__gte=F('nb_places_occupees') + F('nb_places_en_attente') + places
+            )
+        return evenements.update(nb_places_en_attente=F('nb_places_en_attente')) == 1
 
 
 class EvenementRecurrence(BaseModel):
@@ -614,6 +767,22 @@ class EvenementRecurrence(BaseModel):
     def __str__(self):
         return f"Récurrence {self.frequence} - {self.evenement_parent.titre}"
 
+    def dates_occurrences(self, fin, debut=None):
+        """Dates de début des occurrences entre ``debut`` et ``fin``"""
+        from .recurrence import dates_occurrences
+        return dates_occurrences(self, fin, debut)
+
+    def generer_occurrences(self, fin=None):
+        """
+        Crée les occurrences manquantes jusqu'à ``fin`` (par défaut l'horizon
+        EVENEMENTS_RECURRENCE_HORIZON_JOURS).
+
+        Returns:
+            int: Nombre d'occurrences créées
+        """
+        from .recurrence import generateur_occurrences
+        return generateur_occurrences.generer([self], fin=fin).get(self.pk, 0)
+
     def clean(self):
         """Validation des règles métier de la récurrence"""
         super().clean()
@@ -879,8 +1048,9 @@ class InscriptionEvenement(BaseModel):
                 if not self.evenement.inscriptions_ouvertes:
                     raise ValidationError("Les inscriptions sont fermées pour cet événement.")
                 
-                # Vérifier que l'événement n'est pas complet (sauf si en liste d'attente)
-                if (self.statut not in ['liste_attente'] and 
+                # Vérifier que l'événement n'est pas complet (sauf si en liste d'attente) ;
+                # une inscription existante occupe déjà ses places (reserver_places)
+                if (self._state.adding and self.statut not in ['liste_attente'] and 
                     self.evenement.places_disponibles <= 0):
                     raise ValidationError("Cet événement est complet.")
                 
@@ -914,6 +1084,16 @@ class InscriptionEvenement(BaseModel):
             else:
                 raise
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._memoriser_etat_places()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._memoriser_etat_places()
+
     def save(self, *args, **kwargs):
         # Génération du code de confirmation
         if not self.code_confirmation:
@@ -925,7 +1105,78 @@ class InscriptionEvenement(BaseModel):
                 hours=self.evenement.delai_confirmation
             )
         
-        super().save(*args, **kwargs)
+        # Sauvegarde et mise à jour des compteurs de l'événement dans la même transaction
+        with transaction.atomic():
+            etat_precedent = self._etat_places_precedent()
+            super().save(*args, **kwargs)
+            self._appliquer_variation_places(etat_precedent, (self.evenement_id, self.compteurs_places()))
+        
+        self._memoriser_etat_places()
+
+    def compteurs_places(self):
+        """
+        Contribution de cette inscription aux compteurs de places de son événement.
+        """
+        compteurs = dict.fromkeys(Evenement.CHAMPS_COMPTEURS_PLACES, 0)
+        if self.deleted_at is not None:
+            return compteurs
+        
+        places = 1 + (self.nombre_accompagnants or 0)
+        if self.statut in Evenement.STATUTS_OCCUPENT_PLACE:
+            compteurs['nb_places_occupees'] = places
+            compteurs['nb_inscriptions_confirmees'] = 1
+        elif self.statut == 'en_attente':
+            compteurs['nb_places_en_attente'] = places
+        elif self.statut == 'liste_attente':
+            compteurs['nb_liste_attente'] = 1
+        return compteurs
+
+    def _memoriser_etat_places(self):
+        """Mémorise la contribution actuellement enregistrée en base."""
+        self._etat_places = (self.evenement_id, self.compteurs_places())
+
+    def _etat_places_precedent(self):
+        """Contribution enregistrée en base avant la sauvegarde en cours."""
+        if self._state.adding:
+            return (None, dict.fromkeys(Evenement.CHAMPS_COMPTEURS_PLACES, 0))
+        if hasattr(self, '_etat_places'):
+            return self._etat_places
+        
+        # Instance construite hors ORM : relire l'état enregistré
+        ancienne = InscriptionEvenement._base_manager.filter(pk=self.pk).first()
+        if ancienne is None:
+            return (None, dict.fromkeys(Evenement.CHAMPS_COMPTEURS_PLACES, 0))
+        return ancienne._etat_places
+
+    def _appliquer_variation_places(self, etat_precedent, etat_nouveau):
+        """
+        Répercute le passage d'un état à l'autre sur les compteurs
+        des événements concernés (et sur l'instance d'événement en mémoire).
+        """
+        ancien_evenement_id, anciens_compteurs = etat_precedent
+        nouvel_evenement_id, nouveaux_compteurs = etat_nouveau
+        
+        if ancien_evenement_id == nouvel_evenement_id:
+            variations = {
+                nouvel_evenement_id: {
+                    champ: nouveaux_compteurs[champ] - anciens_compteurs[champ]
+                    for champ in Evenement.CHAMPS_COMPTEURS_PLACES
+                }
+            }
+        else:
+            variations = {
+                ancien_evenement_id: {champ: -valeur for champ, valeur in anciens_compteurs.items()},
+                nouvel_evenement_id: dict(nouveaux_compteurs),
+            }
+        
+        for evenement_id, deltas in variations.items():
+            Evenement.ajuster_compteurs_places(evenement_id, **deltas)
+            
+            # Garder cohérente l'instance d'événement déjà chargée
+            if (evenement_id and evenement_id == self.evenement_id
+                    and InscriptionEvenement.evenement.is_cached(self)):
+                for champ, delta in deltas.items():
+                    setattr(self.evenement, champ, max(0, getattr(self.evenement, champ) + delta))
 
     def _generer_code_confirmation(self):
         """Génère un code de confirmation unique"""
@@ -993,6 +1244,55 @@ class InscriptionEvenement(BaseModel):
         return False
 
 
+class RappelInscription(models.Model):
+    """
+    Registre des rappels envoyés pour une inscription (apps.evenements.rappels).
+
+    Une ligne par inscription et par type de rappel : la contrainte d'unicité
+    garantit qu'un même rappel n'est jamais envoyé deux fois.
+    """
+    TYPE_RAPPEL_CHOICES = [
+        ('confirmation_24h', 'Confirmation - 24 heures avant la date limite'),
+        ('confirmation_2h', 'Confirmation - 2 heures avant la date limite'),
+        ('evenement_24h', 'Événement - 24 heures avant le début'),
+        ('evenement_2h', 'Événement - 2 heures avant le début'),
+    ]
+
+    inscription = models.ForeignKey(
+        InscriptionEvenement,
+        on_delete=models.CASCADE,
+        related_name='rappels',
+        verbose_name="Inscription"
+    )
+    type_rappel = models.CharField(
+        max_length=20,
+        choices=TYPE_RAPPEL_CHOICES,
+        verbose_name="Type de rappel"
+    )
+    date_envoi = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Date d'envoi"
+    )
+
+    class Meta:
+        db_table = 'rappels_inscriptions'
+        verbose_name = "Rappel d'inscription"
+        verbose_name_plural = "Rappels d'inscriptions"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['inscription', 'type_rappel'],
+                name='rappel_inscription_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['date_envoi']),
+        ]
+
+    def __str__(self):
+        # Pas d'accès aux relations : appelé par les signaux de journalisation
+        return f"{self.get_type_rappel_display()} #{self.inscription_id}"
+
+
 class AccompagnantInvite(BaseModel):
     """
     Accompagnants et invités pour les inscriptions aux événements
@@ -0,0 +1,202 @@
+# apps/evenements/rappels.py
+"""
+Rappels de confirmation et rappels avant événement, dédupliqués par le
+registre ``RappelInscription``.
+
+Chaque exécution :
+
+1. sélectionne en une requête les inscriptions dont un rappel est dû et
+   absent du registre (anti-jointure ``NOT EXISTS``). Le type de rappel dû
+   dépend de l'échéance : ``_2h`` à moins de deux heures, ``_24h`` à moins
+   de vingt-quatre heures. Une inscription découverte à moins de deux heures
+   ne reçoit que le rappel ``_2h`` ;
+2. réserve ces rappels par lots dans le registre (``bulk_create`` avec
+   ``ignore_conflicts``). Seules les lignes insérées par cette exécution,
+   reconnues à leur ``date_envoi``, sont envoyées : deux exécutions
+   concurrentes ne peuvent pas envoyer le même rappel ;
+3. envoie le lot sur une connexion partagée (``EnvoiEmailsGroupe``) et
+   libère les réservations des envois en échec, retentés à l'exécution
+   suivante.
+
+Le coût d'une exécution ne dépend que des rappels à envoyer : les rappels
+déjà enregistrés sont écartés par la base.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, CharField, Exists, OuterRef, Value, When
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import InscriptionEvenement, RappelInscription
+
+logger = logging.getLogger(__name__)
+
+
+class RappelsInscriptions:
+    """
+    Envoi groupé et sans doublon des rappels liés aux inscriptions.
+    """
+
+    # nature -> (champ d'échéance, statuts concernés)
+    NATURES = {
+        'confirmation': ('date_limite_confirmation', ['en_attente']),
+        'evenement': ('evenement__date_debut', ['confirmee', 'presente']),
+    }
+
+    def __init__(self, taille_lot=None):
+        self.taille_lot = max(1, taille_lot or getattr(settings, 'NOTIFICATIONS_TAILLE_LOT', 100))
+
+    def envoyer(self, nature, maintenant=None):
+        """
+        Envoie les rappels dus de ``nature`` (``confirmation`` ou ``evenement``).
+
+        Returns:
+            dict: ``rappels_envoyes``, ``erreurs`` et ``ignores`` (préférence
+            du membre désactivée)
+        """
+        maintenant = maintenant or timezone.now()
+        resultats = {'rappels_envoyes': 0, 'erreurs': 0, 'ignores': 0}
+
+        candidates = list(self.candidates(nature, maintenant))
+        for debut in range(0, len(candidates), self.taille_lot):
+            envoyes, erreurs, ignores = self._traiter_lot(nature, candidates[debut:debut + self.taille_lot])
+            resultats['rappels_envoyes'] += envoyes
+            resultats['erreurs'] += erreurs
+            resultats['ignores'] += ignores
+
+        logger.info(
+            f"Rappels {nature} : {resultats['rappels_envoyes']} envoyés, "
+            f"{resultats['erreurs']} erreurs, {resultats['ignores']} ignorés"
+        )
+        return resultats
+
+    def candidates(self, nature, maintenant):
+        """
+        Inscriptions dont un rappel de ``nature`` est dû et pas encore
+        enregistré, annotées du ``type_rappel_du``.
+        """
+        champ, statuts = self.NATURES[nature]
+        return InscriptionEvenement.objects.filter(
+            statut__in=statuts,
+            evenement__statut='publie',
+            evenement__deleted_at__isnull=True,
+            **{f'{champ}__gt': maintenant, f'{champ}__lte': maintenant + timedelta(hours=24)}
+        ).annotate(
+            type_rappel_du=Case(
+                When(**{f'{champ}__lte': maintenant + timedelta(hours=2)}, then=Value(f'{nature}_2h')),
+                default=Value(f'{nature}_24h'),
+                output_field=CharField()
+            )
+        ).filter(
+            ~Exists(RappelInscription.objects.filter(
+                inscription=OuterRef('pk'),
+                type_rappel=OuterRef('type_rappel_du')
+            ))
+        ).select_related(
+            'evenement__organisateur', 'membre__utilisateur__profile'
+        ).order_by('pk')
+
+    def _traiter_lot(self, nature, inscriptions):
+        from apps.core.notifications import EnvoiEmailsGroupe
+
+        reservations = self._reserver(inscriptions)
+        destinataires = {}
+        ignores = 0
+        for inscription in inscriptions:
+            if inscription.pk not in reservations:
+                # Réservé par une exécution concurrente
+                continue
+            if not self._preference(inscription):
+                ignores += 1
+                continue
+            destinataire = self._destinataire(nature, inscription)
+            destinataires[id(destinataire)] = (destinataire, reservations[inscription.pk])
+
+        envoyes, echecs = EnvoiEmailsGroupe(taille_lot=self.taille_lot).envoyer(
+            [destinataire for destinataire, _ in destinataires.values()]
+        )
+        if echecs:
+            # Libérés pour être retentés à la prochaine exécution
+            RappelInscription.objects.filter(
+                pk__in=[destinataires[id(destinataire)][1] for destinataire in echecs]
+            ).delete()
+            logger.warning(f"Rappels {nature} : {len(echecs)} envois en échec, retentés à la prochaine exécution")
+        return envoyes, len(echecs), ignores
+
+    def _reserver(self, inscriptions):
+        """
+        Enregistre les rappels du lot dans le registre.
+
+        Returns:
+            dict: Id de la ligne du registre par id d'inscription, pour les
+            seuls rappels insérés par cet appel
+        """
+        marque = timezone.now()
+        with transaction.atomic():
+            RappelInscription.objects.bulk_create(
+                [
+                    RappelInscription(
+                        inscription_id=inscription.pk,
+                        type_rappel=inscription.type_rappel_du,
+                        date_envoi=marque
+                    )
+                    for inscription in inscriptions
+                ],
+                ignore_conflicts=True
+            )
+            return dict(
+                RappelInscription.objects.filter(
+                    inscription_id__in=[inscription.pk for inscription in inscriptions],
+                    date_envoi=marque
+                ).values_list('inscription_id', 'pk')
+            )
+
+    def _destinataire(self, nature, inscription):
+        evenement, membre = inscription.evenement, inscription.membre
+        contexte = {
+            'inscription': inscription,
+            'evenement': evenement,
+            'membre': membre,
+            'url_detail': settings.SITE_URL + reverse(
+                'evenements:inscription_detail', kwargs={'pk': inscription.pk}
+            ),
+            'site_url': settings.SITE_URL,
+            'site_name': getattr(settings, 'SITE_NAME', 'Gestion Association'),
+        }
+        if nature == 'confirmation':
+            temps_restant = inscription.date_limite_confirmation - timezone.now()
+            contexte.update(
+                heures_restantes=max(0, int(temps_restant.total_seconds() / 3600)),
+                url_confirmation=settings.SITE_URL + reverse(
+                    'evenements:confirmer_email', kwargs={'code': inscription.code_confirmation}
+                ),
+            )
+            template_name = 'rappel_confirmation'
+            subject = f"RAPPEL : Confirmez votre inscription à {evenement.titre}"
+        else:
+            contexte['url_evenement'] = settings.SITE_URL + reverse(
+                'evenements:detail', kwargs={'pk': evenement.pk}
+            )
+            template_name = 'rappel_evenement'
+            subject = f"Rappel : {evenement.titre} - {timezone.localtime(evenement.date_debut).strftime('%d/%m/%Y')}"
+
+        return {
+            'recipient_email': membre.email,
+            'recipient_name': f"{membre.prenom} {membre.nom}",
+            'template_name': template_name,
+            'subject': subject,
+            'context': contexte,
+        }
+
+    def _preference(self, inscription):
+        """Préférence de notification du membre (activée sans compte ni profil)."""
+        utilisateur = inscription.membre.utilisateur
+        profil = getattr(utilisateur, 'profile', None) if utilisateur else None
+        return profil is None or profil.get_notification_preference('evenement_rappel_confirmation')
+
+
+# Rappels partagés par les tâches périodiques
+rappels_inscriptions = RappelsInscriptions()
@@ -0,0 +1,207 @@
+# apps/evenements/recurrence.py
+"""
+Calcul des dates des événements récurrents et création de leurs occurrences.
+
+Les dates d'une récurrence sont toutes calculées en mémoire à partir de la
+date de l'événement parent (jamais de la précédente occurrence), à la même
+heure locale :
+
+- hebdomadaire : les ``jours_semaine`` d'une semaine sur
+  ``intervalle_recurrence`` (jour du parent si la liste est vide) ;
+- mensuelle : le jour du mois du parent, ramené au dernier jour des mois
+  plus courts (31 janvier -> 28/29 février -> 31 mars) ;
+- annuelle : la date anniversaire du parent (29 février -> 28 février
+  les années non bissextiles).
+
+Le parent compte pour la première occurrence de ``nombre_occurrences_max``.
+Les occurrences déjà présentes (y compris dans la corbeille) sont lues en
+une requête pour tout un lot de récurrences ; seules les manquantes sont
+créées par ``bulk_create``, sans les signaux ``post_save`` de l'événement.
+"""
+import calendar
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.recherche import index_recherche
+
+from .models import Evenement, ValidationEvenement
+
+logger = logging.getLogger(__name__)
+
+# Champs de l'événement parent repris par ses occurrences
+CHAMPS_OCCURRENCE = (
+    'titre', 'description', 'lieu', 'adresse_complete', 'capacite_max',
+    'type_evenement_id', 'organisateur_id', 'est_payant', 'tarif_membre',
+    'tarif_salarie', 'tarif_invite', 'permet_accompagnants',
+    'nombre_max_accompagnants', 'delai_confirmation',
+)
+
+
+def ajouter_mois(jour, mois):
+    """Ajoute ``mois`` mois à la date ``jour``, ramenée au dernier jour du mois si besoin."""
+    rang = jour.month - 1 + mois
+    annee, mois = jour.year + rang // 12, rang % 12 + 1
+    return jour.replace(year=annee, month=mois, day=min(jour.day, calendar.monthrange(annee, mois)[1]))
+
+
+def _jours_recurrence(recurrence, ancre):
+    """Itère (sans fin) sur les jours de la récurrence, dans l'ordre, à partir de la semaine/du jour ``ancre``."""
+    intervalle = recurrence.intervalle_recurrence
+    rang = 0
+    if recurrence.frequence == 'hebdomadaire':
+        jours = sorted({int(jour) % 7 for jour in recurrence.jours_semaine or []}) or [ancre.weekday()]
+        lundi = ancre - timedelta(days=ancre.weekday())
+        while True:
+            semaine = lundi + timedelta(weeks=rang * intervalle)
+            for jour in jours:
+                yield semaine + timedelta(days=jour)
+            rang += 1
+    elif recurrence.frequence in ('mensuelle', 'annuelle'):
+        mois = intervalle if recurrence.frequence == 'mensuelle' else 12 * intervalle
+        while True:
+            yield ajouter_mois(ancre, rang * mois)
+            rang += 1
+    else:
+        raise ValueError(f"Fréquence de récurrence inconnue : {recurrence.frequence}")
+
+
+def dates_occurrences(recurrence, fin, debut=None):
+    """
+    Retourne les dates de début des occurrences de ``recurrence`` comprises
+    entre ``debut`` (inclus, par défaut le parent) et ``fin`` (incluse).
+
+    Returns:
+        list: datetimes UTC (à l'heure locale du parent), croissants
+    """
+    ancre = timezone.localtime(recurrence.evenement_parent.date_debut)
+    dernier_jour = timezone.localtime(fin).date()
+    if recurrence.date_fin_recurrence:
+        dernier_jour = min(dernier_jour, recurrence.date_fin_recurrence)
+    maximum = recurrence.nombre_occurrences_max
+
+    dates = []
+    nombre = 1  # L'événement parent
+    for jour in _jours_recurrence(recurrence, ancre.date()):
+        if jour <= ancre.date():
+            continue
+        if jour > dernier_jour or (maximum and nombre >= maximum):
+            break
+        nombre += 1
+        # En UTC : une heure locale ambiguë (changement d'heure) n'est jamais
+        # égale à une date d'un autre fuseau, dont celles lues en base
+        date_debut = timezone.make_aware(datetime.combine(jour, ancre.time()), ancre.tzinfo).astimezone(dt_timezone.utc)
+        if (debut is None or date_debut >= debut) and date_debut <= fin:
+            dates.append(date_debut)
+    return dates
+
+
+class GenerateurOccurrences:
+    """
+    Crée par lots les occurrences manquantes des événements récurrents.
+    """
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+
+    def horizon(self, debut):
+        return debut + timedelta(days=getattr(settings, 'EVENEMENTS_RECURRENCE_HORIZON_JOURS', 90))
+
+    def generer(self, recurrences, fin=None, debut=None):
+        """
+        Crée les occurrences de ``recurrences`` comprises entre ``debut``
+        (par défaut maintenant) et ``fin`` (par défaut l'horizon).
+
+        Les récurrences doivent être chargées avec leur ``evenement_parent``
+        (``select_related``).
+
+        Returns:
+            dict: Nombre d'occurrences créées par id de récurrence (les
+            récurrences en erreur sont absentes et journalisées)
+        """
+        debut = debut or timezone.now()
+        fin = fin or self.horizon(debut)
+        resultats = {}
+        lot = []
+        for recurrence in recurrences:
+            lot.append(recurrence)
+            if len(lot) >= self.batch_size:
+                resultats.update(self._generer_lot(lot, debut, fin))
+                lot = []
+        if lot:
+            resultats.update(self._generer_lot(lot, debut, fin))
+        return resultats
+
+    def _generer_lot(self, recurrences, debut, fin):
+        prevues = {}
+        for recurrence in recurrences:
+            try:
+                prevues[recurrence] = dates_occurrences(recurrence, fin, debut)
+            except (TypeError, ValueError) as e:
+                logger.error(f"Erreur calcul récurrence {recurrence.pk}: {e}")
+
+        # Occurrences existantes du lot, y compris supprimées logiquement :
+        # une occurrence mise à la corbeille n'est pas recréée
+        existantes = set(
+            Evenement._base_manager.filter(
+                evenement_parent_id__in=[recurrence.evenement_parent_id for recurrence in prevues],
+                date_debut__gte=debut,
+                date_debut__lte=fin
+            ).values_list('evenement_parent_id', 'date_debut')
+        )
+
+        resultats = {}
+        occurrences = []
+        for recurrence, dates in prevues.items():
+            parent = recurrence.evenement_parent
+            nouvelles = [
+                self._occurrence(parent, date_debut) for date_debut in dates
+                if (parent.pk, date_debut) not in existantes
+            ]
+            occurrences.extend(nouvelles)
+            resultats[recurrence.pk] = len(nouvelles)
+
+        if occurrences:
+            self._creer(occurrences)
+        return resultats
+
+    def _occurrence(self, parent, date_debut):
+        occurrence = Evenement(
+            date_debut=date_debut,
+            date_fin=date_debut + (parent.date_fin - parent.date_debut) if parent.date_fin else None,
+            statut='publie',
+            evenement_parent=parent,
+            **{champ: getattr(parent, champ) for champ in CHAMPS_OCCURRENCE}
+        )
+        # Évite une requête par occurrence pour les validations à créer
+        occurrence.type_evenement = parent.type_evenement
+        return occurrence
+
+    def _creer(self, occurrences):
+        Evenement.generer_references(occurrences)
+        with transaction.atomic():
+            Evenement.objects.bulk_create(occurrences, batch_size=self.batch_size)
+
+            # Ce que faisait le signal creer_validation_evenement à chaque création
+            ValidationEvenement.objects.bulk_create(
+                [
+                    ValidationEvenement(
+                        evenement=occurrence,
+                        statut_validation='en_attente',
+                        commentaire_validation=f"Demande de validation automatique pour {occurrence.titre}"
+                    )
+                    for occurrence in occurrences
+                    if occurrence.type_evenement.necessite_validation
+                ],
+                batch_size=self.batch_size
+            )
+
+            # bulk_create n'envoie pas post_save : index de recherche mis à jour ici
+            index_recherche.indexer_objets(occurrences, dependances=False)
+
+
+# Générateur partagé (tâche périodique, vue et modèle)
+generateur_occurrences = GenerateurOccurrences()
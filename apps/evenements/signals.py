@@ -1,5 +1,5 @@
 # apps/evenements/signals.py - CRÉER CE FICHIER
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from .models import InscriptionEvenement, Evenement, ValidationEvenement
@@ -28,6 +28,14 @@ def gerer_cotisation_inscription(sender, instance, created, **kwargs):
     except Exception as e:
         logger.error(f"Erreur signal cotisation inscription {instance.id}: {str(e)}")
 
+@receiver(post_delete, sender=InscriptionEvenement)
+def liberer_places_inscription_supprimee(sender, instance, **kwargs):
+    """Retire une inscription supprimée physiquement des compteurs de places"""
+    evenement_id, compteurs = instance._etat_places_precedent()
+    Evenement.ajuster_compteurs_places(
+        evenement_id, **{champ: -valeur for champ, valeur in compteurs.items()}
+    )
+
 @receiver(post_save, sender=Evenement)
 def gerer_changement_statut_evenement(sender, instance, created, **kwargs):
     """Gère les changements de statut d'événement (notamment annulation)"""
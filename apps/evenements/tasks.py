@@ -7,9 +7,11 @@ from datetime import timedelta
 from django.core.mail import send_mail
 from django.conf import settings
 import logging
-from .services import NotificationService
 from apps.core.models import Log
 from .monitoring import NotificationMonitoring
+from .balayage import balayage_inscriptions
+from .recurrence import generateur_occurrences
+from .rappels import rappels_inscriptions
 
 from .models import (
     Evenement, InscriptionEvenement, EvenementRecurrence, 
@@ -36,13 +38,6 @@ try:
 except ImportError:
     Membre = None
 
-# Import sécurisé des services
-try:
-    from .services.services import NotificationService
-except ImportError:
-    from .services import NotificationService
-
-
 logger = logging.getLogger(__name__)
 
 # Configuration des tâches périodiques
@@ -61,7 +56,7 @@ CELERY_BEAT_SCHEDULE = {
     },
     'envoyer-rappels-evenements': {
         'task': 'apps.evenements.tasks.envoyer_rappels_evenements',
-        'schedule': crontab(minute=0, hour=10),  # Tous les jours à 10h
+        'schedule': crontab(minute=15),  # Toutes les heures (rappels 24h et 2h)
     },
     'notifier-validations-urgentes': {
         'task': 'apps.evenements.tasks.notifier_validations_urgentes',
@@ -77,61 +72,10 @@ CELERY_BEAT_SCHEDULE = {
 def envoyer_rappels_confirmation(self):
     """
     Envoie des rappels de confirmation pour les inscriptions en attente
+    (24 heures puis 2 heures avant la date limite, une seule fois chacun)
     """
     try:
-        now = timezone.now()
-        rappels_envoyes = 0
-        erreurs = 0
-        
-        # Inscriptions à confirmer dans les 24 heures
-        inscriptions_24h = InscriptionEvenement.objects.filter(
-            statut='en_attente',
-            date_limite_confirmation__lte=now + timedelta(hours=24),
-            date_limite_confirmation__gt=now
-        ).select_related('membre', 'evenement')
-        
-        # Inscriptions à confirmer dans les 2 heures
-        inscriptions_2h = InscriptionEvenement.objects.filter(
-            statut='en_attente',
-            date_limite_confirmation__lte=now + timedelta(hours=2),
-            date_limite_confirmation__gt=now
-        ).select_related('membre', 'evenement')
-        
-        # Envoyer rappels 24h
-        for inscription in inscriptions_24h:
-            try:
-                # Vérifier si un rappel 24h n'a pas déjà été envoyé
-                if not hasattr(inscription, '_rappel_24h_envoye'):
-                    if NotificationService.envoyer_rappel_confirmation(inscription):
-                        rappels_envoyes += 1
-                        # Marquer comme envoyé (vous pouvez utiliser un champ dans le modèle)
-                        logger.info(f"Rappel 24h envoyé pour inscription {inscription.id}")
-                    else:
-                        erreurs += 1
-            except Exception as e:
-                erreurs += 1
-                logger.error(f"Erreur rappel 24h pour inscription {inscription.id}: {str(e)}")
-        
-        # Envoyer rappels 2h (plus urgents)
-        for inscription in inscriptions_2h:
-            try:
-                if NotificationService.envoyer_rappel_confirmation(inscription):
-                    rappels_envoyes += 1
-                    logger.info(f"Rappel 2h envoyé pour inscription {inscription.id}")
-                else:
-                    erreurs += 1
-            except Exception as e:
-                erreurs += 1
-                logger.error(f"Erreur rappel 2h pour inscription {inscription.id}: {str(e)}")
-        
-        logger.info(f"Rappels de confirmation: {rappels_envoyes} envoyés, {erreurs} erreurs")
-        
-        return {
-            'rappels_envoyes': rappels_envoyes,
-            'erreurs': erreurs,
-            'total_24h': inscriptions_24h.count(),
-            'total_2h': inscriptions_2h.count()
-        }
+        return rappels_inscriptions.envoyer('confirmation')
         
     except Exception as e:
         logger.error(f"Erreur dans envoyer_rappels_confirmation: {str(e)}")
@@ -169,69 +113,32 @@ def envoyer_rappel_confirmation():
 def nettoyer_inscriptions_expirees(self):
     """
     Nettoie les inscriptions expirées et promeut les membres en liste d'attente
+    (balayage ensembliste, voir apps.evenements.balayage)
     """
     try:
-        now = timezone.now()
-        inscriptions_expirees = 0
-        promotions = 0
-        
-        # Trouver les inscriptions expirées
-        inscriptions_a_expirer = InscriptionEvenement.objects.filter(
-            statut='en_attente',
-            date_limite_confirmation__lt=now
-        ).select_related('evenement', 'membre')
-        
-        for inscription in inscriptions_a_expirer:
-            try:
-                # Marquer comme expirée
-                inscription.statut = 'expiree'
-                inscription.save()
-                inscriptions_expirees += 1
-                
-                # Notifier le membre
-                try:
-                    NotificationService.envoyer_notification_expiration(inscription)
-                except Exception as e:
-                    logger.error(f"Erreur notification expiration: {str(e)}")
-                
-                # Promouvoir depuis la liste d'attente
-                evenement = inscription.evenement
-                inscription_attente = InscriptionEvenement.objects.filter(
-                    evenement=evenement,
-                    statut='liste_attente'
-                ).order_by('date_inscription').first()
-                
-                if inscription_attente:
-                    inscription_attente.statut = 'en_attente'
-                    inscription_attente.date_limite_confirmation = now + timedelta(
-                        hours=evenement.delai_confirmation
-                    )
-                    inscription_attente.save()
-                    promotions += 1
-                    
-                    # Notifier la promotion
-                    try:
-                        NotificationService.envoyer_promotion_liste_attente(inscription_attente)
-                    except Exception as e:
-                        logger.error(f"Erreur notification promotion: {str(e)}")
-                
-                logger.info(f"Inscription {inscription.id} expirée et traitée")
-                
-            except Exception as e:
-                logger.error(f"Erreur traitement inscription {inscription.id}: {str(e)}")
-        
-        logger.info(f"Nettoyage terminé: {inscriptions_expirees} expirées, {promotions} promotions")
+        resultats = balayage_inscriptions.executer()
         
-        return {
-            'inscriptions_expirees': inscriptions_expirees,
-            'promotions': promotions
-        }
+        logger.info(
+            f"Nettoyage terminé: {resultats['inscriptions_expirees']} expirées, "
+            f"{resultats['promotions']} promotions"
+        )
+        return resultats
         
     except Exception as e:
         logger.error(f"Erreur dans nettoyer_inscriptions_expirees: {str(e)}")
         if self.request.retries < self.max_retries:
             raise self.retry(countdown=60, exc=e)
         raise
+
+@shared_task(bind=True, max_retries=3)
+def notifier_balayage_inscriptions(self, expirees, promues):
+    """
+    Envoie en un lot les notifications d'un balayage des inscriptions
+    """
+    envoyes, echecs = balayage_inscriptions.notifier(expirees, promues)
+    logger.info(f"Notifications du balayage: {envoyes} envoyées, {len(echecs)} échecs")
+    return {'success': envoyes, 'errors': len(echecs)}
+
 @shared_task
 def envoyer_notifications_urgentes_validation():
     """
@@ -264,22 +171,7 @@ def promouvoir_liste_attente():
     Promeut automatiquement les inscriptions depuis la liste d'attente
     """
     try:
-        from .models import Evenement
-        
-        # Récupérer les événements avec des places disponibles
-        evenements_disponibles = Evenement.objects.avec_places_disponibles()
-        
-        count = 0
-        for evenement in evenements_disponibles:
-            try:
-                # Promouvoir depuis la liste d'attente
-                promues = evenement.promouvoir_liste_attente()
-                count += promues
-                if promues > 0:
-                    logger.info(f"Promotions liste d'attente {evenement.id}: {promues}")
-            except Exception as e:
-                logger.error(f"Erreur promotion {evenement.id}: {e}")
-        
+        count = balayage_inscriptions.promouvoir()
         logger.info(f"Total promotions: {count}")
         return count
         
@@ -291,43 +183,22 @@ def promouvoir_liste_attente():
 def generer_occurrences_recurrentes(self):
     """
     Génère les occurrences futures pour les événements récurrents
+    (horizon EVENEMENTS_RECURRENCE_HORIZON_JOURS, par lots de récurrences)
     """
     try:
-        occurrences_creees = 0
-        erreurs = 0
-        
         # Trouver les événements récurrents actifs
-        recurrences = EvenementRecurrence.objects.filter(
-            Q(date_fin_recurrence__isnull=True) | Q(date_fin_recurrence__gte=timezone.now().date())
-        ).select_related('evenement_parent')
+        recurrences = list(EvenementRecurrence.objects.filter(
+            Q(date_fin_recurrence__isnull=True) | Q(date_fin_recurrence__gte=timezone.now().date()),
+            evenement_parent__deleted_at__isnull=True
+        ).select_related('evenement_parent__type_evenement'))
         
-        for recurrence in recurrences:
-            try:
-                # Créer les occurrences pour les 3 prochains mois
-                date_limite = timezone.now() + timedelta(days=90)
-                
-                # Logique de génération selon la fréquence
-                if recurrence.frequence == 'hebdomadaire':
-                    nouvelles_occurrences = _generer_occurrences_hebdomadaires(
-                        recurrence, date_limite
-                    )
-                elif recurrence.frequence == 'mensuelle':
-                    nouvelles_occurrences = _generer_occurrences_mensuelles(
-                        recurrence, date_limite
-                    )
-                elif recurrence.frequence == 'annuelle':
-                    nouvelles_occurrences = _generer_occurrences_annuelles(
-                        recurrence, date_limite
-                    )
-                else:
-                    continue
-                
-                occurrences_creees += nouvelles_occurrences
-                logger.info(f"Récurrence {recurrence.id}: {nouvelles_occurrences} occurrences créées")
-                
-            except Exception as e:
-                erreurs += 1
-                logger.error(f"Erreur génération récurrence {recurrence.id}: {str(e)}")
+        resultats = generateur_occurrences.generer(recurrences)
+        occurrences_creees = sum(resultats.values())
+        erreurs = len(recurrences) - len(resultats)
+        
+        for recurrence_id, nouvelles_occurrences in resultats.items():
+            if nouvelles_occurrences:
+                logger.info(f"Récurrence {recurrence_id}: {nouvelles_occurrences} occurrences créées")
         
         logger.info(f"Génération récurrences terminée: {occurrences_creees} créées, {erreurs} erreurs")
         
@@ -342,252 +213,14 @@ def generer_occurrences_recurrentes(self):
             raise self.retry(countdown=60, exc=e)
         raise
 
-def _generer_occurrences_hebdomadaires(recurrence, date_limite):
-    """
-    Génère les occurrences hebdomadaires
-    """
-    occurrences_creees = 0
-    evenement_parent = recurrence.evenement_parent
-    
-    # Trouver la dernière occurrence créée
-    derniere_occurrence = Evenement.objects.filter(
-        evenement_parent=evenement_parent
-    ).order_by('-date_debut').first()
-    
-    if derniere_occurrence:
-        prochaine_date = derniere_occurrence.date_debut + timedelta(
-            weeks=recurrence.intervalle_recurrence
-        )
-    else:
-        prochaine_date = evenement_parent.date_debut + timedelta(
-            weeks=recurrence.intervalle_recurrence
-        )
-    
-    while prochaine_date <= date_limite:
-        # Vérifier si cette occurrence existe déjà
-        if not Evenement.objects.filter(
-            evenement_parent=evenement_parent,
-            date_debut=prochaine_date
-        ).exists():
-            
-            # Créer la nouvelle occurrence
-            nouvelle_occurrence = Evenement.objects.create(
-                titre=evenement_parent.titre,
-                description=evenement_parent.description,
-                date_debut=prochaine_date,
-                date_fin=prochaine_date + (evenement_parent.date_fin - evenement_parent.date_debut) if evenement_parent.date_fin else None,
-                lieu=evenement_parent.lieu,
-                adresse_complete=evenement_parent.adresse_complete,
-                capacite_max=evenement_parent.capacite_max,
-                type_evenement=evenement_parent.type_evenement,
-                organisateur=evenement_parent.organisateur,
-                statut='publie',
-                est_payant=evenement_parent.est_payant,
-                tarif_membre=evenement_parent.tarif_membre,
-                tarif_salarie=evenement_parent.tarif_salarie,
-                tarif_invite=evenement_parent.tarif_invite,
-                permet_accompagnants=evenement_parent.permet_accompagnants,
-                nombre_max_accompagnants=evenement_parent.nombre_max_accompagnants,
-                delai_confirmation=evenement_parent.delai_confirmation,
-                evenement_parent=evenement_parent
-            )
-            
-            occurrences_creees += 1
-            logger.info(f"Occurrence hebdomadaire créée: {nouvelle_occurrence.id}")
-        
-        prochaine_date += timedelta(weeks=recurrence.intervalle_recurrence)
-    
-    return occurrences_creees
-
-def _generer_occurrences_mensuelles(recurrence, date_limite):
-    """
-    Génère les occurrences mensuelles
-    """
-    occurrences_creees = 0
-    evenement_parent = recurrence.evenement_parent
-    
-    # Logique similaire pour les occurrences mensuelles
-    derniere_occurrence = Evenement.objects.filter(
-        evenement_parent=evenement_parent
-    ).order_by('-date_debut').first()
-    
-    if derniere_occurrence:
-        prochaine_date = derniere_occurrence.date_debut
-    else:
-        prochaine_date = evenement_parent.date_debut
-    
-    # Calculer la prochaine date mensuelle
-    while prochaine_date <= date_limite:
-        # Ajouter les mois
-        if prochaine_date.month + recurrence.intervalle_recurrence <= 12:
-            prochaine_date = prochaine_date.replace(
-                month=prochaine_date.month + recurrence.intervalle_recurrence
-            )
-        else:
-            mois_suivant = (prochaine_date.month + recurrence.intervalle_recurrence - 1) % 12 + 1
-            annee_suivante = prochaine_date.year + (prochaine_date.month + recurrence.intervalle_recurrence - 1) // 12
-            prochaine_date = prochaine_date.replace(year=annee_suivante, month=mois_suivant)
-        
-        # Vérifier si cette occurrence existe déjà
-        if not Evenement.objects.filter(
-            evenement_parent=evenement_parent,
-            date_debut=prochaine_date
-        ).exists():
-            
-            # Créer la nouvelle occurrence
-            nouvelle_occurrence = Evenement.objects.create(
-                titre=evenement_parent.titre,
-                description=evenement_parent.description,
-                date_debut=prochaine_date,
-                date_fin=prochaine_date + (evenement_parent.date_fin - evenement_parent.date_debut) if evenement_parent.date_fin else None,
-                lieu=evenement_parent.lieu,
-                adresse_complete=evenement_parent.adresse_complete,
-                capacite_max=evenement_parent.capacite_max,
-                type_evenement=evenement_parent.type_evenement,
-                organisateur=evenement_parent.organisateur,
-                statut='publie',
-                est_payant=evenement_parent.est_payant,
-                tarif_membre=evenement_parent.tarif_membre,
-                tarif_salarie=evenement_parent.tarif_salarie,
-                tarif_invite=evenement_parent.tarif_invite,
-                permet_accompagnants=evenement_parent.permet_accompagnants,
-                nombre_max_accompagnants=evenement_parent.nombre_max_accompagnants,
-                delai_confirmation=evenement_parent.delai_confirmation,
-                evenement_parent=evenement_parent
-            )
-            
-            occurrences_creees += 1
-            logger.info(f"Occurrence mensuelle créée: {nouvelle_occurrence.id}")
-    
-    return occurrences_creees
-
-def _generer_occurrences_annuelles(recurrence, date_limite):
-    """
-    Génère les occurrences annuelles
-    """
-    occurrences_creees = 0
-    evenement_parent = recurrence.evenement_parent
-    
-    # Logique similaire pour les occurrences annuelles
-    derniere_occurrence = Evenement.objects.filter(
-        evenement_parent=evenement_parent
-    ).order_by('-date_debut').first()
-    
-    if derniere_occurrence:
-        prochaine_date = derniere_occurrence.date_debut.replace(
-            year=derniere_occurrence.date_debut.year + recurrence.intervalle_recurrence
-        )
-    else:
-        prochaine_date = evenement_parent.date_debut.replace(
-            year=evenement_parent.date_debut.year + recurrence.intervalle_recurrence
-        )
-    
-    while prochaine_date <= date_limite:
-        # Vérifier si cette occurrence existe déjà
-        if not Evenement.objects.filter(
-            evenement_parent=evenement_parent,
-            date_debut=prochaine_date
-        ).exists():
-            
-            # Créer la nouvelle occurrence
-            nouvelle_occurrence = Evenement.objects.create(
-                titre=evenement_parent.titre,
-                description=evenement_parent.description,
-                date_debut=prochaine_date,
-                date_fin=prochaine_date + (evenement_parent.date_fin - evenement_parent.date_debut) if evenement_parent.date_fin else None,
-                lieu=evenement_parent.lieu,
-                adresse_complete=evenement_parent.adresse_complete,
-                capacite_max=evenement_parent.capacite_max,
-                type_evenement=evenement_parent.type_evenement,
-                organisateur=evenement_parent.organisateur,
-                statut='publie',
-                est_payant=evenement_parent.est_payant,
-                tarif_membre=evenement_parent.tarif_membre,
-                tarif_salarie=evenement_parent.tarif_salarie,
-                tarif_invite=evenement_parent.tarif_invite,
-                permet_accompagnants=evenement_parent.permet_accompagnants,
-                nombre_max_accompagnants=evenement_parent.nombre_max_accompagnants,
-                delai_confirmation=evenement_parent.delai_confirmation,
-                evenement_parent=evenement_parent
-            )
-            
-            occurrences_creees += 1
-            logger.info(f"Occurrence annuelle créée: {nouvelle_occurrence.id}")
-        
-        prochaine_date = prochaine_date.replace(year=prochaine_date.year + recurrence.intervalle_recurrence)
-    
-    return occurrences_creees
-
 @shared_task(bind=True, max_retries=3)
 def envoyer_rappels_evenements(self):
     """
-    Envoie des rappels avant les événements
+    Envoie des rappels avant les événements aux inscrits confirmés
+    (24 heures puis 2 heures avant le début, une seule fois chacun)
     """
     try:
-        now = timezone.now()
-        rappels_envoyes = 0
-        erreurs = 0
-        
-        # Événements dans 24h
-        evenements_24h = Evenement.objects.filter(
-            date_debut__gte=now + timedelta(hours=23),
-            date_debut__lte=now + timedelta(hours=25),
-            statut='publie'
-        ).select_related('type_evenement', 'organisateur')
-        
-        # Événements dans 2h
-        evenements_2h = Evenement.objects.filter(
-            date_debut__gte=now + timedelta(hours=1),
-            date_debut__lte=now + timedelta(hours=3),
-            statut='publie'
-        ).select_related('type_evenement', 'organisateur')
-        
-        # Traiter les rappels 24h
-        for evenement in evenements_24h:
-            try:
-                # Récupérer les membres inscrits confirmés
-                membres_inscrits = Membre.objects.filter(
-                    inscriptions_evenements__evenement=evenement,
-                    inscriptions_evenements__statut__in=['confirmee', 'presente']
-                ).distinct()
-                
-                if NotificationService.envoyer_rappel_evenement(evenement, membres_inscrits):
-                    rappels_envoyes += 1
-                    logger.info(f"Rappel 24h envoyé pour événement {evenement.id}")
-                else:
-                    erreurs += 1
-                    
-            except Exception as e:
-                erreurs += 1
-                logger.error(f"Erreur rappel 24h événement {evenement.id}: {str(e)}")
-        
-        # Traiter les rappels 2h
-        for evenement in evenements_2h:
-            try:
-                # Récupérer les membres inscrits confirmés
-                membres_inscrits = Membre.objects.filter(
-                    inscriptions_evenements__evenement=evenement,
-                    inscriptions_evenements__statut__in=['confirmee', 'presente']
-                ).distinct()
-                
-                if NotificationService.envoyer_rappel_evenement(evenement, membres_inscrits):
-                    rappels_envoyes += 1
-                    logger.info(f"Rappel 2h envoyé pour événement {evenement.id}")
-                else:
-                    erreurs += 1
-                    
-            except Exception as e:
-                erreurs += 1
-                logger.error(f"Erreur rappel 2h événement {evenement.id}: {str(e)}")
-        
-        logger.info(f"Rappels d'événements: {rappels_envoyes} envoyés, {erreurs} erreurs")
-        
-        return {
-            'rappels_envoyes': rappels_envoyes,
-            'erreurs': erreurs,
-            'evenements_24h': evenements_24h.count(),
-            'evenements_2h': evenements_2h.count()
-        }
+        return rappels_inscriptions.envoyer('evenement')
         
     except Exception as e:
         logger.error(f"Erreur dans envoyer_rappels_evenements: {str(e)}")
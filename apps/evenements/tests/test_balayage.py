@@ -0,0 +1,79 @@
+import itertools
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from django.core import mail
+from django.utils import timezone
+
+from apps.evenements.balayage import balayage_inscriptions
+from apps.evenements.models import Evenement, InscriptionEvenement
+from apps.evenements.tasks import notifier_balayage_inscriptions
+from apps.evenements.tests.factories import EvenementFactory, InscriptionEvenementFactory
+
+
+@pytest.mark.django_db
+class TestBalayageInscriptions:
+    """Tests de l'expiration et de la promotion groupées"""
+
+    # Emails dérivés des noms Faker : risque de collision sur une quinzaine de membres
+    numeros = itertools.count()
+
+    def _inscription(self, evenement, statut, accompagnants=0, minutes=0):
+        inscription = InscriptionEvenementFactory(
+            evenement=evenement, statut=statut, nombre_accompagnants=accompagnants,
+            membre__email=f'balayage{next(self.numeros)}@test.com'
+        )
+        # Ordre d'arrivée maîtrisé (date_inscription est auto_now_add)
+        InscriptionEvenement.objects.filter(pk=inscription.pk).update(
+            date_inscription=timezone.now() - timedelta(days=1) + timedelta(minutes=minutes)
+        )
+        return inscription
+
+    def _evenement(self):
+        evenement = EvenementFactory(capacite_max=3, nombre_max_accompagnants=2)
+        echue = self._inscription(evenement, 'en_attente', accompagnants=1)
+        InscriptionEvenement.objects.filter(pk=echue.pk).update(
+            date_limite_confirmation=timezone.now() - timedelta(hours=1)
+        )
+        self._inscription(evenement, 'confirmee')
+        attente = [
+            self._inscription(evenement, 'liste_attente', accompagnants=accompagnants, minutes=minutes)
+            for minutes, accompagnants in ((1, 0), (2, 1), (3, 0))
+        ]
+        return evenement, echue, attente
+
+    def test_expiration_et_promotion_dans_l_ordre(self, django_capture_on_commit_callbacks):
+        """Places libérées attribuées dans l'ordre d'arrivée, sans doubler un inscrit qui ne tient pas"""
+        evenement, echue, (premiere, deuxieme, troisieme) = self._evenement()
+        mail.outbox = []
+
+        with patch('apps.evenements.tasks.notifier_balayage_inscriptions.delay',
+                   side_effect=notifier_balayage_inscriptions) as delay:
+            with django_capture_on_commit_callbacks(execute=True):
+                resultats = balayage_inscriptions.executer()
+
+        assert resultats == {'inscriptions_expirees': 1, 'promotions': 1}
+        statuts = dict(InscriptionEvenement.objects.filter(evenement=evenement).values_list('pk', 'statut'))
+        assert statuts[echue.pk] == 'expiree'
+        assert statuts[premiere.pk] == 'en_attente'
+        # 2 places demandées pour 1 place restante : la suivante attend aussi
+        assert statuts[deuxieme.pk] == statuts[troisieme.pk] == 'liste_attente'
+
+        evenement.refresh_from_db()
+        compteurs = {champ: getattr(evenement, champ) for champ in Evenement.CHAMPS_COMPTEURS_PLACES}
+        assert compteurs == evenement.recalculer_compteurs_places(commit=False)
+
+        # Un email d'expiration et un de promotion, confiés à une seule tâche
+        delay.assert_called_once()
+        assert sorted(message.subject.split(' ')[0] for message in mail.outbox) == ['Bonne', 'Inscription']
+
+    def test_balayage_idempotent(self, django_assert_max_num_queries):
+        """Un second balayage ne modifie rien, en un nombre borné de requêtes"""
+        for _ in range(3):
+            self._evenement()
+
+        # Nombre de requêtes indépendant du nombre d'événements et d'inscriptions
+        with django_assert_max_num_queries(12):
+            assert balayage_inscriptions.executer() == {'inscriptions_expirees': 3, 'promotions': 3}
+        assert balayage_inscriptions.executer() == {'inscriptions_expirees': 0, 'promotions': 0}
+        assert balayage_inscriptions.promouvoir() == 0
@@ -209,7 +209,8 @@ class TestEvenementManager:
         for _ in range(3):
             InscriptionEvenementFactory(
                 evenement=evt_places,
-                statut='confirmee'
+                statut='confirmee',
+                nombre_accompagnants=0
             )
         
         # Événement complet
@@ -217,7 +218,8 @@ class TestEvenementManager:
         for _ in range(2):
             InscriptionEvenementFactory(
                 evenement=evt_complet,
-                statut='confirmee'
+                statut='confirmee',
+                nombre_accompagnants=0
             )
         
         avec_places = Evenement.objects.avec_places_disponibles()
@@ -232,14 +234,16 @@ class TestEvenementManager:
         for _ in range(2):
             InscriptionEvenementFactory(
                 evenement=evt_complet,
-                statut='confirmee'
+                statut='confirmee',
+                nombre_accompagnants=0
             )
         
         # Événement avec places
         evt_places = EvenementFactory(capacite_max=10)
         InscriptionEvenementFactory(
             evenement=evt_places,
-            statut='confirmee'
+            statut='confirmee',
+            nombre_accompagnants=0
         )
         
         complets = Evenement.objects.complets()
@@ -247,6 +251,34 @@ class TestEvenementManager:
         assert evt_complet in complets
         assert evt_places not in complets
 
+    def test_complet_par_accompagnants(self):
+        """Les accompagnants occupent des places comme les inscrits"""
+        evenement = EvenementFactory(capacite_max=3, permet_accompagnants=True, nombre_max_accompagnants=3)
+        InscriptionEvenementFactory(evenement=evenement, statut='confirmee', nombre_accompagnants=2)
+        
+        evenement.refresh_from_db()
+        assert evenement.est_complet
+        assert evenement in Evenement.objects.complets()
+        assert evenement not in Evenement.objects.avec_places_disponibles()
+
+    def test_complets_coherent_avec_est_complet(self):
+        """complets() et avec_places_disponibles() suivent est_complet (places en attente incluses)"""
+        en_attente = EvenementFactory(capacite_max=2)
+        InscriptionEvenementFactory(evenement=en_attente, statut='en_attente', nombre_accompagnants=0)
+        InscriptionEvenementFactory(evenement=en_attente, statut='confirmee', nombre_accompagnants=0)
+        avec_places = EvenementFactory(capacite_max=3)
+        InscriptionEvenementFactory(evenement=avec_places, statut='en_attente', nombre_accompagnants=0)
+        vide = EvenementFactory(capacite_max=1)
+        
+        complets = set(Evenement.objects.complets())
+        disponibles = set(Evenement.objects.avec_places_disponibles())
+        for evenement in (en_attente, avec_places, vide):
+            evenement.refresh_from_db()
+            assert (evenement in complets) == evenement.est_complet
+            assert (evenement in disponibles) == (not evenement.est_complet)
+        assert en_attente.est_complet
+        assert avec_places.places_disponibles == 2
+
     def test_par_type_string(self):
         """Test filtrage par type (string)"""
         type_formation = TypeEvenementFactory(libelle="Formation Python")
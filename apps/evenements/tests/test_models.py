@@ -340,6 +340,184 @@ class TestEvenement:
     
 
 
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestCompteursPlaces:
+    """Tests des compteurs de places dénormalisés sur Evenement"""
+
+    def test_compteurs_suivent_les_transitions(self):
+        """Les transitions d'inscription mettent à jour les compteurs"""
+        evenement = EvenementFactory(capacite_max=10, permet_accompagnants=True, nombre_max_accompagnants=3)
+        inscription = InscriptionEvenementFactory(
+            evenement=evenement, statut='en_attente', nombre_accompagnants=2
+        )
+        
+        evenement.refresh_from_db()
+        assert evenement.places_en_attente == 3
+        # Places réservées jusqu'à la confirmation
+        assert evenement.places_disponibles == 7
+        
+        inscription.confirmer_inscription()
+        evenement.refresh_from_db()
+        assert evenement.nb_places_en_attente == 0
+        assert evenement.places_disponibles == 7
+        assert evenement.taux_occupation == 10.0
+        
+        inscription.annuler_inscription("Test")
+        evenement.refresh_from_db()
+        assert evenement.nb_places_occupees == 0
+        assert evenement.places_disponibles == 10
+
+    def test_liste_attente_et_promotion(self):
+        """La liste d'attente et la promotion sont comptabilisées"""
+        evenement = EvenementFactory(capacite_max=1)
+        InscriptionEvenementFactory(evenement=evenement, statut='confirmee', nombre_accompagnants=0)
+        attente = InscriptionEvenementFactory(evenement=evenement, statut='liste_attente', nombre_accompagnants=0)
+        
+        evenement.refresh_from_db()
+        assert evenement.nb_liste_attente == 1
+        assert evenement.est_complet
+        
+        evenement.inscriptions.filter(statut='confirmee').first().delete()
+        evenement.refresh_from_db()
+        assert evenement.promouvoir_liste_attente() == 1
+        
+        evenement.refresh_from_db()
+        attente.refresh_from_db()
+        assert attente.statut == 'en_attente'
+        assert evenement.nb_liste_attente == 0
+        assert evenement.nb_places_en_attente == 1
+
+    def test_suppression_physique(self):
+        """Une suppression physique libère les places"""
+        evenement = EvenementFactory(capacite_max=5)
+        inscription = InscriptionEvenementFactory(evenement=evenement, statut='confirmee', nombre_accompagnants=0)
+        
+        inscription.delete(hard=True)
+        evenement.refresh_from_db()
+        assert evenement.nb_places_occupees == 0
+
+    def test_sauvegarde_evenement_ne_reinitialise_pas_compteurs(self):
+        """Une instance périmée d'événement ne réécrit pas les compteurs"""
+        evenement = EvenementFactory(capacite_max=5)
+        copie_perimee = Evenement.objects.get(pk=evenement.pk)
+        InscriptionEvenementFactory(evenement=evenement, statut='confirmee', nombre_accompagnants=0)
+        
+        copie_perimee.titre = "Nouveau titre"
+        copie_perimee.save()
+        
+        evenement.refresh_from_db()
+        assert evenement.titre == "Nouveau titre"
+        assert evenement.nb_places_occupees == 1
+
+    def test_places_disponibles_sans_requete(self, django_assert_num_queries):
+        """La vérification de capacité est une simple lecture de colonne"""
+        evenement = EvenementFactory(capacite_max=5)
+        with django_assert_num_queries(0):
+            assert evenement.places_disponibles == 5
+            assert not evenement.est_complet
+
+    def test_commande_recalcul(self):
+        """La commande détecte et corrige un compteur désynchronisé"""
+        from io import StringIO
+        from django.core.management import call_command
+        
+        evenement = EvenementFactory(capacite_max=5)
+        InscriptionEvenementFactory(evenement=evenement, statut='confirmee', nombre_accompagnants=0)
+        Evenement.objects.filter(pk=evenement.pk).update(nb_places_occupees=4)
+        
+        sortie = StringIO()
+        call_command('recalculer_compteurs_places', '--verifier', stdout=sortie)
+        assert '1 événement(s) avec des compteurs incohérents' in sortie.getvalue()
+        
+        call_command('recalculer_compteurs_places', stdout=StringIO())
+        evenement.refresh_from_db()
+        assert evenement.nb_places_occupees == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestReservationPlaces:
+    """Tests de l'attribution atomique des places"""
+
+    def _nouvelle_inscription(self, nombre_accompagnants=0):
+        return InscriptionEvenement(membre=MembreFactory(), nombre_accompagnants=nombre_accompagnants)
+
+    def test_places_en_attente_de_confirmation_sont_retenues(self):
+        """Les places en attente de confirmation ne peuvent pas être attribuées deux fois"""
+        evenement = EvenementFactory(capacite_max=2)
+        
+        assert evenement.reserver_places(self._nouvelle_inscription()) is True
+        assert evenement.reserver_places(self._nouvelle_inscription()) is True
+        
+        troisieme = self._nouvelle_inscription()
+        assert evenement.reserver_places(troisieme) is False
+        assert troisieme.statut == 'liste_attente'
+        assert troisieme.date_limite_confirmation is None
+        
+        evenement.refresh_from_db()
+        assert evenement.nb_places_en_attente == 2
+        assert evenement.nb_liste_attente == 1
+
+    def test_accompagnants_comptes_dans_la_capacite(self):
+        """Une inscription avec accompagnants doit tenir entièrement dans la capacité"""
+        evenement = EvenementFactory(capacite_max=3, permet_accompagnants=True, nombre_max_accompagnants=2)
+        
+        assert evenement.reserver_places(self._nouvelle_inscription(nombre_accompagnants=1)) is True
+        assert evenement.reserver_places(self._nouvelle_inscription(nombre_accompagnants=1)) is False
+        assert evenement.reserver_places(self._nouvelle_inscription()) is True
+
+    def test_promotion_respecte_les_places_retenues(self):
+        """La promotion ne dépasse pas la capacité en comptant les places en attente"""
+        evenement = EvenementFactory(capacite_max=2)
+        confirmee = InscriptionEvenementFactory(evenement=evenement, statut='confirmee', nombre_accompagnants=0)
+        InscriptionEvenementFactory(evenement=evenement, statut='en_attente', nombre_accompagnants=0)
+        InscriptionEvenementFactory(evenement=evenement, statut='liste_attente', nombre_accompagnants=0)
+        InscriptionEvenementFactory(evenement=evenement, statut='liste_attente', nombre_accompagnants=0)
+        
+        confirmee.delete()
+        evenement.refresh_from_db()
+        
+        assert evenement.promouvoir_liste_attente() == 1
+        evenement.refresh_from_db()
+        assert evenement.nb_places_en_attente == 2
+        assert evenement.nb_liste_attente == 1
+
+    def test_doublon_annule_la_reservation(self):
+        """Un échec d'enregistrement n'immobilise aucune place"""
+        evenement = EvenementFactory(capacite_max=5)
+        membre = MembreFactory()
+        evenement.reserver_places(InscriptionEvenement(membre=membre, nombre_accompagnants=0))
+        
+        with pytest.raises(IntegrityError):
+            evenement.reserver_places(InscriptionEvenement(membre=membre, nombre_accompagnants=0))
+        
+        evenement.refresh_from_db()
+        assert evenement.nb_places_en_attente == 1
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.performance
+class TestChargeInscriptions:
+    """Test de charge : inscriptions simultanées sur un événement à forte demande"""
+
+    def test_aucune_surreservation(self):
+        """Des inscriptions parallèles ne dépassent jamais la capacité"""
+        from io import StringIO
+        from django.core.management import call_command
+        
+        CustomUserFactory(is_superuser=True)
+        sortie = StringIO()
+        call_command(
+            'tester_charge_inscriptions',
+            inscriptions=40, capacite=10, workers=8, accompagnants=1,
+            stdout=sortie
+        )
+        
+        assert '5 place(s) attribuée(s)' in sortie.getvalue()
+        assert 'Aucune surréservation détectée' in sortie.getvalue()
+
+
 @pytest.mark.django_db
 @pytest.mark.unit
 class TestInscriptionEvenement:
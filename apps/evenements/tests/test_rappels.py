@@ -0,0 +1,64 @@
+import pytest
+from datetime import timedelta
+from django.core import mail
+from django.utils import timezone
+
+from apps.evenements.models import InscriptionEvenement, RappelInscription
+from apps.evenements.rappels import rappels_inscriptions
+from apps.evenements.tasks import envoyer_rappels_confirmation, envoyer_rappels_evenements
+from apps.evenements.tests.factories import EvenementFactory, InscriptionEvenementFactory
+
+
+@pytest.mark.django_db
+class TestRappelsInscriptions:
+    """Tests des rappels dédupliqués par le registre"""
+
+    def _inscription(self, evenement, statut, **champs):
+        inscription = InscriptionEvenementFactory(evenement=evenement, statut=statut)
+        InscriptionEvenement.objects.filter(pk=inscription.pk).update(**champs)
+        return inscription
+
+    def test_rappels_confirmation_sans_doublon(self):
+        """Rappel 24h puis 2h, chacun une seule fois quel que soit le nombre d'exécutions"""
+        evenement = EvenementFactory(statut='publie', date_debut=timezone.now() + timedelta(days=5))
+        maintenant = timezone.now()
+        inscription = self._inscription(
+            evenement, 'en_attente', date_limite_confirmation=maintenant + timedelta(hours=20)
+        )
+        # Découverte à moins de deux heures : seul le rappel 2h est dû
+        urgente = self._inscription(
+            evenement, 'en_attente', date_limite_confirmation=maintenant + timedelta(hours=1)
+        )
+        self._inscription(evenement, 'en_attente', date_limite_confirmation=maintenant + timedelta(hours=50))
+        mail.outbox = []
+
+        assert envoyer_rappels_confirmation() == {'rappels_envoyes': 2, 'erreurs': 0, 'ignores': 0}
+        assert envoyer_rappels_confirmation()['rappels_envoyes'] == 0
+
+        # Dix-neuf heures plus tard, l'échéance est à moins de deux heures
+        resultats = rappels_inscriptions.envoyer('confirmation', maintenant + timedelta(hours=19))
+        assert resultats['rappels_envoyes'] == 1
+        assert rappels_inscriptions.envoyer('confirmation', maintenant + timedelta(hours=19, minutes=30))['rappels_envoyes'] == 0
+
+        assert len(mail.outbox) == 3
+        assert sorted(RappelInscription.objects.values_list('inscription_id', 'type_rappel')) == sorted([
+            (inscription.pk, 'confirmation_24h'), (inscription.pk, 'confirmation_2h'), (urgente.pk, 'confirmation_2h')
+        ])
+
+    def test_rappels_evenement_requete_unique(self, django_assert_max_num_queries):
+        """Inscrits confirmés de plusieurs événements : nombre de requêtes indépendant du volume"""
+        for heures in (3, 10, 22):
+            evenement = EvenementFactory(statut='publie', date_debut=timezone.now() + timedelta(hours=heures))
+            for _ in range(3):
+                self._inscription(evenement, 'confirmee')
+            self._inscription(evenement, 'en_attente')
+        mail.outbox = []
+
+        # Candidates, réservation (insertion et relecture), rendu du lot
+        with django_assert_max_num_queries(6):
+            assert envoyer_rappels_evenements()['rappels_envoyes'] == 9
+        assert len(mail.outbox) == 9
+        assert {message.subject.split(' - ')[0] for message in mail.outbox} >= {'Rappel : ' + evenement.titre}
+
+        with django_assert_max_num_queries(1):
+            assert envoyer_rappels_evenements()['rappels_envoyes'] == 0
@@ -0,0 +1,127 @@
+import pytest
+from datetime import date, datetime, timedelta
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.models import DocumentRecherche
+from apps.evenements.models import Evenement, EvenementRecurrence
+from apps.evenements.recurrence import generateur_occurrences
+from apps.evenements.tests.factories import (
+    EvenementFactory, EvenementRecurrenceFactory, CustomUserFactory
+)
+
+
+def heure_locale(annee, mois, jour, heure=10):
+    return timezone.make_aware(datetime(annee, mois, jour, heure))
+
+
+def recurrence_non_enregistree(date_debut, **kwargs):
+    """Récurrence en mémoire : le calcul des dates ne lit pas la base"""
+    return EvenementRecurrence(evenement_parent=Evenement(date_debut=date_debut), **kwargs)
+
+
+@pytest.mark.unit
+class TestDatesOccurrences:
+    """Tests du calcul des dates des occurrences"""
+
+    def test_mensuelle_fin_de_mois(self):
+        """Le 31 est ramené au dernier jour des mois courts, sans dériver"""
+        recurrence = recurrence_non_enregistree(
+            heure_locale(2027, 1, 31), frequence='mensuelle', intervalle_recurrence=1
+        )
+
+        dates = recurrence.dates_occurrences(fin=heure_locale(2027, 5, 31, 23))
+
+        assert [timezone.localtime(d).date() for d in dates] == [
+            date(2027, 2, 28), date(2027, 3, 31), date(2027, 4, 30), date(2027, 5, 31)
+        ]
+
+    def test_annuelle_29_fevrier(self):
+        """Le 29 février devient le 28 les années non bissextiles"""
+        recurrence = recurrence_non_enregistree(
+            heure_locale(2028, 2, 29), frequence='annuelle', intervalle_recurrence=1
+        )
+
+        dates = recurrence.dates_occurrences(fin=heure_locale(2032, 12, 31))
+
+        assert [timezone.localtime(d).date() for d in dates] == [
+            date(2029, 2, 28), date(2030, 2, 28), date(2031, 2, 28), date(2032, 2, 29)
+        ]
+
+    def test_hebdomadaire_jours_et_heure_locale(self):
+        """Jours de la semaine choisis, une semaine sur deux, même heure après le changement d'heure"""
+        recurrence = recurrence_non_enregistree(
+            heure_locale(2027, 10, 20, 18), frequence='hebdomadaire',
+            intervalle_recurrence=2, jours_semaine=[2, 0]
+        )
+
+        dates = [timezone.localtime(d) for d in recurrence.dates_occurrences(fin=heure_locale(2027, 11, 20))]
+
+        assert [d.date() for d in dates] == [
+            date(2027, 11, 1), date(2027, 11, 3), date(2027, 11, 15), date(2027, 11, 17)
+        ]
+        assert {d.hour for d in dates} == {18}
+
+    def test_bornes_de_la_recurrence(self):
+        """Le parent compte dans le nombre maximum, la date de fin est incluse"""
+        maximum = recurrence_non_enregistree(
+            heure_locale(2027, 1, 4), frequence='hebdomadaire', intervalle_recurrence=1,
+            nombre_occurrences_max=3
+        )
+        date_fin = recurrence_non_enregistree(
+            heure_locale(2027, 1, 4), frequence='hebdomadaire', intervalle_recurrence=1,
+            date_fin_recurrence=date(2027, 1, 18)
+        )
+
+        assert len(maximum.dates_occurrences(fin=heure_locale(2027, 12, 31))) == 2
+        assert len(date_fin.dates_occurrences(fin=heure_locale(2027, 12, 31))) == 2
+
+
+@pytest.mark.django_db
+class TestGenerateurOccurrences:
+    """Tests de la création groupée des occurrences"""
+
+    def _recurrence(self):
+        return EvenementRecurrenceFactory(
+            evenement_parent=EvenementFactory(
+                est_recurrent=True, titre="Atelier tricot", date_debut=timezone.now() + timedelta(days=1)
+            ),
+            frequence='hebdomadaire', intervalle_recurrence=1, jours_semaine=[],
+            date_fin_recurrence=None, nombre_occurrences_max=50
+        )
+
+    def test_creation_idempotente(self, django_assert_num_queries):
+        """Occurrences créées une seule fois, en gardant celles mises à la corbeille"""
+        recurrence = self._recurrence()
+        parent = recurrence.evenement_parent
+        fin = parent.date_debut + timedelta(weeks=4, hours=1)
+
+        assert recurrence.generer_occurrences(fin=fin) == 4
+        occurrences = Evenement.objects.filter(evenement_parent=parent).order_by('date_debut')
+        debut_local = timezone.localtime(parent.date_debut)
+        assert [timezone.localtime(o.date_debut) for o in occurrences] == [
+            timezone.make_aware(datetime.combine(debut_local.date() + timedelta(weeks=i), debut_local.time()))
+            for i in range(1, 5)
+        ]
+        assert all(o.reference and o.statut == 'publie' and o.lieu == parent.lieu for o in occurrences)
+        assert DocumentRecherche.objects.filter(
+            modele='evenements.evenement', objet_id__in=[o.pk for o in occurrences]
+        ).count() == 4
+
+        occurrences.first().delete()
+        # Lecture des récurrences et des occurrences existantes
+        with django_assert_num_queries(2):
+            resultats = generateur_occurrences.generer(
+                EvenementRecurrence.objects.select_related('evenement_parent__type_evenement'), fin=fin
+            )
+        assert resultats == {recurrence.pk: 0}
+
+    def test_vue_generer_occurrences(self, client):
+        """La vue crée les occurrences de l'horizon configuré"""
+        recurrence = self._recurrence()
+        client.force_login(CustomUserFactory(is_staff=True))
+
+        response = client.post(reverse('evenements:generer_occurrences', kwargs={'pk': recurrence.evenement_parent.pk}))
+
+        assert response.status_code == 302
+        assert Evenement.objects.filter(evenement_parent=recurrence.evenement_parent).count() >= 12
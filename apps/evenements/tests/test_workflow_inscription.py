@@ -520,7 +520,7 @@ class WorkflowInscriptionTestCase(TestCase):
         # Analyser quelles inscriptions comptent dans le calcul des places
         inscriptions_comptabilisees = InscriptionEvenement.objects.filter(
             evenement=self.evenement,
-            statut__in=['confirmee', 'presente']  # Seules celles-ci comptent probablement
+            statut__in=['en_attente', 'confirmee', 'presente']  # Places réservées ou occupées
         ).count()
         
         places_attendues = self.evenement.capacite_max - inscriptions_comptabilisees
@@ -530,7 +530,7 @@ class WorkflowInscriptionTestCase(TestCase):
             places_reelles, 
             places_attendues,
             f"Places disponibles ({places_reelles}) doit égaler capacité max ({self.evenement.capacite_max}) "
-            f"moins inscriptions confirmées ({inscriptions_comptabilisees}) = {places_attendues}"
+            f"moins inscriptions en attente ou confirmées ({inscriptions_comptabilisees}) = {places_attendues}"
         )
         
         # Confirmer quelques inscriptions
@@ -541,7 +541,7 @@ class WorkflowInscriptionTestCase(TestCase):
         self.evenement.refresh_from_db()
         inscriptions_confirmees = InscriptionEvenement.objects.filter(
             evenement=self.evenement,
-            statut__in=['confirmee', 'presente']
+            statut__in=['en_attente', 'confirmee', 'presente']
         ).count()
         
         places_apres_confirmation = self.evenement.places_disponibles
@@ -561,7 +561,7 @@ class WorkflowInscriptionTestCase(TestCase):
         self.evenement.refresh_from_db()
         inscriptions_actives = InscriptionEvenement.objects.filter(
             evenement=self.evenement,
-            statut__in=['confirmee', 'presente']  # Exclut les annulées
+            statut__in=['en_attente', 'confirmee', 'presente']  # Exclut les annulées
         ).count()
         
         places_apres_annulation = self.evenement.places_disponibles
@@ -28,7 +28,10 @@ import openpyxl
 from io import BytesIO
 import xml.etree.ElementTree as ET
 
+from apps.core.corbeille import compteurs_corbeille
+from apps.core.exports import exporter_en_arriere_plan, lancer_export, suivre_progression
 from apps.core.mixins import StaffRequiredMixin, PermissionRequiredMixin, AjaxRequiredMixin
+from apps.core.recherche import index_recherche
 from apps.membres.models import Membre
 from .models import (
     Evenement, TypeEvenement, InscriptionEvenement, 
@@ -725,6 +728,8 @@ class CalendrierEvenementView(LoginRequiredMixin, TemplateView):
     Vue calendrier interactive des événements
     """
     template_name = 'evenements/calendrier.html'
+    # Événements chargés par l'API, pas par la page (apps.core.profilage)
+    budget_requetes = 10
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -782,21 +787,35 @@ class ExportInscritsView(StaffRequiredMixin, View):
     def get(self, request, evenement_pk):
         evenement = get_object_or_404(Evenement, pk=evenement_pk)
         format_export = request.GET.get('format', 'csv')
-        
-        # Récupérer les inscriptions confirmées
-        inscriptions = InscriptionEvenement.objects.filter(
+        inscriptions = self.inscriptions(evenement)
+
+        # Les exports volumineux sont confiés à une tâche Celery
+        if exporter_en_arriere_plan(request, inscriptions):
+            return lancer_export(
+                request, 'apps.evenements.views.generer_export_inscrits', format_export,
+                {'evenement_pk': evenement.pk}
+            )
+
+        return self.exporter(evenement, inscriptions, format_export)
+
+    @staticmethod
+    def inscriptions(evenement):
+        """Récupérer les inscriptions confirmées"""
+        return InscriptionEvenement.objects.filter(
             evenement=evenement,
             statut__in=['confirmee', 'presente']
-        ).select_related('membre').prefetch_related('accompagnants')
-        
+        ).select_related('membre', 'mode_paiement').prefetch_related('accompagnants')
+
+    def exporter(self, evenement, inscriptions, format_export, progression=None):
+        """Produit l'export des inscrits (vue et tâche d'export en arrière-plan)"""
         if format_export == 'pdf':
-            return self._export_pdf(evenement, inscriptions)
+            return self._export_pdf(evenement, inscriptions, progression)
         elif format_export == 'excel':
-            return self._export_excel(evenement, inscriptions)
+            return self._export_excel(evenement, inscriptions, progression)
         else:
-            return self._export_csv(evenement, inscriptions)
+            return self._export_csv(evenement, inscriptions, progression)
     
-    def _export_csv(self, evenement, inscriptions):
+    def _export_csv(self, evenement, inscriptions, progression=None):
         """Export CSV"""
         import csv
         from django.http import HttpResponse
@@ -813,7 +832,7 @@ class ExportInscritsView(StaffRequiredMixin, View):
             'Statut', 'Nb accompagnants', 'Montant payé', 'Mode paiement'
         ])
         
-        for inscription in inscriptions:
+        for inscription in suivre_progression(inscriptions, progression, inscriptions):
             writer.writerow([
                 inscription.membre.nom,
                 inscription.membre.prenom,
@@ -842,7 +861,7 @@ class ExportInscritsView(StaffRequiredMixin, View):
         
         return response
     
-    def _export_excel(self, evenement, inscriptions):
+    def _export_excel(self, evenement, inscriptions, progression=None):
         """Export Excel"""
         from django.http import HttpResponse
         import openpyxl
@@ -866,7 +885,7 @@ class ExportInscritsView(StaffRequiredMixin, View):
         
         # Données
         row = 2
-        for inscription in inscriptions:
+        for inscription in suivre_progression(inscriptions, progression, inscriptions):
             ws.cell(row=row, column=1, value=inscription.membre.nom)
             ws.cell(row=row, column=2, value=inscription.membre.prenom)
             ws.cell(row=row, column=3, value=inscription.membre.email)
@@ -910,7 +929,7 @@ class ExportInscritsView(StaffRequiredMixin, View):
         
         return response
     
-    def _export_pdf(self, evenement, inscriptions):
+    def _export_pdf(self, evenement, inscriptions, progression=None):
         """Export PDF"""
         from django.http import HttpResponse
         from reportlab.pdfgen import canvas
@@ -943,7 +962,7 @@ class ExportInscritsView(StaffRequiredMixin, View):
         y -= 0.8*cm
         p.setFont("Helvetica", 9)
         
-        for i, inscription in enumerate(inscriptions, 1):
+        for i, inscription in enumerate(suivre_progression(inscriptions, progression, inscriptions), 1):
             if y < 3*cm:  # Nouvelle page si nécessaire
                 p.showPage()
                 y = height - 2*cm
@@ -979,6 +998,17 @@ class ExportInscritsView(StaffRequiredMixin, View):
         return response
 
 
+def generer_export_inscrits(parametres, progression=None):
+    """
+    Générateur de l'export des inscrits exécuté par la tâche d'export en arrière-plan
+    """
+    evenement = get_object_or_404(Evenement, pk=parametres.get('evenement_pk'))
+    vue = ExportInscritsView()
+    return vue.exporter(
+        evenement, vue.inscriptions(evenement), parametres.get('format', 'csv'), progression
+    )
+
+
 class EvenementSearchView(LoginRequiredMixin, ListView):
     """
     Vue de recherche avancée d'événements
@@ -1466,11 +1496,13 @@ class AutocompleteOrganisateursView(StaffRequiredMixin, View):
         if len(query) < 2:
             return JsonResponse({'results': []})
         
-        # Rechercher parmi les membres actifs
-        membres = Membre.objects.filter(
-            Q(nom__icontains=query) | Q(prenom__icontains=query) | Q(email__icontains=query),
-            deleted_at__isnull=True
-        ).select_related('utilisateur')[:10]
+        # Rechercher parmi les membres actifs (début de mot, les plus pertinents d'abord)
+        membres = index_recherche.rechercher(
+            Membre.objects.filter(deleted_at__isnull=True).select_related('utilisateur'),
+            query,
+            limite=10,
+            prefixe=True
+        )
         
         results = []
         for membre in membres:
@@ -1818,6 +1850,7 @@ class RestaurerEvenementView(StaffRequiredMixin, View):
             evenement = Evenement.objects.only_deleted().get(pk=pk)
             evenement.deleted_at = None
             evenement.save()
+            compteurs_corbeille.ajuster(Evenement, -1)
             
             messages.success(
                 request,
@@ -1972,8 +2005,13 @@ class GenererOccurrencesView(StaffRequiredMixin, View):
             messages.error(request, "Cet événement n'est pas récurrent.")
             return redirect('evenements:detail', pk=pk)
         
-        # TODO: Logique de génération des occurrences
-        count = 0  # Nombre d'occurrences générées
+        try:
+            recurrence = evenement.recurrence
+        except EvenementRecurrence.DoesNotExist:
+            messages.error(request, "Aucune règle de récurrence n'est définie pour cet événement.")
+            return redirect('evenements:detail', pk=pk)
+        
+        count = recurrence.generer_occurrences()
         
         messages.success(
             request,
@@ -2477,6 +2515,7 @@ class RestaurerInscriptionView(StaffRequiredMixin, View):
             inscription = InscriptionEvenement.objects.only_deleted().get(pk=pk)
             inscription.deleted_at = None
             inscription.save()
+            compteurs_corbeille.ajuster(InscriptionEvenement, -1)
             
             messages.success(
                 request,
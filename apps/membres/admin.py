@@ -3,6 +3,7 @@ from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
 from django.urls import reverse
 from django.db.models import Count
+from apps.core.corbeille import compteurs_corbeille
 from apps.membres.models import Membre, TypeMembre, MembreTypeMembre, HistoriqueMembre
 
 
@@ -278,6 +279,7 @@ class MembreAdmin(admin.ModelAdmin):
         updated = queryset.filter(deleted_at__isnull=True).update(deleted_at=timezone.now())
         
         if updated:
+            compteurs_corbeille.ajuster(queryset.model, updated)
             self.message_user(
                 request, 
                 _("%(count)d membres ont été marqués comme supprimés.") % {'count': updated}
@@ -294,6 +296,7 @@ class MembreAdmin(admin.ModelAdmin):
         updated = queryset.filter(deleted_at__isnull=False).update(deleted_at=None)
         
         if updated:
+            compteurs_corbeille.ajuster(queryset.model, -updated)
             self.message_user(
                 request, 
                 _("%(count)d membres ont été restaurés.") % {'count': updated}
@@ -336,6 +339,7 @@ class TypeMembreAdmin(admin.ModelAdmin):
     def restaurer_membres(self, request, queryset):
         # Action pour restaurer les membres supprimés
         updated = queryset.update(deleted_at=None)
+        compteurs_corbeille.invalider(queryset.model)
         self.message_user(request, _(f"{updated} membre(s) restauré(s) avec succès."))
     restaurer_membres.short_description = _("Restaurer les membres sélectionnés")
     
@@ -368,6 +372,7 @@ class TypeMembreAdmin(admin.ModelAdmin):
         updated = queryset.filter(deleted_at__isnull=True).update(deleted_at=timezone.now())
         
         if updated:
+            compteurs_corbeille.ajuster(queryset.model, updated)
             self.message_user(
                 request, 
                 _("%(count)d types de membre ont été marqués comme supprimés.") % {'count': updated}
@@ -384,6 +389,7 @@ class TypeMembreAdmin(admin.ModelAdmin):
         updated = queryset.filter(deleted_at__isnull=False).update(deleted_at=None)
         
         if updated:
+            compteurs_corbeille.ajuster(queryset.model, -updated)
             self.message_user(
                 request, 
                 _("%(count)d types de membre ont été restaurés.") % {'count': updated}
@@ -440,11 +446,18 @@ class MembreTypeMembreAdmin(admin.ModelAdmin):
         from django.utils import timezone
         
         # Ne traiter que les associations actives
-        updated = queryset.filter(date_fin__isnull=True).update(
+        associations = queryset.filter(date_fin__isnull=True)
+        membre_ids = list(associations.values_list('membre_id', flat=True))
+        updated = associations.update(
             date_fin=timezone.now().date(),
             modifie_par=request.user
         )
         
+        # update() n'émet pas de signal : mettre à jour l'index des types actifs
+        from apps.membres.services import IndexTypesActifsService, StatistiquesMembresService
+        IndexTypesActifsService().synchroniser(membre_ids)
+        StatistiquesMembresService.invalider()
+        
         if updated:
             self.message_user(
                 request, 
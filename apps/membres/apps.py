@@ -9,3 +9,10 @@ class MembresConfig(AppConfig):
     def ready(self):
         # Importer les signaux
         import apps.membres.signals
+
+        # Index de recherche plein texte
+        from apps.core.recherche import index_recherche
+        index_recherche.enregistrer(
+            self.get_model('Membre'),
+            ('nom', 'prenom', 'email', 'telephone', 'code_postal', 'ville')
+        )
@@ -0,0 +1,101 @@
+# apps/membres/management/commands/benchmark_import_membres.py
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.membres.models import Membre, TypeMembre
+from apps.membres.services import ImportMembresService
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare le débit (lignes/seconde) de l'import de membres ligne par ligne "
+        "et de l'import par lots, sur des données synthétiques annulées en fin de mesure"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lignes',
+            type=int,
+            default=50000,
+            help='Nombre de lignes synthétiques à importer'
+        )
+        parser.add_argument(
+            '--existants',
+            type=int,
+            default=10,
+            help='Pourcentage de lignes correspondant à un membre existant (nom modifié)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Taille des lots de l'import groupé"
+        )
+        parser.add_argument(
+            '--erreurs',
+            type=int,
+            default=2,
+            help="Pourcentage de lignes en erreur (prénom manquant)"
+        )
+        parser.add_argument(
+            '--par-lots-seulement',
+            action='store_true',
+            help="Ne mesurer que l'import par lots"
+        )
+
+    def handle(self, *args, **options):
+        if options['lignes'] < 1 or options['batch_size'] < 1:
+            raise CommandError('Les valeurs numériques doivent être strictement positives')
+
+        modes = ['par_lots'] if options['par_lots_seulement'] else ['ligne_par_ligne', 'par_lots']
+        mesures = {}
+        for mode in modes:
+            # Chaque mesure repart d'une base identique puis est annulée
+            with transaction.atomic():
+                lignes = self._generer_donnees(options)
+                service = ImportMembresService(
+                    type_membre=TypeMembre.objects.get_or_create(libelle='Benchmark')[0],
+                    batch_size=options['batch_size']
+                )
+                importer = service.importer if mode == 'par_lots' else service.importer_ligne_par_ligne
+
+                requetes = []
+                with connection.execute_wrapper(lambda execute, sql, *args: requetes.append(sql) or execute(sql, *args)):
+                    debut = time.perf_counter()
+                    resultats = importer(lignes)
+                    duree = time.perf_counter() - debut
+
+                mesures[mode] = (duree, len(requetes), resultats)
+                transaction.set_rollback(True)
+
+        for mode, (duree, nb_requetes, resultats) in mesures.items():
+            self.stdout.write(
+                f"{mode:<16} {options['lignes'] / duree:>10.0f} lignes/s  "
+                f"{duree:>8.2f}s  {nb_requetes:>7} requêtes  "
+                f"({resultats['importes']} importés, {resultats['maj']} mis à jour, {resultats['erreurs']} erreurs)"
+            )
+
+        if len(mesures) == 2:
+            duree_unitaire, duree_lots = mesures['ligne_par_ligne'][0], mesures['par_lots'][0]
+            self.stdout.write(self.style.SUCCESS(f"Accélération : x{duree_unitaire / duree_lots:.1f}"))
+
+    def _generer_donnees(self, options):
+        """Crée les membres existants synthétiques et retourne les lignes à importer."""
+        suffixe = uuid.uuid4().hex[:8]
+        aujourd_hui = timezone.now().date()
+
+        lignes = []
+        existants = []
+        for i in range(options['lignes']):
+            email = f'bench-{suffixe}-{i}@example.com'
+            if i % 100 < options['existants']:
+                existants.append(Membre(nom='ANCIEN', prenom=f'Membre {i}', email=email, date_adhesion=aujourd_hui))
+            prenom = '' if i % 100 >= 100 - options['erreurs'] else f'membre {i}'
+            lignes.append((i + 2, ['Benchmark', prenom, email, '0102030405', f'{i} rue du Test']))
+
+        Membre.objects.bulk_create(existants, batch_size=1000)
+        return lignes
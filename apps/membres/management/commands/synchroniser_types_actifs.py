@@ -0,0 +1,29 @@
+# apps/membres/management/commands/synchroniser_types_actifs.py
+from django.core.management.base import BaseCommand
+from apps.membres.services import IndexTypesActifsService
+
+
+class Command(BaseCommand):
+    help = (
+        "Met à jour l'index des types actifs des membres : associations dont la "
+        "date de début est atteinte et écarts éventuels (ou reconstruction complète)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reconstruire',
+            action='store_true',
+            help="Recalculer l'index de tous les membres"
+        )
+
+    def handle(self, *args, **options):
+        service = IndexTypesActifsService()
+        if options['reconstruire']:
+            modifications = service.reconstruire()
+            self.stdout.write(f"{modifications} lignes d'index modifiées")
+        else:
+            resultat = service.appliquer_transitions()
+            self.stdout.write(
+                f"{resultat['membres']} membres resynchronisés, {resultat['modifications']} lignes d'index modifiées"
+            )
+        self.stdout.write(self.style.SUCCESS('Index des types actifs à jour'))
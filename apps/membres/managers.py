@@ -1,5 +1,5 @@
 from django.db import models
-from django.db.models import Q, Count, Max, F, Subquery, OuterRef
+from django.db.models import Count, Max, F, OuterRef, Exists
 from django.utils import timezone
 from apps.core.managers import BaseManager
 import datetime
@@ -10,28 +10,13 @@ class TypeMembreQuerySet(models.QuerySet):
     """
     def actifs(self):
         """Retourne les types de membres qui ont au moins un membre actif"""
-        from apps.membres.models import MembreTypeMembre
+        from apps.membres.models import TypeMembreActif
         
-        types_ids = MembreTypeMembre.objects.filter(
-            date_debut__lte=timezone.now().date(),
-            date_fin__isnull=True
-        ).values_list('type_membre_id', flat=True).distinct()
-        
-        return self.filter(id__in=types_ids)
+        return self.filter(Exists(TypeMembreActif.objects.filter(type_membre=OuterRef('pk'))))
     
     def avec_nombre_membres(self):
         """Retourne les types de membres avec le nombre de membres actifs"""
-        from apps.membres.models import MembreTypeMembre
-        
-        subquery = MembreTypeMembre.objects.filter(
-            type_membre=OuterRef('pk'),
-            date_debut__lte=timezone.now().date(),
-            date_fin__isnull=True
-        ).values('type_membre').annotate(
-            count=Count('membre', distinct=True)
-        ).values('count')
-        
-        return self.annotate(nombre_membres=Subquery(subquery))
+        return self.annotate(nombre_membres=Count('membres_actifs_index'))
     
     def par_ordre_affichage(self):
         """Retourne les types de membres triés par ordre d'affichage"""
@@ -43,28 +28,13 @@ class TypeMembreManager(BaseManager):
     """
     def actifs(self):
         """Retourne les types de membres qui ont au moins un membre actif"""
-        from apps.membres.models import MembreTypeMembre
+        from apps.membres.models import TypeMembreActif
         
-        types_ids = MembreTypeMembre.objects.filter(
-            date_debut__lte=timezone.now().date(),
-            date_fin__isnull=True
-        ).values_list('type_membre_id', flat=True).distinct()
-        
-        return self.filter(id__in=types_ids)
+        return self.filter(Exists(TypeMembreActif.objects.filter(type_membre=OuterRef('pk'))))
     
     def avec_nombre_membres(self):
         """Retourne les types de membres avec le nombre de membres actifs"""
-        from apps.membres.models import MembreTypeMembre
-        
-        subquery = MembreTypeMembre.objects.filter(
-            type_membre=OuterRef('pk'),
-            date_debut__lte=timezone.now().date(),
-            date_fin__isnull=True
-        ).values('type_membre').annotate(
-            count=Count('membre', distinct=True)
-        ).values('count')
-        
-        return self.annotate(nombre_membres=Subquery(subquery))
+        return self.annotate(nombre_membres=Count('membres_actifs_index'))
     
     def par_ordre_affichage(self):
         """Retourne les types de membres triés par ordre d'affichage"""
@@ -77,29 +47,16 @@ class MembreManager(BaseManager):
     """
     
     def recherche(self, query):
-        """Recherche de membres par différents critères"""
-        if not query:
-            return self.all()
-        
-        return self.filter(
-            Q(nom__icontains=query) | 
-            Q(prenom__icontains=query) | 
-            Q(email__icontains=query) | 
-            Q(telephone__icontains=query) |
-            Q(code_postal__icontains=query) |
-            Q(ville__icontains=query)
-        )
+        """Recherche de membres (nom, prénom, email, téléphone, code postal, ville)"""
+        from apps.core.recherche import index_recherche
+        return index_recherche.filtrer(self.all(), query)
     
     def par_type(self, type_membre_id):
         """Filtre les membres par type de membre actif"""
         if not type_membre_id:
             return self.all()
             
-        return self.filter(
-            types_historique__type_membre_id=type_membre_id,
-            types_historique__date_debut__lte=timezone.now().date(),
-            types_historique__date_fin__isnull=True
-        ).distinct()
+        return self.filter(types_actifs_index__type_membre_id=type_membre_id)
     
     def par_statut(self, statut_id):
         """Filtre les membres par statut"""
@@ -164,25 +121,11 @@ class MembreManager(BaseManager):
     
     def actifs(self):
         """Retourne les membres actifs (avec au moins un type de membre actif)"""
-        from apps.membres.models import MembreTypeMembre
-        
-        membres_ids = MembreTypeMembre.objects.filter(
-            date_debut__lte=timezone.now().date(),
-            date_fin__isnull=True
-        ).values_list('membre_id', flat=True).distinct()
-        
-        return self.filter(id__in=membres_ids)
+        return self.filter(nb_types_actifs__gt=0)
         
     def inactifs(self):
         """Retourne les membres inactifs (sans type de membre actif)"""
-        from apps.membres.models import MembreTypeMembre
-        
-        membres_ids = MembreTypeMembre.objects.filter(
-            date_debut__lte=timezone.now().date(),
-            date_fin__isnull=True
-        ).values_list('membre_id', flat=True).distinct()
-        
-        return self.exclude(id__in=membres_ids)
+        return self.filter(nb_types_actifs=0)
     
     def par_age(self, age_min=None, age_max=None):
         """Filtre les membres par tranche d'âge"""
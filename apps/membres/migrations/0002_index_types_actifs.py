@@ -0,0 +1,80 @@
+# Generated by Django 5.1.8 on 2026-10-17 23:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def remplir_index_types_actifs(apps, schema_editor):
+    """Construit l'index des types actifs à partir des associations ouvertes."""
+    from django.db.models import Count
+    from django.utils import timezone
+
+    Membre = apps.get_model('membres', 'Membre')
+    MembreTypeMembre = apps.get_model('membres', 'MembreTypeMembre')
+    TypeMembreActif = apps.get_model('membres', 'TypeMembreActif')
+
+    couples = MembreTypeMembre.objects.filter(
+        date_debut__lte=timezone.now().date(),
+        date_fin__isnull=True
+    ).values_list('membre_id', 'type_membre_id').distinct()
+    TypeMembreActif.objects.bulk_create(
+        (TypeMembreActif(membre_id=membre_id, type_membre_id=type_membre_id) for membre_id, type_membre_id in couples),
+        batch_size=500
+    )
+
+    par_nombre = {}
+    for membre_id, nombre in TypeMembreActif.objects.values('membre_id').annotate(
+        nombre=Count('id')
+    ).values_list('membre_id', 'nombre'):
+        par_nombre.setdefault(nombre, []).append(membre_id)
+    for nombre, membre_ids in par_nombre.items():
+        for debut in range(0, len(membre_ids), 500):
+            Membre.objects.filter(pk__in=membre_ids[debut:debut + 500]).update(nb_types_actifs=nombre)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('membres', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TypeMembreActif',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'verbose_name': 'Type de membre actif',
+                'verbose_name_plural': 'Types de membres actifs',
+            },
+        ),
+        migrations.AddField(
+            model_name='membre',
+            name='nb_types_actifs',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Nombre de types actifs'),
+        ),
+        migrations.AddIndex(
+            model_name='membre',
+            index=models.Index(fields=['nb_types_actifs'], name='membres_mem_nb_type_a6bf06_idx'),
+        ),
+        migrations.AddField(
+            model_name='typemembreactif',
+            name='membre',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='types_actifs_index', to='membres.membre', verbose_name='Membre'),
+        ),
+        migrations.AddField(
+            model_name='typemembreactif',
+            name='type_membre',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='membres_actifs_index', to='membres.typemembre', verbose_name='Type de membre'),
+        ),
+        migrations.AddIndex(
+            model_name='typemembreactif',
+            index=models.Index(fields=['type_membre', 'membre'], name='membres_typ_type_me_311300_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='typemembreactif',
+            unique_together={('membre', 'type_membre')},
+        ),
+        migrations.RunPython(remplir_index_types_actifs, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,7 @@ from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
 
+from apps.core.corbeille import compteurs_corbeille
 from apps.core.models import BaseModel, Statut
 from apps.accounts.models import CustomUser
 from apps.membres.managers import MembreManager, TypeMembreManager, MembreTypeMembreManager
@@ -50,18 +51,11 @@ class TypeMembre(BaseModel):
     
     def get_membres_actifs(self):
         """Retourne les membres actifs de ce type"""
-        return self.membres.filter(
-            membretypemembre__date_debut__lte=timezone.now().date(),
-            membretypemembre__date_fin__isnull=True
-        ).distinct()
+        return Membre.objects.filter(types_actifs_index__type_membre=self)
     
     def nb_membres_actifs(self):
         """Retourne le nombre de membres actifs de ce type"""
-        today = timezone.now().date()
-        return self.membres_historique.filter(
-            date_debut__lte=today,
-            date_fin__isnull=True
-        ).values('membre').distinct().count()
+        return self.membres_actifs_index.count()
 
 
 class Membre(BaseModel):
@@ -179,6 +173,13 @@ class Membre(BaseModel):
         verbose_name=_("Accepte les communications par SMS")
     )
     
+    # Nombre de types actifs, tenu à jour avec TypeMembreActif (0 : membre inactif)
+    nb_types_actifs = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("Nombre de types actifs")
+    )
+    
     # Utiliser le gestionnaire personnalisé
     objects = MembreManager()
     
@@ -190,6 +191,7 @@ class Membre(BaseModel):
             models.Index(fields=['nom', 'prenom']),
             models.Index(fields=['email']),
             models.Index(fields=['date_adhesion']),
+            models.Index(fields=['nb_types_actifs']),
         ]
     
     def __str__(self):
@@ -215,12 +217,19 @@ class Membre(BaseModel):
             
             # Appeler la méthode delete() du parent (models.Model)
             # pour éviter toute logique de soft delete dans la hiérarchie d'héritage
-            return models.Model.delete(self, *args, **kwargs)
+            dans_corbeille = self.deleted_at is not None
+            resultat = models.Model.delete(self, *args, **kwargs)
+            if dans_corbeille:
+                compteurs_corbeille.ajuster(Membre, -1)
+            return resultat
         else:
             # Suppression logique
             logger.info(f"Suppression logique de {self.__class__.__name__} ID={self.id}")
+            deja_supprime = self.deleted_at is not None
             self.deleted_at = timezone.now()
             self.save(update_fields=['deleted_at'])
+            if not deja_supprime:
+                compteurs_corbeille.ajuster(Membre, 1)
             return 1, {}  # Simuler le retour de la méthode delete() standard
     
     def delete_permanent(self):
@@ -238,6 +247,7 @@ class Membre(BaseModel):
         
         with connection.cursor() as cursor:
             # Supprimer d'abord les relations
+            cursor.execute("DELETE FROM membres_typemembreactif WHERE membre_id = %s", [membre_id])
             cursor.execute("DELETE FROM membres_membretypemembre WHERE membre_id = %s", [membre_id])
             cursor.execute("DELETE FROM membres_historiquemembre WHERE membre_id = %s", [membre_id])
             
@@ -247,7 +257,16 @@ class Membre(BaseModel):
             # Loguer le nombre de lignes supprimées
             rows_deleted = cursor.rowcount
             logger.info(f"Membre ID={membre_id} supprimé définitivement ({rows_deleted} lignes)")
-            
+
+        # Requêtes SQL directes : aucun signal n'invalide les statistiques, l'index de
+        # recherche ni le compteur de la corbeille
+        from apps.core.recherche import index_recherche
+        from apps.membres.services import StatistiquesMembresService
+        StatistiquesMembresService.invalider()
+        index_recherche.supprimer(Membre, [membre_id])
+        if self.deleted_at is not None:
+            compteurs_corbeille.ajuster(Membre, -1)
+
         return rows_deleted
 
     def clean(self):
@@ -279,11 +298,7 @@ class Membre(BaseModel):
     
     def get_types_actifs(self):
         """Retourne les types de membre actifs"""
-        return TypeMembre.objects.filter(
-            membres_historique__membre=self,
-            membres_historique__date_debut__lte=timezone.now().date(),
-            membres_historique__date_fin__isnull=True
-        ).distinct()
+        return TypeMembre.objects.filter(membres_actifs_index__membre=self)
     
     def get_types_historiques(self):
         """Retourne tous les types de membre, y compris ceux qui ne sont plus actifs"""
@@ -293,12 +308,7 @@ class Membre(BaseModel):
     
     def est_type_actif(self, type_membre):
         """Vérifie si le membre a un type de membre actif spécifique"""
-        return MembreTypeMembre.objects.filter(
-            membre=self,
-            type_membre=type_membre,
-            date_debut__lte=timezone.now().date(),
-            date_fin__isnull=True
-        ).exists()
+        return TypeMembreActif.objects.filter(membre=self, type_membre=type_membre).exists()
     
     def ajouter_type(self, type_membre, date_debut=None):
         """Ajoute un type de membre au membre"""
@@ -324,11 +334,16 @@ class Membre(BaseModel):
         if date_fin is None:
             date_fin = timezone.now().date()
             
-        return MembreTypeMembre.objects.filter(
+        termines = MembreTypeMembre.objects.filter(
             membre=self,
             type_membre=type_membre,
             date_fin__isnull=True
         ).update(date_fin=date_fin)
+        
+        # update() n'émet pas de signal : mettre à jour l'index des types actifs
+        from apps.membres.services import IndexTypesActifsService
+        IndexTypesActifsService().synchroniser([self.pk])
+        return termines
     
     def age(self):
         """Calcule l'âge du membre"""
@@ -610,30 +625,10 @@ class MembreTypeMembre(models.Model):
             })
     
     def save(self, *args, **kwargs):
-        """Surcharge de la méthode save pour la validation et la mise à jour du cache"""
+        """Surcharge de la méthode save pour la validation"""
         self.clean()
-        
-        # Sauvegarde des valeurs précédentes pour vérifier les changements
-        if self.pk:
-            old_instance = MembreTypeMembre.objects.get(pk=self.pk)
-            date_fin_changed = old_instance.date_fin != self.date_fin
-        else:
-            date_fin_changed = False
-        
-        # Sauvegarde normale
-        result = super().save(*args, **kwargs)
-        
-        # Si la date de fin a changé, forcer la mise à jour du cache des types actifs du membre
-        if date_fin_changed and self.membre:
-            # Forcer le rechargement des types actifs si nécessaire
-            try:
-                # Cette ligne force Django à recalculer les types actifs
-                # en invalidant le cache QuerySet
-                refresh_types = list(self.membre.get_types_actifs())
-            except Exception:
-                pass  # Ignorer les erreurs potentielles
-        
-        return result
+        # L'index des types actifs (TypeMembreActif) est mis à jour par le signal post_save
+        return super().save(*args, **kwargs)
     
     @property
     def est_actif(self):
@@ -647,6 +642,39 @@ class MembreTypeMembre(models.Model):
         )
 
 
+class TypeMembreActif(models.Model):
+    """
+    Index des types actuellement actifs de chaque membre : une ligne par
+    couple membre / type ayant une association ouverte (date de début passée,
+    sans date de fin). Tenu à jour par IndexTypesActifsService à chaque
+    modification d'association et chaque jour pour les dates de début atteintes.
+    """
+    membre = models.ForeignKey(
+        Membre,
+        on_delete=models.CASCADE,
+        related_name='types_actifs_index',
+        verbose_name=_("Membre")
+    )
+    type_membre = models.ForeignKey(
+        TypeMembre,
+        on_delete=models.CASCADE,
+        related_name='membres_actifs_index',
+        verbose_name=_("Type de membre")
+    )
+    
+    class Meta:
+        verbose_name = _("Type de membre actif")
+        verbose_name_plural = _("Types de membres actifs")
+        unique_together = ('membre', 'type_membre')
+        indexes = [
+            models.Index(fields=['type_membre', 'membre']),
+        ]
+    
+    def __str__(self):
+        # Identifiants seulement : journalisé à chaque suppression, sans requête supplémentaire
+        return f"Membre {self.membre_id} - type {self.type_membre_id}"
+
+
 class HistoriqueMembre(BaseModel):
     """
     Modèle pour enregistrer l'historique des modifications des membres
@@ -0,0 +1,545 @@
+# apps/membres/services.py
+"""
+Services métier pour les membres.
+"""
+import logging
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, CharField, Count, Exists, OuterRef, Q, Value, When
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from apps.core.audit import journal_differe
+from apps.core.recherche import index_recherche
+from apps.core.utils import une_fois_apres_commit
+
+from .models import Membre, TypeMembre, MembreTypeMembre, TypeMembreActif, HistoriqueMembre
+from .signals import historique_creation_membre, historique_type_membre
+
+logger = logging.getLogger(__name__)
+
+
+class ImportMembresService:
+    """
+    Moteur d'importation des membres (fichier CSV ou Excel).
+
+    Les lignes (nom, prénom, email, téléphone, adresse) sont lues au fil de
+    l'eau et traitées par lots de ``batch_size`` : les emails sont normalisés
+    comme dans le signal ``validate_membre_data``, les membres existants et
+    leurs types actifs sont résolus par une requête ``IN`` par lot, puis les
+    nouveaux membres, leurs types et leurs historiques sont écrits par
+    ``bulk_create`` et les noms modifiés par ``bulk_update``.
+
+    Les erreurs sont rapportées ligne par ligne dans ``resultats['messages']``.
+    L'import se fait dans une seule transaction, annulée si une ligne est
+    structurellement invalide (moins de 3 colonnes) ou si plus de la moitié
+    des lignes sont en erreur.
+
+    Args:
+        type_membre (TypeMembre): Type attribué aux membres importés
+        statut (Statut): Statut des membres créés
+        batch_size (int): Nombre de lignes par lot
+    """
+
+    TAUX_ERREUR_MAX = 0.5
+
+    def __init__(self, type_membre=None, statut=None, batch_size=1000):
+        self.type_membre = type_membre
+        self.statut = statut
+        self.batch_size = max(1, batch_size)
+        self.resultats = {
+            'importes': 0,
+            'erreurs': 0,
+            'maj': 0,
+            'messages': []
+        }
+        self._erreur_structure = False
+
+        # Membres déjà rencontrés dans le fichier, par email normalisé
+        self._membres = {}
+        self._membres_types_actifs = set()
+
+    #
+    # Points d'entrée
+    #
+    def importer(self, lignes):
+        """
+        Importe les lignes par lots.
+
+        Args:
+            lignes (iterable): Couples ``(numéro de ligne, valeurs)``
+
+        Returns:
+            dict: Résultats (``importes``, ``maj``, ``erreurs``, ``messages``)
+        """
+        with transaction.atomic():
+            lot = []
+            for numero, valeurs in lignes:
+                ligne = self._preparer_ligne(numero, valeurs)
+                if ligne is not None and not self._erreur_structure:
+                    lot.append(ligne)
+                    if len(lot) >= self.batch_size:
+                        self._traiter_lot(lot)
+                        lot = []
+            if lot and not self._erreur_structure:
+                self._traiter_lot(lot)
+
+            self._verifier()
+            # bulk_create / bulk_update n'émettent pas les signaux d'invalidation
+            StatistiquesMembresService.invalider()
+        return self.resultats
+
+    def importer_ligne_par_ligne(self, lignes):
+        """
+        Importe les lignes une à une (requêtes et ``save()`` par ligne).
+        Chemin historique, conservé comme référence de comparaison.
+        """
+        with journal_differe(), transaction.atomic():
+            for numero, valeurs in lignes:
+                ligne = self._preparer_ligne(numero, valeurs)
+                if ligne is None or self._erreur_structure:
+                    continue
+                try:
+                    with transaction.atomic():
+                        self._enregistrer_unitaire(ligne)
+                except Exception as e:
+                    logger.error(f"Erreur ligne {numero}: {str(e)}", exc_info=True)
+                    self._ajouter_erreur(numero, str(e))
+
+            self._verifier()
+        return self.resultats
+
+    def _verifier(self):
+        """Annule l'import (exception) si le fichier est invalide ou trop d'erreurs."""
+        if self._erreur_structure:
+            self.resultats['erreurs'] += 1
+            raise ValueError(_("Le fichier CSV contient des erreurs structurelles. Veuillez corriger le format avant d'importer."))
+
+        traitees = self.resultats['importes'] + self.resultats['erreurs'] + self.resultats['maj']
+        if self.resultats['erreurs'] > 0 and self.resultats['erreurs'] / traitees > self.TAUX_ERREUR_MAX:
+            raise ValueError(_("Trop d'erreurs détectées lors de l'importation. L'opération a été annulée."))
+
+    #
+    # Validation d'une ligne
+    #
+    def _preparer_ligne(self, numero, valeurs):
+        """
+        Normalise une ligne ; retourne None si une erreur a été rapportée.
+        """
+        if len(valeurs) < 3:  # Minimum: nom, prénom, email
+            self.resultats['messages'].append(
+                _("Ligne %(line)d: Données insuffisantes (minimum 3 colonnes requis)") % {'line': numero}
+            )
+            self._erreur_structure = True
+            return None
+
+        nom, prenom, email, telephone, adresse = [
+            self._texte(valeurs[i]) if i < len(valeurs) else '' for i in range(5)
+        ]
+        if not nom or not prenom or not email:
+            self._ajouter_erreur(numero, _("Données incomplètes (nom, prénom ou email manquant)"))
+            return None
+
+        # Mêmes normalisations que le signal validate_membre_data
+        return {
+            'numero': numero,
+            'nom': nom.upper(),
+            'prenom': prenom.title(),
+            'email': email.lower(),
+            'telephone': telephone or None,
+            'adresse': adresse or None,
+        }
+
+    @staticmethod
+    def _texte(valeur):
+        return str(valeur).strip() if valeur is not None else ''
+
+    #
+    # Traitement par lots
+    #
+    def _traiter_lot(self, lot):
+        """Résout les membres existants du lot puis écrit créations et mises à jour."""
+        self._charger_membres({ligne['email'] for ligne in lot})
+        aujourd_hui = timezone.now().date()
+
+        nouveaux = []
+        modifies = {}
+        for ligne in lot:
+            membre = self._membres.get(ligne['email'])
+
+            if membre is None:
+                membre = Membre(
+                    nom=ligne['nom'],
+                    prenom=ligne['prenom'],
+                    email=ligne['email'],
+                    telephone=ligne['telephone'],
+                    adresse=ligne['adresse'],
+                    date_adhesion=aujourd_hui,
+                    statut=self.statut
+                )
+                self._membres[ligne['email']] = membre
+                nouveaux.append(membre)
+                self.resultats['importes'] += 1
+            elif membre.deleted_at is not None:
+                self._ajouter_erreur(
+                    ligne['numero'],
+                    _("L'email %(email)s est celui d'un membre supprimé (corbeille)") % {'email': ligne['email']}
+                )
+            elif membre.nom != ligne['nom'] or membre.prenom != ligne['prenom']:
+                membre.nom = ligne['nom']
+                membre.prenom = ligne['prenom']
+                if membre.pk is not None:
+                    modifies[membre.pk] = membre
+                self.resultats['maj'] += 1
+
+        maintenant = timezone.now()
+        for membre in modifies.values():
+            membre.updated_at = maintenant
+
+        Membre.objects.bulk_create(nouveaux, batch_size=self.batch_size)
+        Membre.objects.bulk_update(list(modifies.values()), ['nom', 'prenom', 'updated_at'], batch_size=self.batch_size)
+        # Pas de signal : documents de recherche (et cotisations des membres renommés)
+        index_recherche.indexer_objets(nouveaux, dependances=False)
+        index_recherche.indexer_objets(modifies.values())
+        historiques = [historique_creation_membre(membre) for membre in nouveaux]
+
+        if self.type_membre:
+            historiques += self._ajouter_types(lot, aujourd_hui, nouveaux)
+        HistoriqueMembre.objects.bulk_create(historiques, batch_size=self.batch_size)
+
+    def _charger_membres(self, emails):
+        """Charge les membres (corbeille comprise) des emails non encore rencontrés."""
+        inconnus = [email for email in emails if email not in self._membres]
+        if not inconnus:
+            return
+
+        # _base_manager : un email de la corbeille reste réservé (unicité)
+        membres = list(Membre._base_manager.filter(email__in=inconnus))
+        self._membres.update((membre.email, membre) for membre in membres)
+
+        if self.type_membre:
+            self._membres_types_actifs.update(
+                MembreTypeMembre.objects.filter(
+                    membre__in=membres,
+                    type_membre=self.type_membre,
+                    date_debut__lte=timezone.now().date(),
+                    date_fin__isnull=True
+                ).values_list('membre_id', flat=True)
+            )
+
+    def _ajouter_types(self, lot, aujourd_hui, nouveaux):
+        """
+        Attribue le type aux membres du lot qui ne l'ont pas (comme
+        ``Membre.ajouter_type``) ; retourne les historiques correspondants.
+        """
+        membres = {}
+        for ligne in lot:
+            membre = self._membres[ligne['email']]
+            if membre.deleted_at is None and membre.pk not in self._membres_types_actifs:
+                membres[membre.pk] = membre
+        if not membres:
+            return []
+
+        # Terminer les associations ouvertes du même type (début futur) des membres existants
+        existants = set(membres).difference(membre.pk for membre in nouveaux)
+        if existants:
+            MembreTypeMembre.objects.filter(
+                membre_id__in=existants,
+                type_membre=self.type_membre,
+                date_fin__isnull=True
+            ).update(date_fin=aujourd_hui)
+
+        associations = MembreTypeMembre.objects.bulk_create(
+            [
+                MembreTypeMembre(membre=membre, type_membre=self.type_membre, date_debut=aujourd_hui)
+                for membre in membres.values()
+            ],
+            batch_size=self.batch_size
+        )
+        self._membres_types_actifs.update(membres)
+        # bulk_create n'émet pas de signal : mettre à jour l'index des types actifs
+        IndexTypesActifsService(aujourd_hui, self.batch_size).synchroniser(membres)
+        return [historique_type_membre(association, True) for association in associations]
+
+    #
+    # Traitement unitaire
+    #
+    def _enregistrer_unitaire(self, ligne):
+        """Crée ou met à jour le membre d'une ligne via l'ORM (signaux compris)."""
+        membre = Membre.objects.filter(email=ligne['email']).first()
+
+        if membre:
+            if membre.nom != ligne['nom'] or membre.prenom != ligne['prenom']:
+                membre.nom = ligne['nom']
+                membre.prenom = ligne['prenom']
+                membre.save(update_fields=['nom', 'prenom'])
+                self.resultats['maj'] += 1
+
+            if self.type_membre and not membre.est_type_actif(self.type_membre):
+                membre.ajouter_type(self.type_membre)
+        else:
+            membre = Membre.objects.create(
+                nom=ligne['nom'],
+                prenom=ligne['prenom'],
+                email=ligne['email'],
+                telephone=ligne['telephone'],
+                adresse=ligne['adresse'],
+                date_adhesion=timezone.now().date(),
+                statut=self.statut
+            )
+            if self.type_membre:
+                membre.ajouter_type(self.type_membre)
+            self.resultats['importes'] += 1
+
+    def _ajouter_erreur(self, numero, message):
+        self.resultats['messages'].append(
+            _("Ligne %(line)d: %(error)s") % {'line': numero, 'error': message}
+        )
+        self.resultats['erreurs'] += 1
+
+
+class StatistiquesMembresService:
+    """
+    Statistiques des membres (tableau de bord et page de statistiques).
+
+    Toutes les répartitions sont calculées par quelques requêtes groupées :
+    totaux et tranches d'âge (une seule expression ``Case/When``), mois et
+    années d'adhésion (``ExtractYear``/``ExtractMonth``), types et statuts.
+    Le résultat est mis en cache (MEMBRES_STATISTIQUES_CACHE_DUREE) sous une
+    clé datée, et invalidé par les signaux de Membre et MembreTypeMembre une
+    fois la transaction validée.
+    """
+
+    CLE_CACHE = 'membres:statistiques'
+    NOMBRE_ANNEES = 10
+
+    # Libellé et âge minimum de chaque tranche, de la plus jeune à la plus âgée
+    TRANCHES_AGE = (
+        ('< 18 ans', None),
+        ('18-30 ans', 18),
+        ('31-45 ans', 31),
+        ('46-60 ans', 46),
+        ('61-75 ans', 61),
+        ('> 75 ans', 76),
+    )
+
+    def __init__(self, aujourd_hui=None):
+        self.aujourd_hui = aujourd_hui or timezone.now().date()
+
+    @classmethod
+    def cle_cache(cls, aujourd_hui=None):
+        # Les membres actifs et les âges dépendent du jour
+        return f"{cls.CLE_CACHE}:{(aujourd_hui or timezone.now().date()).isoformat()}"
+
+    @classmethod
+    def invalider(cls):
+        """Supprime les statistiques en cache après validation de la transaction."""
+        # Une seule suppression par transaction, même après de nombreuses écritures
+        une_fois_apres_commit(cls._supprimer_cache)
+
+    @classmethod
+    def _supprimer_cache(cls):
+        cache.delete(cls.cle_cache())
+
+    def statistiques(self):
+        """
+        Retourne les statistiques, depuis le cache si possible.
+
+        Returns:
+            dict: ``total``, ``actifs``, ``avec_compte``, ``types``,
+            ``statuts``, ``par_mois``, ``par_annee`` et ``tranches_age``
+        """
+        cle = self.cle_cache(self.aujourd_hui)
+        resultat = cache.get(cle)
+        if resultat is None:
+            resultat = self.calculer()
+            cache.set(cle, resultat, getattr(settings, 'MEMBRES_STATISTIQUES_CACHE_DUREE', 300))
+        return resultat
+
+    def calculer(self):
+        """Calcule les statistiques sans passer par le cache."""
+        resultat = Membre.objects.aggregate(
+            total=Count('id'),
+            actifs=Count('id', filter=Q(nb_types_actifs__gt=0)),
+            avec_compte=Count('id', filter=Q(utilisateur__isnull=False)),
+        )
+
+        resultat['types'] = [
+            {'id': type_membre['id'], 'libelle': type_membre['libelle'], 'count': type_membre['count']}
+            for type_membre in TypeMembre.objects.annotate(
+                count=Count('membres_actifs_index')
+            ).values('id', 'libelle', 'count').order_by('-count')
+        ]
+
+        resultat['statuts'] = [
+            {'id': statut['statut_id'], 'nom': statut['statut__nom'], 'count': statut['count']}
+            for statut in Membre.objects.filter(statut__isnull=False).values(
+                'statut_id', 'statut__nom'
+            ).annotate(count=Count('id')).order_by('-count')
+        ]
+
+        resultat.update(self._repartition_adhesions())
+        resultat['tranches_age'] = self._tranches_age()
+        return resultat
+
+    def _repartition_adhesions(self):
+        """Adhésions par mois (toutes années) et par année (dix dernières), en une requête."""
+        par_mois = dict.fromkeys(range(1, 13), 0)
+        annee_actuelle = self.aujourd_hui.year
+        par_annee = dict.fromkeys(range(annee_actuelle - self.NOMBRE_ANNEES + 1, annee_actuelle + 1), 0)
+
+        groupes = Membre.objects.filter(date_adhesion__isnull=False).annotate(
+            annee=ExtractYear('date_adhesion'),
+            mois=ExtractMonth('date_adhesion')
+        ).values('annee', 'mois').annotate(count=Count('id')).order_by()
+        for groupe in groupes:
+            par_mois[groupe['mois']] += groupe['count']
+            if groupe['annee'] in par_annee:
+                par_annee[groupe['annee']] += groupe['count']
+
+        return {
+            'par_mois': [
+                {'month': datetime(2000, mois, 1).strftime('%B'), 'count': count}
+                for mois, count in par_mois.items()
+            ],
+            'par_annee': [{'year': annee, 'count': count} for annee, count in par_annee.items()],
+        }
+
+    def _tranches_age(self):
+        """Répartition des membres (date de naissance connue) par tranche d'âge, en une requête."""
+        tranches = [libelle for libelle, _age in self.TRANCHES_AGE]
+        # Un membre a au moins N ans s'il est né au plus tard il y a N ans jour pour jour
+        conditions = [
+            When(date_naissance__gt=self._date_anniversaire(age_suivant), then=Value(libelle))
+            for (libelle, _age), (_libelle, age_suivant) in zip(self.TRANCHES_AGE, self.TRANCHES_AGE[1:])
+        ]
+        comptes = dict(
+            Membre.objects.filter(date_naissance__isnull=False).annotate(
+                tranche=Case(*conditions, default=Value(tranches[-1]), output_field=CharField())
+            ).values('tranche').annotate(count=Count('id')).values_list('tranche', 'count').order_by()
+        )
+        return [{'label': libelle, 'count': comptes.get(libelle, 0)} for libelle in tranches]
+
+    def _date_anniversaire(self, age):
+        """Date de naissance la plus récente pour avoir ``age`` ans aujourd'hui."""
+        try:
+            return self.aujourd_hui.replace(year=self.aujourd_hui.year - age)
+        except ValueError:
+            # 29 février d'une année non bissextile
+            return self.aujourd_hui.replace(year=self.aujourd_hui.year - age, day=28)
+
+
+class IndexTypesActifsService:
+    """
+    Maintient l'index des types actifs des membres (TypeMembreActif et
+    ``Membre.nb_types_actifs``).
+
+    Un type est actif pour un membre s'il a une association ouverte
+    (``date_debut`` passée, ``date_fin`` nulle). ``synchroniser`` recalcule
+    l'index de quelques membres après une modification de leurs associations ;
+    ``appliquer_transitions`` (tâche quotidienne) y reporte les associations
+    dont la date de début est atteinte et corrige les écarts éventuels
+    (modifications par ``QuerySet.update``).
+
+    Args:
+        aujourd_hui (date): Date de référence (aujourd'hui par défaut)
+        taille_lot (int): Nombre de membres traités par requête
+    """
+
+    def __init__(self, aujourd_hui=None, taille_lot=500):
+        self.aujourd_hui = aujourd_hui or timezone.now().date()
+        self.taille_lot = max(1, taille_lot)
+
+    def associations_actives(self):
+        return MembreTypeMembre.objects.filter(date_debut__lte=self.aujourd_hui, date_fin__isnull=True)
+
+    def synchroniser(self, membre_ids, corriger_nombres=False):
+        """
+        Recalcule l'index des membres donnés.
+
+        Args:
+            membre_ids (iterable): Identifiants des membres
+            corriger_nombres (bool): Vérifier ``nb_types_actifs`` même si
+                aucune ligne d'index n'a changé
+
+        Returns:
+            int: Nombre de lignes d'index ajoutées ou supprimées
+        """
+        membre_ids = sorted({membre_id for membre_id in membre_ids if membre_id is not None})
+        modifications = 0
+        # Une seule transaction (pas de point de sauvegarde dans une transaction englobante)
+        with transaction.atomic(savepoint=False):
+            for debut in range(0, len(membre_ids), self.taille_lot):
+                modifications += self._synchroniser_lot(membre_ids[debut:debut + self.taille_lot], corriger_nombres)
+        return modifications
+
+    def _synchroniser_lot(self, membre_ids, corriger_nombres):
+        attendus = set(
+            self.associations_actives().filter(membre_id__in=membre_ids).values_list(
+                'membre_id', 'type_membre_id'
+            ).order_by()
+        )
+        actuels = {
+            (membre_id, type_membre_id): pk
+            for pk, membre_id, type_membre_id in TypeMembreActif.objects.filter(
+                membre_id__in=membre_ids
+            ).values_list('pk', 'membre_id', 'type_membre_id')
+        }
+
+        obsoletes = [pk for couple, pk in actuels.items() if couple not in attendus]
+        if obsoletes:
+            TypeMembreActif.objects.filter(pk__in=obsoletes).delete()
+        nouveaux = [
+            TypeMembreActif(membre_id=membre_id, type_membre_id=type_membre_id)
+            for membre_id, type_membre_id in attendus.difference(actuels)
+        ]
+        if nouveaux:
+            TypeMembreActif.objects.bulk_create(nouveaux, ignore_conflicts=True)
+
+        if obsoletes or nouveaux or corriger_nombres:
+            # Une requête UPDATE par nombre de types actifs
+            nombres = dict.fromkeys(membre_ids, 0)
+            for membre_id, _type_membre_id in attendus:
+                nombres[membre_id] += 1
+            par_nombre = {}
+            for membre_id, nombre in nombres.items():
+                par_nombre.setdefault(nombre, []).append(membre_id)
+            for nombre, ids in par_nombre.items():
+                Membre._base_manager.filter(pk__in=ids).exclude(nb_types_actifs=nombre).update(
+                    nb_types_actifs=nombre
+                )
+        return len(obsoletes) + len(nouveaux)
+
+    def appliquer_transitions(self):
+        """
+        Resynchronise les membres dont l'index diffère des associations
+        actives à la date de référence (deux anti-jointures indexées).
+
+        Returns:
+            dict: Nombre de ``membres`` resynchronisés et de ``modifications``
+        """
+        actives = self.associations_actives()
+        manquants = actives.exclude(
+            Exists(TypeMembreActif.objects.filter(
+                membre_id=OuterRef('membre_id'), type_membre_id=OuterRef('type_membre_id')
+            ))
+        ).values_list('membre_id', flat=True)
+        obsoletes = TypeMembreActif.objects.exclude(
+            Exists(actives.filter(membre_id=OuterRef('membre_id'), type_membre_id=OuterRef('type_membre_id')))
+        ).values_list('membre_id', flat=True)
+
+        membre_ids = set(manquants).union(obsoletes)
+        modifications = self.synchroniser(membre_ids)
+        if modifications:
+            StatistiquesMembresService.invalider()
+        return {'membres': len(membre_ids), 'modifications': modifications}
+
+    def reconstruire(self):
+        """Recalcule l'index de tous les membres (corbeille comprise)."""
+        modifications = self.synchroniser(Membre._base_manager.values_list('pk', flat=True), corriger_nombres=True)
+        StatistiquesMembresService.invalider()
+        return modifications
@@ -9,6 +9,7 @@ from django.utils.crypto import get_random_string
 from apps.membres.models import Membre
 from apps.accounts.models import CustomUser
 from apps.membres.models import Membre, TypeMembre, MembreTypeMembre, HistoriqueMembre
+from apps.core.audit import enregistrer
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -53,6 +54,25 @@ def validate_membre_data(sender, instance, **kwargs):
         instance.email = instance.email.strip().lower()
 
 
+def historique_creation_membre(instance):
+    """
+    Construit (sans l'enregistrer) l'entrée d'historique de création d'un membre.
+    Partagée entre le signal post_save et les imports en masse.
+    """
+    return HistoriqueMembre(
+        membre=instance,
+        action='creation',
+        description=_("Création du membre"),
+        donnees_apres={
+            'id': instance.id,
+            'nom': instance.nom,
+            'prenom': instance.prenom,
+            'email': instance.email,
+            'date_adhesion': str(instance.date_adhesion)
+        }
+    )
+
+
 @receiver(post_save, sender=Membre)
 def create_membre_historique(sender, instance, created, **kwargs):
     """
@@ -60,18 +80,7 @@ def create_membre_historique(sender, instance, created, **kwargs):
     """
     if created:
         try:
-            HistoriqueMembre.objects.create(
-                membre=instance,
-                action='creation',
-                description=_("Création du membre"),
-                donnees_apres={
-                    'id': instance.id,
-                    'nom': instance.nom,
-                    'prenom': instance.prenom,
-                    'email': instance.email,
-                    'date_adhesion': str(instance.date_adhesion)
-                }
-            )
+            enregistrer(historique_creation_membre(instance))
             logger.info(f"Historique créé pour nouveau membre: {instance}")
         except Exception as e:
             logger.error(f"Erreur lors de la création de l'historique pour {instance}: {e}")
@@ -111,43 +120,72 @@ def validate_membre_type_membre(sender, instance, **kwargs):
             })
 
 
+def historique_type_membre(instance, created):
+    """
+    Construit (sans l'enregistrer) l'entrée d'historique d'une association
+    membre-type. Partagée entre le signal post_save et les imports en masse.
+    """
+    # Déterminer l'action et la description
+    if created:
+        action = 'ajout_type'
+        description = _(f"Ajout du type de membre: {instance.type_membre.libelle}")
+    else:
+        # Vérifier si la date de fin a été ajoutée (association terminée)
+        if instance.date_fin:
+            action = 'fin_type'
+            description = _(f"Fin de l'association avec le type: {instance.type_membre.libelle}")
+        else:
+            action = 'modification_type'
+            description = _(f"Modification de l'association avec le type: {instance.type_membre.libelle}")
+    
+    return HistoriqueMembre(
+        membre=instance.membre,
+        utilisateur_id=instance.modifie_par_id,
+        action=action,
+        description=description,
+        donnees_apres={
+            'type_membre': instance.type_membre.libelle,
+            'date_debut': str(instance.date_debut),
+            'date_fin': str(instance.date_fin) if instance.date_fin else None,
+            'commentaire': instance.commentaire
+        }
+    )
+
+
 @receiver(post_save, sender=MembreTypeMembre)
 def create_membre_type_historique(sender, instance, created, **kwargs):
     """
     Créer une entrée dans l'historique lors de la modification d'une association membre-type
     """
     try:
-        # Déterminer l'action et la description
-        if created:
-            action = 'ajout_type'
-            description = _(f"Ajout du type de membre: {instance.type_membre.libelle}")
-        else:
-            # Vérifier si la date de fin a été ajoutée (association terminée)
-            if instance.date_fin:
-                action = 'fin_type'
-                description = _(f"Fin de l'association avec le type: {instance.type_membre.libelle}")
-            else:
-                action = 'modification_type'
-                description = _(f"Modification de l'association avec le type: {instance.type_membre.libelle}")
-        
-        # Créer l'entrée d'historique
-        HistoriqueMembre.objects.create(
-            membre=instance.membre,
-            utilisateur=instance.modifie_par,
-            action=action,
-            description=description,
-            donnees_apres={
-                'type_membre': instance.type_membre.libelle,
-                'date_debut': str(instance.date_debut),
-                'date_fin': str(instance.date_fin) if instance.date_fin else None,
-                'commentaire': instance.commentaire
-            }
-        )
+        enregistrer(historique_type_membre(instance, created))
         logger.info(f"Historique créé pour association membre-type: {instance}")
     except Exception as e:
         logger.error(f"Erreur lors de la création de l'historique pour {instance}: {e}")
 
 
+@receiver(post_save, sender=MembreTypeMembre)
+@receiver(post_delete, sender=MembreTypeMembre)
+def synchroniser_types_actifs(sender, instance, **kwargs):
+    """
+    Mettre à jour l'index des types actifs du membre de l'association
+    """
+    from apps.membres.services import IndexTypesActifsService
+    IndexTypesActifsService().synchroniser([instance.membre_id])
+
+
+@receiver(post_save, sender=Membre)
+@receiver(post_delete, sender=Membre)
+@receiver(post_save, sender=MembreTypeMembre)
+@receiver(post_delete, sender=MembreTypeMembre)
+def invalider_statistiques_membres(sender, instance, **kwargs):
+    """
+    Invalider les statistiques des membres en cache (tableau de bord, statistiques)
+    """
+    from apps.membres.services import StatistiquesMembresService
+    StatistiquesMembresService.invalider()
+
+
 @receiver(pre_delete, sender=Membre)
 def handle_membre_delete(sender, instance, **kwargs):
     """
@@ -0,0 +1,13 @@
+# apps/membres/tasks.py
+from celery import shared_task
+
+
+@shared_task
+def appliquer_transitions_types_actifs_task():
+    """
+    Reporte dans l'index des types actifs les associations dont la date de
+    début est atteinte (tâche quotidienne, peu après minuit UTC).
+    """
+    from .services import IndexTypesActifsService
+
+    return IndexTypesActifsService().appliquer_transitions()
@@ -0,0 +1,98 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.membres.models import Membre, TypeMembre, MembreTypeMembre, HistoriqueMembre
+from apps.membres.services import ImportMembresService
+
+
+class ImportMembresServiceTest(TestCase):
+    """
+    Tests pour l'import des membres par lots.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.type_membre = TypeMembre.objects.create(libelle="Importé")
+        cls.existant = Membre.objects.create(nom="Dupont", prenom="Jean", email="jean.dupont@example.com")
+
+    def _lignes(self, *rows):
+        return list(enumerate(rows, start=2))
+
+    def test_creations_et_mises_a_jour(self):
+        lignes = self._lignes(
+            ['martin', 'sophie', ' Sophie.Martin@Example.com ', '0102030405', '1 rue de la Paix'],
+            ['Durand', 'Jean', 'JEAN.DUPONT@example.com'],
+            ['martin', 'Sophie', 'sophie.martin@example.com'],
+        )
+
+        resultats = ImportMembresService(type_membre=self.type_membre).importer(lignes)
+
+        self.assertEqual((resultats['importes'], resultats['maj'], resultats['erreurs']), (1, 1, 0))
+        sophie = Membre.objects.get(email='sophie.martin@example.com')
+        self.assertEqual((sophie.nom, sophie.prenom, sophie.telephone), ('MARTIN', 'Sophie', '0102030405'))
+        self.existant.refresh_from_db()
+        self.assertEqual(self.existant.nom, 'DURAND')
+
+        for membre in (sophie, self.existant):
+            self.assertTrue(membre.est_type_actif(self.type_membre))
+        self.assertTrue(HistoriqueMembre.objects.filter(membre=sophie, action='creation').exists())
+        self.assertEqual(HistoriqueMembre.objects.filter(action='ajout_type').count(), 2)
+
+    def test_requetes_par_lot(self):
+        lignes = self._lignes(*[['Nom', f'Prenom {i}', f'membre{i}@example.com'] for i in range(40)])
+
+        # Savepoint, lecture des membres, une insertion par table,
+        # l'index des types actifs (deux lectures, une insertion, un UPDATE)
+        # et les documents de recherche (une insertion)
+        with self.assertNumQueries(11):
+            resultats = ImportMembresService(type_membre=self.type_membre, batch_size=500).importer(lignes)
+
+        self.assertEqual(resultats['importes'], 40)
+        self.assertEqual(
+            MembreTypeMembre.objects.filter(type_membre=self.type_membre, date_debut=timezone.now().date()).count(),
+            40
+        )
+        self.assertEqual(Membre.objects.actifs().filter(nb_types_actifs=1).count(), 40)
+
+    def test_type_deja_actif_non_reattribue(self):
+        self.existant.ajouter_type(self.type_membre)
+
+        ImportMembresService(type_membre=self.type_membre).importer(
+            self._lignes(['Dupont', 'Jean', 'jean.dupont@example.com'])
+        )
+
+        self.assertEqual(MembreTypeMembre.objects.filter(membre=self.existant).count(), 1)
+
+    def test_lignes_en_erreur(self):
+        supprime = Membre.objects.create(nom="Ancien", prenom="Membre", email="ancien@example.com")
+        supprime.delete()
+
+        resultats = ImportMembresService().importer(self._lignes(
+            ['Nom', '', 'vide@example.com'],
+            ['Ancien', 'Membre', 'ancien@example.com'],
+            ['Petit', 'Anne', 'anne.petit@example.com'],
+            ['Grand', 'Paul', 'paul.grand@example.com'],
+        ))
+
+        self.assertEqual((resultats['importes'], resultats['erreurs']), (2, 2))
+        self.assertEqual(len(resultats['messages']), 2)
+        self.assertTrue(resultats['messages'][0].startswith('Ligne 2'))
+
+    def test_trop_d_erreurs_annule_l_import(self):
+        service = ImportMembresService()
+        with self.assertRaises(ValueError):
+            service.importer(self._lignes(
+                ['Petit', 'Anne', 'anne.petit@example.com'],
+                ['', 'Sans', 'nom@example.com'],
+                ['Sans', '', 'prenom@example.com'],
+            ))
+
+        self.assertFalse(Membre.objects.filter(email='anne.petit@example.com').exists())
+
+    def test_erreur_structurelle_annule_l_import(self):
+        service = ImportMembresService()
+        with self.assertRaises(ValueError):
+            service.importer(self._lignes(['Petit', 'Anne', 'anne.petit@example.com'], ['Incomplet']))
+
+        self.assertIn('Ligne 3', str(service.resultats['messages'][0]))
+        self.assertFalse(Membre.objects.filter(email='anne.petit@example.com').exists())
@@ -0,0 +1,150 @@
+from datetime import date
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.models import Statut
+from apps.membres.models import Membre, TypeMembre, MembreTypeMembre
+from apps.membres.services import StatistiquesMembresService
+from apps.membres.views import MembreStatistiquesView
+
+User = get_user_model()
+
+
+class StatistiquesMembresServiceTest(TestCase):
+    """
+    Tests pour les statistiques agrégées des membres.
+    """
+
+    aujourd_hui = date(2025, 6, 15)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.type_membre = TypeMembre.objects.create(libelle="Adhérent")
+        cls.statut = Statut.objects.create(nom="Actif")
+        naissances_adhesions = [
+            (date(2007, 6, 15), date(2025, 3, 1)),   # 18 ans le jour même
+            (date(2007, 6, 16), date(2025, 3, 20)),  # 17 ans
+            (date(1949, 6, 15), date(2024, 3, 10)),  # 76 ans
+            (date(1949, 6, 16), date(2010, 1, 5)),   # 75 ans, adhésion hors des dix ans
+            (None, date(2024, 11, 2)),
+        ]
+        cls.membres = [
+            Membre.objects.create(
+                nom=f"Nom{i}", prenom="Prenom", email=f"membre{i}@example.com",
+                date_naissance=naissance, date_adhesion=adhesion,
+                statut=cls.statut if i < 2 else None
+            )
+            for i, (naissance, adhesion) in enumerate(naissances_adhesions)
+        ]
+        for membre in cls.membres[:3]:
+            MembreTypeMembre.objects.create(membre=membre, type_membre=cls.type_membre, date_debut=date(2025, 1, 1))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_repartitions(self):
+        stats = StatistiquesMembresService(self.aujourd_hui).calculer()
+
+        self.assertEqual((stats['total'], stats['actifs']), (5, 3))
+        self.assertEqual(
+            [tranche['count'] for tranche in stats['tranches_age']],
+            [1, 1, 0, 0, 1, 1]
+        )
+        self.assertEqual([mois['count'] for mois in stats['par_mois']][:3], [1, 0, 3])
+        self.assertEqual(stats['par_mois'][10]['count'], 1)
+        self.assertEqual(stats['par_annee'][0]['year'], 2016)
+        self.assertEqual(stats['par_annee'][-1], {'year': 2025, 'count': 2})
+        self.assertEqual(sum(annee['count'] for annee in stats['par_annee']), 4)
+        self.assertEqual(stats['types'][0], {'id': self.type_membre.pk, 'libelle': "Adhérent", 'count': 3})
+        self.assertEqual(stats['statuts'], [{'id': self.statut.pk, 'nom': "Actif", 'count': 2}])
+
+    def test_vues_nombre_de_requetes_constant(self):
+        self.client.force_login(
+            User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpassword')
+        )
+        # Activité de session récente : pas d'écriture de session pendant les mesures
+        session = self.client.session
+        session['last_activity'] = timezone.now().timestamp()
+        session.save()
+
+        def requetes(nom):
+            cache.clear()
+            with CaptureQueriesContext(connection) as contexte:
+                if nom == 'membres:dashboard':
+                    self.assertEqual(self.client.get(reverse(nom)).status_code, 200)
+                else:
+                    # Pas de gabarit pour cette page dans le projet : seul le contexte est mesuré
+                    vue = MembreStatistiquesView()
+                    vue.setup(RequestFactory().get(reverse(nom)))
+                    vue.get_context_data()
+            return len(contexte)
+
+        for nom in ('membres:dashboard', 'membres:statistiques'):
+            avant = requetes(nom)
+            for i in range(5):
+                membre = Membre.objects.create(
+                    nom=f"Autre{i}", prenom="Membre", email=f"{nom}{i}@example.com".replace(':', ''),
+                    date_adhesion=date(2025, i + 1, 1)
+                )
+                membre.ajouter_type(self.type_membre)
+            self.assertEqual(requetes(nom), avant)
+
+class InvalidationStatistiquesMembresTest(TransactionTestCase):
+    """
+    Tests pour l'invalidation du cache des statistiques (transactions validées).
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.type_membre = TypeMembre.objects.create(libelle="Adhérent")
+        self.membres = [
+            Membre.objects.create(nom=f"Nom{i}", prenom="Prenom", email=f"membre{i}@example.com")
+            for i in range(3)
+        ]
+        self.membres[0].ajouter_type(self.type_membre)
+
+    def test_cache_et_invalidation(self):
+        service = StatistiquesMembresService()
+        self.assertEqual((service.statistiques()['total'], service.statistiques()['actifs']), (3, 1))
+
+        with self.assertNumQueries(0):
+            service.statistiques()
+
+        Membre.objects.create(nom="Nouveau", prenom="Membre", email="nouveau@example.com")
+        self.assertEqual(service.statistiques()['total'], 4)
+
+        MembreTypeMembre.objects.get(membre=self.membres[0]).delete()
+        self.assertEqual(service.statistiques()['actifs'], 0)
+
+    def test_invalidation_apres_validation_unique(self):
+        service = StatistiquesMembresService()
+        service.statistiques()
+
+        supprimer_cache = StatistiquesMembresService._supprimer_cache
+        with patch.object(StatistiquesMembresService, '_supprimer_cache', wraps=supprimer_cache) as suppression:
+            with transaction.atomic():
+                for membre in self.membres:
+                    membre.nom = "Modifie"
+                    membre.save()
+                # Toujours en cache tant que la transaction n'est pas validée
+                self.assertIsNotNone(cache.get(service.cle_cache()))
+
+        self.assertEqual(suppression.call_count, 1)
+        self.assertIsNone(cache.get(service.cle_cache()))
+
+    def test_annulation_conserve_le_cache(self):
+        service = StatistiquesMembresService()
+        service.statistiques()
+
+        with self.assertRaises(ValueError), transaction.atomic():
+            Membre.objects.create(nom="Annule", prenom="Membre", email="annule@example.com")
+            raise ValueError
+
+        self.assertEqual(cache.get(service.cle_cache())['total'], 3)
@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.membres.models import Membre, TypeMembre, MembreTypeMembre, TypeMembreActif
+from apps.membres.services import IndexTypesActifsService
+
+
+class IndexTypesActifsTest(TestCase):
+    """
+    Tests pour l'index des types actifs des membres.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.aujourd_hui = timezone.now().date()
+        cls.adherent = TypeMembre.objects.create(libelle="Adhérent")
+        cls.benevole = TypeMembre.objects.create(libelle="Bénévole")
+        cls.membre = Membre.objects.create(nom="Dupont", prenom="Jean", email="jean.dupont@example.com")
+        cls.autre = Membre.objects.create(nom="Martin", prenom="Sophie", email="sophie.martin@example.com")
+
+    def _nb_types_actifs(self, membre):
+        membre.refresh_from_db(fields=['nb_types_actifs'])
+        return membre.nb_types_actifs
+
+    def test_synchronise_a_chaque_modification(self):
+        self.membre.ajouter_type(self.adherent)
+        association = self.membre.ajouter_type(self.benevole)
+
+        self.assertEqual(self._nb_types_actifs(self.membre), 2)
+        self.assertEqual(set(self.membre.get_types_actifs()), {self.adherent, self.benevole})
+        self.assertEqual(list(Membre.objects.actifs()), [self.membre])
+        self.assertEqual(list(Membre.objects.par_type(self.benevole.pk)), [self.membre])
+
+        association.date_fin = self.aujourd_hui
+        association.save()
+        self.assertEqual(self._nb_types_actifs(self.membre), 1)
+
+        self.membre.supprimer_type(self.adherent)
+        self.assertEqual(self._nb_types_actifs(self.membre), 0)
+        self.assertFalse(TypeMembreActif.objects.exists())
+        self.assertEqual(set(Membre.objects.inactifs()), {self.membre, self.autre})
+
+    def test_transitions_quotidiennes(self):
+        demain = self.aujourd_hui + timedelta(days=1)
+        # Association à venir (chargement en masse, sans signal ni validation)
+        MembreTypeMembre.objects.bulk_create([
+            MembreTypeMembre(membre=self.membre, type_membre=self.adherent, date_debut=demain)
+        ])
+        self.assertFalse(self.membre.est_type_actif(self.adherent))
+        self.autre.ajouter_type(self.benevole)
+
+        # Rien à faire : deux anti-jointures seulement
+        with self.assertNumQueries(2):
+            resultat = IndexTypesActifsService().appliquer_transitions()
+        self.assertEqual(resultat, {'membres': 0, 'modifications': 0})
+
+        # Association terminée sans signal (QuerySet.update)
+        MembreTypeMembre.objects.filter(membre=self.autre).update(date_fin=self.aujourd_hui)
+
+        resultat = IndexTypesActifsService(aujourd_hui=demain).appliquer_transitions()
+
+        self.assertEqual(resultat, {'membres': 2, 'modifications': 2})
+        self.assertTrue(self.membre.est_type_actif(self.adherent))
+        self.assertEqual((self._nb_types_actifs(self.membre), self._nb_types_actifs(self.autre)), (1, 0))
+
+    def test_reconstruire_corrige_les_nombres(self):
+        self.membre.ajouter_type(self.adherent)
+        Membre.objects.filter(pk__in=[self.membre.pk, self.autre.pk]).update(nb_types_actifs=3)
+
+        IndexTypesActifsService().reconstruire()
+
+        self.assertEqual((self._nb_types_actifs(self.membre), self._nb_types_actifs(self.autre)), (1, 0))
+        self.assertEqual(TypeMembre.objects.avec_nombre_membres().get(pk=self.adherent.pk).nombre_membres, 1)
@@ -3,12 +3,9 @@ import csv
 import io
 import json
 import logging
-from datetime import datetime
 from django.conf import settings
-from django.db.models.functions import ExtractMonth
 from django.contrib import messages
-from django.db import transaction
-from django.db.models import Count, Q, F, IntegerField, Case, When
+from django.db.models import Count, Q, F, Case, When, Prefetch
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
@@ -19,22 +16,23 @@ from django.views.generic import (
     CreateView, DeleteView, DetailView, FormView, ListView, TemplateView, UpdateView, View
 )
 
-from openpyxl import Workbook
 from openpyxl import load_workbook
 from django.db.utils import IntegrityError
 from apps.core.mixins import StaffRequiredMixin, TrashViewMixin, RestoreViewMixin
-from apps.core.models import Statut
+from apps.core.corbeille import compteurs_corbeille
+from apps.core.recherche import index_recherche
+from apps.core.exports import exporter_en_arriere_plan, lancer_export, suivre_progression
+from apps.core.utils import streaming_excel_response
 from apps.membres.forms import (
     MembreForm, TypeMembreForm, MembreTypeMembreForm, 
     MembreImportForm, MembreSearchForm
 )
-from apps.membres.models import Membre, TypeMembre, MembreTypeMembre, HistoriqueMembre
-from django.db.models import F, IntegerField
+from apps.membres.models import Membre, TypeMembre, MembreTypeMembre, TypeMembreActif, HistoriqueMembre
+from apps.membres.services import ImportMembresService, StatistiquesMembresService
 from django.utils.crypto import get_random_string
 from apps.accounts.models import CustomUser
 from django.http import Http404
 import types
-import openpyxl.styles
 
 logger = logging.getLogger(__name__)
 
@@ -48,73 +46,51 @@ class DashboardView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Récupérer la date actuelle et les statistiques de base
-        today = timezone.now().date()
-        total_membres = Membre.objects.count()
-        membres_actifs = Membre.objects.actifs().count()
-        
-        # Types de membres avec leur nombre
-        types_membres = TypeMembre.objects.annotate(
-            count=Count('membres_historique__membre', 
-                          filter=Q(membres_historique__date_debut__lte=today, 
-                                 membres_historique__date_fin__isnull=True),
-                          distinct=True)
-        ).order_by('-count')
-        
-        # Adhésions récentes
-        adhesions_recentes = Membre.objects.order_by('-date_adhesion')[:10]
-        
-        # Statistiques sur les membres
-        membres_par_mois = Membre.objects.annotate(
-        month=ExtractMonth('date_adhesion', output_field=IntegerField())
-        ).values('month').annotate(count=Count('id')).order_by('month')
-        
-        # Membres par statut - Inclure l'ID du statut dans les valeurs retournées
-        membres_par_statut = Membre.objects.filter(
-            statut__isnull=False
-        ).values('statut__nom', 'statut_id').annotate(
-            count=Count('id')
-        ).order_by('-count')
+        # Statistiques agrégées (mises en cache)
+        stats = StatistiquesMembresService().statistiques()
         
-        # Membres avec/sans compte utilisateur
-        avec_compte = Membre.objects.filter(utilisateur__isnull=False).count()
-        sans_compte = total_membres - avec_compte
+        # Adhésions récentes, avec leurs types actifs préchargés (index des types actifs)
+        adhesions_recentes = list(
+            Membre.objects.order_by('-date_adhesion').prefetch_related(
+                Prefetch(
+                    'types_actifs_index',
+                    queryset=TypeMembreActif.objects.select_related('type_membre'),
+                    to_attr='types_actifs_prefetch'
+                )
+            )[:10]
+        )
+        for membre in adhesions_recentes:
+            membre.types_actifs = [actif.type_membre for actif in membre.types_actifs_prefetch]
         
         # Construire les données pour les graphiques
         chart_types = [
-            {'id': t.id, 'name': t.libelle, 'value': t.count} for t in types_membres
+            {'id': t['id'], 'name': t['libelle'], 'value': t['count']} for t in stats['types']
         ]
         
-        chart_monthly = []
-        for i in range(1, 13):
-            month_name = datetime(2000, i, 1).strftime('%B')
-            count = next((item['count'] for item in membres_par_mois if item['month'] == i), 0)
-            chart_monthly.append({'month': month_name, 'count': count})
-        
-        # Corriger l'accès aux données du statut (utiliser la syntaxe dictionnaire)
         chart_statuts = [
-            {'id': s['statut_id'], 'name': s['statut__nom'] or 'Sans statut', 'value': s['count']} 
-            for s in membres_par_statut
+            {'id': s['id'], 'name': s['nom'] or 'Sans statut', 'value': s['count']}
+            for s in stats['statuts']
         ]
         
         chart_comptes = [
-            {'name': 'Avec compte', 'value': avec_compte},
-            {'name': 'Sans compte', 'value': sans_compte}
+            {'name': 'Avec compte', 'value': stats['avec_compte']},
+            {'name': 'Sans compte', 'value': stats['total'] - stats['avec_compte']}
         ]
         
         context.update({
-            'total_membres': total_membres,
-            'membres_actifs': membres_actifs,
-            'types_membres': types_membres,
+            'total_membres': stats['total'],
+            'membres_actifs': stats['actifs'],
+            'types_membres': stats['types'],
             'adhesions_recentes': adhesions_recentes,
             'chart_types': json.dumps(chart_types),
-            'chart_monthly': json.dumps(chart_monthly),
+            'chart_monthly': json.dumps(stats['par_mois']),
             'chart_statuts': json.dumps(chart_statuts),
             'chart_comptes': json.dumps(chart_comptes),
         })
         
         return context
 
+
 class MembreListView(ListView):
     """
     Vue pour afficher la liste des membres avec recherche et filtrage
@@ -164,23 +140,11 @@ class MembreListView(ListView):
         
         # Filtre par terme de recherche
         if term:
-            q_objects = (
-                Q(nom__icontains=term) | 
-                Q(prenom__icontains=term) | 
-                Q(email__icontains=term) | 
-                Q(telephone__icontains=term) |
-                Q(code_postal__icontains=term) |
-                Q(ville__icontains=term)
-            )
-            queryset = queryset.filter(q_objects)
+            queryset = index_recherche.filtrer(queryset, term)
         
         # Filtre par type de membre
         if type_membre_id:
-            queryset = queryset.filter(
-                types_historique__type_membre_id=type_membre_id,
-                types_historique__date_debut__lte=timezone.now().date(),
-                types_historique__date_fin__isnull=True
-            ).distinct()
+            queryset = queryset.filter(types_actifs_index__type_membre_id=type_membre_id)
         
         # Filtre par statut
         if statut_id:
@@ -244,23 +208,11 @@ class MembreListView(ListView):
         elif avec_compte == 'sans':
             queryset = queryset.filter(utilisateur__isnull=True)
         
-        # Filtre par statut d'activité
+        # Filtre par statut d'activité (index des types actifs)
         if actif == 'actif':
-            # Obtenir les IDs des membres avec au moins un type de membre actif
-            membres_ids = MembreTypeMembre.objects.filter(
-                date_debut__lte=timezone.now().date(),
-                date_fin__isnull=True
-            ).values_list('membre_id', flat=True).distinct()
-            
-            queryset = queryset.filter(id__in=membres_ids)
+            queryset = queryset.filter(nb_types_actifs__gt=0)
         elif actif == 'inactif':
-            # Obtenir les IDs des membres avec au moins un type de membre actif
-            membres_ids = MembreTypeMembre.objects.filter(
-                date_debut__lte=timezone.now().date(),
-                date_fin__isnull=True
-            ).values_list('membre_id', flat=True).distinct()
-            
-            queryset = queryset.exclude(id__in=membres_ids)
+            queryset = queryset.filter(nb_types_actifs=0)
         
         # Appliquer le tri
         if sort_by:
@@ -278,17 +230,7 @@ class MembreListView(ListView):
                 queryset = queryset.select_related('statut')
                 order_fields = [f'{direction}statut__nom', f'{direction}nom']
             elif sort_by == 'types':
-                queryset = queryset.annotate(
-                    nb_types=Count(
-                        'types_historique',
-                        filter=Q(
-                            types_historique__date_debut__lte=timezone.now().date(),
-                            types_historique__date_fin__isnull=True
-                        ),
-                        distinct=True
-                    )
-                )
-                order_fields = [f'{direction}nb_types', f'{direction}nom']
+                order_fields = [f'{direction}nb_types_actifs', f'{direction}nom']
             else:
                 order_fields = ['nom', 'prenom']
             
@@ -567,6 +509,7 @@ class MembreDeleteView(StaffRequiredMixin, DeleteView):
         # Suppression logique explicite
         membre.deleted_at = timezone.now()
         membre.save(update_fields=['deleted_at'])
+        compteurs_corbeille.ajuster(Membre, 1)
         
         messages.success(
             request, 
@@ -585,16 +528,8 @@ class TypeMembreListView(ListView):
     
     def get_queryset(self):
         # Utiliser une annotation pour ajouter members_count à chaque type
-        today = timezone.now().date()
         return TypeMembre.objects.annotate(
-            members_count=Count(
-                'membres_historique__membre',
-                filter=Q(
-                    membres_historique__date_debut__lte=today,
-                    membres_historique__date_fin__isnull=True
-                ),
-                distinct=True
-            )
+            members_count=Count('membres_actifs_index')
         ).order_by('ordre_affichage', 'libelle')
 
 
@@ -646,13 +581,9 @@ class TypeMembreUpdateView(StaffRequiredMixin, UpdateView):
         # Ajouter dynamiquement une méthode nb_membres_actifs à l'objet
         # pour être compatible avec le template existant
         type_membre = obj
-        today = timezone.now().date()
         
         # Calculer le nombre de membres actifs
-        membres_count = type_membre.membres_historique.filter(
-            date_debut__lte=today,
-            date_fin__isnull=True
-        ).values('membre').distinct().count()
+        membres_count = type_membre.membres_actifs_index.count()
         
         # Ajouter une méthode dynamique à l'objet qui renvoie ce nombre
         # Cette approche évite de modifier le template
@@ -703,13 +634,9 @@ class TypeMembreDeleteView(StaffRequiredMixin, DeleteView):
         # Ajouter dynamiquement une méthode nb_membres_actifs à l'objet
         # pour être compatible avec le template existant
         type_membre = obj
-        today = timezone.now().date()
         
         # Calculer le nombre de membres actifs
-        membres_count = type_membre.membres_historique.filter(
-            date_debut__lte=today,
-            date_fin__isnull=True
-        ).values('membre').distinct().count()
+        membres_count = type_membre.membres_actifs_index.count()
         
         # Ajouter une méthode dynamique à l'objet qui renvoie ce nombre
         def nb_membres_actifs(self):
@@ -928,19 +855,14 @@ class MembreImportView(StaffRequiredMixin, FormView):
         type_membre = form.cleaned_data['type_membre']
         statut = form.cleaned_data['statut']
         
-        # Préparer les résultats
-        resultats = {
-            'importes': 0,
-            'erreurs': 0,
-            'maj': 0,
-            'messages': []
-        }
+        service = ImportMembresService(type_membre=type_membre, statut=statut)
+        resultats = service.resultats
         
         try:
             if extension == 'csv':
-                self._process_csv(fichier, form, type_membre, statut, resultats)
+                service.importer(self._lignes_csv(fichier, form))
             else:  # xlsx ou xls
-                self._process_excel(fichier, type_membre, statut, resultats)
+                service.importer(self._lignes_excel(fichier))
                 
             # Message de succès
             message = _("Importation terminée: %(importes)s membres importés, %(maj)s mis à jour, %(erreurs)s erreurs.") % {
@@ -955,186 +877,54 @@ class MembreImportView(StaffRequiredMixin, FormView):
                 messages.info(self.request, msg)
             
         except Exception as e:
-            logger.error(f"Erreur lors de l'importation: {str(e)}")
+            logger.error(f"Erreur lors de l'importation: {str(e)}", exc_info=True)
             messages.error(self.request, _("Une erreur s'est produite lors de l'importation: %(error)s") % {'error': str(e)})
         
         return super().form_valid(form)
     
-    def _process_csv(self, fichier, form, type_membre, statut, resultats):
-        """Traiter un fichier CSV"""
-        delimiter = form.cleaned_data['delimiter']
+    def _lignes_csv(self, fichier, form):
+        """Lit le fichier CSV au fil de l'eau : couples (numéro de ligne, valeurs)"""
+        delimiter = form.cleaned_data['delimiter'] or ';'
         has_header = form.cleaned_data['header']
+        encoding = form.cleaned_data.get('encoding') or 'utf-8'
         
-        # Lire le fichier CSV
-        decoded_file = fichier.read().decode('utf-8')
-        io_string = io.StringIO(decoded_file)
-        
-        reader = csv.reader(io_string, delimiter=delimiter)
-        rows = list(reader)  # Convertir en liste pour pouvoir l'analyser avant transaction
+        reader = csv.reader(io.TextIOWrapper(fichier, encoding=encoding, newline=''), delimiter=delimiter)
         
         # Ignorer la première ligne si c'est un en-tête
         start_idx = 1 if has_header else 0
-        
-        # Vérification préliminaire des données avant de commencer la transaction
-        fatal_error = False
-        for i, row in enumerate(rows[start_idx:], start=start_idx+1):
-            if len(row) < 3:  # Minimum: nom, prénom, email
-                resultats['messages'].append(_("Ligne %(line)d: Données insuffisantes (minimum 3 colonnes requis)") % {'line': i})
-                fatal_error = True
-        
-        if fatal_error:
-            resultats['erreurs'] += 1
-            raise ValueError(_("Le fichier CSV contient des erreurs structurelles. Veuillez corriger le format avant d'importer."))
-        
-        # Si tout est structurellement correct, commencer la transaction
-        try:
-            with transaction.atomic():
-                for i, row in enumerate(rows[start_idx:], start=start_idx+1):
-                    try:
-                        # Récupérer les données de base
-                        nom = row[0].strip() if row[0] else ""
-                        prenom = row[1].strip() if row[1] else ""
-                        email = row[2].strip() if row[2] else ""
-                        
-                        if not nom or not prenom or not email:
-                            resultats['messages'].append(_("Ligne %(line)d: Données incomplètes (nom, prénom ou email manquant)") % {'line': i})
-                            resultats['erreurs'] += 1
-                            continue
-                        
-                        # Vérifier si le membre existe déjà
-                        membre_existant = Membre.objects.filter(email=email).first()
-                        
-                        if membre_existant:
-                            # Mettre à jour le membre existant si nécessaire
-                            if membre_existant.nom != nom or membre_existant.prenom != prenom:
-                                membre_existant.nom = nom
-                                membre_existant.prenom = prenom
-                                membre_existant.save(update_fields=['nom', 'prenom'])
-                                resultats['maj'] += 1
-                            
-                            # Ajouter le type de membre s'il n'existe pas déjà
-                            if type_membre and not membre_existant.est_type_actif(type_membre):
-                                membre_existant.ajouter_type(type_membre)
-                        else:
-                            # Créer un nouveau membre
-                            date_adhesion = timezone.now().date()
-                            
-                            # Données optionnelles (si disponibles)
-                            telephone = row[3].strip() if len(row) > 3 and row[3] else None
-                            adresse = row[4].strip() if len(row) > 4 and row[4] else None
-                            
-                            # Créer le membre
-                            membre = Membre.objects.create(
-                                nom=nom,
-                                prenom=prenom,
-                                email=email,
-                                telephone=telephone,
-                                adresse=adresse,
-                                date_adhesion=date_adhesion,
-                                statut=statut
-                            )
-                            
-                            # Ajouter le type de membre si spécifié
-                            if type_membre:
-                                membre.ajouter_type(type_membre)
-                            
-                            resultats['importes'] += 1
-                    
-                    except Exception as e:
-                        logger.error(f"Erreur ligne {i}: {str(e)}", exc_info=True)
-                        resultats['messages'].append(_("Ligne %(line)d: %(error)s") % {'line': i, 'error': str(e)})
-                        resultats['erreurs'] += 1
-                        # Ne pas lever l'exception ici pour continuer à traiter les autres lignes
-                    
-                # Vérifier si le taux d'erreur est acceptable (par exemple, < 50%)
-                if resultats['erreurs'] > 0 and resultats['erreurs'] / (resultats['importes'] + resultats['erreurs'] + resultats['maj']) > 0.5:
-                    raise ValueError(_("Trop d'erreurs détectées lors de l'importation. L'opération a été annulée."))
-                    
-        except Exception as e:
-            # Capture toute exception non gérée ou levée intentionnellement
-            logger.error(f"Erreur lors de l'importation CSV: {str(e)}", exc_info=True)
-            resultats['messages'].append(_("Erreur critique: %(error)s") % {'error': str(e)})
-            resultats['erreurs'] += 1
-            raise
+        for i, row in enumerate(reader, start=1):
+            if i > start_idx:
+                yield i, row
     
-    def _process_excel(self, fichier, type_membre, statut, resultats):
-        """Traiter un fichier Excel"""
-        wb = load_workbook(fichier)
-        sheet = wb.active
-        
-        # Déterminer si la première ligne est un en-tête (on suppose que oui)
-        has_header = True
-        
-        with transaction.atomic():
-            rows = list(sheet.rows)
-            start_idx = 1 if has_header else 0
-            
-            for i, row in enumerate(rows[start_idx:], start=start_idx+1):
-                try:
-                    # Récupérer les valeurs des cellules
-                    nom = row[0].value.strip() if row[0].value else ""
-                    prenom = row[1].value.strip() if row[1].value else ""
-                    email = row[2].value.strip() if row[2].value else ""
-                    
-                    if not nom or not prenom or not email:
-                        resultats['messages'].append(_("Ligne %(line)d: Données incomplètes") % {'line': i})
-                        resultats['erreurs'] += 1
-                        continue
-                    
-                    # Vérifier si le membre existe déjà
-                    membre_existant = Membre.objects.filter(email=email).first()
-                    
-                    if membre_existant:
-                        # Mettre à jour le membre existant si nécessaire
-                        if membre_existant.nom != nom or membre_existant.prenom != prenom:
-                            membre_existant.nom = nom
-                            membre_existant.prenom = prenom
-                            membre_existant.save(update_fields=['nom', 'prenom'])
-                            resultats['maj'] += 1
-                        
-                        # Ajouter le type de membre s'il n'existe pas déjà
-                        if not membre_existant.est_type_actif(type_membre):
-                            membre_existant.ajouter_type(type_membre)
-                    else:
-                        # Créer un nouveau membre
-                        date_adhesion = timezone.now().date()
-                        
-                        # Données optionnelles (si disponibles)
-                        telephone = row[3].value if len(row) > 3 and row[3].value else None
-                        adresse = row[4].value if len(row) > 4 and row[4].value else None
-                        
-                        # Créer le membre
-                        membre = Membre.objects.create(
-                            nom=nom,
-                            prenom=prenom,
-                            email=email,
-                            telephone=telephone,
-                            adresse=adresse,
-                            date_adhesion=date_adhesion,
-                            statut=statut
-                        )
-                        
-                        # Ajouter le type de membre
-                        membre.ajouter_type(type_membre)
-                        
-                        resultats['importes'] += 1
-                
-                except Exception as e:
-                    logger.error(f"Erreur ligne {i}: {str(e)}")
-                    resultats['messages'].append(_("Ligne %(line)d: %(error)s") % {'line': i, 'error': str(e)})
-                    resultats['erreurs'] += 1
+    def _lignes_excel(self, fichier):
+        """Lit la feuille active au fil de l'eau (la première ligne est un en-tête)"""
+        wb = load_workbook(fichier, read_only=True)
+        try:
+            for i, row in enumerate(wb.active.iter_rows(min_row=2, values_only=True), start=2):
+                yield i, row
+        finally:
+            wb.close()
 
 
 class MembreExportView(StaffRequiredMixin, View):
     """
     Vue pour exporter la liste des membres au format CSV ou Excel
     """
-    # Correction pour MembreExportView.get() - Implémentation du filtre des cotisations impayées
     def get(self, request):
         format_export = request.GET.get('format', 'csv')
-        
-        # Récupérer les filtres de recherche pour les appliquer à l'export
-        form = MembreSearchForm(request.GET)
+        queryset = self.filtrer(request.GET)
+
+        # Les exports volumineux sont confiés à une tâche Celery
+        if exporter_en_arriere_plan(request, queryset):
+            return lancer_export(request, 'apps.membres.views.generer_export_membres', format_export)
+
+        return self.exporter(queryset, format_export)
+
+    # Correction pour MembreExportView.get() - Implémentation du filtre des cotisations impayées
+    @classmethod
+    def filtrer(cls, parametres):
+        """Retourne les membres correspondant aux filtres de recherche."""
+        form = MembreSearchForm(parametres)
         queryset = Membre.objects.all()
         
         if form.is_valid():
@@ -1203,7 +993,11 @@ class MembreExportView(StaffRequiredMixin, View):
                     queryset = queryset.actifs()
                 elif actif == 'inactif':
                     queryset = queryset.inactifs()
-        
+
+        return queryset
+
+    def exporter(self, queryset, format_export, progression=None):
+        """Produit l'export des membres (vue et tâche d'export en arrière-plan)."""
         # Précharger les relations pour optimiser
         membres = queryset.select_related('statut').prefetch_related('types')
         
@@ -1218,11 +1012,11 @@ class MembreExportView(StaffRequiredMixin, View):
         date_str = timezone.now().strftime('%Y%m%d')
         
         if format_export == 'excel':
-            return self._export_excel(membres, champs, date_str)
+            return self._export_excel(membres, champs, date_str, progression)
         else:  # csv par défaut
-            return self._export_csv(membres, champs, date_str)
+            return self._export_csv(membres, champs, date_str, progression)
     
-    def _export_csv(self, membres, champs, date_str):
+    def _export_csv(self, membres, champs, date_str, progression=None):
         """Exporter au format CSV avec encodage UTF-8 et BOM pour Excel"""
         response = HttpResponse(content_type='text/csv; charset=utf-8-sig')
         response['Content-Disposition'] = f'attachment; filename="membres_{date_str}.csv"'
@@ -1242,7 +1036,7 @@ class MembreExportView(StaffRequiredMixin, View):
         writer.writerow(header)
         
         # Écrire les données
-        for membre in membres:
+        for membre in suivre_progression(membres, progression, membres):
             row = []
             for champ in champs:
                 if champ == 'statut':
@@ -1260,81 +1054,69 @@ class MembreExportView(StaffRequiredMixin, View):
         
         return response
 
-    def _export_excel(self, membres, champs, date_str):
-        """Exporter au format Excel avec prise en charge correcte des caractères accentués"""
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="membres_{date_str}.xlsx"'
-        
-        # Créer un nouveau classeur Excel
-        wb = Workbook()
-        ws = wb.active
-        ws.title = _("Membres")
-        
-        # Écrire l'en-tête
-        header = [
-            _('ID'), _('Nom'), _('Prénom'), _('Email'), _('Téléphone'), 
-            _('Adresse'), _('Code postal'), _('Ville'), _('Pays'),
-            _('Date d\'adhésion'), _('Date de naissance'),
-            _('Statut'), _('Types de membre')
+    def _export_excel(self, membres, champs, date_str, progression=None):
+        """
+        Exporter au format Excel à mémoire constante : les membres sont lus par
+        paquets via values_list() et le classeur est écrit dans un fichier
+        temporaire renvoyé en flux
+        """
+        colonnes = [
+            (_('ID'), 8, None),
+            (_('Nom'), 20, None),
+            (_('Prénom'), 20, None),
+            (_('Email'), 30, None),
+            (_('Téléphone'), 15, None),
+            (_('Adresse'), 35, None),
+            (_('Code postal'), 12, None),
+            (_('Ville'), 20, None),
+            (_('Pays'), 15, None),
+            (_('Date d\'adhésion'), 15, {'num_format': 'dd/mm/yyyy'}),
+            (_('Date de naissance'), 15, {'num_format': 'dd/mm/yyyy'}),
+            (_('Statut'), 15, None),
+            (_('Types de membre'), 30, None),
         ]
-        ws.append(header)
-        
-        # Écrire les données
-        for membre in membres:
-            row = []
-            for champ in champs:
-                if champ == 'statut':
-                    row.append(membre.statut.nom if membre.statut else '')
-                elif champ == 'types_actifs':
-                    types = ", ".join([t.libelle for t in membre.get_types_actifs()])
-                    row.append(types)
-                elif champ in ('date_adhesion', 'date_naissance') and getattr(membre, champ):
-                    # Pour Excel, on peut garder les objets date directement
-                    row.append(getattr(membre, champ))
-                else:
-                    value = getattr(membre, champ, '')
-                    # S'assurer que les valeurs None sont converties en chaînes vides
-                    row.append(str(value) if value is not None else '')
-            ws.append(row)
-        
-        # Style de l'en-tête
-        for cell in ws[1]:
-            cell.font = cell.font.copy(bold=True)
-        
-        # Ajuster la largeur des colonnes
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if cell.value:
-                        # Ajuster la largeur en fonction de la longueur de la valeur
-                        # en tenant compte des caractères spéciaux
-                        cell_length = len(str(cell.value))
-                        if cell_length > max_length:
-                            max_length = cell_length
-                except:
-                    pass
-            # Largeur minimale de 8 caractères
-            adjusted_width = max(max_length + 2, 8)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Formater les dates
-        date_format = 'DD/MM/YYYY'
-        date_style = openpyxl.styles.NamedStyle(name='date_style', number_format=date_format)
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2), 2):
-            # Colonnes des dates (9 = date_adhesion, 10 = date_naissance)
-            for col_idx in [9, 10]:
-                cell = ws.cell(row=row_idx, column=col_idx)
-                if isinstance(cell.value, datetime.date):
-                    cell.style = date_style
-        
-        # Enregistrer le classeur dans la réponse
-        wb.save(response)
-        
-        return response
+        return streaming_excel_response(
+            f'membres_{date_str}.xlsx', _("Membres"), colonnes, self._lignes_export(membres, progression)
+        )
+
+    def _lignes_export(self, membres, progression=None, taille_lot=500):
+        """
+        Génère les lignes d'export dans l'ordre du queryset : une requête jointe
+        pour les membres et leur statut, une requête par lot pour les types actifs
+        """
+        valeurs = membres.prefetch_related(None).values_list(
+            'id', 'nom', 'prenom', 'email', 'telephone', 'adresse',
+            'code_postal', 'ville', 'pays', 'date_adhesion', 'date_naissance',
+            'statut__nom'
+        )
+        lot = []
+        for ligne in suivre_progression(valeurs.iterator(chunk_size=taille_lot), progression, membres):
+            lot.append(ligne)
+            if len(lot) >= taille_lot:
+                yield from self._completer_types_actifs(lot)
+                lot = []
+        if lot:
+            yield from self._completer_types_actifs(lot)
+
+    def _completer_types_actifs(self, lot):
+        """Ajoute à chaque ligne du lot ses types de membre actifs (cf. Membre.get_types_actifs)"""
+        types_par_membre = {}
+        types_actifs = TypeMembre.objects.filter(
+            membres_actifs_index__membre_id__in=[ligne[0] for ligne in lot]
+        ).values_list('membres_actifs_index__membre_id', 'libelle')
+        for membre_id, libelle in types_actifs:
+            types_par_membre.setdefault(membre_id, []).append(libelle)
+
+        for ligne in lot:
+            yield ligne + (", ".join(types_par_membre.get(ligne[0], [])),)
+
+
+def generer_export_membres(parametres, progression=None):
+    """
+    Générateur de l'export des membres exécuté par la tâche d'export en arrière-plan.
+    """
+    vue = MembreExportView()
+    return vue.exporter(vue.filtrer(parametres), parametres.get('format', 'csv'), progression)
 
 
 class MembreHistoriqueView(DetailView):
@@ -1369,60 +1151,20 @@ class MembreStatistiquesView(StaffRequiredMixin, TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        today = timezone.now().date()
-        
-        # Statistiques générales
-        total_membres = Membre.objects.count()
-        membres_actifs = Membre.objects.actifs().count()
-        
-        # Répartition par type de membre
-        types_stats = TypeMembre.objects.annotate(
-            count=Count('membres_historique__membre', 
-                          filter=Q(membres_historique__date_debut__lte=today, 
-                                 membres_historique__date_fin__isnull=True),
-                          distinct=True)
-        ).order_by('-count')
-        
-        # Répartition par statut
-        statuts_stats = Statut.objects.filter(
-            membre__isnull=False
-        ).annotate(
-            count=Count('membre', distinct=True)
-        ).order_by('-count')
-        
-        # Répartition par mois d'adhésion
-        membres_par_mois = []
-        for i in range(1, 13):
-            month_name = datetime(2000, i, 1).strftime('%B')
-            count = Membre.objects.filter(date_adhesion__month=i).count()
-            membres_par_mois.append({'month': month_name, 'count': count})
-        
-        # Répartition par année d'adhésion
-        annee_actuelle = today.year
-        membres_par_annee = []
-        for i in range(annee_actuelle - 9, annee_actuelle + 1):
-            count = Membre.objects.filter(date_adhesion__year=i).count()
-            membres_par_annee.append({'year': i, 'count': count})
-        
-        # Répartition par tranche d'âge
-        membres_avec_age = Membre.objects.filter(date_naissance__isnull=False)
-        tranches_age = [
-            {'label': '< 18 ans', 'count': membres_avec_age.par_age(age_max=17).count()},
-            {'label': '18-30 ans', 'count': membres_avec_age.par_age(age_min=18, age_max=30).count()},
-            {'label': '31-45 ans', 'count': membres_avec_age.par_age(age_min=31, age_max=45).count()},
-            {'label': '46-60 ans', 'count': membres_avec_age.par_age(age_min=46, age_max=60).count()},
-            {'label': '61-75 ans', 'count': membres_avec_age.par_age(age_min=61, age_max=75).count()},
-            {'label': '> 75 ans', 'count': membres_avec_age.par_age(age_min=76).count()},
-        ]
         
-        # Adhésions par année
-        adhesions_par_annee = []
-        for i in range(annee_actuelle - 9, annee_actuelle + 1):
-            count = Membre.objects.filter(date_adhesion__year=i).count()
-            adhesions_par_annee.append({'year': i, 'count': count})
+        # Statistiques agrégées (mises en cache)
+        stats = StatistiquesMembresService().statistiques()
+        total_membres = stats['total']
+        membres_actifs = stats['actifs']
+        types_stats = stats['types']
+        statuts_stats = stats['statuts']
+        membres_par_mois = stats['par_mois']
+        membres_par_annee = stats['par_annee']
+        tranches_age = stats['tranches_age']
+        adhesions_par_annee = stats['par_annee']
         
         # Membres avec/sans compte utilisateur
-        with_account = Membre.objects.filter(utilisateur__isnull=False).count()
+        with_account = stats['avec_compte']
         without_account = total_membres - with_account
         
         # Mettre à jour le contexte
@@ -1439,15 +1181,15 @@ class MembreStatistiquesView(StaffRequiredMixin, TemplateView):
             'with_account': with_account,
             'without_account': without_account,
             # Convertir en JSON pour les graphiques JavaScript
-            'chart_types': json.dumps([{'name': t.libelle, 'value': t.count} for t in types_stats]),
-            'chart_statuts': json.dumps([{'name': s.nom, 'value': s.count} for s in statuts_stats]),
+            'chart_types': json.dumps([{'name': t['libelle'], 'value': t['count']} for t in types_stats]),
+            'chart_statuts': json.dumps([{'name': s['nom'], 'value': s['count']} for s in statuts_stats]),
             'chart_mois': json.dumps(membres_par_mois),
             'chart_annees': json.dumps(membres_par_annee),
             'chart_ages': json.dumps(tranches_age),
             'chart_adhesions': json.dumps(adhesions_par_annee),
             'chart_comptes': json.dumps([
-                {'name': _('Avec compte'), 'value': with_account},
-                {'name': _('Sans compte'), 'value': without_account}
+                {'name': str(_('Avec compte')), 'value': with_account},
+                {'name': str(_('Sans compte')), 'value': without_account}
             ]),
         })
         
@@ -1481,13 +1223,9 @@ class TypeMembreDetailView(StaffRequiredMixin, DetailView):
             
         # Ajouter dynamiquement une méthode nb_membres_actifs à l'objet
         type_membre = obj
-        today = timezone.now().date()
         
         # Calculer le nombre de membres actifs
-        membres_count = type_membre.membres_historique.filter(
-            date_debut__lte=today,
-            date_fin__isnull=True
-        ).values('membre').distinct().count()
+        membres_count = type_membre.membres_actifs_index.count()
         
         # Ajouter une méthode dynamique à l'objet qui renvoie ce nombre
         def nb_membres_actifs(self):
@@ -1500,12 +1238,8 @@ class TypeMembreDetailView(StaffRequiredMixin, DetailView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Ajouter les membres actifs au contexte en utilisant la relation correcte
-        today = timezone.now().date()
-        context['membres_actifs'] = self.object.membres_historique.filter(
-            date_debut__lte=today,
-            date_fin__isnull=True
-        ).values('membre').distinct()
+        # Ajouter les membres actifs au contexte (index des types actifs)
+        context['membres_actifs'] = self.object.membres_actifs_index.values('membre')
         return context
     
 class MembreCorbeillePage(StaffRequiredMixin, TrashViewMixin, ListView):
@@ -1535,6 +1269,7 @@ class MembreRestaurerView(StaffRequiredMixin, View):
         membre = get_object_or_404(Membre.objects.only_deleted(), pk=pk)
         membre.deleted_at = None
         membre.save(update_fields=['deleted_at'])
+        compteurs_corbeille.ajuster(Membre, -1)
         
         # Ajouter à l'historique
         HistoriqueMembre.objects.create(
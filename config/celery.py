@@ -93,7 +93,7 @@ app.conf.beat_schedule = {
     
     'envoyer-rappels-evenements': {
         'task': 'apps.evenements.tasks.envoyer_rappels_evenements',
-        'schedule': crontab(minute=0, hour=10),  # Tous les jours à 10h
+        'schedule': crontab(minute=15),  # Toutes les heures (rappels 24h et 2h)
         'options': {
             'expires': 3600,  # 1 heure
             'retry': True,
@@ -137,6 +137,25 @@ app.conf.beat_schedule = {
         }
     },
     
+    'nettoyer-exports-expires': {
+        'task': 'apps.core.tasks.nettoyer_exports_expires_task',
+        'schedule': crontab(minute=30),  # Toutes les heures
+        'options': {
+            'expires': 3600,  # 1 heure
+            'retry': False,
+        }
+    },
+    
+    'appliquer-transitions-types-actifs': {
+        'task': 'apps.membres.tasks.appliquer_transitions_types_actifs_task',
+        # Tous les jours à 2h05 : la date de référence (timezone.now().date()) est celle d'UTC
+        'schedule': crontab(minute=5, hour=2),
+        'options': {
+            'expires': 3600,  # 1 heure
+            'retry': False,
+        }
+    },
+    
     'generer-rapport-activite': {
         'task': 'apps.evenements.tasks.generer_rapport_activite',
         'schedule': crontab(minute=0, hour=9, day_of_week=1),  # Tous les lundis à 9h
@@ -227,8 +246,12 @@ app.conf.update(
         'apps.evenements.tasks.nettoyer_anciennes_donnees': {'queue': 'maintenance'},
         'apps.evenements.tasks.generer_rapport_activite': {'queue': 'reports'},
         'apps.evenements.tasks.health_check': {'queue': 'monitoring'},
+        'apps.core.tasks.generer_export_task': {'queue': 'reports'},
+        'apps.core.tasks.nettoyer_exports_expires_task': {'queue': 'maintenance'},
+        'apps.membres.tasks.appliquer_transitions_types_actifs_task': {'queue': 'maintenance'},
         'apps.core.notifications.send_event_email': {'queue': 'emails'},
         'apps.core.notifications.send_batch_notifications': {'queue': 'emails'},
+        'apps.core.notifications.send_event_emails_batch': {'queue': 'emails'},
     },
     
     # Configuration des queues
@@ -44,6 +44,8 @@ SITE_ID = 1
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Profilage en tête : requêtes des autres middlewares comprises
+    'apps.core.middleware.ProfilageRequetesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -56,6 +58,7 @@ MIDDLEWARE = [
     'apps.accounts.middleware.RolePermissionMiddleware',
     'apps.core.middleware.MaintenanceModeMiddleware',
     'apps.core.middleware.NoCacheMiddleware',
+    'apps.core.middleware.ContextProcessorsInstrumentationMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -155,6 +158,53 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Exports en arrière-plan (apps.core.exports)
+EXPORT_ARRIERE_PLAN_SEUIL = 10000  # nombre de lignes au-delà duquel l'export passe par Celery
+EXPORT_DUREE_CONSERVATION = 86400  # 24 heures en secondes
+
+# Séquences de références (apps.core.references)
+REFERENCES_TAILLE_BLOC = 50  # numéros réservés par écriture en base et conservés par processus
+
+# Piste d'audit (apps.core.audit)
+AUDIT_ECRITURE_ASYNCHRONE = False  # écriture différée confiée à Celery plutôt qu'au commit
+AUDIT_TAILLE_LOT = 500
+
+# Permissions des rôles (apps.accounts.permissions)
+ACCOUNTS_PERMISSIONS_CACHE_DUREE = 3600  # 1 heure en secondes, nouvelle version à chaque modification
+ACCOUNTS_PERMISSIONS_VERIFICATION = 5  # secondes entre deux lectures de la version par processus
+
+# Dernière activité des utilisateurs (apps.accounts.activite)
+ACCOUNTS_ACTIVITE_PRECISION = 900  # 15 minutes en secondes entre deux activités notées
+ACCOUNTS_ACTIVITE_INTERVALLE_ECRITURE = 60  # secondes entre deux écritures groupées par processus
+
+# Compteurs de la corbeille (apps.core.corbeille)
+CORBEILLE_COMPTEURS_DUREE = 3600  # 1 heure en secondes, ajustés à chaque suppression / restauration
+
+# Mesure des context processors (apps.core.middleware)
+CONTEXT_PROCESSORS_INSTRUMENTATION = None  # None : activée si DEBUG
+
+# Profilage des requêtes (apps.core.middleware.ProfilageRequetesMiddleware)
+PROFILAGE_TAUX = 0  # proportion des requêtes mesurées (0 : désactivé, activé en développement)
+PROFILAGE_HISTORIQUE = 200  # dernières mesures conservées par processus
+PROFILAGE_BUDGET_STRICT = False  # True : budget de requêtes dépassé -> exception
+
+# Index de recherche plein texte (apps.core.recherche)
+RECHERCHE_MOTEUR = 'auto'  # 'fts5' (SQLite), 'trigrammes', ou 'auto' pour détecter
+
+# Envoi des rappels de cotisation (apps.cotisations.services.EnvoiRappelsService)
+COTISATIONS_RAPPELS_BACKEND = 'apps.cotisations.rappels.EmailRappelBackend'
+COTISATIONS_RAPPELS_TAILLE_LOT = 100
+COTISATIONS_RAPPELS_DELAI_RESERVATION = 900  # 15 minutes en secondes
+
+# Recalcul des soldes des cotisations (apps.cotisations.services.SoldeCotisationsService)
+COTISATIONS_SOLDES_TAILLE_LOT = 2000
+
+# Occurrences des événements récurrents (apps.evenements.recurrence)
+EVENEMENTS_RECURRENCE_HORIZON_JOURS = 90  # occurrences créées à l'avance
+
+# Statistiques des membres (apps.membres.services.StatistiquesMembresService)
+MEMBRES_STATISTIQUES_CACHE_DUREE = 300  # 5 minutes en secondes, invalidées à chaque modification
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -166,6 +216,7 @@ EMAIL_PORT = env.int('EMAIL_PORT', default=587)
 EMAIL_HOST_USER = env('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', default='')
 EMAIL_USE_TLS = env.bool('EMAIL_USE_TLS', default=True)
+NOTIFICATIONS_TAILLE_LOT = 100  # messages envoyés par connexion SMTP (apps.core.notifications)
 
 # Site URL
 SITE_URL = env('SITE_URL', default='http://localhost:8000')
@@ -184,6 +235,7 @@ LOGIN_REDIRECT_URL = 'core:home'
 
 # Durée d'inactivité avant déconnexion (en secondes)
 SESSION_IDLE_TIMEOUT = 1800  # 30 minutes
+SESSION_ACTIVITE_PRECISION = 60  # la session n'est réécrite qu'une fois par minute au plus
 
 # Nom du site pour les emails
 SITE_NAME = env('SITE_NAME', default='Nom de l\'association')
@@ -18,6 +18,9 @@ INTERNAL_IPS = ['127.0.0.1']
 # Simplified email testing
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# Profilage de toutes les requêtes (apps.core.middleware.ProfilageRequetesMiddleware)
+PROFILAGE_TAUX = 1
+
 
 # Ajoutez ces paramètres dans votre fichier settings (config/settings/development.py)
 
@@ -71,6 +74,13 @@ if 'test' in sys.argv or 'pytest' in sys.modules:
     # Désactiver les tâches planifiées
     CELERY_BEAT_SCHEDULE = {}
     
+    # Activités écrites à la fin de chaque requête (rien en attente d'un test à l'autre)
+    ACCOUNTS_ACTIVITE_INTERVALLE_ECRITURE = 0
+    
+    # Toutes les requêtes profilées, budgets de requêtes vérifiés
+    PROFILAGE_TAUX = 1
+    PROFILAGE_BUDGET_STRICT = True
+    
     # Base de données en mémoire pour les tests (plus rapide)
     DATABASES = {
         'default': {
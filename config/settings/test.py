@@ -17,6 +17,9 @@ class DisableMigrations:
 
 MIGRATION_MODULES = DisableMigrations()
 
+# Activités écrites à la fin de chaque requête (rien en attente d'un test à l'autre)
+ACCOUNTS_ACTIVITE_INTERVALLE_ECRITURE = 0
+
 # Configuration email pour tests
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 